@@ -24,6 +24,8 @@ from src.db import init_db
 from src.routes import bp
 from src.worker import queue_worker
 from src.auto_worker import auto_scan_worker
+from src.maintenance import maintenance_worker
+from src.seeding import seeding_worker
 
 app = Flask(__name__)
 
@@ -93,6 +95,14 @@ if RUN_WORKER:
     t2.start()
     logger.info("Background auto-scan worker thread started")
 
+    t3 = threading.Thread(target=maintenance_worker, args=(shutdown_event,), daemon=True)
+    t3.start()
+    logger.info("Background DB maintenance thread started")
+
+    t4 = threading.Thread(target=seeding_worker, args=(shutdown_event,), daemon=True)
+    t4.start()
+    logger.info("Background seeding monitor thread started")
+
 if __name__ == "__main__":
     logger.info("Starting torrup application on port 5001")
     app.run(host="0.0.0.0", port=5001, debug=False)
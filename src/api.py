@@ -2,48 +2,410 @@
 
 from __future__ import annotations
 
+import atexit
+import importlib.util
+import os
+import random
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
 import httpx
 
-from src.config import ANNOUNCE_KEY, TL_SEARCH_URL, TL_UPLOAD_URL
+from src.artifacts import Artifact
+from src.config import ANNOUNCE_KEY, TL_HTTP2, TL_SEARCH_URL, TL_UPLOAD_URL
 from src.logger import logger
 
 TL_DOWNLOAD_URL = "https://www.torrentleech.org/torrents/upload/apidownload"
 
+# Shared connection pool. Auto-scan can send thousands of searches per run;
+# keep-alive makes each one a single round trip instead of TCP + TLS setup.
+TL_MAX_CONNECTIONS = 10
+TL_MAX_KEEPALIVE = 10
+TL_KEEPALIVE_SECONDS = 60
+TL_CONNECT_TIMEOUT = 10
 
-def check_exists(release_name: str, exact: bool = True) -> bool:
-    """Check if release already exists on TorrentLeech."""
+# Retries for tracker calls (see _call): full-jitter exponential backoff
+RETRY_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 1
+RETRY_MAX_SECONDS = 30
+
+# Circuit breaker: consecutive outage errors before tracker calls pause,
+# and how long the first pause lasts (doubling while probes keep failing)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_OPEN_SECONDS = 30
+BREAKER_MAX_OPEN_SECONDS = 600
+
+# TrackerError kinds
+TIMEOUT = "timeout"
+NETWORK = "network"
+SERVER = "server"
+RATE_LIMITED = "rate_limited"
+AUTH = "auth"
+REJECTED = "rejected"
+MALFORMED = "malformed"
+CIRCUIT_OPEN = "circuit_open"
+
+_client: httpx.Client | None = None
+_client_pid: int | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> httpx.Client:
+    """Return the shared TorrentLeech HTTP client, creating it on first use.
+
+    A forked child (gunicorn worker) gets its own client rather than
+    sharing the parent's sockets. HTTP/2 is used when TORRUP_TL_HTTP2=1 and
+    the h2 package is installed.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            http2 = TL_HTTP2 and importlib.util.find_spec("h2") is not None
+            if TL_HTTP2 and not http2:
+                logger.warning("TORRUP_TL_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+            _client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=TL_MAX_CONNECTIONS,
+                    max_keepalive_connections=TL_MAX_KEEPALIVE,
+                    keepalive_expiry=TL_KEEPALIVE_SECONDS,
+                ),
+                timeout=httpx.Timeout(30, connect=TL_CONNECT_TIMEOUT),
+            )
+            _client_pid = os.getpid()
+        return _client
+
+
+def close_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None and _client_pid == os.getpid():
+        client.close()
+
+
+atexit.register(close_client)
+
+
+class TrackerError(Exception):
+    """A tracker call that failed, classified by kind.
+
+    Kinds: timeout, network (connection failed), server (5xx),
+    rate_limited (429), auth (401/403), rejected (other 4xx), malformed
+    (an answer the client cannot parse) and circuit_open.
+    """
+
+    RETRYABLE = frozenset({TIMEOUT, NETWORK, SERVER, RATE_LIMITED})
+    # Kinds that count against the circuit breaker; a rejected request
+    # means the tracker is up and answering
+    OUTAGE = frozenset({TIMEOUT, NETWORK, SERVER, RATE_LIMITED, AUTH, MALFORMED})
+
+    def __init__(
+        self,
+        kind: str,
+        message: str,
+        status: int | None = None,
+        retry_after: float | None = None,
+        sent: bool = True,
+    ):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.retry_after = retry_after
+        # False when the request never reached the tracker (connect failed)
+        self.sent = sent
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in self.RETRYABLE
+
+
+class CircuitOpenError(TrackerError):
+    """Raised instead of calling the tracker while the breaker is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(CIRCUIT_OPEN, f"Tracker unavailable, retrying in {retry_in:.0f}s", sent=False)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Stops tracker calls after repeated outage errors.
+
+    closed: calls go through. After failure_threshold consecutive outage
+    errors it opens: calls fail fast with CircuitOpenError for open_seconds.
+    Then one caller's probe is let through (half_open); success closes the
+    breaker, failure reopens it for twice as long, up to max_open_seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._open_for = self.open_seconds
+            self._opened_at = 0.0
+            self._probing = False
+            self._last_error: str | None = None
+            self._trips = 0
+
+    def _retry_in(self) -> float:
+        return max(0.0, self._opened_at + self._open_for - self._clock())
+
+    def retry_in(self) -> float:
+        """Seconds until a probe is allowed (0 when calls may go through)."""
+        with self._lock:
+            return self._retry_in() if self._state == "open" else 0.0
+
+    def is_open(self) -> bool:
+        """Whether callers should hold off (without claiming the probe)."""
+        with self._lock:
+            if self._state == "half_open":
+                return self._probing
+            return self._state == "open" and self._retry_in() > 0
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now; may claim the half-open probe."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if self._retry_in() > 0:
+                    return False
+                self._state = "half_open"
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def abandon_probe(self) -> None:
+        """Release a claimed probe whose call ended without a verdict."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                logger.info("Tracker reachable again; resuming tracker calls")
+            self._state = "closed"
+            self._failures = 0
+            self._open_for = self.open_seconds
+            self._probing = False
+
+    def record_failure(self, error: TrackerError) -> None:
+        if error.kind not in TrackerError.OUTAGE:
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            self._last_error = f"{error.kind}: {error}"
+            if self._state == "half_open":
+                self._open_for = min(self._open_for * 2, self.max_open_seconds)
+            elif self._failures < self.failure_threshold:
+                return
+            self._state = "open"
+            self._opened_at = self._clock()
+            self._probing = False
+            self._trips += 1
+            logger.warning(
+                f"Tracker circuit open for {self._open_for:.0f}s after "
+                f"{self._failures} failures ({self._last_error})"
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": round(self._retry_in(), 1) if self._state == "open" else 0,
+                "trips": self._trips,
+                "last_error": self._last_error,
+            }
+
+
+_breaker = CircuitBreaker()
+
+
+def tracker_breaker() -> CircuitBreaker:
+    """The process-wide breaker shared by every tracker call."""
+    return _breaker
+
+
+def classify_response(response: httpx.Response) -> TrackerError | None:
+    """The TrackerError an HTTP status stands for, or None if it is not an error."""
+    status = response.status_code
+    if status < 400:
+        return None
+    if status == 429:
+        return TrackerError(RATE_LIMITED, "HTTP 429", status, _retry_after(response))
+    if status >= 500:
+        return TrackerError(SERVER, f"HTTP {status}", status, _retry_after(response))
+    # TL explains a refused request in the body; keep it for the queue message
+    reason = _reason(response)
+    if status in (401, 403):
+        return TrackerError(AUTH, f"HTTP {status}: {reason or 'check TL_ANNOUNCE_KEY'}", status)
+    return TrackerError(REJECTED, f"HTTP {status}: {reason}" if reason else f"HTTP {status}", status)
+
+
+def _reason(response: httpx.Response) -> str:
+    text = getattr(response, "text", "")
+    return " ".join(text.split())[:200] if isinstance(text, str) else ""
+
+
+def classify_exception(exc: httpx.HTTPError) -> TrackerError:
+    """Map an httpx transport error to a TrackerError."""
+    if isinstance(exc, httpx.TimeoutException):
+        # A connect timeout never sent the request
+        return TrackerError(TIMEOUT, f"Timed out: {exc}", sent=not isinstance(exc, httpx.ConnectTimeout))
+    return TrackerError(NETWORK, f"Connection failed: {exc}", sent=not isinstance(exc, httpx.ConnectError))
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After."""
+    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt))
+    return max(delay, retry_after or 0)
+
+
+def _call(op: str, send, idempotent: bool) -> httpx.Response:
+    """Send a tracker request through the breaker, retrying where safe.
+
+    Idempotent calls (search, download) are retried on every retryable
+    error. An upload is only retried when it never reached the tracker or
+    was rate limited, so a timed-out upload is not sent twice.
+
+    Raises:
+        TrackerError: classified failure after the last attempt
+        CircuitOpenError: the breaker is open
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        if not _breaker.allow():
+            raise CircuitOpenError(_breaker.retry_in())
+        try:
+            response = send()
+            error = classify_response(response)
+        except httpx.HTTPError as e:
+            error = classify_exception(e)
+        except BaseException:
+            _breaker.abandon_probe()
+            raise
+        if error is None:
+            _breaker.record_success()
+            return response
+        _breaker.record_failure(error)
+        safe = error.retryable and (idempotent or not error.sent or error.kind == RATE_LIMITED)
+        if not safe or attempt == RETRY_ATTEMPTS - 1:
+            raise error
+        delay = backoff_delay(attempt, error.retry_after)
+        logger.warning(f"TL {op} failed ({error.kind}: {error}); retry {attempt + 1} in {delay:.1f}s")
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def search_form(query: str, exact: bool = True) -> dict[str, str]:
+    """Form fields for a TL search request."""
+    return {
+        "announcekey": ANNOUNCE_KEY,
+        "exact": "1" if exact else "0",
+        "query": f"'{query}'",
+    }
+
+
+def parse_search_response(text: str) -> bool:
+    """Whether a TL search response reports a match.
+
+    Raises:
+        TrackerError: (malformed) the body is not "0" or "1"
+    """
+    # API returns "1" or "0" (often wrapped in double quotes)
+    result = text.strip().replace('"', '')
+    if result not in ("0", "1"):
+        raise TrackerError(MALFORMED, f"Unexpected search response: {text[:80]!r}")
+    return result == "1"
+
+
+def check_exists(release_name: str, exact: bool = True, use_cache: bool = False) -> bool:
+    """Check if release already exists on TorrentLeech.
+
+    With use_cache, a fresh answer from the search cache (src/search_cache.py)
+    is returned without calling TL, and a new answer is stored there.
+
+    Raises:
+        TrackerError: TL could not answer; never read this as "not a duplicate"
+    """
     if not ANNOUNCE_KEY:
         return False
+    if use_cache:
+        from src.search_cache import cache_lookup
+
+        cached = cache_lookup(release_name, exact)
+        if cached is not None:
+            return cached
+
+    def send() -> httpx.Response:
+        return get_client().post(TL_SEARCH_URL, data=search_form(release_name, exact), timeout=30)
+
+    response = _call("search", send, idempotent=True)
     try:
-        response = httpx.post(
-            TL_SEARCH_URL,
-            data={
-                "announcekey": ANNOUNCE_KEY,
-                "exact": "1" if exact else "0",
-                "query": f"'{release_name}'",
-            },
-            timeout=30,
-        )
-        # API returns "1" or "0" (often wrapped in double quotes)
-        result = response.text.strip().replace('"', '')
-        return result == "1"
-    except Exception:
-        return False
+        found = parse_search_response(response.text)
+    except TrackerError as e:
+        _breaker.record_failure(e)
+        raise
+    if use_cache:
+        from src.search_cache import cache_store
+
+        cache_store(release_name, exact, found)
+    return found
+
+
+def _open_upload(source: Path | Artifact):
+    """Binary file object for a .torrent or .nfo on disk or staged in memory."""
+    if isinstance(source, Artifact):
+        return source.open()
+    return open(source, "rb")
 
 
 def upload_torrent(
-    torrent_path: Path, 
-    nfo_path: Path, 
+    torrent_path: Path | Artifact,
+    nfo_path: Path | Artifact,
     category: int, 
     tags: str,
     imdb: str | None = None,
     tvmazeid: int | str | None = None,
     tvmazetype: int | str | None = None
 ) -> dict[str, Any]:
-    """Upload torrent to TorrentLeech."""
+    """Upload torrent to TorrentLeech.
+
+    torrent_path and nfo_path may be files or Artifacts staged by the queue
+    worker (src/artifacts.py); either is streamed into the request as is.
+
+    Returns {"success": False, "error": ...} when TL answers with an error
+    message (e.g. a rejected upload).
+
+    Raises:
+        TrackerError: TL could not be reached or failed (see _call)
+    """
     if not ANNOUNCE_KEY:
         raise Exception("TL_ANNOUNCE_KEY not configured")
 
@@ -59,16 +421,20 @@ def upload_torrent(
     if tvmazetype:
         data["tvmazetype"] = str(tvmazetype)
 
-    with open(torrent_path, "rb") as torrent_file, open(nfo_path, "rb") as nfo_file:
-        response = httpx.post(
-            TL_UPLOAD_URL,
-            files={
-                "torrent": (torrent_path.name, torrent_file, "application/x-bittorrent"),
-                "nfo": (nfo_path.name, nfo_file, "text/plain"),
-            },
-            data=data,
-            timeout=60,
-        )
+    def send() -> httpx.Response:
+        # Reopened per attempt so a retry sends the files from the start
+        with _open_upload(torrent_path) as torrent_file, _open_upload(nfo_path) as nfo_file:
+            return get_client().post(
+                TL_UPLOAD_URL,
+                files={
+                    "torrent": (torrent_path.name, torrent_file, "application/x-bittorrent"),
+                    "nfo": (nfo_path.name, nfo_file, "text/plain"),
+                },
+                data=data,
+                timeout=60,
+            )
+
+    response = _call("upload", send, idempotent=False)
 
     try:
         torrent_id = int(response.text)
@@ -77,25 +443,24 @@ def upload_torrent(
         return {"success": False, "error": response.text}
 
 
-def download_torrent(torrent_id: int, dest_path: Path) -> bool:
-    """Download the official .torrent file from TorrentLeech.
+def fetch_torrent(torrent_id: int) -> bytes | None:
+    """Download the official .torrent from TorrentLeech into memory.
 
     After uploading, TL may modify the torrent (announce URL, info dict).
-    This downloads TL's version so the info hash matches what peers expect.
+    This fetches TL's version so the info hash matches what peers expect.
 
     Args:
         torrent_id: The torrent ID returned by upload_torrent.
-        dest_path: Where to save the downloaded .torrent file.
 
     Returns:
-        True if downloaded successfully, False otherwise.
+        The bencoded torrent, or None if it could not be downloaded.
     """
     if not ANNOUNCE_KEY:
         logger.error("TL_ANNOUNCE_KEY not configured for torrent download")
-        return False
+        return None
 
-    try:
-        response = httpx.post(
+    def send() -> httpx.Response:
+        return get_client().post(
             TL_DOWNLOAD_URL,
             data={
                 "announcekey": ANNOUNCE_KEY,
@@ -104,21 +469,42 @@ def download_torrent(torrent_id: int, dest_path: Path) -> bool:
             timeout=30,
         )
 
+    try:
+        response = _call("download", send, idempotent=True)
+
         if response.status_code != 200:
             logger.error(f"TL download failed: HTTP {response.status_code}")
-            return False
+            return None
 
         # Sanity check: response should be bencoded torrent data, not an error string
         content = response.content
         if len(content) < 50 or not content.startswith(b"d"):
             logger.error(f"TL download returned invalid data (len={len(content)})")
-            return False
+            return None
+        return content
 
+    except TrackerError as e:
+        logger.error(f"TL torrent download failed ({e.kind}): {e}")
+        return None
+    except Exception as e:
+        logger.error(f"TL torrent download error: {e}")
+        return None
+
+
+def download_torrent(torrent_id: int, dest_path: Path) -> bool:
+    """Download the official .torrent file from TorrentLeech to dest_path.
+
+    Returns:
+        True if downloaded successfully, False otherwise.
+    """
+    content = fetch_torrent(torrent_id)
+    if content is None:
+        return False
+    try:
         dest_path.parent.mkdir(parents=True, exist_ok=True)
         dest_path.write_bytes(content)
-        logger.info(f"Downloaded TL torrent {torrent_id} -> {dest_path.name}")
-        return True
-
-    except Exception as e:
+    except OSError as e:
         logger.error(f"TL torrent download error: {e}")
         return False
+    logger.info(f"Downloaded TL torrent {torrent_id} -> {dest_path.name}")
+    return True
@@ -0,0 +1,345 @@
+"""In-memory staging store for the NFO, XML, thumbnail and .torrent of queue items.
+
+The queue worker used to write every artifact to the output dir, reopen
+the .torrent and .nfo to upload them, and delete them only after a
+successful upload. In Docker the output dir is tmpfs inside the
+container's memory limit, so the files of failed items stayed in RAM
+for good.
+
+Artifacts now live in one process-wide ArtifactStore. Anything up to
+staging_spill_kb is kept as an in-memory buffer; larger artifacts (the
+.torrent of a very large release) are spilled to the output dir. Every
+staged byte, spilled or not, counts against staging_budget_mb.
+
+An item is pinned while it is being prepared or uploaded. Once it fails
+or is requeued it is unpinned, and when the budget is exceeded unpinned
+items are evicted whole, least recently used first. Unpinned items not
+touched for STALE_HOURS are dropped even under budget. Eviction makes the
+item's checkpoints (src/checkpoints.py) for those stages stale, so a
+retry rebuilds them; the torrent comes back from the piece-hash cache.
+
+The store is per process: torrup prepare and torrup upload run in their
+own process and keep writing real files to the output dir.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from src.db import get_int_setting
+from src.logger import logger
+
+DEFAULT_BUDGET_MB = 64
+DEFAULT_SPILL_KB = 1024
+# Unpinned items untouched this long are dropped even under budget
+STALE_HOURS = 24
+
+_serials = itertools.count(1)
+
+
+class Artifact:
+    """One staged file: an in-memory buffer, or a file spilled to disk.
+
+    Quacks enough like a Path for upload_torrent(), add_to_qbt() and the
+    XML sidecar: it has a name, opens for binary reading and prints as its
+    path (or just its name while it is in memory).
+    """
+
+    def __init__(self, name: str, data: bytes | None = None, path: Path | None = None):
+        self.name = name
+        self.path = path
+        self._data = data
+        self.size = len(data) if data is not None else path.stat().st_size
+        # Distinguishes this artifact from an earlier one with the same
+        # name, so a checkpoint only matches the exact artifact it recorded
+        self.serial = next(_serials)
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def open(self) -> BinaryIO:
+        """Binary file object positioned at the start."""
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        return open(self.path, "rb")
+
+    def read_bytes(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        return self.path.read_bytes()
+
+    def intact(self) -> bool:
+        """False once dropped, or if a spilled file was removed or changed."""
+        if self.path is None:
+            return self._data is not None
+        try:
+            return self.path.stat().st_size == self.size
+        except OSError:
+            return False
+
+    def stamp(self) -> list[int]:
+        """Identity recorded by checkpoints."""
+        return [self.size, self.serial]
+
+    def write_to(self, dest: Path) -> Path:
+        """Copy the artifact to dest (no-op if it is already spilled there)."""
+        if self.path != dest:
+            _write_atomic(dest, self.read_bytes())
+        return dest
+
+    def drop(self) -> None:
+        """Free the buffer or delete the spilled file."""
+        self._data = None
+        if self.path is not None:
+            try:
+                self.path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove staged {self.path.name}: {e}")
+
+    def __str__(self) -> str:
+        return str(self.path) if self.path is not None else self.name
+
+    def __repr__(self) -> str:
+        where = "memory" if self.in_memory else str(self.path)
+        return f"Artifact({self.name!r}, {self.size} bytes, {where})"
+
+
+def _write_atomic(dest: Path, data: bytes) -> None:
+    # Write then rename so a crash never leaves a truncated file behind
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, dest)
+
+
+class _Item:
+    __slots__ = ("artifacts", "pins", "touched")
+
+    def __init__(self, now: float):
+        self.artifacts: dict[str, Artifact] = {}
+        self.pins = 0
+        self.touched = now
+
+    @property
+    def size(self) -> int:
+        return sum(a.size for a in self.artifacts.values())
+
+
+class ArtifactStore:
+    """Staged artifacts of every item, bounded by a byte budget.
+
+    Items are kept in least-recently-used order. Pinned items (in flight)
+    are never evicted, so the budget can be exceeded while more items are
+    in flight than fit; it is enforced again as they finish.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024,
+        spill_bytes: int = DEFAULT_SPILL_KB * 1024,
+        clock=time.monotonic,
+    ):
+        self.budget_bytes = budget_bytes
+        self.spill_bytes = spill_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._items: OrderedDict[int, _Item] = OrderedDict()
+        self._bytes = 0
+        self._stats = {"stored": 0, "spilled": 0, "evictions": 0, "evicted_bytes": 0}
+
+    def configure(self, budget_bytes: int, spill_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = max(0, budget_bytes)
+            self.spill_bytes = max(0, spill_bytes)
+            self._trim()
+
+    def open(self, item_id: int, out_dir: Path) -> "Staging":
+        """Pin item_id and return its staging area."""
+        with self._lock:
+            self._touch(item_id).pins += 1
+        return Staging(self, item_id, out_dir)
+
+    def put(self, item_id: int, name: str, data: bytes, out_dir: Path) -> Artifact:
+        """Stage data as name, spilling it to out_dir above the spill threshold."""
+        if len(data) > self.spill_bytes:
+            path = out_dir / name
+            _write_atomic(path, data)
+            artifact = Artifact(name, path=path)
+        else:
+            artifact = Artifact(name, data)
+        return self._add(item_id, artifact)
+
+    def adopt(self, item_id: int, path: Path) -> Artifact:
+        """Take over a file written by an external tool (ffmpeg, exiftool).
+
+        Small files are read into memory and deleted; larger ones stay
+        where they are as a spilled artifact.
+        """
+        path = Path(path)
+        if path.stat().st_size > self.spill_bytes:
+            return self._add(item_id, Artifact(path.name, path=path))
+        artifact = Artifact(path.name, path.read_bytes())
+        path.unlink(missing_ok=True)
+        return self._add(item_id, artifact)
+
+    def _add(self, item_id: int, artifact: Artifact) -> Artifact:
+        with self._lock:
+            item = self._touch(item_id)
+            old = item.artifacts.pop(artifact.name, None)
+            if old is not None:
+                self._bytes -= old.size
+                # A spill to the same path has already replaced the file
+                if old.path is None or old.path != artifact.path:
+                    old.drop()
+            item.artifacts[artifact.name] = artifact
+            self._bytes += artifact.size
+            self._stats["stored"] += 1
+            if not artifact.in_memory:
+                self._stats["spilled"] += 1
+            # Never evict what the caller is being handed, even unpinned
+            # (put() outside open(), e.g. from the CLI)
+            self._trim(keep=item_id)
+        return artifact
+
+    def get(self, item_id: int, name: str) -> Artifact | None:
+        """The item's artifact called name, if still staged and intact."""
+        with self._lock:
+            item = self._items.get(item_id)
+            artifact = item.artifacts.get(name) if item else None
+            if artifact is None:
+                return None
+            self._touch(item_id)
+        return artifact if artifact.intact() else None
+
+    def unpin(self, item_id: int) -> None:
+        """Mark the item as no longer in flight, so it may be evicted."""
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None:
+                return
+            item.pins = max(0, item.pins - 1)
+            item.touched = self._clock()
+            self._trim()
+
+    def discard(self, item_id: int) -> None:
+        """Drop every artifact of the item (e.g. after a successful upload)."""
+        with self._lock:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                self._drop(item)
+
+    def clear(self) -> None:
+        """Drop every staged artifact of every item."""
+        with self._lock:
+            for item in self._items.values():
+                self._drop(item)
+            self._items.clear()
+
+    def _touch(self, item_id: int) -> _Item:
+        item = self._items.get(item_id)
+        if item is None:
+            item = self._items[item_id] = _Item(self._clock())
+        else:
+            item.touched = self._clock()
+            self._items.move_to_end(item_id)
+        return item
+
+    def _drop(self, item: _Item) -> None:
+        for artifact in item.artifacts.values():
+            self._bytes -= artifact.size
+            artifact.drop()
+        item.artifacts.clear()
+
+    def _trim(self, keep: int | None = None) -> None:
+        """Evict unpinned items other than keep: stale ones, then LRU until under budget.
+
+        Holds the lock.
+        """
+        stale_before = self._clock() - STALE_HOURS * 3600
+        for item_id, item in list(self._items.items()):
+            if item.pins or item_id == keep:
+                continue
+            if item.touched >= stale_before and self._bytes <= self.budget_bytes:
+                continue
+            size = item.size
+            if size:
+                self._stats["evictions"] += 1
+                self._stats["evicted_bytes"] += size
+                logger.info(f"Item {item_id}: Evicted {size} staged bytes")
+            self._drop(item)
+            del self._items[item_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            artifacts = [a for item in self._items.values() for a in item.artifacts.values()]
+            return {
+                **self._stats,
+                "items": sum(1 for item in self._items.values() if item.artifacts),
+                "pinned": sum(1 for item in self._items.values() if item.pins),
+                "artifacts": len(artifacts),
+                "bytes": self._bytes,
+                "spilled_bytes": sum(a.size for a in artifacts if not a.in_memory),
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+class Staging:
+    """One item's view of the store, handed to the prepare steps.
+
+    Opening it pins the item; close() unpins it (failed, requeued) and
+    discard() drops its artifacts (uploaded). Both are safe to repeat.
+    """
+
+    def __init__(self, store: ArtifactStore, item_id: int, out_dir: Path):
+        self.store = store
+        self.item_id = item_id
+        self.out_dir = out_dir
+        self._open = True
+
+    def put(self, name: str, data: bytes) -> Artifact:
+        return self.store.put(self.item_id, name, data, self.out_dir)
+
+    def adopt(self, path: Path) -> Artifact:
+        return self.store.adopt(self.item_id, path)
+
+    def get(self, name: str) -> Artifact | None:
+        return self.store.get(self.item_id, name)
+
+    def close(self) -> None:
+        if self._open:
+            self._open = False
+            self.store.unpin(self.item_id)
+
+    def discard(self) -> None:
+        self._open = False
+        self.store.discard(self.item_id)
+
+
+_store = ArtifactStore()
+
+
+def staging_store() -> ArtifactStore:
+    """The process-wide store used by the queue worker."""
+    return _store
+
+
+def open_staging(conn: sqlite3.Connection, item_id: int, out_dir: Path) -> Staging:
+    """Pin item_id in the process-wide store, applying the staging settings."""
+    _store.configure(
+        get_int_setting(conn, "staging_budget_mb", DEFAULT_BUDGET_MB) * 1024 * 1024,
+        get_int_setting(conn, "staging_spill_kb", DEFAULT_SPILL_KB) * 1024,
+    )
+    return _store.open(item_id, out_dir)
+
+
+def staging_stats() -> dict:
+    """Store counters for /health."""
+    return _store.stats()
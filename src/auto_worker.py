@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
-import time
 from pathlib import Path
 
-from src.api import check_exists
+from src.api import tracker_breaker
 from src.cli.queue import calculate_certainty
-from src.db import db, get_media_roots, get_setting, get_excludes
+from src.db import (
+    db,
+    enqueue_items,
+    get_bool_setting,
+    get_excludes,
+    get_int_setting,
+    get_media_roots,
+    get_setting,
+    known_paths,
+)
+from src.dupe_search import DupeSearch
 from src.logger import logger
 from src.utils import (
+    ReleaseManifest,
     extract_metadata,
     generate_release_name,
     is_excluded,
@@ -18,6 +28,9 @@ from src.utils import (
     suggest_release_name,
 )
 
+# Rows are written in batches so a long scan keeps its progress without a
+# transaction per item.
+SCAN_FLUSH_EVERY = 50
 
 
 def auto_scan_worker(shutdown_event: "threading.Event | None" = None) -> None:
@@ -36,8 +49,8 @@ def auto_scan_worker(shutdown_event: "threading.Event | None" = None) -> None:
     while not shutdown_event.is_set():
         try:
             with db() as conn:
-                enabled = get_setting(conn, "enable_auto_upload") == "1"
-                interval_mins = int(get_setting(conn, "auto_scan_interval") or 60)
+                enabled = get_bool_setting(conn, "enable_auto_upload")
+                interval_mins = get_int_setting(conn, "auto_scan_interval", 60)
                 excludes = get_excludes(conn)
 
                 if not enabled:
@@ -58,13 +71,15 @@ def auto_scan_worker(shutdown_event: "threading.Event | None" = None) -> None:
                         pass  # For now we just scan every loop if auto_scan is on
 
                     logger.info(f"Auto-scanning {root['media_type']} root: {root['path']}")
-                    _scan_root(conn, root, excludes)
+                    _scan_root(conn, root, excludes, shutdown_event=shutdown_event)
 
                     # Update last scan time
                     conn.execute(
                         "UPDATE media_roots SET last_scan = ? WHERE media_type = ?",
                         (now_iso(), root["media_type"])
                     )
+                    # Don't hold the write lock while the next root is scanned
+                    conn.commit()
 
             # Wait for next interval
             shutdown_event.wait(interval_mins * 60)
@@ -76,12 +91,20 @@ def auto_scan_worker(shutdown_event: "threading.Event | None" = None) -> None:
     logger.info("Auto-scan worker stopped")
 
 
-def _scan_root(conn, root, excludes, source="Auto-scan"):
-    """Scan a specific root directory."""
+def _scan_root(conn, root, excludes, source="Auto-scan", shutdown_event=None):
+    """Scan a specific root directory.
+
+    TL searches run concurrently through DupeSearch; shutdown_event stops
+    the scan from starting new ones.
+    """
     base_path = Path(root["path"])
     if not base_path.exists():
         return
 
+    if tracker_breaker().is_open():
+        logger.warning(f"{source}: tracker unavailable, skipping {root['media_type']} scan")
+        return
+
     media_type = root["media_type"]
     category = root["default_category"]
     release_group = get_setting(conn, "release_group") or "torrup"
@@ -99,50 +122,63 @@ def _scan_root(conn, root, excludes, source="Auto-scan"):
     else:
         entries = [e for e in base_path.iterdir() if not is_excluded(e, excludes)]
 
-    for entry in entries:
-        try:
-            # Check if already in queue or history
-            exists_in_db = conn.execute(
-                "SELECT 1 FROM queue WHERE path = ?", (str(entry),)
-            ).fetchone()
+    existing = known_paths(conn, [str(e) for e in entries])
+    candidates: dict[str, tuple[Path, dict, str, int]] = {}
 
-            if exists_in_db:
+    def searches():
+        # Runs on the search engine's feeder thread, so metadata for the
+        # next entries is read while earlier searches are in flight.
+        for entry in entries:
+            if str(entry) in existing:
                 continue
-
-            metadata = extract_metadata(entry, media_type)
-
-            # Build a human-readable search query from raw metadata.
-            # TL search needs natural terms (e.g. "3030 Quinta Dimensao"),
-            # not formatted release names ("3030-Quinta.Dimensao-2012-WEB-FLAC-16bit-torrup").
-            search_query = _build_search_query(metadata, media_type, entry)
-
-            if not search_query:
+            try:
+                # One walk gives both the metadata and the size sjf orders by
+                manifest = ReleaseManifest(entry)
+                metadata = extract_metadata(entry, media_type, manifest=manifest)
+                # Build a human-readable search query from raw metadata.
+                # TL search needs natural terms (e.g. "3030 Quinta Dimensao"),
+                # not formatted release names ("3030-Quinta.Dimensao-2012-WEB-FLAC-16bit-torrup").
+                search_query = _build_search_query(metadata, media_type, entry)
+            except Exception as e:
+                logger.error(f"{source}: Error processing {entry}: {e}")
                 continue
-
-            # Check TL with the natural search query
-            if check_exists(search_query, exact=False):
-                logger.info(f"{source}: '{search_query}' found on TL, skipping.")
-                # Still generate a release name for the queue record
-                release_name = _make_release_name(metadata, media_type, release_group, entry)
-                _add_to_queue_silent(
-                    conn, media_type, entry, release_name,
-                    category, "duplicate", f"TL match for: {search_query}", metadata,
-                )
-                conn.commit()
-                time.sleep(1.5)
+            if not search_query:
                 continue
+            candidates[str(entry)] = (entry, metadata, search_query, manifest.total_size)
+            yield str(entry), [search_query]
 
-            time.sleep(1.5)
+    engine = DupeSearch.from_settings(conn)
+    pending: list[dict] = []
 
-            # Not on TL, generate the formatted release name for upload
+    for key, found in engine.search_many(searches(), exact=False, cancel=shutdown_event):
+        entry, metadata, search_query, size = candidates.pop(key)
+        try:
+            if found is None:
+                # Not recorded, so the next scan searches it again
+                logger.warning(f"{source}: TL search failed for '{search_query}', will retry next scan.")
+                continue
             release_name = _make_release_name(metadata, media_type, release_group, entry)
-
-            logger.info(f"{source}: '{search_query}' not on TL, queuing as {release_name}")
-            _add_to_queue(conn, media_type, entry, release_name, category, metadata)
-            conn.commit()
+            if found:
+                logger.info(f"{source}: '{search_query}' found on TL, skipping.")
+                # Still record it (as duplicate) so it is not searched again
+                pending.append(_queue_row(
+                    media_type, entry, release_name, category, metadata, size,
+                    status="duplicate", message=f"TL match for: {search_query}",
+                ))
+            else:
+                logger.info(f"{source}: '{search_query}' not on TL, queuing as {release_name}")
+                pending.append(_queue_row(media_type, entry, release_name, category, metadata, size))
         except Exception as e:
             logger.error(f"{source}: Error processing {entry}: {e}")
-            continue
+
+        if len(pending) >= SCAN_FLUSH_EVERY:
+            enqueue_items(conn, pending)
+            pending = []
+
+    if pending:
+        enqueue_items(conn, pending)
+    if engine.searched or engine.failed:
+        logger.info(f"{source}: {media_type} TL searches: {engine.stats()}")
 
 
 def _build_search_query(metadata: dict, media_type: str, entry: Path) -> str:
@@ -179,55 +215,25 @@ def _make_release_name(metadata: dict, media_type: str, release_group: str, entr
     return release_name or "unnamed"
 
 
-def _add_to_queue(conn, media_type, path, release_name, category, metadata):
-    """Add item to queue for processing with certainty scoring."""
-    certainty = calculate_certainty(metadata, media_type)
-    approval = "approved" if certainty >= 80 else "pending_approval"
-
-    conn.execute(
-        """
-        INSERT INTO queue (
-            media_type, path, release_name, category,
-            imdb, tvmazeid, tvmazetype,
-            created_at, updated_at, status,
-            certainty_score, approval_status
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)
-        """,
-        (
-            media_type,
-            str(path),
-            release_name,
-            category,
-            metadata.get("imdb"),
-            metadata.get("tvmazeid"),
-            metadata.get("tvmazetype"),
-            now_iso(),
-            now_iso(),
-            certainty,
-            approval,
-        )
-    )
-
-
-def _add_to_queue_silent(conn, media_type, path, release_name, category, status, message, metadata):
-    """Add item to queue with a specific status (e.g. duplicate) to avoid re-scanning."""
-    conn.execute(
-        """
-        INSERT INTO queue (media_type, path, release_name, category, imdb, tvmazeid, tvmazetype, created_at, updated_at, status, message)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            media_type,
-            str(path),
-            release_name,
-            category,
-            metadata.get("imdb"),
-            metadata.get("tvmazeid"),
-            metadata.get("tvmazetype"),
-            now_iso(),
-            now_iso(),
-            status,
-            message
-        )
-    )
+def _queue_row(
+    media_type, path, release_name, category, metadata, size_bytes=None,
+    status="queued", message="",
+):
+    """Build an enqueue_items() row; queued items get certainty scoring."""
+    row = {
+        "media_type": media_type,
+        "path": str(path),
+        "release_name": release_name,
+        "category": category,
+        "imdb": metadata.get("imdb"),
+        "tvmazeid": metadata.get("tvmazeid"),
+        "tvmazetype": metadata.get("tvmazetype"),
+        "size_bytes": size_bytes,
+        "status": status,
+        "message": message,
+    }
+    if status == "queued":
+        certainty = calculate_certainty(metadata, media_type)
+        row["certainty_score"] = certainty
+        row["approval_status"] = "approved" if certainty >= 80 else "pending_approval"
+    return row
@@ -0,0 +1,136 @@
+"""Per-stage prepare checkpoints so a retried item resumes where it stopped.
+
+Each prepare stage (metadata, thumbnail, nfo, torrent, xml) records a
+fingerprint of its inputs and its result in the queue.checkpoints JSON
+column as soon as it finishes. When the item is retried, a stage whose
+fingerprint still matches, and whose output file is still the one it wrote,
+is skipped and its recorded result reused. Outputs staged in the artifact
+store (src/artifacts.py) are recorded by name and only match while this
+process still holds that exact artifact. Retrying a failed upload then
+costs the dupe check and the upload, not metadata, NFO and piece hashing.
+
+Fingerprints chain: each stage's fingerprint includes those of the stages
+it consumes, so invalidating one stage (files on disk changed, release
+renamed, settings toggled) invalidates everything downstream of it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable
+
+from src.artifacts import Artifact, staging_store
+from src.db import db
+from src.utils import now_iso
+from src.utils.manifest import ReleaseManifest
+
+# Bump when a stage's output format changes, to invalidate old checkpoints.
+# 2: file stages staged in the artifact store instead of the output dir
+CHECKPOINT_VERSION = 2
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable inputs (Paths are stringified)."""
+    data = json.dumps([CHECKPOINT_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def release_fingerprint(manifest: ReleaseManifest) -> str:
+    """Hash of every file's path, size and mtime_ns in the release."""
+    h = hashlib.sha1(os.fsencode(manifest.path))
+    for f, st in manifest.entries:
+        h.update(b"\0" + os.fsencode(f) + b"\0%d\0%d" % (st.st_size, st.st_mtime_ns))
+    return h.hexdigest()
+
+
+def _stamp(path: str | Path) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Checkpoints:
+    """One queue item's recorded stages.
+
+    run() may be called from prepare step threads; each save is a single
+    json_set() UPDATE on a pooled connection, so concurrent stages of the
+    same item never overwrite each other.
+    """
+
+    def __init__(self, item_id: int, raw: str | None = None):
+        self.item_id = item_id
+        self.stages: dict[str, dict] = {}
+        if isinstance(raw, str) and raw:
+            try:
+                self.stages = json.loads(raw)
+            except ValueError:
+                pass
+        self.reused: list[str] = []
+
+    def lookup(self, stage: str, fp: str) -> tuple[bool, Any]:
+        """Return (True, result) if stage completed with inputs fp and its file is intact."""
+        entry = self.stages.get(stage)
+        if not entry or entry.get("fingerprint") != fp:
+            return False, None
+        staged = entry.get("staged")
+        if staged:
+            found = staging_store().get(self.item_id, staged)
+            if found is None or found.stamp() != entry.get("stamp"):
+                return False, None
+            self.reused.append(stage)
+            return True, found
+        artifact = entry.get("artifact")
+        if artifact and _stamp(artifact) != entry.get("stamp"):
+            return False, None
+        self.reused.append(stage)
+        return True, entry.get("result")
+
+    def save(
+        self, stage: str, fp: str, result: Any, artifact: Path | Artifact | None = None
+    ) -> None:
+        """Record a finished stage and commit."""
+        entry = {"fingerprint": fp, "result": result, "completed_at": now_iso()}
+        if isinstance(artifact, Artifact):
+            entry["staged"] = artifact.name
+            entry["stamp"] = artifact.stamp()
+        elif artifact:
+            entry["artifact"] = str(artifact)
+            entry["stamp"] = _stamp(artifact)
+        self.stages[stage] = entry
+        with db() as conn:
+            conn.execute(
+                "UPDATE queue SET checkpoints = json_set(COALESCE(checkpoints, '{}'), ?, json(?)) "
+                "WHERE id = ?",
+                (f"$.{stage}", json.dumps(entry, default=str), self.item_id),
+            )
+            conn.commit()
+
+    def run(self, stage: str, fp: str, fn: Callable[[], Any], produces_file: bool = False) -> Any:
+        """Return the stage's recorded result if still valid, else run fn and record it.
+
+        With produces_file, fn returns a Path whose size and mtime are checked
+        on reuse, a staged Artifact, or None.
+        """
+        hit, result = self.lookup(stage, fp)
+        if hit:
+            if isinstance(result, Artifact):
+                return result
+            return Path(result) if produces_file and result else result
+        result = fn()
+        if produces_file:
+            self.save(stage, fp, str(result) if result else None, artifact=result)
+        else:
+            self.save(stage, fp, result)
+        return result
+
+
+def clear_checkpoints(conn: sqlite3.Connection, item_id: int) -> None:
+    """Forget an item's checkpoints (e.g. once its staging files are removed)."""
+    conn.execute("UPDATE queue SET checkpoints = NULL WHERE id = ?", (item_id,))
+    conn.commit()
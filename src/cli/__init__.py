@@ -28,6 +28,9 @@ from src.cli.upload import (
 )
 from src.cli.scan import cmd_scan
 from src.cli.activity import cmd_activity
+from src.cli.maintenance import cmd_db_maintain
+from src.cli.search_cache import cmd_search_cache_clear, cmd_search_cache_stats
+from src.maintenance import MAINTENANCE_TASKS
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -118,6 +121,7 @@ def build_parser() -> argparse.ArgumentParser:
     queue_update.add_argument("--tags", help="New tags")
     queue_update.add_argument("--status", help="New status")
     queue_update.add_argument("--approval", choices=["approved", "pending_approval", "rejected"], help="Approval status")
+    queue_update.add_argument("--priority", type=int, help="Priority (higher is claimed first)")
 
     queue_delete = queue_sub.add_parser("delete", help="Delete from queue")
     queue_delete.add_argument("id", type=int, help="Queue item ID")
@@ -125,8 +129,15 @@ def build_parser() -> argparse.ArgumentParser:
 
     queue_run = queue_sub.add_parser("run", help="Run queue worker")
     queue_run.add_argument("--once", action="store_true", help="Process one item and exit")
-    queue_run.add_argument("--interval", type=int, default=30, help="Check interval (seconds)")
-    queue_run.add_argument("--max-concurrent", type=int, default=1, help="Max concurrent uploads")
+    queue_run.add_argument(
+        "--interval", type=int, help="Max seconds between idle checks (default: wait for a wakeup)"
+    )
+    queue_run.add_argument(
+        "--max-concurrent", type=int, help="Upload threads (default: worker_upload_concurrency)"
+    )
+    queue_run.add_argument(
+        "--prepare-workers", type=int, help="Prepare threads (default: worker_prepare_concurrency)"
+    )
 
     # prepare
     prepare_parser = subparsers.add_parser("prepare", help="Prepare NFO/torrent")
@@ -143,6 +154,18 @@ def build_parser() -> argparse.ArgumentParser:
     # check-dup
     dup_parser = subparsers.add_parser("check-dup", help="Check for duplicates")
     dup_parser.add_argument("release_name", help="Release name to check")
+    dup_parser.add_argument("--no-cache", action="store_true", help="Ask the tracker even if a cached answer is fresh")
+
+    # search-cache
+    search_cache_parser = subparsers.add_parser("search-cache", help="Cached tracker search results")
+    search_cache_sub = search_cache_parser.add_subparsers(dest="search_cache_cmd")
+
+    search_cache_sub.add_parser("stats", help="Show entry counts and hits")
+
+    search_cache_clear = search_cache_sub.add_parser("clear", help="Invalidate cached results")
+    search_cache_clear.add_argument("--query", help="Only this search query")
+    search_cache_clear.add_argument("--negative", action="store_true", help="Only cached 'not found' results")
+    search_cache_clear.add_argument("--expired", action="store_true", help="Only results past their TTL")
 
     # uploads
     uploads_parser = subparsers.add_parser("uploads", help="Upload history")
@@ -158,7 +181,30 @@ def build_parser() -> argparse.ArgumentParser:
     uploads_show.add_argument("id", type=int, help="Upload ID")
 
     # activity
-    subparsers.add_parser("activity", help="Show TL activity health for the current month")
+    activity_parser = subparsers.add_parser("activity", help="Show TL activity health for the current month")
+    activity_parser.add_argument(
+        "--rebuild", action="store_true",
+        help="Recompute activity counters from the queue table first",
+    )
+    activity_parser.add_argument(
+        "--seeding", action="store_true",
+        help="Show seeding compliance of torrup torrents in qBT instead",
+    )
+
+    # db
+    db_parser = subparsers.add_parser("db", help="Database commands")
+    db_sub = db_parser.add_subparsers(dest="db_cmd")
+
+    db_maintain = db_sub.add_parser(
+        "maintain", help="Checkpoint WAL, optimize/analyze and vacuum the database"
+    )
+    db_maintain.add_argument(
+        "--task", action="append", choices=MAINTENANCE_TASKS,
+        help="Run only this task (repeatable; default: all)",
+    )
+    db_maintain.add_argument(
+        "--analyze", action="store_true", help="Run a full ANALYZE, not just PRAGMA optimize",
+    )
 
     # qbt
     qbt_parser = subparsers.add_parser("qbt", help="qBitTorrent commands")
@@ -213,6 +259,12 @@ def main(argv: list[str] | None = None) -> int:
         return cmd_upload(cli)
     elif args.command == "check-dup":
         return cmd_check_dup(cli)
+    elif args.command == "search-cache":
+        if args.search_cache_cmd == "stats":
+            return cmd_search_cache_stats(cli)
+        elif args.search_cache_cmd == "clear":
+            return cmd_search_cache_clear(cli)
+        parser.parse_args(["search-cache", "--help"])
     elif args.command == "activity":
         return cmd_activity(cli)
     elif args.command == "uploads":
@@ -221,6 +273,10 @@ def main(argv: list[str] | None = None) -> int:
         elif args.uploads_cmd == "show":
             return cmd_uploads_show(cli)
         parser.parse_args(["uploads", "--help"])
+    elif args.command == "db":
+        if args.db_cmd == "maintain":
+            return cmd_db_maintain(cli)
+        parser.parse_args(["db", "--help"])
     elif args.command == "qbt":
         if args.qbt_cmd == "test":
             return cmd_qbt_test(cli)
@@ -2,20 +2,32 @@
 
 from __future__ import annotations
 
-from src.db import db
+from src.db import db, rebuild_activity_counters
+from src.seeding import seeding_summary
 from src.utils.activity import calculate_health
 
 
 def cmd_activity(cli) -> int:
     """Show TorrentLeech activity health for the current month."""
+    if getattr(cli.args, "seeding", False):
+        return _cmd_seeding(cli)
+
+    rebuilt = None
     with db() as conn:
+        if getattr(cli.args, "rebuild", False):
+            rebuilt = rebuild_activity_counters(conn)
         health = calculate_health(conn)
 
     if cli.json_output:
+        if rebuilt is not None:
+            health["rebuilt_from_rows"] = rebuilt
         cli.output(health)
         return 0
 
-    lines = [
+    lines = []
+    if rebuilt is not None:
+        lines += [f"Rebuilt counters from {rebuilt} queue rows", ""]
+    lines += [
         f"Uploads this month: {health['uploads']}",
         f"Queued:             {health['queued']}",
         f"Projected:          {health['projected']} / {health['minimum']}",
@@ -33,3 +45,26 @@ def cmd_activity(cli) -> int:
 
     cli.output("\n".join(lines), "\n".join(lines))
     return 0
+
+
+def _cmd_seeding(cli) -> int:
+    """Show seeding compliance from the seeding table (last qBT sync)."""
+    with db() as conn:
+        summary = seeding_summary(conn, include_all=True)
+
+    lines = [
+        f"Minimum:  {summary['min_days']} days or {summary['min_copies']} copies",
+        f"Tracked:  {summary['tracked']}",
+        f"Met:      {summary['met']}",
+        f"Seeding:  {summary['seeding']}",
+        f"Flagged:  {summary['flagged']}",
+    ]
+    flagged = [t for t in summary["torrents"] if t["status"] == "flagged"]
+    if flagged:
+        lines.append("")
+        lines.append("Below the seeding minimum and not seeding:")
+        for t in flagged:
+            lines.append(f"  {t['name']} ({t['state']}, {t['seed_days']}d, {t['seeds']} seeds)")
+
+    cli.output(summary, "\n".join(lines))
+    return 0
@@ -0,0 +1,29 @@
+"""Database maintenance CLI command."""
+
+from __future__ import annotations
+
+from src.db import db, set_setting
+from src.maintenance import MAINTENANCE_TASKS, run_maintenance
+from src.utils import human_size, now_iso
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_ERROR = 1
+
+
+def cmd_db_maintain(cli) -> int:
+    """Handle: torrup db maintain [--task T ...] [--analyze]."""
+    tasks = getattr(cli.args, "task", None) or list(MAINTENANCE_TASKS)
+    analyze = getattr(cli.args, "analyze", False)
+
+    with db() as conn:
+        results = run_maintenance(conn, tasks, analyze=analyze)
+        set_setting(conn, "db_last_maintenance", now_iso())
+        conn.commit()
+
+    lines = [
+        f"{r['task']:<11} {r['seconds']:>8.3f}s  {human_size(r['bytes_reclaimed']):>10} reclaimed  {r['detail']}"
+        for r in results
+    ]
+    cli.output(results, "\n".join(lines))
+    return EXIT_ERROR if any("error" in r for r in results) else EXIT_SUCCESS
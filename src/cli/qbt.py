@@ -4,8 +4,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from src.db import db, get_setting
-from src.utils.qbittorrent import add_to_qbt, get_qbt_client
+from src.db import db, get_bool_setting
+from src.utils.qbittorrent import add_to_qbt, qbt_session
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -15,7 +15,7 @@ EXIT_API_ERROR = 5
 
 
 def _qbt_enabled(conn) -> bool:
-    return get_setting(conn, "qbt_enabled") == "1"
+    return get_bool_setting(conn, "qbt_enabled")
 
 
 def cmd_qbt_test(cli) -> int:
@@ -24,14 +24,12 @@ def cmd_qbt_test(cli) -> int:
         if not _qbt_enabled(conn):
             return cli.error("qBT is disabled (qbt_enabled=0).", EXIT_INVALID_ARGS)
 
-    client = get_qbt_client()
-    if not client:
-        return cli.error("Failed to connect to qBT. Check URL/user/pass.", EXIT_API_ERROR)
-
     try:
-        version = client.app.version
+        version = qbt_session().call(lambda client: client.app.version)
     except Exception:
         version = "unknown"
+    if version is None:
+        return cli.error("Failed to connect to qBT. Check URL/user/pass.", EXIT_API_ERROR)
 
     cli.output({"success": True, "version": version}, f"Connected. qBT version: {version}")
     return EXIT_SUCCESS
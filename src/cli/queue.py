@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-import time
+import threading
 from pathlib import Path
 
-from src.api import check_exists
+from src.api import check_exists, close_client
 from src.config import CATEGORY_OPTIONS, MEDIA_TYPES
-from src.db import db, get_setting
+from src.db import db, enqueue_items, get_setting
+from src.pipeline import UploadPipeline, pipeline_settings
 from src.utils import generate_release_name, now_iso, suggest_release_name
 from src.utils.metadata import extract_metadata
-from src.worker import process_queue_item
+from src.wakeup import notify_queue
+from src.worker import LeaseHeartbeat, claim_next_item, make_worker_id, process_queue_item
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -80,18 +82,18 @@ def cmd_queue_add(cli) -> int:
         approval = "pending_approval"
 
     with db() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO queue (
-                media_type, path, release_name, category, tags, status, 
-                message, created_at, updated_at, certainty_score, approval_status
-            )
-            VALUES (?, ?, ?, ?, ?, 'queued', '', ?, ?, ?, ?)
-            """,
-            (media_type, str(path), release_name, category, tags, now_iso(), now_iso(), certainty, approval),
-        )
-        item_id = cursor.lastrowid
-        conn.commit()
+        ids = enqueue_items(conn, [{
+            "media_type": media_type,
+            "path": str(path),
+            "release_name": release_name,
+            "category": category,
+            "tags": tags,
+            "certainty_score": certainty,
+            "approval_status": approval,
+        }])
+    if not ids:
+        return cli.error(f"Already in queue: {path}", EXIT_INVALID_ARGS)
+    item_id = ids[0]
 
     cli.output(
         {"id": item_id, "release_name": release_name, "certainty": certainty, "approval": approval},
@@ -160,6 +162,9 @@ def cmd_queue_update(cli) -> int:
         if getattr(cli.args, "approval", None):
             updates.append("approval_status = ?")
             params.append(cli.args.approval)
+        if getattr(cli.args, "priority", None) is not None:
+            updates.append("priority = ?")
+            params.append(cli.args.priority)
 
         if updates:
             updates.append("updated_at = ?")
@@ -167,6 +172,8 @@ def cmd_queue_update(cli) -> int:
             params.append(item_id)
             conn.execute(f"UPDATE queue SET {', '.join(updates)} WHERE id = ?", params)
             conn.commit()
+            if getattr(cli.args, "status", None) or getattr(cli.args, "approval", None):
+                notify_queue()
 
     cli.output({"id": item_id, "updated": True}, f"Updated queue item {item_id}")
     return EXIT_SUCCESS
@@ -198,29 +205,44 @@ def cmd_queue_delete(cli) -> int:
 def cmd_queue_run(cli) -> int:
     """Handle: torrup queue run."""
     once = getattr(cli.args, "once", False)
-    interval = getattr(cli.args, "interval", 30)
+    interval = getattr(cli.args, "interval", None)
 
-    if not cli.quiet:
-        print(f"Starting queue worker (once={once}, interval={interval}s)")
-
-    while True:
+    if once:
+        if not cli.quiet:
+            print("Starting queue worker (once=True)")
+        worker_id = make_worker_id()
         with db() as conn:
-            # Only process approved items
-            row = conn.execute(
-                "SELECT * FROM queue WHERE status = 'queued' AND approval_status = 'approved' ORDER BY id ASC LIMIT 1"
-            ).fetchone()
+            # Claims only approved items; safe alongside the web worker
+            row = claim_next_item(conn, worker_id)
             if row:
                 if not cli.quiet:
                     print(f"Processing: {row['release_name']}")
-                process_queue_item(conn, row)
-                conn.commit()
-            elif once:
-                if not cli.quiet:
-                    print("No approved items to process")
-                break
+                with LeaseHeartbeat(row["id"], worker_id):
+                    process_queue_item(conn, row)
+            elif not cli.quiet:
+                print("No approved items to process")
+        return EXIT_SUCCESS
 
-        if once:
-            break
-        time.sleep(interval)
+    prepare, upload, handoff = pipeline_settings()
+    prepare = getattr(cli.args, "prepare_workers", None) or prepare
+    upload = getattr(cli.args, "max_concurrent", None) or upload
 
+    if not cli.quiet:
+        print(
+            f"Starting queue worker (prepare={prepare}, upload={upload}, "
+            f"interval={f'{interval}s' if interval else 'on wakeup'})"
+        )
+
+    shutdown = threading.Event()
+    pipeline = UploadPipeline(shutdown, prepare, upload, handoff, poll_seconds=interval)
+    pipeline.start()
+    try:
+        while not shutdown.wait(1):
+            pass
+    except KeyboardInterrupt:
+        if not cli.quiet:
+            print("Stopping: finishing in-flight uploads")
+        shutdown.set()
+    pipeline.join()
+    close_client()
     return EXIT_SUCCESS
@@ -2,13 +2,12 @@
 
 from __future__ import annotations
 
-import time
 from pathlib import Path
 
-from src.api import check_exists
 from src.config import CATEGORY_OPTIONS, MEDIA_TYPES
-from src.db import db, get_setting
-from src.utils import generate_release_name, now_iso, sanitize_release_name
+from src.db import db, enqueue_items, get_setting, known_paths
+from src.dupe_search import DupeSearch
+from src.utils import ReleaseManifest, generate_release_name, sanitize_release_name
 from src.utils.metadata import extract_metadata
 from src.cli.queue import calculate_certainty
 
@@ -16,6 +15,9 @@ from src.cli.queue import calculate_certainty
 EXIT_SUCCESS = 0
 EXIT_ERROR = 1
 
+# Albums are queued in batches rather than one transaction each.
+SCAN_FLUSH_EVERY = 50
+
 def cmd_scan(cli) -> int:
     """Handle: torrup scan <media_type> <path>."""
     media_type = cli.args.media_type
@@ -34,89 +36,108 @@ def cmd_scan(cli) -> int:
     return cli.error("Scanning for this media type is not supported in this version.")
 
 
+def _flush(pending: list[dict]) -> int:
+    """Queue a batch of scanned albums in one transaction; returns rows added."""
+    if not pending:
+        return 0
+    with db() as conn:
+        return len(enqueue_items(conn, pending))
+
+
 def _scan_music(cli, artists_dir: Path, dry_run: bool) -> int:
     """Scan music library for missing releases."""
     
     with db() as conn:
         release_group = get_setting(conn, "release_group") or "torrup"
         default_cat = CATEGORY_OPTIONS["music"][0]["id"] # Audio
+        engine = DupeSearch.from_settings(conn)
 
     count_found = 0
     count_missing = 0
     count_queued = 0
+    count_failed = 0
+    pending: list[dict] = []
 
     artists = [d for d in artists_dir.iterdir() if d.is_dir()]
     print(f"Scanning {len(artists)} artists in {artists_dir}...")
 
-    for artist_dir in sorted(artists):
-        albums = [d for d in artist_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
-        
-        for album_dir in albums:
-            # 1. Extract Metadata
-            try:
-                meta = extract_metadata(album_dir, "music")
-            except Exception:
-                meta = {}
-            
-            # 2. Generate Release Name
-            release_name = generate_release_name(meta, "music", release_group)
-            
-            if release_name == "unnamed" or "Unknown" in release_name:
-                # Fallback to folder name
-                release_name = sanitize_release_name(album_dir.name)
-
-            print(f"Checking: {release_name}...", end="", flush=True)
-
-            # 3. Check TL
-            try:
-                # Check exact generated name
-                exists = check_exists(release_name, exact=False)
-                if not exists:
-                    # Check Artist Album fallback
-                    fallback = sanitize_release_name(f"{artist_dir.name} {album_dir.name}")
-                    exists = check_exists(fallback, exact=False)
-
-                if exists:
-                    print(" FOUND (Skipping)")
-                    count_found += 1
-                else:
-                    print(" MISSING -> Queuing")
-                    count_missing += 1
-                    
-                    if not dry_run:
-                        # Queue it
-                        certainty = calculate_certainty(meta, "music")
-                        approval = "approved" if certainty >= 80 else "pending_approval"
-                        
-                        with db() as conn:
-                            # Check if already queued
-                            existing = conn.execute(
-                                "SELECT id FROM queue WHERE path = ? AND status != 'failed'", 
-                                (str(album_dir),)
-                            ).fetchone()
-                            
-                            if not existing:
-                                conn.execute(
-                                    """
-                                    INSERT INTO queue (
-                                        media_type, path, release_name, category, tags, 
-                                        status, created_at, updated_at, certainty_score, approval_status
-                                    )
-                                    VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)
-                                    """,
-                                    ("music", str(album_dir), release_name, default_cat, "", 
-                                     now_iso(), now_iso(), certainty, approval)
-                                )
-                                conn.commit()
-                                count_queued += 1
-            except Exception as e:
-                print(f" Error: {e}")
-            
-            time.sleep(1.0) # Rate limit protection
+    with db() as conn:
+        # Failed albums are queued again, as torrup scan always did
+        existing = known_paths(conn, [
+            str(album) for artist in artists for album in artist.iterdir()
+            if album.is_dir() and not album.name.startswith(".")
+        ], retry_failed=True)
+    count_known = len(existing)
+
+    albums: dict[str, tuple[Path, dict, str, int | None]] = {}
+
+    def searches():
+        # Consumed by the search engine's feeder thread
+        for artist_dir in sorted(artists):
+            for album_dir in artist_dir.iterdir():
+                if not album_dir.is_dir() or album_dir.name.startswith("."):
+                    continue
+                if str(album_dir) in existing:
+                    continue
+
+                # 1. Extract Metadata (and the size sjf orders by) from one walk
+                try:
+                    manifest = ReleaseManifest(album_dir)
+                except ValueError:
+                    manifest = None
+                try:
+                    meta = extract_metadata(album_dir, "music", manifest=manifest)
+                except Exception:
+                    meta = {}
+
+                # 2. Generate Release Name
+                release_name = generate_release_name(meta, "music", release_group)
+                if release_name == "unnamed" or "Unknown" in release_name:
+                    # Fallback to folder name
+                    release_name = sanitize_release_name(album_dir.name)
+
+                # 3. Check TL: generated name, then "Artist Album"
+                fallback = sanitize_release_name(f"{artist_dir.name} {album_dir.name}")
+                size = manifest.total_size if manifest else None
+                albums[str(album_dir)] = (album_dir, meta, release_name, size)
+                yield str(album_dir), [release_name, fallback]
+
+    for key, exists in engine.search_many(searches(), exact=False):
+        album_dir, meta, release_name, size = albums.pop(key)
+        if exists is None:
+            print(f"{release_name}: search failed (will retry next scan)")
+            count_failed += 1
+        elif exists:
+            print(f"{release_name}: FOUND (Skipping)")
+            count_found += 1
+        else:
+            print(f"{release_name}: MISSING -> Queuing")
+            count_missing += 1
+
+            if not dry_run:
+                certainty = calculate_certainty(meta, "music")
+                pending.append({
+                    "media_type": "music",
+                    "path": str(album_dir),
+                    "release_name": release_name,
+                    "category": default_cat,
+                    "size_bytes": size,
+                    "certainty_score": certainty,
+                    "approval_status": "approved" if certainty >= 80 else "pending_approval",
+                })
+
+        if len(pending) >= SCAN_FLUSH_EVERY:
+            count_queued += _flush(pending)
+            pending = []
+
+    count_queued += _flush(pending)
 
     print("\nScan Complete.")
     print(f"Found on TL: {count_found}")
     print(f"Missing:     {count_missing}")
     print(f"Queued:      {count_queued}")
+    print(f"Already in queue: {count_known}")
+    if count_failed:
+        print(f"Search failed: {count_failed}")
     
     return EXIT_SUCCESS
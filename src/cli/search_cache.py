@@ -0,0 +1,34 @@
+"""TL search cache CLI commands."""
+
+from __future__ import annotations
+
+from src.db import db
+from src.search_cache import invalidate_search_cache, search_cache_stats
+
+# Exit codes
+EXIT_SUCCESS = 0
+
+
+def cmd_search_cache_stats(cli) -> int:
+    """Handle: torrup search-cache stats."""
+    with db() as conn:
+        stats = search_cache_stats(conn)
+    cli.output(
+        stats,
+        f"Entries: {stats['entries']} ({stats['positive']} found, {stats['negative']} not found)\n"
+        f"Hits:    {stats['lifetime_hits']}",
+    )
+    return EXIT_SUCCESS
+
+
+def cmd_search_cache_clear(cli) -> int:
+    """Handle: torrup search-cache clear [--query Q] [--negative] [--expired]."""
+    with db() as conn:
+        removed = invalidate_search_cache(
+            conn,
+            query=getattr(cli.args, "query", None),
+            negative_only=getattr(cli.args, "negative", False),
+            expired_only=getattr(cli.args, "expired", False),
+        )
+    cli.output({"removed": removed}, f"Removed {removed} cached search result(s)")
+    return EXIT_SUCCESS
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from src.db import db, get_setting, set_setting
+from src.db import db, get_all_settings, get_setting, set_setting
 
 # Exit codes
 EXIT_SUCCESS = 0
@@ -19,9 +19,7 @@ def cmd_settings_get(cli) -> int:
                 return cli.error(f"Setting not found: {key}", EXIT_NOT_FOUND)
             cli.output({"key": key, "value": value}, value)
         else:
-            settings = {}
-            for row in conn.execute("SELECT key, value FROM settings").fetchall():
-                settings[row["key"]] = row["value"]
+            settings = get_all_settings(conn)
             if cli.json_output:
                 cli.output(settings)
             else:
@@ -4,14 +4,15 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from src.api import check_exists, upload_torrent
+from src.api import TrackerError, check_exists, upload_torrent
 from src.db import db, get_output_dir, get_setting
+from src.piece_cache import PieceHashCache
 from src.utils import (
+    ReleaseManifest,
     create_torrent,
     extract_metadata,
     extract_thumbnail,
     generate_nfo,
-    get_folder_size,
     human_size,
     now_iso,
     sanitize_release_name,
@@ -57,19 +58,25 @@ def cmd_prepare(cli) -> int:
             return EXIT_SUCCESS
 
         try:
-            metadata = extract_metadata(path, media_type)
-            thumb_path = extract_thumbnail(path, out_dir, release_name, media_type)
+            manifest = ReleaseManifest(path)
+            metadata = extract_metadata(path, media_type, manifest)
+            thumb_path = extract_thumbnail(path, out_dir, release_name, media_type, manifest)
             if thumb_path and media_type == "music":
                 try:
                     size = thumb_path.stat().st_size
                     metadata["album_art_file"] = {"name": thumb_path.name, "size": human_size(size)}
                 except OSError:
                     metadata["album_art_file"] = {"name": thumb_path.name}
-            nfo = generate_nfo(path, release_name, out_dir, media_type, release_group, metadata)
-            torrent = create_torrent(path, release_name, out_dir)
-            size_bytes = get_folder_size(path) if path.is_dir() else path.stat().st_size
+            nfo = generate_nfo(
+                path, release_name, out_dir, media_type, release_group, metadata, manifest
+            )
+            # Unchanged files since the last prepare are not re-hashed
+            torrent = create_torrent(
+                path, release_name, out_dir, manifest, cache=PieceHashCache(conn)
+            )
             xml = write_xml_metadata(
-                release_name, media_type, path, size_bytes, torrent, nfo, tags, out_dir, metadata, thumb_path
+                release_name, media_type, path, manifest.total_size, torrent, nfo, tags, out_dir,
+                metadata, thumb_path,
             )
 
             conn.execute(
@@ -109,12 +116,17 @@ def cmd_upload(cli) -> int:
         category = row["category"]
         tags = row["tags"]
 
-        if not torrent_path or not nfo_path:
+        # The queue worker keeps small artifacts in its own memory and evicts
+        # spilled ones, so a recorded path may be missing or already gone
+        if not torrent_path or not nfo_path or not (Path(torrent_path).exists() and Path(nfo_path).exists()):
             return cli.error("Item not prepared. Run 'torrup prepare' first.", EXIT_ERROR)
 
-        if not skip_dup and check_exists(release_name):
+        try:
+            exists = not skip_dup and check_exists(release_name)
+        except TrackerError as e:
+            return cli.error(f"Duplicate check failed ({e.kind}): {e}", EXIT_API_ERROR)
+        if exists:
             update_queue_status(conn, item_id, "duplicate", "Duplicate found on TorrentLeech")
-            conn.commit()
             return cli.error(f"Duplicate found: {release_name}", EXIT_DUPLICATE)
 
         if dry_run:
@@ -125,12 +137,10 @@ def cmd_upload(cli) -> int:
             result = upload_torrent(Path(torrent_path), Path(nfo_path), category, tags)
             if result.get("success"):
                 update_queue_status(conn, item_id, "success", f"Uploaded: {result['torrent_id']}")
-                conn.commit()
                 cli.output(result, f"Uploaded: torrent_id={result['torrent_id']}")
                 return EXIT_SUCCESS
             else:
                 update_queue_status(conn, item_id, "failed", result.get("error", "Unknown error"))
-                conn.commit()
                 return cli.error(result.get("error", "Upload failed"), EXIT_API_ERROR)
         except Exception as e:
             return cli.error(str(e), EXIT_API_ERROR)
@@ -139,8 +149,9 @@ def cmd_upload(cli) -> int:
 def cmd_check_dup(cli) -> int:
     """Handle: torrup check-dup <release_name>."""
     release_name = cli.args.release_name
+    use_cache = not getattr(cli.args, "no_cache", False)
     try:
-        exists = check_exists(release_name)
+        exists = check_exists(release_name, use_cache=use_cache)
         if exists:
             cli.output({"duplicate": True, "release_name": release_name}, f"Duplicate found: {release_name}")
             return EXIT_DUPLICATE
@@ -20,6 +20,8 @@ TL_TRACKER = tl.TRACKER_BASE
 TL_UPLOAD_URL = tl.UPLOAD_URL
 TL_SEARCH_URL = tl.SEARCH_URL
 ANNOUNCE_KEY = tl.ANNOUNCE_KEY
+# Use HTTP/2 for the TorrentLeech API (needs the h2 package)
+TL_HTTP2 = os.environ.get("TORRUP_TL_HTTP2", "0") == "1"
 
 # Worker
 RUN_WORKER = os.environ.get("TORRUP_RUN_WORKER", "1") == "1"
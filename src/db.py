@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -18,137 +21,798 @@ from src.config import (
     QBT_DEFAULT_URL,
     QBT_DEFAULT_USER,
 )
+from src.utils.core import now_iso
+from src.wakeup import notify_queue
+
+# Applied once per pooled connection, not per `with db()`.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "PRAGMA cache_size=-16000",  # ~16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",  # 128 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionPool:
+    """Thread-local SQLite connections, opened once and reused.
+
+    Each thread gets its own connection (SQLite connections are not safe to
+    share mid-transaction). Nested ``with db()`` blocks on the same thread
+    reuse the connection and only the outermost block commits or rolls back.
+    Connections owned by threads that have exited are closed on the next
+    acquire, and the pool resets itself after a fork.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: dict[int, tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._opened = 0
+        self._reused = 0
+        self._closed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reap(self) -> None:
+        """Close connections whose owning thread has exited. Caller holds the lock."""
+        dead = [ident for ident, (thread, _) in self._conns.items() if not thread.is_alive()]
+        for ident in dead:
+            _, conn = self._conns.pop(ident)
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            self._closed += 1
+
+    def acquire(self) -> tuple[sqlite3.Connection, bool]:
+        """Return (connection, outermost) for the calling thread."""
+        if os.getpid() != self._pid:
+            # Forked child: inherited connections belong to the parent.
+            self.__init__(self.path)
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._reap()
+                self._conns[threading.get_ident()] = (threading.current_thread(), conn)
+                self._opened += 1
+        elif self._local.depth == 0:
+            with self._lock:
+                self._reused += 1
+
+        self._local.depth += 1
+        return conn, self._local.depth == 1
+
+    def release(self, discard: bool = False) -> None:
+        """Leave one ``with db()`` scope; drop the connection if it is unusable."""
+        self._local.depth -= 1
+        if discard and self._local.depth == 0:
+            conn = self._local.conn
+            self._local.conn = None
+            with self._lock:
+                self._conns.pop(threading.get_ident(), None)
+                self._closed += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self) -> None:
+        """Close every pooled connection (shutdown and tests)."""
+        with self._lock:
+            for _, conn in self._conns.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._closed += len(self._conns)
+            self._conns.clear()
+        self._local = threading.local()
+
+    def stats(self) -> dict:
+        """Return pool counters for monitoring."""
+        with self._lock:
+            self._reap()
+            return {
+                "open": len(self._conns),
+                "opened": self._opened,
+                "reused": self._reused,
+                "closed": self._closed,
+            }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool for DB_PATH."""
+    global _pool
+    pool = _pool
+    if pool is None or pool.path != Path(DB_PATH):
+        with _pool_lock:
+            if _pool is None or _pool.path != Path(DB_PATH):
+                _pool = ConnectionPool(DB_PATH)
+            pool = _pool
+    return pool
+
+
+def pool_stats() -> dict:
+    """Connection pool statistics (exposed on /health)."""
+    return get_pool().stats()
+
+
+def close_pool() -> None:
+    """Close all pooled connections."""
+    if _pool is not None:
+        _pool.close_all()
+
+
+class SettingsCache:
+    """In-process cache of the settings table, loaded in one query.
+
+    set_setting() invalidates it for every thread, and the writing thread
+    invalidates again when its outermost ``with db()`` ends so it never reads
+    its own stale value. Commits from other processes (e.g. ``torrup settings
+    set``) are detected by polling settings_generation, which triggers bump
+    on every settings write, on a private connection at most once per
+    RECHECK_SECONDS; between checks reads cost no database round-trips.
+    Unlike ``PRAGMA data_version`` it does not move on heartbeats and status
+    updates, so the table is reloaded only when a setting changed.
+    """
+
+    RECHECK_SECONDS = 1.0
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._values: dict[str, str] | None = None
+        self._watch: sqlite3.Connection | None = None
+        self._generation: int | None = None
+        self._checked = 0.0
+        self._hits = 0
+        self._loads = 0
+        self._bypass = 0
+
+    def _current_generation(self) -> int | None:
+        """The settings generation; None before migration v16 (never fresh)."""
+        if self._watch is None:
+            self._watch = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        try:
+            row = self._watch.execute("SELECT generation FROM settings_generation").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def _fresh(self) -> bool:
+        """Whether cached values are usable. Caller holds the lock."""
+        if self._values is None:
+            return False
+        now = time.monotonic()
+        if now - self._checked < self.RECHECK_SECONDS:
+            return True
+        self._checked = now
+        generation = self._current_generation()
+        if generation is None or generation != self._generation:
+            self._values = None
+            return False
+        return True
+
+    def snapshot(self, conn: sqlite3.Connection | None) -> dict[str, str]:
+        """Return all settings, loading them if the cache is cold or stale."""
+        with self._lock:
+            if self._fresh():
+                self._hits += 1
+                return self._values
+        if conn is None:
+            with db() as own:
+                return self._load(own)
+        return self._load(conn)
+
+    def _load(self, conn: sqlite3.Connection) -> dict[str, str]:
+        if conn.in_transaction:
+            # May hold uncommitted writes: read through without caching
+            with self._lock:
+                self._bypass += 1
+            return {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM settings")}
+        with self._lock:
+            generation = self._current_generation()
+            values = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM settings")}
+            self._values = values
+            self._generation = generation
+            self._checked = time.monotonic()
+            self._loads += 1
+            return values
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._values = None
+
+    def mark_written(self) -> None:
+        """Record a settings write on this thread and drop cached values."""
+        self._local.written = True
+        self.invalidate()
+
+    def end_transaction(self) -> None:
+        """Called when a thread's outermost db() scope ends."""
+        if getattr(self._local, "written", False):
+            self._local.written = False
+            self.invalidate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self._hits, "loads": self._loads, "bypass": self._bypass}
+
+
+_settings_cache: SettingsCache | None = None
+
+
+def get_settings_cache() -> SettingsCache:
+    """Return the settings cache for DB_PATH."""
+    global _settings_cache
+    cache = _settings_cache
+    if cache is None or cache.path != Path(DB_PATH):
+        with _pool_lock:
+            if _settings_cache is None or _settings_cache.path != Path(DB_PATH):
+                _settings_cache = SettingsCache(DB_PATH)
+            cache = _settings_cache
+    return cache
 
 
 @contextmanager
 def db():
-    """Database connection context manager. WAL mode allows concurrent reads."""
-    conn = sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=5000")
+    """Database connection context manager.
+
+    Hands out the calling thread's pooled connection. The outermost block
+    commits on success and rolls back on error; nested blocks share its
+    transaction.
+    """
+    pool = get_pool()
+    conn, outermost = pool.acquire()
+    discard = False
     try:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
+        if outermost:
+            conn.commit()
+    except Exception as e:
+        discard = isinstance(e, (sqlite3.ProgrammingError, sqlite3.InterfaceError))
+        if outermost and not discard:
+            conn.rollback()
         raise
     finally:
-        conn.close()
+        pool.release(discard)
+        if outermost:
+            get_settings_cache().end_transaction()
 
 
-def init_db() -> None:
-    """Initialize database schema and defaults."""
-    with db() as conn:
+def _add_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    """Add a column unless it already exists."""
+    columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    """v1: core tables, plus columns added to pre-versioned databases."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS media_roots (
+            media_type TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1,
+            default_category INTEGER NOT NULL DEFAULT 31,
+            auto_scan INTEGER NOT NULL DEFAULT 0,
+            last_scan TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            media_type TEXT NOT NULL,
+            path TEXT NOT NULL,
+            release_name TEXT NOT NULL,
+            category INTEGER NOT NULL,
+            tags TEXT NOT NULL DEFAULT '',
+            imdb TEXT,
+            tvmazeid TEXT,
+            tvmazetype TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            message TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            torrent_path TEXT,
+            nfo_path TEXT,
+            xml_path TEXT,
+            thumb_path TEXT,
+            certainty_score INTEGER DEFAULT 100,
+            approval_status TEXT DEFAULT 'approved'
+        )
+        """
+    )
+
+    # Databases created before schema versioning may lack these columns
+    _add_column(conn, "media_roots", "auto_scan", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "media_roots", "last_scan", "TEXT")
+    _add_column(conn, "queue", "thumb_path", "TEXT")
+    _add_column(conn, "queue", "imdb", "TEXT")
+    _add_column(conn, "queue", "tvmazeid", "TEXT")
+    _add_column(conn, "queue", "tvmazetype", "TEXT")
+    _add_column(conn, "queue", "certainty_score", "INTEGER DEFAULT 100")
+    _add_column(conn, "queue", "approval_status", "TEXT DEFAULT 'approved'")
+
+
+def _migrate_queue_indexes(conn: sqlite3.Connection) -> None:
+    """v2: indexes for the worker poll, scan dedupe and activity range scans."""
+    # queue_worker: status='queued' AND approval_status='approved' ORDER BY id
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_queue_status_approval_id "
+        "ON queue(status, approval_status, id)"
+    )
+    # _scan_root / cli scan: SELECT 1 FROM queue WHERE path = ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_path ON queue(path)")
+    # calculate_health / get_monthly_history / estimate_pace
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_queue_status_created "
+        "ON queue(status, created_at)"
+    )
+
+
+def _migrate_queue_updated_index(conn: sqlite3.Connection) -> None:
+    """v3: keyset index for history listings ordered by last update."""
+    # /api/queue/page?order=updated: (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_queue_updated_id "
+        "ON queue(updated_at, id)"
+    )
+
+
+# Periods kept in activity_counters. 'total' uses an empty bucket; 'month'
+# and 'day' use the YYYY-MM / YYYY-MM-DD prefix of queue.created_at.
+_COUNTER_BUCKETS = (
+    ("total", "''"),
+    ("month", "substr({row}.created_at, 1, 7)"),
+    ("day", "substr({row}.created_at, 1, 10)"),
+)
+
+
+def _counter_values(row: str) -> str:
+    """VALUES tuples that bump every bucket of a queue row (NEW/OLD/queue)."""
+    return ", ".join(
+        f"('{period}', {bucket.format(row=row)}, {row}.status, 1)"
+        for period, bucket in _COUNTER_BUCKETS
+    )
+
+
+def _counter_decrement(row: str) -> str:
+    """WHERE clause matching every bucket of a queue row."""
+    return " OR ".join(
+        f"(period = '{period}' AND bucket = {bucket.format(row=row)})"
+        for period, bucket in _COUNTER_BUCKETS
+    )
+
+
+def _migrate_activity_counters(conn: sqlite3.Connection) -> None:
+    """v4: per-status counters by total/month/day, kept current by triggers.
+
+    Triggers rather than application code, so every writer (worker, routes,
+    CLI, bulk retry/clear statements, other processes) keeps them exact.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS activity_counters (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, status)
+        ) WITHOUT ROWID
+        """
+    )
+    increment = (
+        "INSERT INTO activity_counters (period, bucket, status, count) "
+        "VALUES {values} "
+        "ON CONFLICT(period, bucket, status) DO UPDATE SET count = count + 1;"
+    )
+    decrement = (
+        "UPDATE activity_counters SET count = count - 1 "
+        "WHERE status = OLD.status AND ({where});"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_queue_counters_insert "
+        "AFTER INSERT ON queue BEGIN "
+        + increment.format(values=_counter_values("NEW"))
+        + " END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_queue_counters_delete "
+        "AFTER DELETE ON queue BEGIN "
+        + decrement.format(where=_counter_decrement("OLD"))
+        + " END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_queue_counters_update "
+        "AFTER UPDATE OF status, created_at ON queue "
+        "WHEN OLD.status IS NOT NEW.status OR OLD.created_at IS NOT NEW.created_at "
+        "BEGIN "
+        + decrement.format(where=_counter_decrement("OLD"))
+        + " "
+        + increment.format(values=_counter_values("NEW"))
+        + " END"
+    )
+    rebuild_activity_counters(conn)
+
+
+def rebuild_activity_counters(conn: sqlite3.Connection) -> int:
+    """Recompute activity_counters from the queue table. Returns rows counted.
+
+    Only needed if the counters were edited by hand or a database was
+    restored without its triggers; the caller commits.
+    """
+    conn.execute("DELETE FROM activity_counters")
+    for period, bucket in _COUNTER_BUCKETS:
+        expr = bucket.format(row="queue")
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-            """
+            "INSERT INTO activity_counters (period, bucket, status, count) "
+            f"SELECT '{period}', {expr}, status, COUNT(*) FROM queue "
+            f"GROUP BY {expr}, status"
+        )
+    return conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+
+def _migrate_queue_leases(conn: sqlite3.Connection) -> None:
+    """v5: worker lease columns for atomic claiming across processes."""
+    _add_column(conn, "queue", "worker_id", "TEXT")
+    _add_column(conn, "queue", "lease_expires_at", "TEXT")
+    # Items already stuck mid-pipeline predate leases; mark them expired so
+    # the first worker to poll puts them back in the queue.
+    conn.execute(
+        "UPDATE queue SET lease_expires_at = '1970-01-01T00:00:00.000000Z' "
+        "WHERE status IN ('preparing', 'uploading')"
+    )
+
+
+def _migrate_queue_path_key(conn: sqlite3.Connection) -> None:
+    """v6: unique path_key so bulk enqueue can dedupe with INSERT OR IGNORE.
+
+    Older databases may hold several rows for one path (re-added from the UI
+    or re-queued after a failure). The newest row per path takes the key;
+    the others keep NULL, which UNIQUE allows, so no history is dropped.
+    """
+    _add_column(conn, "queue", "path_key", "TEXT")
+    conn.execute(
+        "UPDATE queue SET path_key = path "
+        "WHERE id IN (SELECT MAX(id) FROM queue GROUP BY path)"
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_queue_path_key ON queue(path_key)"
+    )
+
+
+def _migrate_maintenance_log(conn: sqlite3.Connection) -> None:
+    """v7: timings and bytes reclaimed by src.maintenance tasks."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            bytes_reclaimed INTEGER NOT NULL DEFAULT 0,
+            detail TEXT NOT NULL DEFAULT ''
+        )
+        """
+    )
+
+
+def _migrate_pipeline_settings(conn: sqlite3.Connection) -> None:
+    """v8: no schema change; triggers seeding of the worker pipeline settings."""
+
+
+def _migrate_piece_cache(conn: sqlite3.Connection) -> None:
+    """v9: piece hashes keyed by file identity (src/piece_cache.py)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS piece_cache (
+            key TEXT PRIMARY KEY,
+            piece_length INTEGER NOT NULL,
+            total_size INTEGER NOT NULL,
+            pieces BLOB NOT NULL,
+            bytes INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_used_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_piece_cache_lru ON piece_cache(last_used_at)"
+    )
+
+
+def _migrate_queue_checkpoints(conn: sqlite3.Connection) -> None:
+    """v10: per-stage prepare checkpoints (src/checkpoints.py)."""
+    _add_column(conn, "queue", "checkpoints", "TEXT")
+
+
+def _migrate_queue_scheduling(conn: sqlite3.Connection) -> None:
+    """v11: priority and release size for the scheduler (src/scheduler.py).
+
+    Also seeds the per-media-type queue_policy_* settings.
+    """
+    _add_column(conn, "queue", "priority", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "queue", "size_bytes", "INTEGER")
+
+
+def _migrate_search_settings(conn: sqlite3.Connection) -> None:
+    """v12: no schema change; triggers seeding of the TL search settings."""
+
+
+def _migrate_search_cache(conn: sqlite3.Connection) -> None:
+    """v13: cached TL search results (src/search_cache.py)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_cache (
+            key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            exact INTEGER NOT NULL,
+            found INTEGER NOT NULL,
+            checked_at TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+# Statuses an item does not leave on its own; its path may be queued again
+TERMINAL_STATUSES = ("success", "failed", "duplicate")
+_TERMINAL_SQL = ", ".join(f"'{s}'" for s in TERMINAL_STATUSES)
+
+
+def _migrate_active_path_key(conn: sqlite3.Connection) -> None:
+    """v15: path_key marks only active items, so finished paths can be re-added.
+
+    Triggers release the key when an item reaches a terminal status and take
+    it back when the item is retried, unless another active row for the path
+    holds it by then.
+    """
+    conn.execute(f"UPDATE queue SET path_key = NULL WHERE status IN ({_TERMINAL_SQL})")
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_queue_path_key_release
+        AFTER UPDATE OF status ON queue
+        WHEN NEW.status IN ({_TERMINAL_SQL}) AND NEW.path_key IS NOT NULL
+        BEGIN
+            UPDATE queue SET path_key = NULL WHERE id = NEW.id;
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_queue_path_key_claim
+        AFTER UPDATE OF status ON queue
+        WHEN NEW.status NOT IN ({_TERMINAL_SQL}) AND NEW.path_key IS NULL
+        BEGIN
+            UPDATE queue SET path_key = NEW.path
+            WHERE id = NEW.id AND NOT EXISTS (SELECT 1 FROM queue WHERE path_key = NEW.path);
+        END
+        """
+    )
+
+
+def _migrate_seeding(conn: sqlite3.Connection) -> None:
+    """v14: seeding state of torrup-tagged qBT torrents (src/seeding.py).
+
+    Also seeds qbt_sync_interval.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS seeding (
+            hash TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            state TEXT NOT NULL,
+            ratio REAL NOT NULL DEFAULT 0,
+            seeding_time INTEGER NOT NULL DEFAULT 0,
+            seeds INTEGER NOT NULL DEFAULT 0,
+            added_on INTEGER,
+            updated_at TEXT NOT NULL
         )
+        """
+    )
+
+
+def _migrate_settings_generation(conn: sqlite3.Connection) -> None:
+    """v16: a counter SettingsCache polls to spot settings writes.
+
+    Triggers bump it on every insert, update and delete of a setting, from
+    set_setting() or any other writer (CLI, raw SQL, another process).
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS settings_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO settings_generation (id, generation) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS media_roots (
-                media_type TEXT PRIMARY KEY,
-                path TEXT NOT NULL,
-                enabled INTEGER NOT NULL DEFAULT 1,
-                default_category INTEGER NOT NULL DEFAULT 31,
-                auto_scan INTEGER NOT NULL DEFAULT 0,
-                last_scan TEXT
-            )
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_settings_generation_{event.lower()}
+            AFTER {event} ON settings
+            BEGIN
+                UPDATE settings_generation SET generation = generation + 1;
+            END
             """
         )
+
+
+# Ordered (version, migration) pairs. Append new entries; never edit old ones.
+# Bump by adding a migration when new default settings are introduced too,
+# since init_db() skips seeding when the schema is already current.
+MIGRATIONS = [
+    (1, _migrate_base_schema),
+    (2, _migrate_queue_indexes),
+    (3, _migrate_queue_updated_index),
+    (4, _migrate_activity_counters),
+    (5, _migrate_queue_leases),
+    (6, _migrate_queue_path_key),
+    (7, _migrate_maintenance_log),
+    (8, _migrate_pipeline_settings),
+    (9, _migrate_piece_cache),
+    (10, _migrate_queue_checkpoints),
+    (11, _migrate_queue_scheduling),
+    (12, _migrate_search_settings),
+    (13, _migrate_search_cache),
+    (14, _migrate_seeding),
+    (15, _migrate_active_path_key),
+    (16, _migrate_settings_generation),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the applied schema version (0 for a new or pre-versioned DB)."""
+    try:
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def init_db() -> None:
+    """Initialize database schema and defaults.
+
+    Runs pending migrations from MIGRATIONS and records each in the
+    schema_version table. When the database is already current this is a
+    single SELECT.
+    """
+    with db() as conn:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return
+
+        # Serialize concurrent starters (app + CLI) and re-check under the lock
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                media_type TEXT NOT NULL,
-                path TEXT NOT NULL,
-                release_name TEXT NOT NULL,
-                category INTEGER NOT NULL,
-                tags TEXT NOT NULL DEFAULT '',
-                imdb TEXT,
-                tvmazeid TEXT,
-                tvmazetype TEXT,
-                status TEXT NOT NULL DEFAULT 'queued',
-                message TEXT NOT NULL DEFAULT '',
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                torrent_path TEXT,
-                nfo_path TEXT,
-                xml_path TEXT,
-                thumb_path TEXT,
-                certainty_score INTEGER DEFAULT 100,
-                approval_status TEXT DEFAULT 'approved'
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                applied_at TEXT NOT NULL
             )
             """
         )
-
-        # Migration for existing DBs
-        migrations = [
-            "ALTER TABLE media_roots ADD COLUMN auto_scan INTEGER NOT NULL DEFAULT 0",
-            "ALTER TABLE media_roots ADD COLUMN last_scan TEXT",
-            "ALTER TABLE queue ADD COLUMN thumb_path TEXT",
-            "ALTER TABLE queue ADD COLUMN imdb TEXT",
-            "ALTER TABLE queue ADD COLUMN tvmazeid TEXT",
-            "ALTER TABLE queue ADD COLUMN tvmazetype TEXT",
-            "ALTER TABLE queue ADD COLUMN certainty_score INTEGER DEFAULT 100",
-            "ALTER TABLE queue ADD COLUMN approval_status TEXT DEFAULT 'approved'",
-        ]
-        
-        for migration in migrations:
-            try:
-                conn.execute(migration)
-            except sqlite3.OperationalError:
-                pass  # Already exists
-
-        # Defaults
-        _ensure_setting(conn, "output_dir", str(DEFAULT_OUTPUT_DIR))
-        _ensure_setting(conn, "exclude_dirs", DEFAULT_EXCLUDES)
-        _ensure_setting(conn, "auto_scan_interval", "60")  # Minutes
-        _ensure_setting(conn, "enable_auto_upload", "0")  # Safety first
-
-        for media_type in MEDIA_TYPES:
-            default_path = str(Path("/volume/media") / media_type)
-            default_category = CATEGORY_OPTIONS[media_type][0]["id"]
+        current = get_schema_version(conn)
+        for version, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
             conn.execute(
-                """
-                INSERT OR IGNORE INTO media_roots (media_type, path, enabled, default_category)
-                VALUES (?, ?, 1, ?)
-                """,
-                (media_type, default_path, default_category),
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (version, now_iso()),
             )
 
-        for k, v in DEFAULT_TEMPLATES.items():
-            _ensure_setting(conn, f"template_{k}", v)
-
-        _ensure_setting(conn, "release_group", DEFAULT_RELEASE_GROUP)
-        _ensure_setting(conn, "extract_metadata", "1")
-        _ensure_setting(conn, "extract_thumbnails", "1")
-
-        # qBitTorrent Settings
-        _ensure_setting(conn, "qbt_enabled", "0")
-        _ensure_setting(conn, "qbt_url", QBT_DEFAULT_URL)
-        _ensure_setting(conn, "qbt_user", QBT_DEFAULT_USER)
-        _ensure_setting(conn, "qbt_pass", QBT_DEFAULT_PASS)
-
-        # TorrentLeech Preferences (Activity + Seeding Minimums)
-        _ensure_setting(conn, "tl_min_uploads_per_month", "10")
-        _ensure_setting(conn, "tl_min_seed_copies", "10")
-        _ensure_setting(conn, "tl_min_seed_days", "7")
-        _ensure_setting(conn, "tl_inactivity_warning_weeks", "3")
-        _ensure_setting(conn, "tl_absence_notice_weeks", "4")
-        _ensure_setting(conn, "tl_enforce_activity", "1")
-
-        # ntfy notification settings
-        _ensure_setting(conn, "ntfy_url", "")
-        _ensure_setting(conn, "ntfy_topic", "")
-        _ensure_setting(conn, "ntfy_enabled", "0")
-        _ensure_setting(conn, "tl_last_critical_state", "0")
-
+        _seed_defaults(conn)
         conn.commit()
+    get_settings_cache().invalidate()
+
+
+def _seed_defaults(conn: sqlite3.Connection) -> None:
+    """Insert default settings and media roots that are missing."""
+    _ensure_setting(conn, "output_dir", str(DEFAULT_OUTPUT_DIR))
+    _ensure_setting(conn, "exclude_dirs", DEFAULT_EXCLUDES)
+    _ensure_setting(conn, "auto_scan_interval", "60")  # Minutes
+    _ensure_setting(conn, "enable_auto_upload", "0")  # Safety first
+
+    for media_type in MEDIA_TYPES:
+        default_path = str(Path("/volume/media") / media_type)
+        default_category = CATEGORY_OPTIONS[media_type][0]["id"]
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO media_roots (media_type, path, enabled, default_category)
+            VALUES (?, ?, 1, ?)
+            """,
+            (media_type, default_path, default_category),
+        )
+
+    for k, v in DEFAULT_TEMPLATES.items():
+        _ensure_setting(conn, f"template_{k}", v)
+
+    _ensure_setting(conn, "release_group", DEFAULT_RELEASE_GROUP)
+    _ensure_setting(conn, "extract_metadata", "1")
+    _ensure_setting(conn, "extract_thumbnails", "1")
+
+    # qBitTorrent Settings
+    _ensure_setting(conn, "qbt_enabled", "0")
+    _ensure_setting(conn, "qbt_url", QBT_DEFAULT_URL)
+    _ensure_setting(conn, "qbt_user", QBT_DEFAULT_USER)
+    _ensure_setting(conn, "qbt_pass", QBT_DEFAULT_PASS)
+    _ensure_setting(conn, "qbt_sync_interval", "60")  # Seconds, 0 = no seeding monitor
+
+    # TorrentLeech Preferences (Activity + Seeding Minimums)
+    _ensure_setting(conn, "tl_min_uploads_per_month", "10")
+    _ensure_setting(conn, "tl_min_seed_copies", "10")
+    _ensure_setting(conn, "tl_min_seed_days", "7")
+    _ensure_setting(conn, "tl_inactivity_warning_weeks", "3")
+    _ensure_setting(conn, "tl_absence_notice_weeks", "4")
+    _ensure_setting(conn, "tl_enforce_activity", "1")
+
+    # ntfy notification settings
+    _ensure_setting(conn, "ntfy_url", "")
+    _ensure_setting(conn, "ntfy_topic", "")
+    _ensure_setting(conn, "ntfy_enabled", "0")
+    _ensure_setting(conn, "tl_last_critical_state", "0")
+
+    # Database maintenance (src/maintenance.py)
+    _ensure_setting(conn, "db_maintenance_interval", "24")  # Hours, 0 = off
+    _ensure_setting(conn, "db_last_maintenance", "")
+
+    # Upload pipeline sizing (src/pipeline.py)
+    _ensure_setting(conn, "worker_prepare_concurrency", "1")
+    _ensure_setting(conn, "worker_upload_concurrency", "1")
+    _ensure_setting(conn, "worker_handoff_size", "1")
+
+    # Piece-hash cache budget (src/piece_cache.py), 0 = off
+    _ensure_setting(conn, "piece_cache_max_mb", "64")
+
+    # Worker artifact staging (src/artifacts.py)
+    _ensure_setting(conn, "staging_budget_mb", "64")
+    _ensure_setting(conn, "staging_spill_kb", "1024")  # Larger artifacts go to output_dir
+
+    # Queue scheduling policy per media type (src/scheduler.py)
+    for media_type in MEDIA_TYPES:
+        _ensure_setting(conn, f"queue_policy_{media_type}", "fifo")
+
+    # Scanner duplicate searches (src/dupe_search.py)
+    _ensure_setting(conn, "tl_search_concurrency", "4")
+    _ensure_setting(conn, "tl_search_rate", "2")  # Searches per second
+
+    # TL search result cache (src/search_cache.py), 0 = don't cache
+    _ensure_setting(conn, "search_cache_positive_hours", "720")
+    _ensure_setting(conn, "search_cache_negative_hours", "24")
 
 
 def _ensure_setting(conn: sqlite3.Connection, key: str, value: str) -> None:
@@ -159,19 +823,64 @@ def _ensure_setting(conn: sqlite3.Connection, key: str, value: str) -> None:
     )
 
 
-def get_setting(conn: sqlite3.Connection, key: str) -> str:
-    """Get a setting value by key."""
-    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-    return row["value"] if row else ""
+def get_setting(conn: sqlite3.Connection | None, key: str) -> str:
+    """Get a setting value by key (served from the settings cache).
+
+    conn is only used when the cache needs reloading; pass None to let the
+    cache borrow a pooled connection.
+    """
+    return get_settings_cache().snapshot(conn).get(key, "")
+
+
+def get_bool_setting(conn: sqlite3.Connection | None, key: str, default: bool = False) -> bool:
+    """Get a '1'/'0' flag. Unset means default; with default=True only '0' is off."""
+    value = get_setting(conn, key)
+    return value != "0" if default else value == "1"
+
+
+def get_int_setting(conn: sqlite3.Connection | None, key: str, default: int) -> int:
+    """Get an integer setting, falling back to default when unset or invalid."""
+    try:
+        return int(get_setting(conn, key))
+    except ValueError:
+        return default
+
+
+def get_all_settings(conn: sqlite3.Connection | None = None) -> dict[str, str]:
+    """Get every setting as a dict (one cached load)."""
+    return dict(get_settings_cache().snapshot(conn))
+
+
+def settings_cache_stats() -> dict:
+    """Settings cache counters (exposed on /health)."""
+    return get_settings_cache().stats()
 
 
 def set_setting(conn: sqlite3.Connection, key: str, value: str) -> None:
-    """Set a setting value."""
+    """Set a setting value and invalidate the settings cache."""
     conn.execute(
         "INSERT INTO settings (key, value) VALUES (?, ?) "
         "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
         (key, value),
     )
+    get_settings_cache().mark_written()
+
+
+def compare_and_set_setting(
+    conn: sqlite3.Connection, key: str, expected: str, value: str
+) -> bool:
+    """Set key to value only if it still holds expected. Commits.
+
+    Lets one process out of several claim a periodic job by swapping a
+    timestamp setting; the loser sees False.
+    """
+    cur = conn.execute(
+        "UPDATE settings SET value = ? WHERE key = ? AND value = ?",
+        (value, key, expected),
+    )
+    conn.commit()
+    get_settings_cache().invalidate()
+    return cur.rowcount == 1
 
 
 def get_output_dir(conn: sqlite3.Connection | None = None) -> Path:
@@ -196,3 +905,127 @@ def get_excludes(conn: sqlite3.Connection) -> list[str]:
     """Get list of excluded directory names."""
     excludes = get_setting(conn, "exclude_dirs")
     return [e.strip() for e in excludes.split(",") if e.strip()]
+
+
+ENQUEUE_STATUSES = frozenset(["queued", "duplicate"])
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER for IN (...) lookups.
+_IN_CHUNK = 500
+
+
+def _select_in(
+    conn: sqlite3.Connection, select: str, column: str, values: list, where: str = ""
+) -> set:
+    """Distinct select values of queue rows whose column is in values, in chunks."""
+    found: set = set()
+    for i in range(0, len(values), _IN_CHUNK):
+        chunk = values[i : i + _IN_CHUNK]
+        marks = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT {select} FROM queue WHERE {column} IN ({marks}){where}", chunk
+        ).fetchall()
+        found.update(r[0] for r in rows)
+    return found
+
+
+def queued_paths(conn: sqlite3.Connection, paths: list[str]) -> set[str]:
+    """Return the subset of paths held by an active (not yet finished) queue item."""
+    return _select_in(conn, "path_key", "path_key", paths)
+
+
+def known_paths(
+    conn: sqlite3.Connection, paths: list[str], retry_failed: bool = False
+) -> set[str]:
+    """Return the subset of paths with any queue row, finished ones included.
+
+    Library scans use this so uploaded, duplicate and failed entries are not
+    queued again on every pass. With retry_failed, paths whose only rows
+    failed are left out, so the scan queues them again.
+    """
+    where = " AND status != 'failed'" if retry_failed else ""
+    return _select_in(conn, "path", "path", paths, where)
+
+
+def paths_for_ids(conn: sqlite3.Connection, ids: list[int]) -> set[str]:
+    """Return the paths of the queue rows with the given ids."""
+    return _select_in(conn, "path", "id", ids)
+
+
+def _enqueue_row(item: dict, now: str) -> tuple | None:
+    """Validate one enqueue dict and return its INSERT parameters, or None."""
+    media_type = item.get("media_type")
+    path = str(item.get("path") or "")
+    release_name = str(item.get("release_name") or "")
+    status = item.get("status", "queued")
+    if media_type not in MEDIA_TYPES or not path or not release_name:
+        return None
+    if status not in ENQUEUE_STATUSES:
+        return None
+    try:
+        category = int(item["category"])
+        certainty = int(item.get("certainty_score", 100))
+        priority = int(item.get("priority") or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Never measured here: a tree walk per item would make bulk adds and
+    # scans slow again. Callers pass a size they already have; otherwise
+    # prepare records it from the release manifest.
+    size = item.get("size_bytes")
+    return (
+        media_type, path, release_name, category, item.get("tags") or "",
+        item.get("imdb"), item.get("tvmazeid"), item.get("tvmazetype"),
+        status, item.get("message") or "", certainty,
+        item.get("approval_status") or "approved", priority, size,
+        path if status == "queued" else None, now, now,
+    )
+
+
+def enqueue_items(conn: sqlite3.Connection, items: list[dict]) -> list[int]:
+    """Insert many queue rows in one transaction and return the new IDs.
+
+    Items are dicts with media_type, path, release_name and category, plus
+    optional tags, imdb, tvmazeid, tvmazetype, status ('queued' or
+    'duplicate'), message, certainty_score, approval_status, priority and
+    size_bytes (left NULL when absent, until prepare measures it). Items missing
+    a required field are skipped, and
+    paths held by an active item (or repeated within the batch) are dropped
+    by INSERT OR IGNORE on the unique path_key; finished paths can be queued
+    again. Commits before returning unless the caller already had a
+    transaction open, which it then commits itself. Wakes idle queue workers.
+    """
+    now = now_iso()
+    rows = [row for row in (_enqueue_row(item, now) for item in items) if row]
+    if not rows:
+        return []
+
+    owned = not conn.in_transaction
+    if owned:
+        # Take the write lock up front so MAX(id) below stays valid
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM queue").fetchone()[0]
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO queue (
+                media_type, path, release_name, category, tags,
+                imdb, tvmazeid, tvmazetype, status, message,
+                certainty_score, approval_status, priority, size_bytes, path_key,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        ids = [
+            r[0] for r in conn.execute(
+                "SELECT id FROM queue WHERE id > ? ORDER BY id", (last_id,)
+            )
+        ]
+        if owned:
+            conn.commit()
+    except Exception:
+        if owned:
+            conn.rollback()
+        raise
+    if ids:
+        notify_queue()
+    return ids
@@ -0,0 +1,296 @@
+"""Concurrent TorrentLeech duplicate searches for the library scanners.
+
+Scanning a library used to search TL one entry at a time with a fixed
+sleep after each. search_many() keeps up to tl_search_concurrency searches
+in flight on one asyncio loop instead, paced by a token bucket that starts
+at tl_search_rate searches per second. A 429 or 5xx response halves the
+rate (honouring Retry-After) and the search is retried; each success wins
+back a little of the rate, up to the configured ceiling. Searches that
+still fail count against the tracker circuit breaker in src/api.py; while
+it is open no new entries are searched and the rest are left for the next
+scan.
+
+Entries to search are pulled lazily from the caller's iterable, and
+results are yielded as they complete, so metadata extraction, searching
+and queueing all overlap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import httpx
+
+from src import api
+from src.db import get_int_setting, get_setting
+from src.logger import logger
+from src.search_cache import cache_lookup, cache_store
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 2.0  # Searches per second
+
+# Attempts per query before it is reported as failed (None).
+MAX_ATTEMPTS = 4
+# Rate floor while throttled, in searches per second.
+MIN_RATE = 0.2
+# Multiplier applied to the rate on 429/5xx.
+BACKOFF_FACTOR = 0.5
+# Fraction of the configured rate regained per successful search.
+RECOVERY_FRACTION = 0.05
+
+_DONE = object()
+
+
+class TokenBucket:
+    """Adaptive token bucket (additive increase, multiplicative decrease).
+
+    Only used from one event loop, so it needs no locking.
+    """
+
+    def __init__(self, rate: float, min_rate: float = MIN_RATE, clock: Callable[[], float] = time.monotonic):
+        self.max_rate = max(float(rate), 0.01)
+        self.rate = self.max_rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.capacity = max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.throttled = 0
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def delay(self) -> float:
+        """Take a token and return 0, or return how long to wait for one."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+
+    def throttle(self, retry_after: float | None = None) -> None:
+        """Back off after the tracker pushed back."""
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+        self.tokens = 0.0
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self._paused_until = max(self._paused_until, self._clock() + pause)
+        # Tokens only start accruing again once the pause is over
+        self._updated = self._paused_until
+
+    def recover(self) -> None:
+        """Creep back towards the configured rate after a success."""
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+class DupeSearch:
+    """Runs batches of TL searches concurrently under one rate limit."""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        use_cache: bool = False,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate)
+        self.use_cache = use_cache
+        self.searched = 0
+        self.cached = 0
+        self.failed = 0
+        self.paused = 0
+
+    @classmethod
+    def from_settings(cls, conn: sqlite3.Connection) -> "DupeSearch":
+        """Build from tl_search_concurrency and tl_search_rate, using the search cache."""
+        concurrency = get_int_setting(conn, "tl_search_concurrency", DEFAULT_CONCURRENCY)
+        try:
+            rate = float(get_setting(conn, "tl_search_rate") or DEFAULT_RATE)
+        except ValueError:
+            rate = DEFAULT_RATE
+        return cls(concurrency, rate if rate > 0 else DEFAULT_RATE, use_cache=True)
+
+    def search_many(
+        self,
+        items: Iterable[tuple[Any, Sequence[str]]],
+        exact: bool = False,
+        cancel: threading.Event | None = None,
+    ) -> Iterator[tuple[Any, bool | None]]:
+        """Search TL for each (key, queries) item, yielding (key, found) as results arrive.
+
+        found is True if any of the item's queries matched, False if none
+        did, and None if a search still failed after MAX_ATTEMPTS or the
+        tracker circuit is open (the caller should leave that item for the
+        next scan). items is consumed
+        lazily from a worker thread; setting cancel stops pulling new items.
+        """
+        if not api.ANNOUNCE_KEY:
+            for key, _queries in items:
+                yield key, False
+            return
+
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        batch = _Batch(self, iter(items), exact, cancel or stop, stop, results)
+        thread = threading.Thread(target=batch.run, name="dupe-search", daemon=True)
+        thread.start()
+        try:
+            while (result := results.get()) is not _DONE:
+                if isinstance(result, BaseException):
+                    raise result
+                yield result
+        finally:
+            batch.cancel()
+            thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "searched": self.searched,
+            "cached": self.cached,
+            "failed": self.failed,
+            "paused": self.paused,
+            "throttled": self.bucket.throttled,
+            "rate": round(self.bucket.rate, 2),
+        }
+
+
+class _Batch:
+    """One search_many() call, run on its own event loop thread."""
+
+    def __init__(self, engine, items, exact, cancel, stop, results):
+        self.engine = engine
+        self.items = items
+        self.exact = exact
+        self.cancel_event = cancel
+        self.stop = stop
+        self.results = results
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            self.results.put(e)
+        finally:
+            self.results.put(_DONE)
+
+    def cancel(self) -> None:
+        """Abandon the batch (consumer stopped early); in-flight searches are dropped."""
+        with self._lock:
+            self.stop.set()
+            if self._task is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+                self._task = None
+
+    def _stopped(self) -> bool:
+        # An open tracker circuit pauses the scan; unsearched entries wait
+        # for the next one
+        return self.stop.is_set() or self.cancel_event.is_set() or api.tracker_breaker().is_open()
+
+    async def _main(self) -> None:
+        with self._lock:
+            if self.stop.is_set():
+                return
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+        try:
+            await self._search_all()
+        finally:
+            with self._lock:
+                self._task = None
+
+    async def _search_all(self) -> None:
+        n = self.engine.concurrency
+        todo: asyncio.Queue = asyncio.Queue(maxsize=n * 2)
+        limits = httpx.Limits(
+            max_connections=n,
+            max_keepalive_connections=n,
+            keepalive_expiry=api.TL_KEEPALIVE_SECONDS,
+        )
+        timeout = httpx.Timeout(30, connect=api.TL_CONNECT_TIMEOUT)
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            workers = [asyncio.create_task(self._worker(client, todo)) for _ in range(n)]
+            try:
+                while not self._stopped():
+                    item = await asyncio.to_thread(next, self.items, _DONE)
+                    if item is _DONE or self._stopped():
+                        break
+                    await todo.put(item)
+                for _ in workers:
+                    await todo.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+
+    async def _worker(self, client: httpx.AsyncClient, todo: asyncio.Queue) -> None:
+        while (item := await todo.get()) is not None:
+            key, queries = item
+            found: bool | None = False
+            for query in queries:
+                result = await self._search(client, query)
+                if result:
+                    found = True
+                    break
+                if result is None:
+                    found = None
+            self.results.put((key, found))
+
+    async def _search(self, client: httpx.AsyncClient, query: str) -> bool | None:
+        engine = self.engine
+        bucket = engine.bucket
+        breaker = api.tracker_breaker()
+        if engine.use_cache:
+            cached = await asyncio.to_thread(cache_lookup, query, self.exact)
+            if cached is not None:
+                engine.cached += 1
+                return cached
+        if not breaker.allow():
+            engine.paused += 1
+            return None
+        try:
+            for _attempt in range(MAX_ATTEMPTS):
+                await bucket.acquire()
+                try:
+                    response = await client.post(api.TL_SEARCH_URL, data=api.search_form(query, self.exact))
+                    error = api.classify_response(response)
+                    found = api.parse_search_response(response.text) if error is None else None
+                except httpx.HTTPError as e:
+                    error = api.classify_exception(e)
+                except api.TrackerError as e:
+                    error = e  # Malformed answer
+                if error is None:
+                    breaker.record_success()
+                    bucket.recover()
+                    engine.searched += 1
+                    if engine.use_cache:
+                        await asyncio.to_thread(cache_store, query, self.exact, found)
+                    return found
+                if not error.retryable:
+                    break
+                logger.debug(f"TL search {error.kind} for '{query}': {error}")
+                bucket.throttle(error.retry_after)
+            # Only the final outcome counts against the breaker; the bucket
+            # already absorbs individual 429s
+            breaker.record_failure(error)
+        except BaseException:
+            breaker.abandon_probe()
+            raise
+        engine.failed += 1
+        logger.warning(f"TL search failed ({error.kind}: {error}): '{query}'")
+        return None
@@ -0,0 +1,183 @@
+"""SQLite maintenance: optimize/analyze, incremental vacuum and WAL checkpoint."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.db import compare_and_set_setting, db, get_int_setting, get_setting
+from src.logger import logger
+from src.utils import now_iso
+
+# Run order matters: vacuum writes freed pages through the WAL, so the
+# checkpoint goes last to fold them in and truncate the -wal file.
+MAINTENANCE_TASKS = ("optimize", "vacuum", "checkpoint")
+# maintenance_log rows kept; older ones are trimmed after each run.
+LOG_KEEP = 200
+# How often the background thread checks whether a run is due.
+POLL_SECONDS = 600
+
+
+def _db_file(conn: sqlite3.Connection) -> str:
+    """Path of the main database file behind conn."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _pages(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA page_count").fetchone()[0]
+
+
+def checkpoint(conn: sqlite3.Connection, analyze: bool = False) -> tuple[int, str]:
+    """Copy the WAL into the database and truncate the -wal file."""
+    wal = _db_file(conn) + "-wal"
+    before = _size(wal)
+    busy, log_frames, done = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    detail = f"frames={log_frames} checkpointed={done}"
+    if busy:
+        detail += " (busy: a reader kept part of the WAL)"
+    return before - _size(wal), detail
+
+
+def optimize(conn: sqlite3.Connection, analyze: bool = False) -> tuple[int, str]:
+    """Refresh planner statistics.
+
+    PRAGMA optimize only re-analyzes tables whose stats look stale; a full
+    ANALYZE runs when asked for or when no statistics exist yet.
+    """
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    full = analyze or not has_stats
+    if full:
+        conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    return 0, "analyze + optimize" if full else "optimize"
+
+
+def vacuum(conn: sqlite3.Connection, analyze: bool = False) -> tuple[int, str]:
+    """Return free pages to the filesystem.
+
+    Databases created before auto_vacuum=INCREMENTAL are converted with one
+    full VACUUM; after that each run is a cheap PRAGMA incremental_vacuum.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    before = _pages(conn)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        detail = "converted to incremental auto_vacuum"
+    else:
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # Each step of the pragma frees one page; fetchall() runs it to the end
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        detail = f"freed {free} pages"
+    return (before - _pages(conn)) * page_size, detail
+
+
+_TASK_FUNCS = {"checkpoint": checkpoint, "optimize": optimize, "vacuum": vacuum}
+
+
+def run_maintenance(
+    conn: sqlite3.Connection,
+    tasks: tuple[str, ...] | list[str] = MAINTENANCE_TASKS,
+    analyze: bool = False,
+) -> list[dict]:
+    """Run maintenance tasks in order and record each in maintenance_log.
+
+    conn must not be inside a transaction (VACUUM and checkpoints need the
+    connection idle). A failing task is logged and recorded; later tasks
+    still run.
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    results = []
+    for task in (t for t in MAINTENANCE_TASKS if t in tasks):
+        started_at = now_iso()
+        start = time.monotonic()
+        error = None
+        try:
+            reclaimed, detail = _TASK_FUNCS[task](conn, analyze)
+        except sqlite3.Error as e:
+            reclaimed, detail, error = 0, f"error: {e}", str(e)
+            logger.warning(f"DB maintenance {task} failed: {e}")
+        result = {
+            "task": task,
+            "started_at": started_at,
+            "seconds": round(time.monotonic() - start, 3),
+            "bytes_reclaimed": max(0, reclaimed),
+            "detail": detail,
+        }
+        if error:
+            result["error"] = error
+        results.append(result)
+
+    conn.executemany(
+        "INSERT INTO maintenance_log (task, started_at, seconds, bytes_reclaimed, detail) "
+        "VALUES (:task, :started_at, :seconds, :bytes_reclaimed, :detail)",
+        results,
+    )
+    conn.execute(
+        "DELETE FROM maintenance_log WHERE id <= "
+        "(SELECT MAX(id) FROM maintenance_log) - ?",
+        (LOG_KEEP,),
+    )
+    conn.commit()
+
+    for r in results:
+        logger.info(
+            f"DB maintenance {r['task']}: {r['seconds']}s, "
+            f"{r['bytes_reclaimed']} bytes reclaimed ({r['detail']})"
+        )
+    return results
+
+
+def maintenance_due(conn: sqlite3.Connection) -> str | None:
+    """Return the current db_last_maintenance value if a run is due, else None."""
+    hours = get_int_setting(conn, "db_maintenance_interval", 24)
+    if hours <= 0:
+        return None
+    last = get_setting(conn, "db_last_maintenance")
+    if last:
+        try:
+            last_dt = datetime.fromisoformat(last.rstrip("Z")).replace(tzinfo=timezone.utc)
+        except ValueError:
+            last_dt = None
+        if last_dt and datetime.now(timezone.utc) - last_dt < timedelta(hours=hours):
+            return None
+    return last
+
+
+def maintenance_worker(shutdown_event: "threading.Event | None" = None) -> None:
+    """Run scheduled maintenance every db_maintenance_interval hours.
+
+    Every web worker process starts this thread; swapping the
+    db_last_maintenance timestamp decides which one actually runs.
+    """
+    import threading as _threading
+
+    if shutdown_event is None:
+        shutdown_event = _threading.Event()
+
+    logger.info("DB maintenance worker started")
+    while not shutdown_event.wait(POLL_SECONDS):
+        try:
+            with db() as conn:
+                last = maintenance_due(conn)
+                if last is None:
+                    continue
+                if not compare_and_set_setting(conn, "db_last_maintenance", last, now_iso()):
+                    continue
+                run_maintenance(conn)
+        except Exception as e:
+            logger.error(f"DB maintenance worker error: {e}", exc_info=True)
+    logger.info("DB maintenance worker stopped")
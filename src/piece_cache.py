@@ -0,0 +1,110 @@
+"""Persistent piece-hash cache so re-preparing unchanged files reads no data.
+
+Entries are keyed by piece_cache_key(): the piece length plus, for every
+file in torrent order, its relative path, device, inode, size and
+mtime_ns. Any rename, edit, touch or added/removed file changes the key,
+so a hit is only possible for content that has not changed. The table is
+bounded by the piece_cache_max_mb setting; least recently used entries
+are evicted first.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from src.db import get_int_setting
+from src.utils import now_iso
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+class PieceHashCache:
+    """piece_cache table accessor passed to create_torrent().
+
+    Every call commits straight away, like the worker's status writes, so no
+    transaction is held while pieces are hashed. A budget of 0 MB disables
+    the cache.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, max_bytes: int | None = None):
+        self.conn = conn
+        if max_bytes is None:
+            max_bytes = get_int_setting(conn, "piece_cache_max_mb", 64) * 1024 * 1024
+        self.max_bytes = max(0, max_bytes)
+
+    def get(self, key: str) -> bytes | None:
+        """Return cached piece hashes for key, or None."""
+        if not self.max_bytes:
+            return None
+        row = self.conn.execute(
+            "SELECT pieces FROM piece_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            _count("misses")
+            return None
+        self.conn.execute(
+            "UPDATE piece_cache SET hits = hits + 1, last_used_at = ? WHERE key = ?",
+            (now_iso(), key),
+        )
+        self.conn.commit()
+        _count("hits")
+        return bytes(row["pieces"])
+
+    def put(self, key: str, pieces: bytes, piece_length: int, total_size: int) -> None:
+        """Store piece hashes for key, then evict down to the budget."""
+        if not self.max_bytes or len(pieces) > self.max_bytes:
+            return
+        now = now_iso()
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO piece_cache
+                (key, piece_length, total_size, pieces, bytes, hits, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+            """,
+            (key, piece_length, total_size, pieces, len(pieces), now, now),
+        )
+        _count("stores")
+        self.evict()
+        self.conn.commit()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the total fits the budget."""
+        over = self.conn.execute(
+            "SELECT COALESCE(SUM(bytes), 0) FROM piece_cache"
+        ).fetchone()[0] - self.max_bytes
+        if over <= 0:
+            return 0
+        victims = []
+        for row in self.conn.execute(
+            "SELECT key, bytes FROM piece_cache ORDER BY last_used_at, key"
+        ):
+            if over <= 0:
+                break
+            victims.append((row["key"],))
+            over -= row["bytes"]
+        self.conn.executemany("DELETE FROM piece_cache WHERE key = ?", victims)
+        _count("evictions", len(victims))
+        return len(victims)
+
+
+def piece_cache_counters() -> dict:
+    """This process's hit/miss counters; no query, so cheap enough for /health."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def piece_cache_stats(conn: sqlite3.Connection) -> dict:
+    """Entry count, stored bytes and this process's hit/miss counters."""
+    entries, size = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM piece_cache"
+    ).fetchone()
+    stats = piece_cache_counters()
+    stats.update({"entries": entries, "bytes": size})
+    return stats
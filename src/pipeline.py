@@ -0,0 +1,218 @@
+"""Staged upload pipeline: a prepare pool feeding an upload pool.
+
+Preparing (exiftool, ffmpeg, mediainfo, piece hashing) is CPU/disk bound and
+uploading is network bound, so they run in separate thread pools joined by
+a bounded hand-off queue. While one item uploads the next is already being
+hashed; throughput is set by the slower stage, not the sum of both.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+from src import worker
+from src.api import tracker_breaker
+from src.db import db, get_int_setting
+from src.logger import logger
+from src.utils.qbittorrent import seed_batcher
+from src.wakeup import get_queue_wakeup, notify_queue
+
+# Margin after a lease's expiry before an idle worker looks for it, so the
+# reclaim query sees it as past due.
+LEASE_WAKE_MARGIN_SECONDS = 1
+
+
+def pipeline_settings() -> tuple[int, int, int]:
+    """Return (prepare_workers, upload_workers, handoff_size) from settings."""
+    with db() as conn:
+        prepare = get_int_setting(conn, "worker_prepare_concurrency", 1)
+        upload = get_int_setting(conn, "worker_upload_concurrency", 1)
+        handoff = get_int_setting(conn, "worker_handoff_size", 1)
+    return max(1, prepare), max(1, upload), max(1, handoff)
+
+
+class UploadPipeline:
+    """Run prepare and upload thread pools until shutdown_event is set.
+
+    Each prepare thread claims items under its own worker id and keeps the
+    item's lease alive until the upload thread finishes with it. When the
+    hand-off queue is full, prepare threads block, so at most
+    prepare_workers + handoff_size + upload_workers items are in flight.
+    On shutdown, in-flight uploads finish; prepared items still waiting in
+    the hand-off queue are put back to 'queued'.
+
+    While the tracker circuit breaker is open (src/api.py), both pools stop
+    taking new work until it lets a probe through, so an outage does not
+    burn through the queue.
+
+    Idle prepare threads do not poll: they sleep on the queue wakeup
+    (src/wakeup.py) until an item is enqueued, retried or approved, or until
+    another worker's lease is due to expire. poll_seconds caps that sleep
+    when set.
+    """
+
+    def __init__(
+        self,
+        shutdown_event: threading.Event,
+        prepare_workers: int = 1,
+        upload_workers: int = 1,
+        handoff_size: int = 1,
+        poll_seconds: float | None = None,
+    ):
+        self.shutdown_event = shutdown_event
+        self.prepare_workers = max(1, prepare_workers)
+        self.upload_workers = max(1, upload_workers)
+        self.poll_seconds = poll_seconds
+        self.wakeup = get_queue_wakeup()
+        self.handoff: queue.Queue = queue.Queue(maxsize=max(1, handoff_size))
+        self._preparers: list[threading.Thread] = []
+        self._uploaders: list[threading.Thread] = []
+
+    def start(self) -> "UploadPipeline":
+        logger.info(
+            f"Upload pipeline started: {self.prepare_workers} prepare, "
+            f"{self.upload_workers} upload, hand-off {self.handoff.maxsize}"
+        )
+        self._preparers = [
+            threading.Thread(target=self._prepare_loop, name=f"prepare-{n}", daemon=True)
+            for n in range(self.prepare_workers)
+        ]
+        self._uploaders = [
+            threading.Thread(target=self._upload_loop, name=f"upload-{n}", daemon=True)
+            for n in range(self.upload_workers)
+        ]
+        for t in self._preparers + self._uploaders:
+            t.start()
+        return self
+
+    def join(self) -> None:
+        # Idle prepare threads sleep on the wakeup, not on shutdown_event
+        self.wakeup.wake_local()
+        for t in self._preparers + self._uploaders:
+            t.join()
+        # Torrents of the last uploads may still be waiting for their batch
+        seed_batcher().flush()
+        logger.info("Upload pipeline stopped")
+
+    def run(self) -> None:
+        """Start both pools and block until shutdown completes."""
+        self.start()
+        while not self.shutdown_event.wait(1):
+            pass
+        self.join()
+
+    def _prepare_loop(self) -> None:
+        with worker.step_pool(f"{threading.current_thread().name}-step") as steps:
+            self._prepare_items(steps)
+
+    def _prepare_items(self, steps) -> None:
+        worker_id = worker.make_worker_id()
+        backoff = 2
+        max_backoff = 60
+        while True:
+            # Read before claiming so a notify during the claim is not missed,
+            # and check shutdown after so join()'s wake_local() is not either
+            since = self.wakeup.generation()
+            if self.shutdown_event.is_set():
+                break
+            if not self._wait_for_tracker("prepare"):
+                continue
+            try:
+                with db() as conn:
+                    row = worker.claim_next_item(conn, worker_id)
+                    if row is None:
+                        idle = self._idle_timeout(worker.seconds_until_lease_expiry(conn))
+                    else:
+                        heartbeat = worker.LeaseHeartbeat(row["id"], worker_id).start()
+                        try:
+                            job = worker.prepare_queue_item(conn, row, steps)
+                        except BaseException:
+                            heartbeat.stop()
+                            raise
+                if row is None:
+                    self.wakeup.wait(since, idle)
+                elif job is None:
+                    heartbeat.stop()
+                    worker.check_activity_after_item()
+                else:
+                    job["heartbeat"] = heartbeat
+                    self._hand_off(job)
+                backoff = 2
+            except Exception as e:
+                logger.error(f"Prepare loop error: {e}", exc_info=True)
+                self.shutdown_event.wait(backoff)
+                backoff = min(backoff * 2, max_backoff)
+
+    def _wait_for_tracker(self, stage: str) -> bool:
+        """Block while the tracker circuit is open; False if shut down meanwhile."""
+        breaker = tracker_breaker()
+        if not breaker.is_open():
+            return True
+        logger.info(f"Tracker unavailable; {stage} paused for {breaker.retry_in():.0f}s")
+        while breaker.is_open():
+            if self.shutdown_event.wait(min(max(breaker.retry_in(), 0.5), 5)):
+                return False
+        return True
+
+    def _idle_timeout(self, lease_expiry: float | None) -> float | None:
+        """How long an idle prepare thread sleeps; None means until woken."""
+        timeouts = [self.poll_seconds] if self.poll_seconds else []
+        if lease_expiry is not None:
+            timeouts.append(lease_expiry + LEASE_WAKE_MARGIN_SECONDS)
+        return min(timeouts) if timeouts else None
+
+    def _hand_off(self, job: dict) -> None:
+        """Block until an upload slot frees up, or requeue on shutdown."""
+        while not self.shutdown_event.is_set():
+            try:
+                self.handoff.put(job, timeout=1)
+                return
+            except queue.Full:
+                continue
+        self._requeue(job)
+
+    def _upload_loop(self) -> None:
+        while True:
+            try:
+                job = self.handoff.get(timeout=1)
+            except queue.Empty:
+                if self.shutdown_event.is_set() and not any(
+                    t.is_alive() for t in self._preparers
+                ):
+                    return
+                continue
+            if job["heartbeat"].lost.is_set():
+                # Reclaimed by another worker while waiting: not ours to upload
+                logger.warning(f"Item {job['item_id']}: Lease lost before upload, dropped")
+                job["heartbeat"].stop()
+                job["staging"].close()
+                continue
+            if self.shutdown_event.is_set() or not self._wait_for_tracker("upload"):
+                self._requeue(job)
+                continue
+            try:
+                with db() as conn:
+                    worker.upload_queue_item(conn, job)
+            except Exception as e:
+                logger.error(f"Upload loop error: {e}", exc_info=True)
+            finally:
+                job["heartbeat"].stop()
+                job["staging"].close()
+            worker.check_activity_after_item()
+
+    def _requeue(self, job: dict) -> None:
+        """Put a prepared but not yet uploaded item back in the queue."""
+        try:
+            with db() as conn:
+                worker.update_queue_status(
+                    conn, job["item_id"], "queued", "Requeued: worker shut down before upload",
+                    job.get("worker_id"),
+                )
+            # Another process's worker may still be running
+            notify_queue()
+        except Exception as e:
+            logger.warning(f"Item {job['item_id']}: Could not requeue on shutdown - {e}")
+        finally:
+            job["heartbeat"].stop()
+            job["staging"].close()
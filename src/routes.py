@@ -8,10 +8,12 @@ from typing import Any
 
 from flask import Blueprint, jsonify, render_template, request
 
+from src.api import tracker_breaker
+from src.artifacts import staging_stats
 from src.extensions import limiter
 
 # Security constants
-VALID_FIELDS = frozenset(["release_name", "category", "tags", "status", "imdb", "tvmazeid", "tvmazetype"])
+VALID_FIELDS = frozenset(["release_name", "category", "tags", "status", "imdb", "tvmazeid", "tvmazetype", "priority"])
 VALID_STATUSES = frozenset(["queued", "preparing", "uploading", "success", "failed", "duplicate"])
 
 
@@ -43,7 +45,17 @@ from src.config import (
     DEFAULT_TEMPLATES,
     MEDIA_TYPES,
 )
-from src.db import db, get_excludes, get_media_roots, get_setting, set_setting
+from src.db import (
+    db,
+    get_all_settings,
+    get_bool_setting,
+    get_excludes,
+    get_media_roots,
+    get_setting,
+    pool_stats,
+    set_setting,
+    settings_cache_stats,
+)
 from src.utils import (
     extract_metadata,
     get_folder_size,
@@ -52,6 +64,12 @@ from src.utils import (
     now_iso,
     suggest_release_name,
 )
+from src.piece_cache import piece_cache_counters, piece_cache_stats
+from src.scheduler import QUEUE_POLICIES, get_queue_policies
+from src.search_cache import search_cache_counters, search_cache_stats
+from src.seeding import seeding_stats
+from src.utils.exiftool import exiftool_stats
+from src.utils.qbittorrent import qbt_stats
 from src.logger import logger
 
 bp = Blueprint("main", __name__)
@@ -63,7 +81,20 @@ def health():
     try:
         with db() as conn:
             conn.execute("SELECT 1")
-        return jsonify({"status": "healthy", "version": APP_VERSION}), 200
+        # In-memory counters only; table sizes are on /api/stats/caches
+        return jsonify({
+            "status": "healthy",
+            "version": APP_VERSION,
+            "db": pool_stats(),
+            "settings_cache": settings_cache_stats(),
+            "exiftool": exiftool_stats(),
+            "piece_cache": piece_cache_counters(),
+            "search_cache": search_cache_counters(),
+            "tracker": tracker_breaker().stats(),
+            "staging": staging_stats(),
+            "qbt": qbt_stats(),
+            "seeding": seeding_stats(),
+        }), 200
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return jsonify({"status": "unhealthy"}), 503
@@ -74,10 +105,15 @@ def stats():
     """Get system statistics for dashboard."""
     try:
         with db() as conn:
-            queue_total = conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
-            queue_pending = conn.execute("SELECT COUNT(*) FROM queue WHERE status = 'queued'").fetchone()[0]
+            queue_total = conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM activity_counters WHERE period = 'total'"
+            ).fetchone()[0]
+            queue_pending = conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM activity_counters "
+                "WHERE period = 'total' AND status = 'queued'"
+            ).fetchone()[0]
             
-            auto_enabled = get_setting(conn, "enable_auto_upload") == "1"
+            auto_enabled = get_bool_setting(conn, "enable_auto_upload")
             auto_interval = get_setting(conn, "auto_scan_interval") or "60"
             
             music_root = conn.execute("SELECT last_scan FROM media_roots WHERE media_type = 'music'").fetchone()
@@ -98,6 +134,20 @@ def stats():
         return jsonify({"error": "Failed to load stats"}), 500
 
 
+@bp.route('/api/stats/caches')
+def cache_stats():
+    """Piece and search cache table sizes plus this process's counters."""
+    try:
+        with db() as conn:
+            return jsonify({
+                "piece_cache": piece_cache_stats(conn),
+                "search_cache": search_cache_stats(conn),
+            })
+    except Exception as e:
+        logger.error(f"Cache stats failed: {e}")
+        return jsonify({"error": "Failed to load cache stats"}), 500
+
+
 @bp.route("/")
 def index() -> str:
     """Main upload UI page."""
@@ -114,17 +164,20 @@ def index() -> str:
 def settings() -> str:
     """Settings UI page."""
     with db() as conn:
-        settings_rows = conn.execute("SELECT key, value FROM settings").fetchall()
+        all_settings = get_all_settings(conn)
         media_roots = get_media_roots(conn)
         templates = {k: get_setting(conn, f"template_{k}") for k in DEFAULT_TEMPLATES}
+        queue_policies = get_queue_policies(conn)
     return render_template(
         "settings.html",
         app_name=APP_NAME,
         app_version=APP_VERSION,
-        settings={r["key"]: r["value"] for r in settings_rows},
+        settings=all_settings,
         media_roots=media_roots,
         templates=templates,
         category_options=CATEGORY_OPTIONS,
+        queue_policies=queue_policies,
+        policy_labels=QUEUE_POLICIES,
     )
 
 
@@ -199,6 +252,11 @@ def update_settings() -> tuple[Any, int]:
             if key in data:
                 set_setting(conn, key, str(data[key]))
 
+        # Queue scheduling policy per media type
+        for media_type, policy in (data.get("queue_policies") or {}).items():
+            if media_type in MEDIA_TYPES and policy in QUEUE_POLICIES:
+                set_setting(conn, f"queue_policy_{media_type}", policy)
+
         # Templates
         templates = data.get("templates", {})
         for k, v in templates.items():
@@ -233,11 +291,11 @@ def update_settings() -> tuple[Any, int]:
 @limiter.limit("5 per minute")
 def test_qbt_connection():
     """Test connection to qBitTorrent."""
-    from src.utils.qbittorrent import get_qbt_client
+    from src.utils.qbittorrent import qbt_session
     try:
-        client = get_qbt_client()
-        if client:
-            version = client.app.version
+        # Reuses the cached session; a stale one is rebuilt and asked again
+        version = qbt_session().call(lambda client: client.app.version)
+        if version is not None:
             return jsonify({"success": True, "version": version}), 200
         else:
             return jsonify({"success": False, "error": "Failed to connect. Check logs or settings."}), 400
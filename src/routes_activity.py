@@ -7,6 +7,7 @@ from flask import jsonify, request
 from src.extensions import limiter
 from src.db import db
 from src.routes import bp
+from src.seeding import seeding_summary
 from src.utils.activity import calculate_health, get_monthly_history
 
 
@@ -26,3 +27,12 @@ def activity_history():
     months = max(1, min(24, months))
     with db() as conn:
         return jsonify(get_monthly_history(conn, months)), 200
+
+
+@bp.route("/api/activity/seeding")
+@limiter.limit("60 per minute")
+def activity_seeding():
+    """Seeding compliance of torrup torrents, from the last qBT sync."""
+    include_all = request.args.get("all", "0") == "1"
+    with db() as conn:
+        return jsonify(seeding_summary(conn, include_all)), 200
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import base64
+import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -10,9 +13,19 @@ from flask import jsonify, request
 
 from src.extensions import limiter
 from src.config import CATEGORY_OPTIONS, MEDIA_TYPES
-from src.db import db, get_media_roots, get_setting
+from src.db import (
+    db,
+    enqueue_items,
+    get_bool_setting,
+    get_media_roots,
+    get_setting,
+    paths_for_ids,
+    queued_paths,
+)
 from src.utils import extract_metadata, generate_release_name, now_iso, suggest_release_name
 from src.logger import logger
+from src.scheduler import schedule_info
+from src.wakeup import notify_queue
 from src.routes import (
     bp,
     sanitize_tags,
@@ -31,8 +44,8 @@ def add_queue() -> tuple[Any, int]:
     items = data.get("items", [])
     if not items:
         return jsonify({"error": "No items provided"}), 400
-    ids = _enqueue_items(items)
-    return jsonify({"success": True, "ids": ids}), 200
+    ids, skipped = _enqueue_items(items)
+    return jsonify({"success": True, "ids": ids, "skipped": skipped}), 200
 
 
 @bp.route("/api/queue")
@@ -43,6 +56,146 @@ def list_queue() -> tuple[Any, int]:
         return jsonify([dict(r) for r in rows]), 200
 
 
+# Columns a list view may project with ?fields=. Anything else is rejected.
+QUEUE_COLUMNS = (
+    "id", "media_type", "path", "release_name", "category", "tags",
+    "imdb", "tvmazeid", "tvmazetype", "status", "message",
+    "torrent_path", "nfo_path", "xml_path", "thumb_path",
+    "certainty_score", "approval_status", "priority", "size_bytes",
+    "created_at", "updated_at",
+)
+PAGE_ORDERS = {
+    # order name -> (keyset columns, ORDER BY clause)
+    "id": (("id",), "id DESC"),
+    "updated": (("updated_at", "id"), "updated_at DESC, id DESC"),
+}
+PAGE_DEFAULT_LIMIT = 50
+PAGE_MAX_LIMIT = 500
+
+
+def _encode_cursor(values: list[Any]) -> str:
+    """Encode keyset values as an opaque URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> list[Any] | None:
+    """Decode a cursor produced by _encode_cursor. Returns None if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    if not isinstance(values[-1], int):
+        return None
+    return values
+
+
+def _split_param(name: str) -> list[str]:
+    """Split a comma-separated query parameter into non-empty values."""
+    return [v.strip() for v in request.args.get(name, "").split(",") if v.strip()]
+
+
+@bp.route("/api/queue/schedule")
+def queue_schedule() -> tuple[Any, int]:
+    """Scheduling policy per media type and whether small items are favoured."""
+    with db() as conn:
+        return jsonify(schedule_info(conn)), 200
+
+
+@bp.route("/api/queue/page")
+def page_queue() -> tuple[Any, int]:
+    """List queue items one keyset page at a time.
+
+    Filters (status, media_type, since, until) narrow both the page and the
+    per-status counts; the cursor only narrows the page. Counts come from a
+    single GROUP BY over the filtered set rather than one query per status.
+    """
+    order = request.args.get("order", "id")
+    if order not in PAGE_ORDERS:
+        return jsonify({"error": "Invalid order"}), 400
+    keyset, order_by = PAGE_ORDERS[order]
+
+    try:
+        limit = int(request.args.get("limit", PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = max(1, min(limit, PAGE_MAX_LIMIT))
+
+    fields = _split_param("fields") or list(QUEUE_COLUMNS)
+    if any(f not in QUEUE_COLUMNS for f in fields):
+        return jsonify({"error": "Invalid fields"}), 400
+    select = list(dict.fromkeys([*fields, *keyset]))
+
+    statuses = _split_param("status")
+    if any(s not in VALID_STATUSES for s in statuses):
+        return jsonify({"error": "Invalid status"}), 400
+    media_types = _split_param("media_type")
+    if any(m not in MEDIA_TYPES for m in media_types):
+        return jsonify({"error": "Invalid media_type"}), 400
+
+    where: list[str] = []
+    params: list[Any] = []
+    if media_types:
+        where.append(f"media_type IN ({', '.join('?' * len(media_types))})")
+        params.extend(media_types)
+    since = request.args.get("since", "").strip()
+    if since:
+        where.append("updated_at >= ?")
+        params.append(since)
+    until = request.args.get("until", "").strip()
+    if until:
+        where.append("updated_at < ?")
+        params.append(until)
+
+    cursor_where: list[str] = []
+    cursor_params: list[Any] = []
+    cursor = request.args.get("cursor", "").strip()
+    if cursor:
+        values = _decode_cursor(cursor, len(keyset))
+        if values is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        cols = ", ".join(keyset)
+        marks = ", ".join("?" * len(keyset))
+        cursor_where.append(f"({cols}) < ({marks})" if len(keyset) > 1 else f"{cols} < ?")
+        cursor_params.extend(values)
+
+    status_where: list[str] = []
+    if statuses:
+        status_where.append(f"status IN ({', '.join('?' * len(statuses))})")
+
+    def clause(parts: list[str]) -> str:
+        return f"WHERE {' AND '.join(parts)}" if parts else ""
+
+    with db() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(select)} FROM queue "
+            f"{clause(where + status_where + cursor_where)} "
+            f"ORDER BY {order_by} LIMIT ?",
+            [*params, *statuses, *cursor_params, limit + 1],
+        ).fetchall()
+        count_rows = conn.execute(
+            f"SELECT status, COUNT(*) FROM queue {clause(where)} GROUP BY status",
+            params,
+        ).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor([rows[-1][c] for c in keyset])
+
+    counts = {r[0]: r[1] for r in count_rows}
+    total = sum(n for s, n in counts.items() if not statuses or s in statuses)
+    return jsonify({
+        "items": [{f: r[f] for f in fields} for r in rows],
+        "next_cursor": next_cursor,
+        "total": total,
+        "counts": counts,
+    }), 200
+
+
 @bp.route("/api/queue/update", methods=["POST"])
 @limiter.limit("30 per minute")
 def update_queue() -> tuple[Any, int]:
@@ -109,6 +262,14 @@ def update_queue() -> tuple[Any, int]:
             updates.append("tvmazetype = ?")
             params.append(str(value) if value else None)
 
+        elif field == "priority":
+            try:
+                priority = int(value or 0)
+            except (ValueError, TypeError):
+                return jsonify({"error": "Invalid priority"}), 400
+            updates.append("priority = ?")
+            params.append(priority)
+
     if not updates:
         return jsonify({"error": "No updates"}), 400
 
@@ -119,6 +280,8 @@ def update_queue() -> tuple[Any, int]:
             params,
         )
         conn.commit()
+    if "status" in data:
+        notify_queue()
 
     return jsonify({"success": True}), 200
 
@@ -150,6 +313,8 @@ def retry_all_failed():
         )
         count = result.rowcount
         conn.commit()
+    if count:
+        notify_queue()
     return jsonify({"success": True, "count": count}), 200
 
 
@@ -189,79 +354,122 @@ def clear_all():
     return jsonify({"success": True, "count": count}), 200
 
 
-def _enqueue_items(items: list[dict[str, Any]]) -> list[int]:
-    """Add items to the queue and return their IDs."""
-    ids = []
-    with db() as conn:
-        roots = get_media_roots(conn)
-        for item in items:
-            media_type = item.get("media_type", "")
-            if media_type not in MEDIA_TYPES:
-                continue
-
-            path = item.get("path", "")
-            if not path:
-                continue
-
-            root = next((r for r in roots if r["media_type"] == media_type), None)
-            if not root or not root.get("enabled"):
-                continue
-
-            path_obj = Path(path)
-            root_path = Path(root["path"])
-            if '..' in str(path_obj) or not str(path_obj).isprintable():
-                continue
-            if not path_obj.exists() or path_obj.is_symlink():
-                continue
-            try:
-                resolved_path = path_obj.resolve(strict=False)
-                resolved_root = root_path.resolve(strict=False)
-                resolved_path.relative_to(resolved_root)
-            except (ValueError, RuntimeError):
-                continue
+# exiftool/mediainfo are subprocesses; a few in flight hide their startup cost.
+METADATA_WORKERS = 4
 
-            release_name = item.get("release_name") or suggest_release_name(
-                media_type, path_obj
-            )
 
-            if release_name and not validate_release_name(str(release_name)):
-                continue
+def _validate_enqueue_item(item: dict[str, Any], roots: list[dict]) -> dict[str, Any] | None:
+    """Check one /api/queue/add item against the media roots; None if rejected."""
+    media_type = item.get("media_type", "")
+    if media_type not in MEDIA_TYPES:
+        return None
+
+    path = item.get("path", "")
+    if not path:
+        return None
+
+    root = next((r for r in roots if r["media_type"] == media_type), None)
+    if not root or not root.get("enabled"):
+        return None
+
+    path_obj = Path(path)
+    root_path = Path(root["path"])
+    if '..' in str(path_obj) or not str(path_obj).isprintable():
+        return None
+    if not path_obj.exists() or path_obj.is_symlink():
+        return None
+    try:
+        resolved_path = path_obj.resolve(strict=False)
+        resolved_root = root_path.resolve(strict=False)
+        resolved_path.relative_to(resolved_root)
+    except (ValueError, RuntimeError):
+        return None
+
+    release_name = item.get("release_name")
+    if release_name and not validate_release_name(str(release_name)):
+        return None
+
+    try:
+        category = int(item["category"])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    if not validate_category(category, media_type, CATEGORY_OPTIONS):
+        return None
+
+    return {
+        "media_type": media_type,
+        "path": path,
+        "release_name": release_name,
+        "category": category,
+        "tags": sanitize_tags(str(item.get("tags", ""))),
+        "imdb": item.get("imdb"),
+        "tvmazeid": item.get("tvmazeid"),
+        "tvmazetype": item.get("tvmazetype"),
+        "size_bytes": _size_hint(item.get("size_bytes")),
+    }
+
+
+def _size_hint(value: Any) -> int | None:
+    """A client-supplied release size (the browse listing has one), if usable."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return None
+    return size if size >= 0 else None
+
+
+def _apply_metadata(row: dict[str, Any], release_group: str, extract: bool) -> dict[str, Any]:
+    """Fill release name and IDs for a validated item from its metadata."""
+    path_obj = Path(row["path"])
+    media_type = row["media_type"]
+    explicit_name = row["release_name"]
+    if not explicit_name:
+        row["release_name"] = suggest_release_name(media_type, path_obj)
+
+    if extract:
+        meta = extract_metadata(path_obj, media_type)
+        row["imdb"] = row["imdb"] or meta.get("imdb")
+        row["tvmazeid"] = row["tvmazeid"] or meta.get("tvmazeid")
+
+        if not explicit_name and meta:
+            generated = generate_release_name(meta, media_type, release_group)
+            if generated and generated != "unnamed" and "Unknown" not in generated:
+                row["release_name"] = generated
+                if not validate_release_name(str(generated)):
+                    row["release_name"] = suggest_release_name(media_type, path_obj)
+    return row
+
+
+def _enqueue_items(items: list[dict[str, Any]]) -> tuple[list[int], list[str]]:
+    """Add items to the queue.
+
+    Validation and metadata extraction run before any write; paths held by
+    an active queue item are skipped before metadata is read. All rows then
+    go in through one enqueue_items() transaction.
+
+    Returns the IDs of newly queued rows and the valid paths skipped because
+    they are already in the queue.
+    """
+    with db() as conn:
+        roots = get_media_roots(conn)
+        extract = get_bool_setting(conn, "extract_metadata", default=True)
+        release_group = get_setting(conn, "release_group") or "torrup"
+
+        rows = [r for r in (_validate_enqueue_item(i, roots) for i in items) if r]
+        existing = queued_paths(conn, [r["path"] for r in rows])
+        rows = [r for r in rows if r["path"] not in existing]
+
+        if len(rows) > 1 and extract:
+            with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as pool:
+                rows = list(pool.map(lambda r: _apply_metadata(r, release_group, extract), rows))
+        else:
+            rows = [_apply_metadata(r, release_group, extract) for r in rows]
+
+        rows = [r for r in rows if validate_release_name(str(r["release_name"]))]
+        ids = enqueue_items(conn, rows)
+        # Paths lost to INSERT OR IGNORE because another writer queued them
+        # since the check above
+        lost = {r["path"] for r in rows} - paths_for_ids(conn, ids)
+        return ids, sorted(existing | lost)
 
-            try:
-                category = int(item["category"])
-            except (ValueError, TypeError, KeyError):
-                continue
-
-            if not validate_category(category, media_type, CATEGORY_OPTIONS):
-                continue
-
-            tags = sanitize_tags(str(item.get("tags", "")))
-
-            imdb = item.get("imdb")
-            tvmazeid = item.get("tvmazeid")
-            tvmazetype = item.get("tvmazetype")
-
-            if get_setting(conn, "extract_metadata") != "0":
-                meta = extract_metadata(path_obj, media_type)
-                imdb = imdb or meta.get("imdb")
-                tvmazeid = tvmazeid or meta.get("tvmazeid")
-
-                if not item.get("release_name") and meta:
-                    release_group = get_setting(conn, "release_group") or "torrup"
-                    generated = generate_release_name(meta, media_type, release_group)
-                    if generated and generated != "unnamed" and "Unknown" not in generated:
-                        release_name = generated
-                        if not validate_release_name(str(release_name)):
-                            release_name = suggest_release_name(media_type, path_obj)
-
-            now = now_iso()
-            cur = conn.execute(
-                """
-                INSERT INTO queue (media_type, path, release_name, category, tags, imdb, tvmazeid, tvmazetype, status, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)
-                """,
-                (media_type, path, release_name, category, tags, imdb, tvmazeid, tvmazetype, now, now),
-            )
-            ids.append(cur.lastrowid)
-        conn.commit()
-    return ids
@@ -0,0 +1,110 @@
+"""Queue scheduling: which approved item a worker claims next.
+
+Every media type has its own policy (setting ``queue_policy_<media_type>``):
+
+- ``fifo``: oldest first.
+- ``sjf``: shortest job first, by the release size recorded at enqueue.
+- ``deadline``: FIFO while the month is on track for
+  tl_min_uploads_per_month, shortest first while it is behind.
+
+Within a media type, a higher ``queue.priority`` always goes first; the
+policy orders items of equal priority. Across media types the head of each
+type's queue competes on priority, then age, so one slow type cannot starve
+another.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from src.config import MEDIA_TYPES
+from src.db import get_int_setting, get_setting
+from src.utils.activity import calculate_health
+
+QUEUE_POLICIES = {
+    "fifo": "Oldest first",
+    "sjf": "Smallest first",
+    "deadline": "Activity deadline",
+}
+DEFAULT_QUEUE_POLICY = "fifo"
+
+# Items without a recorded size sort after every sized item under sjf.
+_UNKNOWN_SIZE = 2**63 - 1
+
+
+def get_queue_policies(conn: sqlite3.Connection) -> dict[str, str]:
+    """Return {media_type: policy}, falling back to fifo for unknown values."""
+    policies = {}
+    for media_type in MEDIA_TYPES:
+        policy = get_setting(conn, f"queue_policy_{media_type}") or DEFAULT_QUEUE_POLICY
+        policies[media_type] = policy if policy in QUEUE_POLICIES else DEFAULT_QUEUE_POLICY
+    return policies
+
+
+def activity_behind(conn: sqlite3.Connection) -> bool:
+    """Whether uploads so far plus the recent pace fall short of the monthly minimum.
+
+    Queued items are not counted: they only help if they actually upload
+    before the month ends, which is what deadline mode is for.
+    """
+    minimum = get_int_setting(conn, "tl_min_uploads_per_month", 10)
+    if minimum <= 0:
+        return False
+    health = calculate_health(conn)
+    pace = health["pace"] or 0
+    return health["uploads"] + pace * health["days_remaining"] < minimum
+
+
+def _size_first(conn: sqlite3.Connection) -> list[str]:
+    """Media types whose queue is currently ordered smallest first."""
+    policies = get_queue_policies(conn)
+    behind = None
+    types = []
+    for media_type, policy in policies.items():
+        if policy == "deadline":
+            if behind is None:
+                behind = activity_behind(conn)
+            if not behind:
+                continue
+        elif policy != "sjf":
+            continue
+        types.append(media_type)
+    return types
+
+
+def next_item_sql(conn: sqlite3.Connection) -> tuple[str, list]:
+    """SELECT returning the id of the item to claim next, with its parameters."""
+    base = "FROM queue WHERE status = 'queued' AND approval_status = 'approved'"
+    sized = _size_first(conn)
+    if not sized:
+        return f"SELECT id {base} ORDER BY priority DESC, id ASC LIMIT 1", []
+
+    marks = ", ".join("?" * len(sized))
+    size_key = (
+        f"CASE WHEN media_type IN ({marks}) "
+        f"THEN COALESCE(size_bytes, {_UNKNOWN_SIZE}) ELSE 0 END"
+    )
+    sql = f"""
+        SELECT id FROM (
+            SELECT id, priority, ROW_NUMBER() OVER (
+                PARTITION BY media_type ORDER BY priority DESC, {size_key}, id
+            ) AS rank
+            {base}
+        )
+        WHERE rank = 1
+        ORDER BY priority DESC, id ASC
+        LIMIT 1
+    """
+    return sql, list(sized)
+
+
+def schedule_info(conn: sqlite3.Connection) -> dict:
+    """Policies and whether deadline mode is favouring small items (for the UI)."""
+    policies = get_queue_policies(conn)
+    behind = activity_behind(conn) if "deadline" in policies.values() else False
+    return {
+        "policies": policies,
+        "labels": QUEUE_POLICIES,
+        "behind": behind,
+        "smallest_first": _size_first(conn),
+    }
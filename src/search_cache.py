@@ -0,0 +1,170 @@
+"""Persistent cache of TorrentLeech search results.
+
+Library scans search TL for every entry not yet in the queue, on every
+pass. Results are cached in the search_cache table keyed by the
+normalised query (case-folded, whitespace collapsed) and the exact flag,
+so rescanning an unchanged library makes no API calls while the answers
+are fresh.
+
+Matches and misses age differently: a release found on TL stays there, so
+positives live for search_cache_positive_hours (default 30 days), while a
+miss can turn into a match whenever someone else uploads, so negatives
+live for search_cache_negative_hours (default 24). A TTL of 0 disables
+caching of that kind. The pre-upload check in the queue worker always asks
+TL directly.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from src.db import db, get_int_setting
+from src.logger import logger
+from src.utils import now_iso
+
+DEFAULT_POSITIVE_HOURS = 720
+DEFAULT_NEGATIVE_HOURS = 24
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_key(query: str, exact: bool) -> str:
+    """Normalised cache key for a search."""
+    return f"{int(bool(exact))}:{' '.join(query.split()).casefold()}"
+
+
+def _cutoff(hours: int) -> str:
+    return (datetime.utcnow() - timedelta(hours=hours)).isoformat() + "Z"
+
+
+def _ttls(conn: sqlite3.Connection) -> tuple[int, int]:
+    return (
+        get_int_setting(conn, "search_cache_positive_hours", DEFAULT_POSITIVE_HOURS),
+        get_int_setting(conn, "search_cache_negative_hours", DEFAULT_NEGATIVE_HOURS),
+    )
+
+
+def cache_lookup(query: str, exact: bool) -> bool | None:
+    """Return the cached result for a search, or None if absent or expired.
+
+    The cache is best effort: a database error counts as a miss.
+    """
+    try:
+        return _lookup(query, exact)
+    except sqlite3.Error as e:
+        logger.warning(f"Search cache lookup failed: {e}")
+        return None
+
+
+def _lookup(query: str, exact: bool) -> bool | None:
+    with db() as conn:
+        positive, negative = _ttls(conn)
+        if positive <= 0 and negative <= 0:
+            return None
+        # Expired (or disabled) kinds get a cutoff no row can reach
+        never = "9999"
+        row = conn.execute(
+            """
+            UPDATE search_cache SET hits = hits + 1
+            WHERE key = ? AND checked_at >= CASE WHEN found THEN ? ELSE ? END
+            RETURNING found
+            """,
+            (
+                cache_key(query, exact),
+                _cutoff(positive) if positive > 0 else never,
+                _cutoff(negative) if negative > 0 else never,
+            ),
+        ).fetchone()
+        conn.commit()
+    if row is None:
+        _count("misses")
+        return None
+    _count("hits")
+    return bool(row["found"])
+
+
+def cache_store(query: str, exact: bool, found: bool) -> None:
+    """Record a fresh search result (best effort, like cache_lookup)."""
+    try:
+        _store(query, exact, found)
+    except sqlite3.Error as e:
+        logger.warning(f"Search cache store failed: {e}")
+
+
+def _store(query: str, exact: bool, found: bool) -> None:
+    with db() as conn:
+        positive, negative = _ttls(conn)
+        if (positive if found else negative) <= 0:
+            return
+        conn.execute(
+            """
+            INSERT INTO search_cache (key, query, exact, found, checked_at, hits)
+            VALUES (?, ?, ?, ?, ?, 0)
+            ON CONFLICT(key) DO UPDATE SET
+                query = excluded.query, found = excluded.found, checked_at = excluded.checked_at
+            """,
+            (cache_key(query, exact), query, int(bool(exact)), int(found), now_iso()),
+        )
+        conn.commit()
+    _count("stores")
+
+
+def invalidate_search_cache(
+    conn: sqlite3.Connection,
+    query: str | None = None,
+    negative_only: bool = False,
+    expired_only: bool = False,
+) -> int:
+    """Delete cached results and return how many were removed.
+
+    Args:
+        query: Only this search (exact and non-exact); default all
+        negative_only: Only cached misses
+        expired_only: Only entries past their TTL
+    """
+    clauses, params = [], []
+    if query is not None:
+        clauses.append("key IN (?, ?)")
+        params += [cache_key(query, False), cache_key(query, True)]
+    if negative_only:
+        clauses.append("found = 0")
+    if expired_only:
+        positive, negative = _ttls(conn)
+        clauses.append("checked_at < CASE WHEN found THEN ? ELSE ? END")
+        params += [_cutoff(max(positive, 0)), _cutoff(max(negative, 0))]
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    removed = conn.execute(f"DELETE FROM search_cache{where}", params).rowcount
+    conn.commit()
+    return removed
+
+
+def search_cache_counters() -> dict:
+    """This process's hits, misses and hit rate; no query, so cheap enough for /health."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    return stats
+
+
+def search_cache_stats(conn: sqlite3.Connection) -> dict:
+    """Entry counts, lifetime hits and this process's hit rate."""
+    entries, positive, hits = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(found), 0), COALESCE(SUM(hits), 0) FROM search_cache"
+    ).fetchone()
+    stats = search_cache_counters()
+    stats.update({
+        "entries": entries,
+        "positive": positive,
+        "negative": entries - positive,
+        "lifetime_hits": hits,
+    })
+    return stats
@@ -0,0 +1,234 @@
+"""Seeding-compliance tracking for torrup-tagged torrents in qBitTorrent.
+
+TorrentLeech expects each upload to be seeded until it has
+tl_min_seed_copies copies or for tl_min_seed_days, whichever comes first.
+The seeding monitor keeps the seeding table current from qBT's
+/sync/maindata endpoint: after the first (full) answer, every call passes
+the last rid and qBT returns only the torrents and fields that changed
+since, so a library of thousands of seeding torrents costs a few hundred
+bytes per sync instead of a full torrents_info listing.
+
+Only torrents tagged "torrup" (as add_to_qbt() tags them) are kept. A
+torrent removed from qBT stays in the table as "removed" until it meets
+the minimums, so an early removal shows up as flagged. /api/activity
+reads the table and never talks to qBT.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from src.db import db, get_bool_setting, get_int_setting
+from src.logger import logger
+from src.utils import now_iso
+from src.utils.qbittorrent import qbt_session
+
+DEFAULT_SYNC_SECONDS = 60
+# How often a disabled monitor (qbt_enabled=0 or interval 0) looks again
+IDLE_SECONDS = 300
+TAG = "torrup"
+
+# qBT states in which a completed torrent is still being offered to peers
+SEEDING_STATES = frozenset({"uploading", "stalledUP", "forcedUP", "queuedUP", "checkingUP"})
+
+# qBT torrent field -> seeding column
+_FIELDS = {
+    "name": "name",
+    "state": "state",
+    "ratio": "ratio",
+    "seeding_time": "seeding_time",
+    "num_complete": "seeds",
+    "added_on": "added_on",
+}
+
+
+def _tagged(tags: str) -> bool:
+    return TAG in (t.strip() for t in (tags or "").split(","))
+
+
+class SeedingMonitor:
+    """Applies /sync/maindata diffs to the seeding table."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rid = 0
+        self._stats = {"syncs": 0, "full_syncs": 0, "errors": 0, "last_sync": None}
+
+    def sync(self) -> bool:
+        """Fetch the changes since the last sync and store them. False if qBT is unreachable."""
+        with self._lock:
+            try:
+                data = qbt_session().call(lambda client: client.sync_maindata(rid=self.rid))
+            except Exception as e:
+                logger.warning(f"Seeding sync failed: {e}")
+                data = None
+            if data is None:
+                self._stats["errors"] += 1
+                # The next answer we get must be a full one
+                self.rid = 0
+                return False
+            with db() as conn:
+                self.rid = self._apply(conn, data)
+                conn.commit()
+            self._stats["syncs"] += 1
+            self._stats["last_sync"] = now_iso()
+            return True
+
+    def _apply(self, conn: sqlite3.Connection, data) -> int:
+        """Write one maindata answer and return the rid to ask with next."""
+        now = now_iso()
+        torrents = data.get("torrents") or {}
+        full = bool(data.get("full_update"))
+        tracked = {row[0] for row in conn.execute("SELECT hash FROM seeding")}
+        inserts, updates, untag = [], [], []
+        resync = False
+
+        for torrent_hash, changes in torrents.items():
+            if "tags" in changes and not _tagged(changes["tags"]):
+                if torrent_hash in tracked:
+                    untag.append((torrent_hash,))
+                continue
+            if torrent_hash in tracked:
+                updates.append(
+                    (*(changes.get(field) for field in _FIELDS), now, torrent_hash)
+                )
+            elif "tags" in changes:
+                if "name" not in changes:
+                    # Tag added to an existing torrent: the diff holds only the tag
+                    resync = True
+                    continue
+                inserts.append(
+                    (torrent_hash, *(changes.get(field) for field in _FIELDS), now)
+                )
+
+        removed = set(data.get("torrents_removed") or ())
+        if full:
+            self._stats["full_syncs"] += 1
+            removed |= tracked - set(torrents)
+
+        columns = ", ".join(_FIELDS.values())
+        conn.executemany(
+            f"""
+            INSERT OR REPLACE INTO seeding (hash, {columns}, updated_at)
+            VALUES (?, ?, COALESCE(?, 'unknown'), COALESCE(?, 0), COALESCE(?, 0), COALESCE(?, 0), ?, ?)
+            """,
+            inserts,
+        )
+        conn.executemany(
+            "UPDATE seeding SET "
+            + ", ".join(f"{col} = COALESCE(?, {col})" for col in _FIELDS.values())
+            + ", updated_at = ? WHERE hash = ?",
+            updates,
+        )
+        conn.executemany("DELETE FROM seeding WHERE hash = ?", untag)
+        conn.executemany(
+            "UPDATE seeding SET state = 'removed', updated_at = ? WHERE hash = ? AND state != 'removed'",
+            [(now, h) for h in removed & tracked],
+        )
+        if inserts or untag or removed:
+            logger.info(
+                f"Seeding sync: {len(inserts)} new, {len(untag) + len(removed & tracked)} gone, "
+                f"{len(updates)} changed"
+            )
+        return 0 if resync else data.get("rid", 0)
+
+    def stats(self) -> dict:
+        return {**self._stats, "rid": self.rid}
+
+
+_monitor = SeedingMonitor()
+
+
+def seeding_monitor() -> SeedingMonitor:
+    """The process-wide seeding monitor."""
+    return _monitor
+
+
+def seed_minimums(conn: sqlite3.Connection) -> tuple[int, int]:
+    """(tl_min_seed_days, tl_min_seed_copies)."""
+    return (
+        get_int_setting(conn, "tl_min_seed_days", 7),
+        get_int_setting(conn, "tl_min_seed_copies", 10),
+    )
+
+
+def seed_status(row, min_days: int, min_copies: int) -> str:
+    """'met', 'seeding' (on its way) or 'flagged' (below minimums, not seeding)."""
+    if row["seeding_time"] >= min_days * 86400 or row["seeds"] >= min_copies:
+        return "met"
+    if row["state"] in SEEDING_STATES:
+        return "seeding"
+    return "flagged"
+
+
+def prune_seeding(conn: sqlite3.Connection) -> int:
+    """Drop removed torrents that had already met the minimums."""
+    min_days, min_copies = seed_minimums(conn)
+    return conn.execute(
+        "DELETE FROM seeding WHERE state = 'removed' AND (seeding_time >= ? OR seeds >= ?)",
+        (min_days * 86400, min_copies),
+    ).rowcount
+
+
+def seeding_summary(conn: sqlite3.Connection, include_all: bool = False) -> dict:
+    """Compliance counts and the flagged (or, with include_all, every) torrent.
+
+    Reads only the seeding table.
+    """
+    min_days, min_copies = seed_minimums(conn)
+    counts = {"met": 0, "seeding": 0, "flagged": 0}
+    torrents = []
+    for row in conn.execute("SELECT * FROM seeding ORDER BY added_on DESC, hash"):
+        status = seed_status(row, min_days, min_copies)
+        counts[status] += 1
+        if include_all or status == "flagged":
+            torrents.append({
+                "hash": row["hash"],
+                "name": row["name"],
+                "state": row["state"],
+                "ratio": round(row["ratio"], 3),
+                "seed_days": round(row["seeding_time"] / 86400, 2),
+                "seeds": row["seeds"],
+                "status": status,
+                "updated_at": row["updated_at"],
+            })
+    return {
+        "enabled": get_bool_setting(conn, "qbt_enabled"),
+        "min_days": min_days,
+        "min_copies": min_copies,
+        "tracked": sum(counts.values()),
+        **counts,
+        "last_sync": _monitor.stats()["last_sync"],
+        "torrents": torrents,
+    }
+
+
+def seeding_stats() -> dict:
+    """Monitor counters for /health."""
+    return _monitor.stats()
+
+
+def seeding_worker(shutdown_event: "threading.Event | None" = None) -> None:
+    """Sync the seeding table every qbt_sync_interval seconds while qBT is enabled."""
+    if shutdown_event is None:
+        shutdown_event = threading.Event()
+
+    logger.info("Seeding monitor started")
+    while True:
+        wait = IDLE_SECONDS
+        try:
+            with db() as conn:
+                interval = get_int_setting(conn, "qbt_sync_interval", DEFAULT_SYNC_SECONDS)
+                enabled = interval > 0 and get_bool_setting(conn, "qbt_enabled")
+            if enabled:
+                wait = interval
+                if _monitor.sync():
+                    with db() as conn:
+                        prune_seeding(conn)
+                        conn.commit()
+        except Exception as e:
+            logger.error(f"Seeding monitor error: {e}", exc_info=True)
+        if shutdown_event.wait(wait):
+            break
+    logger.info("Seeding monitor stopped")
@@ -10,6 +10,9 @@ from src.utils.core import (
     suggest_release_name,
     validate_path_for_subprocess,
 )
+from src.utils.manifest import (
+    ReleaseManifest,
+)
 from src.utils.media import (
     extract_thumbnail,
 )
@@ -35,6 +38,8 @@ __all__ = [
     "sanitize_release_name",
     "suggest_release_name",
     "validate_path_for_subprocess",
+    # manifest
+    "ReleaseManifest",
     # metadata
     "extract_metadata",
     "extract_thumbnail",
@@ -9,7 +9,7 @@ from datetime import datetime, timedelta, timezone
 
 import httpx
 
-from src.db import get_setting, set_setting
+from src.db import get_bool_setting, get_int_setting, get_setting, set_setting
 from src.logger import logger
 
 
@@ -34,26 +34,40 @@ def days_remaining_in_month() -> int:
     return total_days - now.day + 1
 
 
+UPLOAD_STATUSES = ("success", "duplicate")
+
+
+def count_activity(
+    conn: sqlite3.Connection,
+    period: str,
+    statuses: tuple[str, ...],
+    since: str = "",
+    until: str | None = None,
+) -> int:
+    """Sum activity_counters for statuses over buckets in [since, until].
+
+    period is 'total', 'month' or 'day'; buckets are '' / YYYY-MM / YYYY-MM-DD.
+    """
+    marks = ", ".join("?" * len(statuses))
+    return conn.execute(
+        "SELECT COALESCE(SUM(count), 0) FROM activity_counters "
+        f"WHERE period = ? AND bucket >= ? AND bucket <= ? AND status IN ({marks})",
+        (period, since, since if until is None else until, *statuses),
+    ).fetchone()[0]
+
+
 def calculate_health(conn: sqlite3.Connection) -> dict:
     """Calculate activity health for the current month.
 
     Returns dict with: uploads, queued, minimum, projected, needed,
     critical, enforce, days_remaining, pace.
     """
-    start, end = get_month_bounds()
+    month = datetime.now(timezone.utc).strftime("%Y-%m")
+    uploads = count_activity(conn, "month", UPLOAD_STATUSES, month)
+    queued = count_activity(conn, "total", ("queued",))
 
-    uploads = conn.execute(
-        "SELECT COUNT(*) FROM queue WHERE status IN ('success','duplicate') "
-        "AND created_at >= ? AND created_at < ?",
-        (start, end),
-    ).fetchone()[0]
-
-    queued = conn.execute(
-        "SELECT COUNT(*) FROM queue WHERE status = 'queued'"
-    ).fetchone()[0]
-
-    minimum = int(get_setting(conn, "tl_min_uploads_per_month") or "10")
-    enforce = get_setting(conn, "tl_enforce_activity") == "1"
+    minimum = get_int_setting(conn, "tl_min_uploads_per_month", 10)
+    enforce = get_bool_setting(conn, "tl_enforce_activity")
 
     projected = uploads + queued
     needed = max(0, minimum - projected)
@@ -89,15 +103,11 @@ def get_monthly_history(conn: sqlite3.Connection, months: int = 6) -> list[dict]
         start_month += 12
         start_year -= 1
 
-    start_dt = datetime(start_year, start_month, 1, tzinfo=timezone.utc)
-    start_iso = start_dt.isoformat()
-
     rows = conn.execute(
-        "SELECT strftime('%Y-%m', created_at) AS month, COUNT(*) AS count "
-        "FROM queue WHERE status IN ('success','duplicate') "
-        "AND created_at >= ? "
-        "GROUP BY month ORDER BY month ASC",
-        (start_iso,),
+        "SELECT bucket AS month, SUM(count) AS count FROM activity_counters "
+        "WHERE period = 'month' AND bucket >= ? AND status IN (?, ?) "
+        "GROUP BY bucket",
+        (f"{start_year:04d}-{start_month:02d}", *UPLOAD_STATUSES),
     ).fetchall()
 
     result_map = {r["month"]: r["count"] for r in rows}
@@ -117,18 +127,14 @@ def get_monthly_history(conn: sqlite3.Connection, months: int = 6) -> list[dict]
 
 
 def estimate_pace(conn: sqlite3.Connection) -> float | None:
-    """Estimate uploads per day over the last 7 days.
+    """Estimate uploads per day over the last 7 UTC days, including today.
 
     Returns None if no uploads in that window.
     """
-    now = datetime.now(timezone.utc)
-    week_ago_iso = (now - timedelta(days=7)).isoformat()
+    today = datetime.now(timezone.utc).date()
+    week_start = (today - timedelta(days=6)).isoformat()
 
-    count = conn.execute(
-        "SELECT COUNT(*) FROM queue WHERE status IN ('success','duplicate') "
-        "AND created_at >= ?",
-        (week_ago_iso,),
-    ).fetchone()[0]
+    count = count_activity(conn, "day", UPLOAD_STATUSES, week_start, today.isoformat())
 
     if count == 0:
         return None
@@ -167,11 +173,11 @@ def send_ntfy(url: str, topic: str, title: str, message: str, priority: str = "h
 
 def check_and_notify_critical(conn: sqlite3.Connection, critical: bool) -> None:
     """Send ntfy notification only on False->True transition of critical state."""
-    enabled = get_setting(conn, "ntfy_enabled") == "1"
+    enabled = get_bool_setting(conn, "ntfy_enabled")
     if not enabled:
         return
 
-    last_state = get_setting(conn, "tl_last_critical_state") == "1"
+    last_state = get_bool_setting(conn, "tl_last_critical_state")
 
     if critical and not last_state:
         url = get_setting(conn, "ntfy_url")
@@ -183,4 +189,6 @@ def check_and_notify_critical(conn: sqlite3.Connection, critical: bool) -> None:
             "Projected uploads are below the monthly minimum. Check your queue.",
         )
 
-    set_setting(conn, "tl_last_critical_state", "1" if critical else "0")
+    # Only write on transitions so the settings cache stays warm
+    if critical != last_state:
+        set_setting(conn, "tl_last_critical_state", "1" if critical else "0")
@@ -0,0 +1,112 @@
+"""Bencode encoding/decoding (BEP 3) for .torrent files."""
+
+from __future__ import annotations
+
+import hashlib
+
+
+def bencode(value) -> bytes:
+    """Encode int, str, bytes, list and dict values.
+
+    Dict keys are emitted in sorted raw-byte order, as BEP 3 requires, so
+    equal dicts always produce identical bytes (and info-hashes).
+    """
+    out: list[bytes] = []
+    _encode(value, out)
+    return b"".join(out)
+
+
+def _encode(value, out: list[bytes]) -> None:
+    if isinstance(value, bool):
+        raise TypeError("bencode has no boolean type")
+    if isinstance(value, int):
+        out.append(b"i%de" % value)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(b"%d:" % len(value))
+        out.append(bytes(value))
+    elif isinstance(value, str):
+        _encode(value.encode("utf-8"), out)
+    elif isinstance(value, (list, tuple)):
+        out.append(b"l")
+        for item in value:
+            _encode(item, out)
+        out.append(b"e")
+    elif isinstance(value, dict):
+        out.append(b"d")
+        items = [(k.encode("utf-8") if isinstance(k, str) else k, v) for k, v in value.items()]
+        for key, item in sorted(items):
+            _encode(key, out)
+            _encode(item, out)
+        out.append(b"e")
+    else:
+        raise TypeError(f"Cannot bencode {type(value).__name__}")
+
+
+def bdecode(data: bytes):
+    """Decode bencoded bytes. Strings come back as bytes, dict keys included.
+
+    Raises:
+        ValueError: If data is not valid bencode
+    """
+    try:
+        value, end = _decode(data, 0)
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Invalid bencode: {e}") from e
+    if end != len(data):
+        raise ValueError("Invalid bencode: trailing data")
+    return value
+
+
+def _decode(data: bytes, pos: int):
+    token = data[pos:pos + 1]
+    if token == b"i":
+        end = data.index(b"e", pos)
+        return int(data[pos + 1:end]), end + 1
+    if token == b"l":
+        pos += 1
+        items = []
+        while data[pos:pos + 1] != b"e":
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos + 1
+    if token == b"d":
+        pos += 1
+        result = {}
+        while data[pos:pos + 1] != b"e":
+            key, pos = _decode(data, pos)
+            result[key], pos = _decode(data, pos)
+        return result, pos + 1
+    if token.isdigit():
+        colon = data.index(b":", pos)
+        start = colon + 1
+        end = start + int(data[pos:colon])
+        if end > len(data):
+            raise ValueError("string runs past end of data")
+        return data[start:end], end
+    raise ValueError(f"unexpected byte {token!r} at {pos}")
+
+
+def _raw_info(data: bytes) -> bytes:
+    """Return the exact bytes of the top-level 'info' value."""
+    if data[:1] != b"d":
+        raise ValueError("Invalid torrent: not a dictionary")
+    pos = 1
+    while data[pos:pos + 1] != b"e":
+        key, pos = _decode(data, pos)
+        start = pos
+        _, pos = _decode(data, pos)
+        if key == b"info":
+            return data[start:pos]
+    raise ValueError("Invalid torrent: no info dictionary")
+
+
+def info_hash(torrent: bytes) -> str:
+    """SHA-1 info-hash (hex) of a .torrent file's contents.
+
+    Hashes the info dict bytes exactly as stored, so torrents written by
+    other tools hash correctly even if their encoding is not canonical.
+    """
+    try:
+        return hashlib.sha1(_raw_info(torrent)).hexdigest()
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Invalid torrent: {e}") from e
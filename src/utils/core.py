@@ -6,6 +6,8 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+from src.utils.manifest import ReleaseManifest
+
 
 def now_iso() -> str:
     """Return current UTC time in ISO format."""
@@ -34,15 +36,7 @@ def get_folder_size(path: Path, max_files: int = 50000) -> int:
     Raises:
         ValueError: If directory contains more than max_files
     """
-    total = 0
-    count = 0
-    for f in path.rglob("*"):
-        if f.is_file():
-            count += 1
-            if count > max_files:
-                raise ValueError(f"Directory contains more than {max_files} files")
-            total += f.stat().st_size
-    return total
+    return ReleaseManifest(path, max_files).total_size
 
 
 def sanitize_release_name(name: str) -> str:
@@ -0,0 +1,230 @@
+"""Persistent exiftool processes (-stay_open mode).
+
+Starting exiftool costs 150-300 ms of Perl startup per call. A process
+started with `-stay_open True -@ -` reads one argument per line from stdin
+and runs a command each time it sees `-execute<N>`, printing `{ready<N>}`
+when the output is complete. ExifToolPool keeps a few of these alive so
+metadata reads pay only for the file I/O.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+
+from src.logger import logger
+
+# Matches METADATA_WORKERS in routes_queue so a parallel enqueue never waits.
+EXIFTOOL_POOL_SIZE = 4
+EXIFTOOL_TIMEOUT = 30
+
+
+class ExifToolError(OSError):
+    """The exiftool process died or could not be started."""
+
+
+class ExifToolProcess:
+    """One exiftool -stay_open process. Not thread-safe; use ExifToolPool."""
+
+    def __init__(self, executable: str = "exiftool"):
+        self.executable = executable
+        self._seq = 0
+        try:
+            self.proc = subprocess.Popen(
+                [executable, "-stay_open", "True", "-@", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise ExifToolError(f"Could not start exiftool: {e}") from e
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def execute(self, *args: str, timeout: float = EXIFTOOL_TIMEOUT) -> str:
+        """Run one exiftool command and return its stdout.
+
+        Raises:
+            subprocess.TimeoutExpired: No complete response within timeout
+                (the process is killed; it cannot be reused)
+            ExifToolError: The process exited or the pipe broke
+        """
+        self._seq += 1
+        marker = f"{{ready{self._seq}}}".encode()
+        request = b"".join(os.fsencode(a) + b"\n" for a in args)
+        request += f"-execute{self._seq}\n".encode()
+        try:
+            self.proc.stdin.write(request)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            self.kill()
+            raise ExifToolError(f"exiftool is not running: {e}") from e
+
+        fd = self.proc.stdout.fileno()
+        buf = bytearray()
+        deadline = time.monotonic() + timeout
+        while True:
+            end = buf.find(marker)
+            if end != -1:
+                return buf[:end].decode("utf-8", errors="replace")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                self.kill()
+                raise subprocess.TimeoutExpired(self.executable, timeout)
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self.kill()
+                raise ExifToolError("exiftool exited unexpectedly")
+            buf += chunk
+
+    def close(self, timeout: float = 5) -> None:
+        """Ask exiftool to exit, killing it if it does not."""
+        if self.alive:
+            try:
+                self.proc.stdin.write(b"-stay_open\nFalse\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=timeout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+    def kill(self) -> None:
+        if self.alive:
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+
+
+class ExifToolPool:
+    """Up to `size` exiftool processes shared across threads.
+
+    Processes start on first use and are reused until they crash or time
+    out, after which the next request starts a replacement. A request that
+    finds its process dead (e.g. exiftool crashed on the previous file) is
+    retried once on a fresh process.
+    """
+
+    def __init__(self, size: int = EXIFTOOL_POOL_SIZE, executable: str = "exiftool"):
+        self.size = max(1, size)
+        self.executable = executable
+        self._lock = threading.Lock()
+        self._started = 0
+        self._restarts = 0
+        self._requests = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._pid = os.getpid()
+
+    def _take(self) -> ExifToolProcess:
+        while True:
+            try:
+                proc = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if proc.alive:
+                return proc
+            proc.kill()
+        with self._lock:
+            self._started += 1
+        return ExifToolProcess(self.executable)
+
+    def execute(self, *args: str, timeout: float = EXIFTOOL_TIMEOUT) -> str:
+        """Run one exiftool command on a pooled process and return stdout."""
+        if os.getpid() != self._pid:
+            # Forked (e.g. gunicorn preload): the parent's pipes are not ours
+            self._reset()
+        with self._slots:
+            with self._lock:
+                self._requests += 1
+            for attempt in (1, 2):
+                proc = self._take()
+                try:
+                    out = proc.execute(*args, timeout=timeout)
+                except ExifToolError:
+                    with self._lock:
+                        self._restarts += 1
+                    if attempt == 2:
+                        raise
+                    logger.warning("exiftool process died; retrying on a new one")
+                    continue
+                except BaseException:
+                    proc.kill()
+                    with self._lock:
+                        self._restarts += 1
+                    raise
+                self._idle.put(proc)
+                return out
+
+    def close(self) -> None:
+        """Stop every idle process."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "started": self._started,
+                "restarts": self._restarts,
+                "requests": self._requests,
+            }
+
+
+_pool: ExifToolPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_exiftool_pool() -> ExifToolPool:
+    """Return the process-wide exiftool pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExifToolPool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def exiftool_stats() -> dict:
+    """exiftool pool statistics (exposed on /health)."""
+    if _pool is None:
+        return {"size": EXIFTOOL_POOL_SIZE, "idle": 0, "started": 0, "restarts": 0, "requests": 0}
+    return _pool.stats()
+
+
+def run_exiftool(*args: str, timeout: float = EXIFTOOL_TIMEOUT) -> str:
+    """Run exiftool with args on a persistent process and return stdout.
+
+    Arguments containing a newline cannot be sent over the -@ argument
+    stream, so those fall back to a one-off exiftool process.
+
+    Raises:
+        subprocess.TimeoutExpired: exiftool did not answer within timeout
+        OSError: exiftool could not be run
+    """
+    if any("\n" in a for a in args):
+        return subprocess.run(
+            ["exiftool", *args], capture_output=True, text=True, timeout=timeout
+        ).stdout
+    return get_exiftool_pool().execute(*args, timeout=timeout)
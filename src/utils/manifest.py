@@ -0,0 +1,128 @@
+"""Release manifest: one directory walk shared by every prepare step."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+# Releases with more files than this are refused (see get_folder_size).
+MAX_RELEASE_FILES = 50000
+
+# Higher priority formats first (lower number = preferred).
+AUDIO_PRIORITY = {".flac": 0, ".wav": 1, ".m4a": 2, ".mp3": 3, ".ogg": 4, ".opus": 5}
+
+PRIMARY_EXTENSIONS = {
+    "movies": {".mkv", ".mp4", ".avi", ".m4v"},
+    "tv": {".mkv", ".mp4", ".avi", ".m4v"},
+    "music": set(AUDIO_PRIORITY),
+    "books": {".epub", ".pdf", ".mobi", ".azw3"},
+}
+
+LYRICS_SUFFIXES = (".lrc", ".txt")
+
+_SKIP_SUFFIXES = {".tmp", ".bak"}
+
+
+class ReleaseManifest:
+    """Every file under a release path, stat'ed once with os.scandir.
+
+    Files are listed in the same order Path.rglob("*") yields them (a
+    directory's own files before those of its subdirectories), so "first
+    matching file" lookups give the same answer as the rglob loops this
+    replaces. Symlinked files are followed; symlinked directories are not
+    descended into.
+
+    Raises:
+        ValueError: If the release contains more than max_files files
+    """
+
+    def __init__(self, path: Path, max_files: int = MAX_RELEASE_FILES):
+        self.path = Path(path)
+        self.is_dir = self.path.is_dir()
+        # (path, stat) per regular file, in walk order
+        self.entries: list[tuple[Path, os.stat_result]] = []
+        if self.is_dir:
+            self._walk(self.path, max_files)
+        else:
+            self.entries.append((self.path, self.path.stat()))
+
+        self.files = [p for p, _ in self.entries]
+        self.total_size = sum(st.st_size for _, st in self.entries)
+        self.by_suffix: dict[str, list[Path]] = {}
+        for p in self.files:
+            self.by_suffix.setdefault(p.suffix.lower(), []).append(p)
+
+    def _walk(self, root: Path, max_files: int) -> None:
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(Path(entry.path))
+                            elif entry.is_file():
+                                if len(self.entries) >= max_files:
+                                    raise ValueError(
+                                        f"Directory contains more than {max_files} files"
+                                    )
+                                self.entries.append((Path(entry.path), entry.stat()))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            # Reversed so the first subdirectory is walked next
+            pending.extend(reversed(subdirs))
+
+    @property
+    def file_count(self) -> int:
+        return len(self.entries)
+
+    def first_with_suffix(self, suffixes) -> Path | None:
+        """First file, in walk order, whose lowercased suffix is in suffixes."""
+        for p in self.files:
+            if p.suffix.lower() in suffixes:
+                return p
+        return None
+
+    def primary_file(self, media_type: str) -> Path | None:
+        """File to read metadata and thumbnails from.
+
+        For music, the best format wins (FLAC > WAV > M4A > MP3 > OGG > OPUS);
+        otherwise the first matching file. Hidden and temp files are skipped.
+        """
+        if not self.is_dir:
+            return self.path
+
+        exts = PRIMARY_EXTENSIONS.get(media_type, PRIMARY_EXTENSIONS["movies"])
+        candidates = [
+            p
+            for p in self.files
+            if not p.name.startswith(".")
+            and p.suffix.lower() not in _SKIP_SUFFIXES
+            and p.suffix.lower() in exts
+        ]
+        if not candidates:
+            return None
+        if media_type == "music":
+            # sort() is stable, so ties keep walk order
+            candidates.sort(key=lambda p: AUDIO_PRIORITY.get(p.suffix.lower(), 99))
+        return candidates[0]
+
+    def lyrics_candidates(self) -> list[Path]:
+        """Sidecar .lrc/.txt files that name a lyric or match an audio track."""
+        audio_stems = {
+            p.stem for s in AUDIO_PRIORITY for p in self.by_suffix.get(s, [])
+        }
+        return [
+            p
+            for s in LYRICS_SUFFIXES
+            for p in self.by_suffix.get(s, [])
+            if "lyric" in p.stem.lower() or p.stem in audio_stems
+        ]
+
+    def top_level(self, suffix: str) -> list[Path]:
+        """Files directly under the release directory with this suffix."""
+        return [p for p in self.by_suffix.get(suffix, []) if p.parent == self.path]
@@ -9,16 +9,13 @@ import subprocess
 from pathlib import Path
 
 from src.utils.core import human_size, validate_path_for_subprocess
+from src.utils.manifest import ReleaseManifest
 
 logger = logging.getLogger(__name__)
 
-# Higher priority formats first (lower number = preferred).
-AUDIO_PRIORITY = {".flac": 0, ".wav": 1, ".m4a": 2, ".mp3": 3, ".ogg": 4, ".opus": 5}
-
-_SKIP_SUFFIXES = {".tmp", ".bak"}
-
-
-def _find_primary_file(path: Path, media_type: str) -> Path | None:
+def _find_primary_file(
+    path: Path, media_type: str, manifest: ReleaseManifest | None = None
+) -> Path | None:
     """Find the primary file to extract metadata from.
 
     For music, files are sorted by format quality (FLAC > WAV > M4A > MP3 > OGG > OPUS).
@@ -26,41 +23,7 @@ def _find_primary_file(path: Path, media_type: str) -> Path | None:
     """
     if path.is_file():
         return path
-
-    extensions = {
-        "movies": {".mkv", ".mp4", ".avi", ".m4v"},
-        "tv": {".mkv", ".mp4", ".avi", ".m4v"},
-        "music": set(AUDIO_PRIORITY.keys()),
-        "books": {".epub", ".pdf", ".mobi", ".azw3"},
-    }
-
-    exts = extensions.get(media_type, extensions["movies"])
-
-    if media_type == "music":
-        # Collect all valid audio files, then pick the highest quality format.
-        audio_files = [
-            f
-            for f in path.rglob("*")
-            if f.is_file()
-            and not f.name.startswith(".")
-            and f.suffix.lower() not in _SKIP_SUFFIXES
-            and f.suffix.lower() in exts
-        ]
-        if not audio_files:
-            return None
-        audio_files.sort(key=lambda f: AUDIO_PRIORITY.get(f.suffix.lower(), 99))
-        return audio_files[0]
-
-    # Non-music: return first matching file (skip hidden/temp).
-    for f in path.rglob("*"):
-        if (
-            f.is_file()
-            and not f.name.startswith(".")
-            and f.suffix.lower() not in _SKIP_SUFFIXES
-            and f.suffix.lower() in exts
-        ):
-            return f
-    return None
+    return (manifest or ReleaseManifest(path)).primary_file(media_type)
 
 
 def extract_thumbnail(
@@ -68,12 +31,13 @@ def extract_thumbnail(
     out_dir: Path,
     release_name: str,
     media_type: str = "movies",
+    manifest: ReleaseManifest | None = None,
 ) -> Path | None:
     """Extract thumbnail from video or album art from audio.
 
     Returns path to extracted image or None if extraction failed.
     """
-    target = _find_primary_file(path, media_type)
+    target = _find_primary_file(path, media_type, manifest)
     if not target or not validate_path_for_subprocess(target):
         return None
 
@@ -173,29 +137,17 @@ def _album_art_from_exif(raw: dict) -> dict | None:
     return info or None
 
 
-def _find_local_lyrics(path: Path) -> list[dict]:
+def _find_local_lyrics(path: Path, manifest: ReleaseManifest | None = None) -> list[dict]:
     """Find local lyrics files (.lrc/.txt) alongside audio files."""
     base = path.parent if path.is_file() else path
     if not base.exists():
         return []
-
-    lyrics_files = list(base.rglob("*.lrc")) + list(base.rglob("*.LRC"))
-    lyrics_files += list(base.rglob("*.txt")) + list(base.rglob("*.TXT"))
-
-    # Build a set of audio track stems to avoid unrelated .txt files.
-    audio_stems = set()
-    for f in base.rglob("*"):
-        if f.is_file() and f.suffix.lower() in AUDIO_PRIORITY:
-            audio_stems.add(f.stem)
+    if manifest is None or manifest.path != base:
+        manifest = ReleaseManifest(base)
 
     entries: list[dict] = []
-    for lf in lyrics_files:
-        if not lf.is_file():
-            continue
+    for lf in manifest.lyrics_candidates():
         name = lf.stem
-        # Filter to likely lyrics files.
-        if "lyric" not in name.lower() and name not in audio_stems:
-            continue
         lang = None
         if "." in name:
             base_name, maybe_lang = name.rsplit(".", 1)
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import io
 import json
 import logging
 import re
@@ -11,8 +12,9 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 
 from src.utils.core import human_size, now_iso, validate_path_for_subprocess
+from src.utils.exiftool import run_exiftool
+from src.utils.manifest import AUDIO_PRIORITY, ReleaseManifest
 from src.utils.media import (
-    AUDIO_PRIORITY,
     _album_art_from_exif,
     _audio_props_from_ffprobe,
     _extract_album_art,
@@ -37,8 +39,13 @@ def write_xml_metadata(
     out_dir: Path,
     metadata: dict | None = None,
     thumb_path: Path | None = None,
+    staging=None,
 ) -> Path:
-    """Write XML sidecar file with upload metadata."""
+    """Write XML sidecar file with upload metadata.
+
+    With an item's Staging area (src/artifacts.py) as staging, the XML is
+    staged there and the Artifact returned.
+    """
     xml_path = out_dir / f"{release_name}.xml"
     metadata = metadata or {}
 
@@ -63,42 +70,48 @@ def write_xml_metadata(
                 ET.SubElement(meta_elem, key).text = str(value)
 
     tree = ET.ElementTree(root)
+    if staging is not None:
+        buf = io.BytesIO()
+        tree.write(buf, encoding="utf-8", xml_declaration=True)
+        return staging.put(xml_path.name, buf.getvalue())
     tree.write(xml_path, encoding="utf-8", xml_declaration=True)
     return xml_path
 
 
-def extract_metadata(path: Path, media_type: str = "movies") -> dict:
+def extract_metadata(
+    path: Path, media_type: str = "movies", manifest: ReleaseManifest | None = None
+) -> dict:
     """Extract metadata from files using exiftool and NFO parsing.
 
     Returns dict with standardized keys based on media type:
     - movies/tv: title, year, description, imdb, tvmazeid, tvmazetype
     - music: artist, album, track, year, genre, format, bitrate, channels, source
     - books: title, author, publisher, year
+
+    Pass the item's ReleaseManifest to reuse its directory walk.
     """
     if not shutil.which("exiftool"):
         logger.warning("exiftool not installed -- metadata extraction disabled")
         return {}
 
-    target = _find_primary_file(path, media_type)
+    if manifest is None and path.is_dir():
+        manifest = ReleaseManifest(path)
+    target = _find_primary_file(path, media_type, manifest)
     result = {}
 
     # 1. Try NFO parsing first (often more reliable for IDs)
     if path.is_dir() or path.suffix.lower() == ".nfo":
-        result.update(_extract_ids_from_nfos(path))
+        result.update(_extract_ids_from_nfos(path, manifest))
 
     if not target or not validate_path_for_subprocess(target):
         return result
 
     try:
         # Single exiftool call -- request all fields we need (including audio).
-        exif_result = subprocess.run(
-            ["exiftool", "-json", "-n", str(target)],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        if exif_result.returncode == 0:
-            data = json.loads(exif_result.stdout)
+        # Runs on a persistent -stay_open process, so no per-call Perl startup.
+        stdout = run_exiftool("-json", "-n", str(target), timeout=30)
+        if stdout.strip():
+            data = json.loads(stdout)
             if data:
                 raw = data[0]
                 result.update(_normalize_metadata(raw, media_type))
@@ -114,7 +127,7 @@ def extract_metadata(path: Path, media_type: str = "movies") -> dict:
 
         # Local lyrics lookup (sidecar .lrc/.txt) for music
         if media_type == "music" and path:
-            lyrics = _find_local_lyrics(path)
+            lyrics = _find_local_lyrics(path, manifest)
             if lyrics:
                 result["lyrics"] = lyrics
                 result["lyrics_count"] = len(lyrics)
@@ -216,12 +229,14 @@ def _audio_props_from_exif(raw: dict) -> dict:
     return props
 
 
-def _extract_ids_from_nfos(path: Path) -> dict:
+def _extract_ids_from_nfos(path: Path, manifest: ReleaseManifest | None = None) -> dict:
     """Scan directory for .nfo files and extract IMDB/TVMaze IDs."""
     ids = {}
     nfo_files = []
     if path.is_file() and path.suffix.lower() == ".nfo":
         nfo_files.append(path)
+    elif manifest is not None and manifest.path == path:
+        nfo_files.extend(manifest.top_level(".nfo"))
     elif path.is_dir():
         nfo_files.extend(list(path.glob("*.nfo")) + list(path.glob("*.NFO")))
 
@@ -8,7 +8,8 @@ from pathlib import Path
 
 from src.config import NFO_TEMPLATES
 from src.logger import logger
-from src.utils.core import get_folder_size, human_size, validate_path_for_subprocess
+from src.utils.core import human_size, validate_path_for_subprocess
+from src.utils.manifest import ReleaseManifest
 
 
 def generate_nfo(
@@ -18,22 +19,29 @@ def generate_nfo(
     media_type: str = "movies",
     release_group: str = "torrup",
     metadata: dict | None = None,
+    manifest: ReleaseManifest | None = None,
+    staging=None,
 ) -> Path:
-    """Generate NFO file using template and mediainfo."""
+    """Generate NFO file using template and mediainfo.
+
+    staging, if given, is an item's Staging area (src/artifacts.py); the NFO
+    is staged there instead of written to out_dir and the Artifact returned.
+
+    Raises:
+        ValueError: If directory contains too many files
+    """
     nfo_path = out_dir / f"{release_name}.nfo"
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     metadata = metadata or {}
+    if manifest is None:
+        try:
+            manifest = ReleaseManifest(path)
+        except ValueError as e:
+            raise ValueError(f"Cannot generate NFO: {e}") from e
 
     # Get mediainfo for audio/video files
     media_extensions = {".flac", ".mp3", ".m4a", ".mkv", ".mp4", ".avi", ".m4v"}
-    media_file = None
-    if path.is_file() and path.suffix.lower() in media_extensions:
-        media_file = path
-    else:
-        for f in path.rglob("*"):
-            if f.suffix.lower() in media_extensions:
-                media_file = f
-                break
+    media_file = manifest.first_with_suffix(media_extensions)
 
     mediainfo = ""
     if media_file and validate_path_for_subprocess(media_file):
@@ -58,17 +66,13 @@ def generate_nfo(
             logger.warning("mediainfo binary not found -- container may need rebuild")
             mediainfo = "  MediaInfo not available"
 
-    # Count files and calculate size for books
-    file_count = sum(1 for f in path.rglob("*") if f.is_file()) if path.is_dir() else 1
-    try:
-        size_bytes = get_folder_size(path) if path.is_dir() else path.stat().st_size
-    except ValueError as e:
-        raise ValueError(f"Cannot generate NFO: {e}") from e
+    file_count = manifest.file_count
+    size_bytes = manifest.total_size
 
     # Extract info from release name for template (use metadata if available)
     source = _extract_source(release_name)
     resolution = _extract_resolution(release_name)
-    file_format = _extract_format(release_name, path)
+    file_format = _extract_format(release_name, path, manifest)
 
     # Build metadata section if we have extracted data
     metadata_section = _format_metadata_section(metadata, media_type)
@@ -128,6 +132,8 @@ def generate_nfo(
             f"METADATA\n{'-' * 80}\n{metadata_section}\n{'-' * 80}\n{info_header:^80}"
         )
 
+    if staging is not None:
+        return staging.put(nfo_path.name, nfo_content.encode())
     nfo_path.write_text(nfo_content)
     return nfo_path
 
@@ -313,7 +319,7 @@ def _extract_resolution(name: str) -> str:
     return "Unknown"
 
 
-def _extract_format(name: str, path: Path) -> str:
+def _extract_format(name: str, path: Path, manifest: ReleaseManifest | None = None) -> str:
     """Extract format from release name or file extension."""
     formats = ["FLAC", "MP3", "AAC", "OGG", "EPUB", "PDF", "MOBI", "AZW3", "CBR", "CBZ"]
     name_upper = name.upper()
@@ -327,10 +333,9 @@ def _extract_format(name: str, path: Path) -> str:
             return ext
     # Check first file in directory
     if path.is_dir():
-        for f in path.rglob("*"):
-            if f.is_file():
-                ext = f.suffix.upper().lstrip(".")
-                if ext in ["FLAC", "MP3", "EPUB", "PDF", "MOBI", "CBR", "CBZ"]:
-                    return ext
-                break
+        files = (manifest or ReleaseManifest(path)).files
+        if files:
+            ext = files[0].suffix.upper().lstrip(".")
+            if ext in ["FLAC", "MP3", "EPUB", "PDF", "MOBI", "CBR", "CBZ"]:
+                return ext
     return "Unknown"
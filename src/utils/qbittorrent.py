@@ -1,15 +1,43 @@
-"""qBitTorrent client utility for automated seeding."""
+"""qBitTorrent client utility for automated seeding.
+
+One QbtSession per process holds a logged-in qbittorrentapi.Client. The
+client keeps its requests session (and so its keep-alive connections and
+SID cookie) for as long as the qBT settings stay the same; qbittorrentapi
+itself logs in again when a call gets a 403 because the SID expired. If
+the WebUI restarts or rejects the credentials, QbtSession.call() rebuilds
+the client once and retries.
+
+The queue worker does not add torrents one at a time: it submits them to
+the process-wide SeedBatcher, which sends everything collected within
+SEED_BATCH_SECONDS (or SEED_BATCH_MAX torrents) through add_torrents() as
+one torrents_add request per save path and logs the result of each item.
+"""
 
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
+from typing import Callable, Hashable, Iterable
 from urllib.parse import urlparse
 
 import qbittorrentapi
 
-from src.db import db, get_setting
+from src.artifacts import Artifact
+from src.db import get_setting
 from src.logger import logger
+from src.utils.bencode import info_hash
+
+# Seconds the worker collects finished uploads before sending them to qBT
+SEED_BATCH_SECONDS = 5
+SEED_BATCH_MAX = 20
+
+# Errors after which the cached client is rebuilt and the call retried once
+_RECONNECT_ERRORS = (
+    qbittorrentapi.LoginFailed,
+    qbittorrentapi.Forbidden403Error,
+    qbittorrentapi.APIConnectionError,
+)
 
 
 def _normalize_qbt_url(url: str) -> str | None:
@@ -24,79 +52,292 @@ def _normalize_qbt_url(url: str) -> str | None:
     return url
 
 
-def get_qbt_client():
-    """Get an authenticated qBitTorrent client based on current settings."""
-    with db() as conn:
-        enabled = get_setting(conn, "qbt_enabled") == "1"
+class QbtSession:
+    """Long-lived, logged-in qBT client, rebuilt when the settings change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._key: tuple | None = None
+        self._stats = {"logins": 0, "reused": 0, "reconnects": 0}
+
+    def client(self):
+        """The cached client, logging in first if needed. None if disabled or down."""
+        # Served from the settings cache; no connection needed when warm
+        enabled = get_setting(None, "qbt_enabled") == "1"
         if not enabled:
+            self.reset()
             return None
 
         # Use environment variables as overrides for security
-        url = os.environ.get("QBT_URL") or get_setting(conn, "qbt_url")
-        user = os.environ.get("QBT_USER") or get_setting(conn, "qbt_user")
-        pwd = os.environ.get("QBT_PASS") or get_setting(conn, "qbt_pass")
+        url = os.environ.get("QBT_URL") or get_setting(None, "qbt_url")
+        user = os.environ.get("QBT_USER") or get_setting(None, "qbt_user")
+        pwd = os.environ.get("QBT_PASS") or get_setting(None, "qbt_pass")
 
-    url = _normalize_qbt_url(url)
-    if not url:
-        logger.error("qBT URL is missing or invalid. Set qbt_url or QBT_URL.")
+        url = _normalize_qbt_url(url)
+        if not url:
+            logger.error("qBT URL is missing or invalid. Set qbt_url or QBT_URL.")
+            return None
+
+        key = (url, user, pwd)
+        with self._lock:
+            if self._client is not None and self._key == key:
+                self._stats["reused"] += 1
+                return self._client
+            self._close()
+            try:
+                qbt_client = qbittorrentapi.Client(
+                    host=url,
+                    username=user,
+                    password=pwd,
+                    REQUESTS_ARGS={"timeout": (3.1, 10)},
+                )
+                qbt_client.auth_log_in()
+            except Exception as e:
+                if isinstance(e, qbittorrentapi.LoginFailed):
+                    logger.error("qBT login failed. Check qbt_user/qbt_pass or QBT_USER/QBT_PASS.")
+                else:
+                    logger.error(f"Failed to connect to qBitTorrent: {e}")
+                return None
+            self._client, self._key = qbt_client, key
+            self._stats["logins"] += 1
+            return qbt_client
+
+    def call(self, fn: Callable):
+        """Run fn(client), rebuilding the client and retrying once if qBT dropped us.
+
+        Returns None if qBT is disabled or unreachable.
+        """
+        client = get_qbt_client()
+        if client is None:
+            return None
+        try:
+            return fn(client)
+        except _RECONNECT_ERRORS as e:
+            logger.info(f"qBT session lost ({type(e).__name__}), logging in again")
+            with self._lock:
+                self._stats["reconnects"] += 1
+            self.reset()
+            client = get_qbt_client()
+            if client is None:
+                return None
+            return fn(client)
+
+    def reset(self) -> None:
+        """Drop the cached client; the next call logs in again."""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        # Holds the lock. No auth_log_out(): after a connection error it would
+        # only wait out another timeout. The client closes its HTTP session
+        # when it is garbage collected.
+        self._client = None
+        self._key = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "connected": self._client is not None}
+
+
+_session = QbtSession()
+
+
+def qbt_session() -> QbtSession:
+    """The process-wide qBT session."""
+    return _session
+
+
+def get_qbt_client():
+    """Get an authenticated qBitTorrent client based on current settings.
+
+    The client is cached and shared; do not log it out.
+    """
+    return _session.client()
+
+
+def _torrent_bytes(torrent) -> tuple[str, bytes] | None:
+    """(name, bencoded bytes) of a path, Artifact or bytes; None if the file is missing."""
+    if isinstance(torrent, bytes):
+        return "torrent", torrent
+    if isinstance(torrent, Artifact):
+        return torrent.name, torrent.read_bytes()
+    torrent_path = Path(torrent)
+    if not torrent_path.exists():
+        logger.error(f"Torrent file not found for qBT: {torrent_path}")
         return None
+    with open(torrent_path, "rb") as f:
+        return torrent_path.name, f.read()
+
 
+def _hash_or_none(data: bytes) -> str | None:
     try:
-        qbt_client = qbittorrentapi.Client(
-            host=url,
-            username=user,
-            password=pwd,
-            REQUESTS_ARGS={"timeout": (3.1, 10)},
-        )
-        qbt_client.auth_log_in()
-        return qbt_client
-    except Exception as e:
-        if isinstance(e, getattr(qbittorrentapi, "LoginFailed", Exception)):
-            logger.error("qBT login failed. Check qbt_user/qbt_pass or QBT_USER/QBT_PASS.")
-        else:
-            logger.error(f"Failed to connect to qBitTorrent: {e}")
+        return info_hash(data)
+    except Exception:
         return None
 
 
+def add_torrents(
+    torrents: Iterable[tuple[Hashable, object, str | Path]],
+    category: str | None = None,
+) -> dict[Hashable, bool]:
+    """Add several torrents to qBitTorrent for seeding in as few requests as possible.
+
+    Args:
+        torrents: (key, torrent, save_path) tuples. torrent is a path to a
+            .torrent file, its bencoded bytes, or a staged Artifact;
+            save_path is the path to the actual data.
+        category: Optional qBT category
+
+    Returns:
+        {key: True/False} for every key: whether qBT now has that torrent.
+    """
+    results: dict[Hashable, bool] = {}
+    groups: dict[str, list[tuple[Hashable, str, bytes]]] = {}
+    for key, torrent, save_path in torrents:
+        results[key] = False
+        try:
+            loaded = _torrent_bytes(torrent)
+        except OSError as e:
+            logger.error(f"Could not read torrent for qBT: {e}")
+            continue
+        if loaded is not None:
+            groups.setdefault(str(Path(save_path).parent), []).append((key, *loaded))
+
+    for save_dir, group in groups.items():
+        # torrents_add is one multipart request; file names must be unique
+        files = {f"{i}-{name}": data for i, (_, name, data) in enumerate(group)}
+
+        def send(client, files=files, save_dir=save_dir, group=group):
+            res = client.torrents_add(
+                torrent_files=files,
+                save_path=save_dir,
+                category=category,
+                tags="torrup",
+                is_paused=False,
+                use_auto_torrent_management=False,
+            )
+            if len(group) == 1:
+                return {group[0][0]: res == "Ok."}
+            # qBT answers "Ok." if any torrent was added, so ask which are there
+            hashes = {key: _hash_or_none(data) for key, _, data in group}
+            known = {
+                t.hash.lower()
+                for t in client.torrents_info(
+                    torrent_hashes="|".join(h for h in hashes.values() if h)
+                )
+            }
+            return {key: h is not None and h in known for key, h in hashes.items()}
+
+        try:
+            added = _session.call(send)
+        except Exception as e:
+            logger.error(f"Error adding to qBitTorrent: {e}")
+            continue
+        if added is None:
+            continue
+        results.update(added)
+        ok = sum(added.values())
+        if ok == len(group):
+            logger.info(f"Added {ok} torrent(s) to qBitTorrent in {save_dir}")
+        else:
+            logger.warning(f"qBitTorrent accepted {ok} of {len(group)} torrent(s) in {save_dir}")
+    return results
+
+
 def add_to_qbt(
-    torrent_path: str | Path, save_path: str | Path, category: str | None = None
+    torrent_path, save_path: str | Path, category: str | None = None
 ) -> bool:
     """Add a torrent to qBitTorrent for seeding.
 
     Args:
-        torrent_path: Path to the .torrent file
+        torrent_path: Path to the .torrent file, its bencoded bytes, or an
+            Artifact staged by the queue worker (src/artifacts.py)
         save_path: Path to the actual data (must match what qBT expects)
         category: Optional qBT category
 
     Returns:
         True if added successfully, False otherwise.
     """
-    client = get_qbt_client()
-    if not client:
-        return False
+    return add_torrents([(0, torrent_path, save_path)], category=category)[0]
+
+
+class SeedBatcher:
+    """Collects torrents to seed and sends them to qBT in batches.
+
+    A batch goes out SEED_BATCH_SECONDS after its first torrent, as soon as
+    it holds SEED_BATCH_MAX torrents, or on flush(). The result of each
+    torrent is logged against its key (the queue item id).
+    """
+
+    def __init__(
+        self,
+        delay: float = SEED_BATCH_SECONDS,
+        max_size: int = SEED_BATCH_MAX,
+        add: Callable = add_torrents,
+    ):
+        self.delay = delay
+        self.max_size = max_size
+        self._add = add
+        self._lock = threading.Lock()
+        self._pending: list[tuple[Hashable, bytes, str]] = []
+        self._timer: threading.Timer | None = None
+
+    def submit(self, key: Hashable, torrent, save_path: str | Path) -> None:
+        """Queue a torrent (path, bytes or Artifact) for the next batch."""
+        # Read it now: the worker drops the staged artifact right after
+        loaded = _torrent_bytes(torrent)
+        if loaded is None:
+            logger.warning(f"Item {key}: Nothing to seed in qBitTorrent")
+            return
+        with self._lock:
+            self._pending.append((key, loaded[1], str(save_path)))
+            if len(self._pending) < self.max_size:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            batch = self._take()
+        self._send(batch)
+
+    def flush(self) -> None:
+        """Send whatever is pending now."""
+        with self._lock:
+            batch = self._take()
+        self._send(batch)
+
+    def _take(self) -> list:
+        # Holds the lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _send(self, batch: list) -> None:
+        if not batch:
+            return
+        try:
+            results = self._add(batch)
+        except Exception as e:
+            logger.error(f"Error adding to qBitTorrent: {e}")
+            results = {}
+        for key, _, _ in batch:
+            if results.get(key):
+                logger.info(f"Item {key}: Seeding in qBitTorrent")
+            else:
+                logger.warning(f"Item {key}: qBitTorrent did not accept the torrent")
+
+
+_seeder = SeedBatcher()
+
+
+def seed_batcher() -> SeedBatcher:
+    """The process-wide batcher used by the queue worker."""
+    return _seeder
 
-    try:
-        torrent_path = Path(torrent_path)
-        if not torrent_path.exists():
-            logger.error(f"Torrent file not found for qBT: {torrent_path}")
-            return False
-
-        res = client.torrents_add(
-            torrent_files=open(torrent_path, "rb"),
-            save_path=str(Path(save_path).parent),
-            category=category,
-            tags="torrup",
-            is_paused=False,
-            use_auto_torrent_management=False,
-        )
-
-        if res == "Ok.":
-            logger.info(f"Successfully added to qBitTorrent: {torrent_path.name}")
-            return True
-        else:
-            logger.warning(f"qBitTorrent add returned: {res}")
-            return False
 
-    except Exception as e:
-        logger.error(f"Error adding to qBitTorrent: {e}")
-        return False
+def qbt_stats() -> dict:
+    """Session counters for /health."""
+    return _session.stats()
@@ -0,0 +1,55 @@
+"""Run a small dependency graph of steps on a thread pool."""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable
+
+# name -> (names of steps it needs, function called with their results as kwargs)
+Steps = dict[str, tuple[tuple[str, ...], Callable[..., Any]]]
+
+
+def run_steps(steps: Steps, executor: Executor) -> dict[str, Any]:
+    """Run every step once its dependencies have finished; return all results.
+
+    Scheduling happens on the calling thread and steps never wait on each
+    other inside the pool, so a pool shared by several callers cannot
+    deadlock. If a step raises, steps not yet started are skipped, running
+    ones are allowed to finish, and the first exception is re-raised.
+
+    Raises:
+        ValueError: If a dependency is unknown or the graph has a cycle
+    """
+    for name, (deps, _) in steps.items():
+        missing = [d for d in deps if d not in steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown step(s): {', '.join(missing)}")
+
+    results: dict[str, Any] = {}
+    running: dict[Future, str] = {}
+    pending = dict(steps)
+    error: BaseException | None = None
+
+    while pending or running:
+        if error is None:
+            for name, (deps, fn) in list(pending.items()):
+                if all(d in results for d in deps):
+                    kwargs = {d: results[d] for d in deps}
+                    running[executor.submit(fn, **kwargs)] = name
+                    del pending[name]
+        if not running:
+            if pending and error is None:
+                raise ValueError(f"Dependency cycle among steps: {', '.join(pending)}")
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            exc = future.exception()
+            if exc is not None:
+                error = error or exc
+            else:
+                results[name] = future.result()
+
+    if error is not None:
+        raise error
+    return results
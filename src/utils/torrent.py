@@ -1,13 +1,27 @@
-"""Torrent creation utilities."""
+"""Torrent creation: bencoded info dict and parallel SHA-1 piece hashing."""
 
 from __future__ import annotations
 
-import subprocess
+import bisect
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
-from src.config import ANNOUNCE_KEY
+from src.config import ANNOUNCE_KEY, APP_NAME, APP_VERSION
 from src.trackers import torrentleech as tl
-from src.utils.core import get_folder_size, validate_path_for_subprocess
+from src.utils.bencode import bencode
+from src.utils.core import validate_path_for_subprocess
+from src.utils.manifest import ReleaseManifest
+
+# Threads hashing pieces for one torrent. hashlib and unbuffered reads
+# release the GIL, so these run on separate cores.
+HASH_WORKERS = min(4, os.cpu_count() or 1)
+# Bytes read and hashed per task (rounded to whole pieces); bounds memory
+# to about HASH_WORKERS * HASH_SPAN_BYTES.
+HASH_SPAN_BYTES = 16 * 1024 * 1024
 
 
 def pick_piece_size(total_bytes: int) -> int:
@@ -36,52 +50,201 @@ def pick_piece_size(total_bytes: int) -> int:
     return 24  # 16MB
 
 
-def create_torrent(path: Path, release_name: str, out_dir: Path) -> Path:
-    """Create torrent file using mktorrent.
+def torrent_files(manifest: ReleaseManifest) -> list[tuple[Path, int, list[str]]]:
+    """(path, size, relative path components) per file, in torrent order.
+
+    mktorrent sorts files by their full path with strcmp(); sorting the
+    relative paths as bytes gives the same order and so the same pieces.
+    """
+    root = manifest.path
+    files = [
+        (p, st.st_size, list(p.relative_to(root).parts) if manifest.is_dir else [p.name])
+        for p, st in manifest.entries
+    ]
+    files.sort(key=lambda f: os.fsencode("/".join(f[2])))
+    return files
+
+
+def _hash_span(
+    files: list[tuple[Path, int, list[str]]],
+    offsets: list[int],
+    start: int,
+    length: int,
+    piece_length: int,
+) -> bytes:
+    """SHA-1 every piece in bytes [start, start + length) of the torrent data."""
+    buf = bytearray(length)
+    view = memoryview(buf)
+    filled = 0
+    i = bisect.bisect_right(offsets, start) - 1
+    while filled < length:
+        path, size, _ = files[i]
+        file_pos = start + filled - offsets[i]
+        want = min(size - file_pos, length - filled)
+        if want > 0:
+            with open(path, "rb", buffering=0) as f:
+                f.seek(file_pos)
+                while want > 0:
+                    n = f.readinto(view[filled:filled + want])
+                    if not n:
+                        raise ValueError(f"File changed while hashing: {path.name}")
+                    filled += n
+                    want -= n
+        i += 1
+    return b"".join(
+        hashlib.sha1(view[pos:pos + piece_length]).digest()
+        for pos in range(0, length, piece_length)
+    )
+
+
+def hash_pieces(
+    files: list[tuple[Path, int, list[str]]],
+    piece_length: int,
+    workers: int = HASH_WORKERS,
+    progress: Callable[[int, int], None] | None = None,
+) -> bytes:
+    """Concatenated SHA-1 piece hashes of files laid end to end.
+
+    The data is cut into spans of whole pieces (about HASH_SPAN_BYTES each)
+    hashed on a thread pool. Unbuffered readinto() and hashlib both release
+    the GIL, so threads scale with cores. progress(done, total) is called
+    from the calling thread as spans complete, in order.
+    """
+    offsets = []
+    total = 0
+    for _, size, _ in files:
+        offsets.append(total)
+        total += size
+    if total == 0:
+        return b""
+
+    span = max(1, HASH_SPAN_BYTES // piece_length) * piece_length
+    starts = range(0, total, span)
+    hashes = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = pool.map(
+            lambda s: _hash_span(files, offsets, s, min(span, total - s), piece_length),
+            starts,
+        )
+        for start, digest in zip(starts, results):
+            hashes.append(digest)
+            if progress:
+                progress(min(start + span, total), total)
+    return b"".join(hashes)
+
+
+def piece_cache_key(
+    manifest: ReleaseManifest,
+    files: list[tuple[Path, int, list[str]]],
+    piece_length: int,
+) -> str:
+    """Identity of the torrent data: piece length plus, per file in torrent
+    order, relative path, device, inode, size and mtime_ns.
+    """
+    stats = dict(manifest.entries)
+    h = hashlib.sha1(b"%d\n" % piece_length)
+    for path, _, parts in files:
+        st = stats[path]
+        h.update(os.fsencode("/".join(parts)) + b"\0")
+        h.update(b"%d:%d:%d:%d\n" % (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns))
+    return h.hexdigest()
+
+
+def build_torrent(
+    manifest: ReleaseManifest,
+    piece_length: int,
+    announce: str,
+    source: str = "",
+    workers: int = HASH_WORKERS,
+    progress: Callable[[int, int], None] | None = None,
+    cache=None,
+) -> dict:
+    """Build a private torrent dict laid out the way mktorrent -p writes it.
+
+    cache, if given, is a PieceHashCache (src/piece_cache.py); on a hit for
+    piece_cache_key() no file data is read.
+    """
+    files = torrent_files(manifest)
+    pieces = None
+    if cache is not None:
+        key = piece_cache_key(manifest, files, piece_length)
+        pieces = cache.get(key)
+        expected = -(-manifest.total_size // piece_length) * 20
+        if pieces is not None and len(pieces) != expected:
+            pieces = None
+    if pieces is None:
+        pieces = hash_pieces(files, piece_length, workers, progress)
+        if cache is not None:
+            cache.put(key, pieces, piece_length, manifest.total_size)
+    info: dict = {
+        "name": manifest.path.name,
+        "piece length": piece_length,
+        "pieces": pieces,
+        "private": 1,
+    }
+    if manifest.is_dir:
+        info["files"] = [{"length": size, "path": parts} for _, size, parts in files]
+    else:
+        info["length"] = files[0][1]
+    if source:
+        info["source"] = source
+    return {
+        "announce": announce,
+        "created by": f"{APP_NAME} {APP_VERSION}",
+        "creation date": int(time.time()),
+        "info": info,
+    }
+
+
+def create_torrent(
+    path: Path,
+    release_name: str,
+    out_dir: Path,
+    manifest: ReleaseManifest | None = None,
+    progress: Callable[[int, int], None] | None = None,
+    cache=None,
+    staging=None,
+) -> Path:
+    """Create a private .torrent for path (in-process, no mktorrent).
+
+    Pass a PieceHashCache as cache to skip hashing unchanged files, and an
+    item's Staging area (src/artifacts.py) as staging to get an Artifact
+    instead of a file in out_dir.
 
     Raises:
-        ValueError: If directory contains too many files
+        ValueError: If directory contains too many files, is empty, or a
+            file changes while it is being hashed
     """
     output_path = out_dir / f"{release_name}.torrent"
-    try:
-        total_size = get_folder_size(path) if path.is_dir() else path.stat().st_size
-    except ValueError as e:
-        raise ValueError(f"Cannot create torrent: {e}") from e
-    piece_size = pick_piece_size(total_size)
-    
+    if manifest is None:
+        try:
+            manifest = ReleaseManifest(path)
+        except ValueError as e:
+            raise ValueError(f"Cannot create torrent: {e}") from e
+    piece_size = pick_piece_size(manifest.total_size)
+
     announce_url = tl.get_announce_url(ANNOUNCE_KEY)
 
-    # Validate paths before subprocess call
     if not validate_path_for_subprocess(path):
         raise ValueError(f"Invalid path for torrent creation: {path}")
     if not validate_path_for_subprocess(output_path):
         raise ValueError(f"Invalid output path for torrent creation: {output_path}")
-
-    cmd = [
-        "mktorrent",
-        "-p",
-        "-l",
-        str(piece_size),
-        "-a",
-        announce_url,
-        "-s",
-        tl.SOURCE_TAG,
-        "-o",
-        str(output_path),
-        str(path),
-    ]
+    if not manifest.files:
+        raise ValueError(f"Cannot create torrent: no files in {path.name}")
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        if result.returncode != 0:
-            raise Exception(f"mktorrent failed: {result.stderr}")
-    except subprocess.TimeoutExpired:
-        raise Exception("mktorrent timed out after 120 seconds")
-    except FileNotFoundError:
-        raise Exception(
-            "mktorrent not found -- container may need rebuild"
+        torrent = build_torrent(
+            manifest, 1 << piece_size, announce_url, tl.SOURCE_TAG,
+            progress=progress, cache=cache,
         )
-    except subprocess.SubprocessError as e:
-        raise Exception(f"mktorrent subprocess error: {e}")
+    except OSError as e:
+        raise ValueError(f"Cannot create torrent: {e}") from e
+
+    if staging is not None:
+        return staging.put(output_path.name, bencode(torrent))
 
+    # Write then rename so a crash never leaves a truncated .torrent behind
+    tmp_path = output_path.with_suffix(".torrent.tmp")
+    tmp_path.write_bytes(bencode(torrent))
+    os.replace(tmp_path, output_path)
     return output_path
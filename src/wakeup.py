@@ -0,0 +1,174 @@
+"""Wake idle queue workers as soon as something becomes claimable.
+
+Threads in the same process wait on a condition. Each waiting process also
+binds a UNIX datagram socket in ``<db path>-wake/``; notify() sends one byte
+to every socket there, so ``torrup queue add`` in a shell wakes the web
+app's worker (and vice versa) within milliseconds. Sockets left behind by
+dead processes are removed by the next sender. Where UNIX sockets are not
+available, waiters fall back to polling every FALLBACK_POLL_SECONDS.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import socket
+import threading
+from pathlib import Path
+
+from src import config
+from src.logger import logger
+
+# Poll interval for waiters when no wake socket could be bound.
+FALLBACK_POLL_SECONDS = 2
+# sun_path is 108 bytes on Linux, 104 on macOS.
+MAX_SOCKET_PATH = 100
+
+
+class QueueWakeup:
+    """Generation counter that waiters block on until it changes.
+
+    Read generation() before looking for work, then wait(since=...) if none
+    was found: a notify() that lands in between is never lost.
+    """
+
+    def __init__(self, wake_dir: Path):
+        self.wake_dir = Path(wake_dir)
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._sock_path: Path | None = None
+        self._pid: int | None = None
+        self._sent = 0
+        self._received = 0
+
+    def generation(self) -> int:
+        with self._cond:
+            return self._generation
+
+    def wake_local(self) -> None:
+        """Wake every waiter in this process."""
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def notify(self) -> None:
+        """Wake waiters in this process and in every other listening process."""
+        self.wake_local()
+        self._broadcast()
+
+    def wait(self, since: int, timeout: float | None = None) -> bool:
+        """Block until the generation moves past since, or timeout.
+
+        Returns:
+            True if woken, False on timeout
+        """
+        if not self.listen() and (timeout is None or timeout > FALLBACK_POLL_SECONDS):
+            timeout = FALLBACK_POLL_SECONDS
+        with self._cond:
+            return self._cond.wait_for(lambda: self._generation != since, timeout)
+
+    def listen(self) -> bool:
+        """Bind this process's wake socket if needed. False if unavailable."""
+        with self._lock:
+            if self._pid == os.getpid():
+                return self._sock is not None
+            # First call, or first call after fork: the parent's socket is not ours
+            self._pid = os.getpid()
+            self._sock = None
+            if not hasattr(socket, "AF_UNIX"):
+                return False
+            path = self.wake_dir / f"{os.getpid()}-{id(self):x}.sock"
+            if len(os.fsencode(path)) > MAX_SOCKET_PATH:
+                logger.warning(f"Wake socket path too long, polling instead: {path}")
+                return False
+            try:
+                self.wake_dir.mkdir(mode=0o700, exist_ok=True)
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                path.unlink(missing_ok=True)
+                sock.bind(str(path))
+            except OSError as e:
+                logger.warning(f"Could not bind wake socket, polling instead: {e}")
+                return False
+            self._sock, self._sock_path = sock, path
+            threading.Thread(
+                target=self._receive, args=(sock,), name="queue-wakeup", daemon=True
+            ).start()
+            return True
+
+    def _receive(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                if not sock.recv(64):
+                    return  # Shut down by close()
+            except OSError:
+                return
+            self._received += 1
+            self.wake_local()
+
+    def _broadcast(self) -> None:
+        try:
+            entries = [e for e in os.scandir(self.wake_dir) if e.name.endswith(".sock")]
+        except OSError:
+            return
+        own = str(self._sock_path) if self._sock_path else None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for entry in entries:
+                if entry.path == own:
+                    continue
+                try:
+                    sender.sendto(b"\x01", entry.path)
+                    self._sent += 1
+                except BlockingIOError:
+                    pass  # Receiver already has wakeups pending
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Nobody bound: left behind by a process that died
+                    Path(entry.path).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.debug(f"Wake socket {entry.name}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            sock, path = self._sock, self._sock_path
+            self._sock = self._sock_path = None
+            self._pid = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._sock is not None,
+            "generation": self.generation(),
+            "sent": self._sent,
+            "received": self._received,
+        }
+
+
+_wakeup: QueueWakeup | None = None
+_wakeup_lock = threading.Lock()
+
+
+def get_queue_wakeup() -> QueueWakeup:
+    """Return the wakeup for the current DB_PATH."""
+    global _wakeup
+    wake_dir = Path(f"{config.DB_PATH}-wake")
+    with _wakeup_lock:
+        if _wakeup is None or _wakeup.wake_dir != wake_dir:
+            if _wakeup is not None:
+                _wakeup.close()
+            _wakeup = QueueWakeup(wake_dir)
+            atexit.register(_wakeup.close)
+        return _wakeup
+
+
+def notify_queue() -> None:
+    """Wake queue workers everywhere; call after committing claimable items."""
+    get_queue_wakeup().notify()
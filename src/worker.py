@@ -2,27 +2,50 @@
 
 from __future__ import annotations
 
+import os
 import re
+import socket
 import sqlite3
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-from src.api import check_exists, download_torrent, upload_torrent
-from src.db import db, get_output_dir, get_setting
+from src.api import AUTH, CircuitOpenError, TrackerError, check_exists, close_client, fetch_torrent, upload_torrent
+from src.artifacts import Artifact, open_staging
+from src.checkpoints import Checkpoints, clear_checkpoints, fingerprint, release_fingerprint
+from src.config import ANNOUNCE_KEY
+from src.db import db, get_bool_setting, get_output_dir, get_setting
 from src.logger import logger
+from src.piece_cache import PieceHashCache
+from src.scheduler import next_item_sql
 from src.utils import (
     create_torrent,
     extract_metadata,
     extract_thumbnail,
+    ReleaseManifest,
     generate_nfo,
-    get_folder_size,
     human_size,
     now_iso,
     sanitize_release_name,
     write_xml_metadata,
 )
-from src.utils.qbittorrent import add_to_qbt
+from src.utils.qbittorrent import seed_batcher
+from src.utils.steps import run_steps
+
+
+def _tracker_unavailable(error: TrackerError) -> bool:
+    """Whether a tracker error is an outage worth requeueing the item for.
+
+    A refused request (rejected 4xx, or a bad announce key) fails the item
+    instead: retrying would only loop it through claim, dupe check and
+    upload forever.
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    return error.kind in TrackerError.OUTAGE and error.kind != AUTH
 
 
 def sanitize_error_message(error: Exception) -> str:
@@ -38,34 +61,297 @@ def sanitize_error_message(error: Exception) -> str:
     return msg
 
 
+# A claimed item is leased to one worker. The holder renews the lease every
+# LEASE_HEARTBEAT_SECONDS; if it dies, any worker may reclaim the item once
+# LEASE_SECONDS pass without a heartbeat.
+LEASE_SECONDS = 120
+LEASE_HEARTBEAT_SECONDS = 30
+ACTIVE_STATUSES = ("preparing", "uploading")
+# Minimum seconds between "Hashing pieces N%" status updates.
+HASH_PROGRESS_SECONDS = 5
+# Threads per prepare worker for one item's independent steps (metadata,
+# thumbnail and torrent hashing run side by side). Each UploadPipeline
+# prepare thread has a pool of its own, so raising worker_prepare_concurrency
+# is not capped by a shared pool; the shared one serves process_queue_item().
+PREPARE_STEP_WORKERS = 3
+
+_step_executor: ThreadPoolExecutor | None = None
+_step_executor_lock = threading.Lock()
+
+
+def step_pool(name: str = "prepare-step") -> ThreadPoolExecutor:
+    """A new executor for one prepare worker's steps."""
+    return ThreadPoolExecutor(max_workers=PREPARE_STEP_WORKERS, thread_name_prefix=name)
+
+
+def _step_pool() -> ThreadPoolExecutor:
+    """Return the process-wide executor for prepare steps."""
+    global _step_executor
+    if _step_executor is None:
+        with _step_executor_lock:
+            if _step_executor is None:
+                _step_executor = step_pool()
+    return _step_executor
+
+
+def _lease_time(offset_seconds: float = 0) -> str:
+    """UTC timestamp with fixed-width microseconds, so strings sort by time."""
+    dt = datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def make_worker_id() -> str:
+    """Identify this worker thread across processes and hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def reclaim_expired_leases(conn: sqlite3.Connection) -> int:
+    """Put items whose worker stopped heartbeating back in the queue."""
+    cur = conn.execute(
+        """
+        UPDATE queue
+        SET status = 'queued', message = 'Requeued: worker lease expired',
+            worker_id = NULL, lease_expires_at = NULL, updated_at = ?
+        WHERE status IN ('preparing', 'uploading') AND lease_expires_at < ?
+        """,
+        (now_iso(), _lease_time()),
+    )
+    conn.commit()
+    if cur.rowcount:
+        logger.warning(f"Reclaimed {cur.rowcount} queue item(s) with expired leases")
+    return cur.rowcount
+
+
+def seconds_until_lease_expiry(conn: sqlite3.Connection) -> float | None:
+    """Seconds until the earliest in-flight lease can be reclaimed, or None."""
+    row = conn.execute(
+        "SELECT MIN(lease_expires_at) FROM queue "
+        "WHERE status IN ('preparing', 'uploading') AND lease_expires_at IS NOT NULL"
+    ).fetchone()
+    if not row or not row[0]:
+        return None
+    expires = datetime.strptime(row[0], "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+    return max(0.0, (expires - datetime.now(timezone.utc)).total_seconds())
+
+
+def claim_next_item(
+    conn: sqlite3.Connection, worker_id: str, lease_seconds: int = LEASE_SECONDS
+) -> sqlite3.Row | None:
+    """Atomically claim the next approved queued item for worker_id.
+
+    Which item is next is up to the scheduler (priority, then each media
+    type's policy). The single UPDATE ... RETURNING moves the row to
+    'preparing' under the write lock, so concurrent workers in any process
+    never get the same item.
+    """
+    reclaim_expired_leases(conn)
+    next_sql, next_params = next_item_sql(conn)
+    row = conn.execute(
+        f"""
+        UPDATE queue
+        SET status = 'preparing', message = 'Claimed by worker',
+            worker_id = ?, lease_expires_at = ?, updated_at = ?
+        WHERE id = ({next_sql})
+        RETURNING *
+        """,
+        (worker_id, _lease_time(lease_seconds), now_iso(), *next_params),
+    ).fetchone()
+    conn.commit()
+    return row
+
+
+class LeaseHeartbeat:
+    """Context manager that renews an item's lease from a background thread.
+
+    lost is set once a renewal finds the item no longer leased to worker_id
+    (it expired and another worker reclaimed it); the holder must then stop
+    working on the item.
+    """
+
+    def __init__(
+        self,
+        item_id: int,
+        worker_id: str,
+        lease_seconds: int = LEASE_SECONDS,
+        interval: float = LEASE_HEARTBEAT_SECONDS,
+    ):
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self._stop = threading.Event()
+        self.lost = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{item_id}", daemon=True
+        )
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def renew(self) -> bool:
+        """Extend the lease. False if another worker reclaimed the item."""
+        with db() as conn:
+            cur = conn.execute(
+                "UPDATE queue SET lease_expires_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status IN ('preparing', 'uploading')",
+                (_lease_time(self.lease_seconds), self.item_id, self.worker_id),
+            )
+            return cur.rowcount == 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.renew():
+                    self.lost.set()
+                    logger.warning(f"Item {self.item_id}: Lease no longer held, heartbeat stopped")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Item {self.item_id}: Lease heartbeat failed - {e}")
+
+
 def update_queue_status(
-    conn: sqlite3.Connection, item_id: int, status: str, message: str = ""
+    conn: sqlite3.Connection,
+    item_id: int,
+    status: str,
+    message: str = "",
+    worker_id: str | None = None,
+) -> bool:
+    """Update queue item status and message, committing immediately.
+
+    Every status transition is its own short transaction so the SQLite write
+    lock is never held while the pipeline runs exiftool, ffmpeg, mediainfo,
+    mktorrent or network calls. Leaving the active statuses releases the lease.
+
+    A worker holding a lease passes its worker_id: the write then only lands
+    while the item is still leased to it, so a worker whose lease expired
+    cannot overwrite the status set by the worker that reclaimed the item.
+    Returns whether the row was updated.
+    """
+    active = status in ACTIVE_STATUSES
+    cur = conn.execute(
+        """
+        UPDATE queue SET status = ?, message = ?, updated_at = ?,
+            worker_id = CASE WHEN ? THEN worker_id END,
+            lease_expires_at = CASE WHEN ? THEN lease_expires_at END
+        WHERE id = ? AND (? IS NULL OR worker_id = ?)
+        """,
+        (status, message, now_iso(), active, active, item_id, worker_id, worker_id),
+    )
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def _disk_path(artifact: Path | Artifact | None) -> str | None:
+    """Where an artifact is on disk; None if it only exists in memory."""
+    if isinstance(artifact, Artifact):
+        return str(artifact.path) if artifact.path else None
+    return str(artifact) if artifact else None
+
+
+def _record_artifacts(
+    conn: sqlite3.Connection,
+    item_id: int,
+    torrent_path: Path | Artifact,
+    nfo_path: Path | Artifact,
+    xml_path: Path | Artifact,
+    thumb_path: Path | Artifact | None,
 ) -> None:
-    """Update queue item status and message."""
+    """Store the on-disk paths of generated artifacts on the queue item and commit.
+
+    Artifacts held in memory are recorded as NULL: other processes (torrup
+    upload) cannot read them.
+    """
     conn.execute(
-        "UPDATE queue SET status = ?, message = ?, updated_at = ? WHERE id = ?",
-        (status, message, now_iso(), item_id),
+        """
+        UPDATE queue SET torrent_path = ?, nfo_path = ?, xml_path = ?, thumb_path = ?, updated_at = ?
+        WHERE id = ?
+        """,
+        (
+            _disk_path(torrent_path), _disk_path(nfo_path), _disk_path(xml_path),
+            _disk_path(thumb_path), now_iso(), item_id,
+        ),
     )
+    conn.commit()
 
 
-def _cleanup_staging(item_id: int, *paths) -> None:
-    """Remove staging files from output dir after successful upload."""
-    for p in paths:
-        if not p:
-            continue
-        try:
-            Path(p).unlink(missing_ok=True)
-        except OSError as e:
-            logger.warning(f"Item {item_id}: Could not remove {Path(p).name}: {e}")
+def _record_size(conn: sqlite3.Connection, item_id: int, size: int) -> None:
+    """Store the measured release size for shortest-first scheduling and commit."""
+    conn.execute("UPDATE queue SET size_bytes = ? WHERE id = ?", (size, item_id))
+    conn.commit()
 
 
-def process_queue_item(conn: sqlite3.Connection, item: sqlite3.Row) -> None:
-    """Process a single queue item through the upload pipeline."""
+def _row_value(item, key: str):
+    """Column value from a queue row, or None if the row predates the column."""
+    try:
+        return item[key]
+    except (IndexError, KeyError):
+        return None
+
+
+def _hash_progress(conn: sqlite3.Connection, item_id: int, worker_id: str | None = None):
+    """Progress callback for create_torrent() that reports via the queue message."""
+    last = [time.monotonic()]
+
+    def report(done: int, total: int) -> None:
+        now = time.monotonic()
+        if done < total and now - last[0] >= HASH_PROGRESS_SECONDS:
+            last[0] = now
+            update_queue_status(
+                conn, item_id, "preparing", f"Hashing pieces {done * 100 // total}%", worker_id
+            )
+
+    return report
+
+
+def _export_staging(job: dict) -> None:
+    """Write a test-mode item's staged artifacts to the output dir for inspection."""
+    for key in ("torrent_path", "nfo_path", "xml_path", "thumb_path"):
+        artifact = job[key]
+        if isinstance(artifact, Artifact):
+            try:
+                artifact.write_to(job["out_dir"] / artifact.name)
+            except OSError as e:
+                logger.warning(f"Item {job['item_id']}: Could not write {artifact.name}: {e}")
+
+
+def prepare_queue_item(
+    conn: sqlite3.Connection,
+    item: sqlite3.Row,
+    steps: ThreadPoolExecutor | None = None,
+) -> dict | None:
+    """Run the local stage: dupe check, metadata, thumbnail, NFO, torrent, XML.
+
+    Returns a job dict for upload_queue_item(), or None if the item already
+    reached a final status (path missing, duplicate, prepare failed). Writes
+    go through update_queue_status() / _record_artifacts(), which commit
+    straight away; no transaction is open while a step runs.
+
+    Thumbnail, NFO, torrent and XML are staged in the artifact store
+    (src/artifacts.py) rather than written to the output dir. The job holds
+    the item's pinned Staging area until upload_queue_item() releases it.
+
+    Independent steps run on steps (the caller's own pool), or on the shared
+    pool when it is None. Status writes are made as the worker the item is
+    leased to (item["worker_id"], set by claim_next_item()); if the lease was
+    lost the item is left to the worker that reclaimed it.
+    """
     item_id = item["id"]
+    owner = _row_value(item, "worker_id")
     media_type = item["media_type"]
     path = Path(item["path"])
     release_name = sanitize_release_name(item["release_name"])
-    category = int(item["category"])
     tags = item["tags"]
     out_dir = get_output_dir(conn)
     release_group = get_setting(conn, "release_group") or "torrup"
@@ -74,74 +360,190 @@ def process_queue_item(conn: sqlite3.Connection, item: sqlite3.Row) -> None:
 
     if not path.exists():
         logger.warning(f"Item {item_id}: Path not found - {path}")
-        update_queue_status(conn, item_id, "failed", "Path not found")
-        return
+        update_queue_status(conn, item_id, "failed", "Path not found", owner)
+        return None
 
-    test_mode = get_setting(conn, "test_mode") == "1"
+    test_mode = get_bool_setting(conn, "test_mode")
 
-    update_queue_status(conn, item_id, "preparing", "Generating NFO + torrent")
-
-    if not test_mode and check_exists(release_name):
-        update_queue_status(conn, item_id, "duplicate", "Exact match found on TorrentLeech")
-        return
+    if not update_queue_status(conn, item_id, "preparing", "Generating NFO + torrent", owner):
+        logger.warning(f"Item {item_id}: Lease lost, leaving it to its new worker")
+        return None
 
+    if not test_mode:
+        try:
+            exists = check_exists(release_name)
+        except TrackerError as e:
+            if not _tracker_unavailable(e):
+                logger.warning(f"Item {item_id}: Dupe check refused - {e}")
+                update_queue_status(conn, item_id, "failed", f"Dupe check refused by TorrentLeech: {e}", owner)
+                return None
+            # Unknown is not "no duplicate": put it back for after the outage
+            logger.warning(f"Item {item_id}: Dupe check failed - {e}")
+            update_queue_status(conn, item_id, "queued", f"Tracker unavailable, will retry: {e}", owner)
+            return None
+        if exists:
+            update_queue_status(conn, item_id, "duplicate", "Exact match found on TorrentLeech", owner)
+            return None
+
+    staging = open_staging(conn, item_id, out_dir)
     try:
-        # Extract metadata using exiftool
-        metadata = {}
-        if get_setting(conn, "extract_metadata") != "0":
-            metadata = extract_metadata(path, media_type)
-
-        # Extract thumbnail/artwork using ffmpeg
-        thumb_path = None
-        if get_setting(conn, "extract_thumbnails") != "0":
-            thumb_path = extract_thumbnail(path, out_dir, release_name, media_type)
-            if thumb_path and media_type == "music":
-                if not metadata:
-                    metadata = {}
-                try:
-                    size = thumb_path.stat().st_size
-                    metadata["album_art_file"] = {"name": thumb_path.name, "size": human_size(size)}
-                except OSError:
-                    metadata["album_art_file"] = {"name": thumb_path.name}
-
-        nfo_path = generate_nfo(
-            path, release_name, out_dir, media_type, release_group, metadata
+        # One walk of the release tree, shared by every step below
+        manifest = ReleaseManifest(path)
+        _record_size(conn, item_id, manifest.total_size)
+        want_metadata = get_bool_setting(conn, "extract_metadata", default=True)
+        want_thumbnail = get_bool_setting(conn, "extract_thumbnails", default=True)
+
+        # Stages already completed by an earlier attempt with the same inputs
+        # are reused; see src/checkpoints.py
+        checkpoints = Checkpoints(item_id, _row_value(item, "checkpoints"))
+        files_fp = release_fingerprint(manifest)
+        fp = {"metadata": fingerprint("metadata", files_fp, media_type, want_metadata)}
+        fp["thumbnail"] = fingerprint(
+            "thumbnail", files_fp, media_type, release_name, out_dir, want_thumbnail
         )
-        torrent_path = create_torrent(path, release_name, out_dir)
-        size_bytes = get_folder_size(path) if path.is_dir() else path.stat().st_size
-        xml_path = write_xml_metadata(
-            release_name,
-            media_type,
-            path,
-            size_bytes,
-            torrent_path,
-            nfo_path,
-            tags,
-            out_dir,
-            metadata,
-            thumb_path,
+        fp["nfo"] = fingerprint(
+            "nfo", files_fp, media_type, release_name, out_dir, release_group,
+            fp["metadata"], fp["thumbnail"],
         )
-
-        conn.execute(
-            """
-            UPDATE queue SET torrent_path = ?, nfo_path = ?, xml_path = ?, thumb_path = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (str(torrent_path), str(nfo_path), str(xml_path), str(thumb_path) if thumb_path else None, now_iso(), item_id),
+        fp["torrent"] = fingerprint("torrent", files_fp, release_name, out_dir, ANNOUNCE_KEY)
+        fp["xml"] = fingerprint("xml", tags, fp["nfo"], fp["torrent"])
+
+        def metadata_step():
+            # exiftool
+            return checkpoints.run(
+                "metadata", fp["metadata"],
+                lambda: extract_metadata(path, media_type, manifest) if want_metadata else {},
+            )
+
+        def thumbnail_step():
+            # ffprobe + ffmpeg
+            if not want_thumbnail:
+                return None
+            def extract():
+                # ffmpeg/exiftool need a file; it is read into the store
+                thumb = extract_thumbnail(path, out_dir, release_name, media_type, manifest)
+                return staging.adopt(thumb) if thumb else None
+
+            return checkpoints.run("thumbnail", fp["thumbnail"], extract, produces_file=True)
+
+        def details_step(metadata, thumbnail):
+            details = dict(metadata or {})
+            if thumbnail and media_type == "music":
+                details["album_art_file"] = {"name": thumbnail.name, "size": human_size(thumbnail.size)}
+            return details
+
+        def nfo_step(details):
+            # mediainfo
+            return checkpoints.run(
+                "nfo", fp["nfo"],
+                lambda: generate_nfo(
+                    path, release_name, out_dir, media_type, release_group, details, manifest,
+                    staging=staging,
+                ),
+                produces_file=True,
+            )
+
+        def torrent_step():
+            def build():
+                # Runs on a pool thread, so it takes its own pooled connection
+                with db() as step_conn:
+                    return create_torrent(
+                        path, release_name, out_dir, manifest, _hash_progress(step_conn, item_id, owner),
+                        cache=PieceHashCache(step_conn), staging=staging,
+                    )
+
+            return checkpoints.run("torrent", fp["torrent"], build, produces_file=True)
+
+        def xml_step(details, thumbnail, nfo, torrent):
+            return checkpoints.run(
+                "xml", fp["xml"],
+                lambda: write_xml_metadata(
+                    release_name, media_type, path, manifest.total_size,
+                    torrent, nfo, tags, out_dir, details, thumbnail, staging=staging,
+                ),
+                produces_file=True,
+            )
+
+        results = run_steps(
+            {
+                "metadata": ((), metadata_step),
+                "thumbnail": ((), thumbnail_step),
+                "torrent": ((), torrent_step),
+                "details": (("metadata", "thumbnail"), details_step),
+                "nfo": (("details",), nfo_step),
+                "xml": (("details", "thumbnail", "nfo", "torrent"), xml_step),
+            },
+            steps or _step_pool(),
         )
-        conn.commit()
+        metadata = results["details"]
+        thumb_path = results["thumbnail"]
+        nfo_path = results["nfo"]
+        torrent_path = results["torrent"]
+        xml_path = results["xml"]
+
+        _record_artifacts(conn, item_id, torrent_path, nfo_path, xml_path, thumb_path)
+        if checkpoints.reused:
+            logger.info(f"Item {item_id}: Resumed - reused {', '.join(checkpoints.reused)}")
         logger.info(f"Item {item_id}: Preparation complete - torrent and NFO generated")
     except Exception as e:
         logger.error(f"Item {item_id}: Prepare failed - {e}\n{traceback.format_exc()}")
-        update_queue_status(conn, item_id, "failed", f"Prepare failed: {sanitize_error_message(e)}")
-        return
-
-    if test_mode:
+        update_queue_status(
+            conn, item_id, "failed", f"Prepare failed: {sanitize_error_message(e)}", owner
+        )
+        staging.close()
+        return None
+
+    return {
+        "item_id": item_id,
+        "worker_id": owner,
+        "media_type": media_type,
+        "path": path,
+        "release_name": release_name,
+        "category": int(item["category"]),
+        "tags": tags,
+        "out_dir": out_dir,
+        "metadata": metadata,
+        "torrent_path": torrent_path,
+        "nfo_path": nfo_path,
+        "xml_path": xml_path,
+        "thumb_path": thumb_path,
+        "staging": staging,
+        "test_mode": test_mode,
+    }
+
+
+def upload_queue_item(conn: sqlite3.Connection, job: dict) -> None:
+    """Run the network stage for a prepared job: upload, qBT seed, cleanup.
+
+    A successful upload drops the item's staged artifacts; any other outcome
+    unpins them, so a retry can reuse them until the staging budget needs
+    the space.
+
+    Nothing is sent if the item's lease was lost since it was prepared: the
+    switch to 'uploading' is made as job["worker_id"] and fails once another
+    worker has reclaimed the item.
+    """
+    item_id = job["item_id"]
+    owner = job.get("worker_id")
+    media_type = job["media_type"]
+    path = job["path"]
+    metadata = job["metadata"]
+    torrent_path = job["torrent_path"]
+    nfo_path = job["nfo_path"]
+    staging = job["staging"]
+
+    if job["test_mode"]:
         logger.info(f"Item {item_id}: Test mode - skipping upload")
-        update_queue_status(conn, item_id, "success", "Test mode - upload skipped")
+        # A dry run leaves the NFO, torrent and XML in the output dir to inspect
+        _export_staging(job)
+        staging.discard()
+        update_queue_status(conn, item_id, "success", "Test mode - upload skipped", owner)
         return
 
-    update_queue_status(conn, item_id, "uploading", "Uploading to TorrentLeech")
+    if not update_queue_status(conn, item_id, "uploading", "Uploading to TorrentLeech", owner):
+        logger.warning(f"Item {item_id}: Lease lost before upload, leaving it to its new worker")
+        staging.close()
+        return
 
     try:
         # Extract metadata for API - only use movie/TV fields for those media types
@@ -159,10 +561,10 @@ def process_queue_item(conn: sqlite3.Connection, item: sqlite3.Row) -> None:
             tvmazetype = None
 
         result = upload_torrent(
-            Path(torrent_path),
-            Path(nfo_path),
-            category,
-            tags,
+            torrent_path,
+            nfo_path,
+            job["category"],
+            job["tags"],
             imdb=imdb,
             tvmazeid=tvmazeid,
             tvmazetype=tvmazetype
@@ -170,64 +572,86 @@ def process_queue_item(conn: sqlite3.Connection, item: sqlite3.Row) -> None:
         if result.get("success"):
             tid = result["torrent_id"]
             logger.info(f"Item {item_id}: Upload successful - torrent_id={tid}")
-            update_queue_status(conn, item_id, "success", f"Uploaded: {tid}")
-
-            # Auto-seed via qBitTorrent: download TL's official .torrent
-            # (hash may differ from local mktorrent output) and feed to qBT.
-            if get_setting(conn, "qbt_enabled") == "1":
-                tl_torrent = out_dir / f"{release_name}.tl.torrent"
-                if download_torrent(tid, tl_torrent):
-                    add_to_qbt(tl_torrent, path)
-                else:
+            if not update_queue_status(conn, item_id, "success", f"Uploaded: {tid}", owner):
+                logger.warning(f"Item {item_id}: Uploaded as {tid} after its lease was lost")
+
+            # Auto-seed via qBitTorrent: fetch TL's official .torrent into
+            # memory (hash may differ from our local build) and hand it to
+            # the batcher, which adds uploads finishing close together at once.
+            if get_bool_setting(conn, "qbt_enabled"):
+                tl_torrent = fetch_torrent(tid)
+                if tl_torrent is None:
                     logger.warning(f"Item {item_id}: TL torrent download failed, seeding with local copy")
-                    add_to_qbt(torrent_path, path)
+                    tl_torrent = torrent_path
+                seed_batcher().submit(item_id, tl_torrent, path)
 
-            # Clean up staging files -- output dir is a cache, not permanent storage
-            _cleanup_staging(item_id, torrent_path, nfo_path, xml_path, thumb_path)
+            # Staged artifacts are a cache, not permanent storage
+            staging.discard()
+            clear_checkpoints(conn, item_id)
         else:
             logger.warning(f"Item {item_id}: Upload failed - {result.get('error')}")
-            update_queue_status(conn, item_id, "failed", f"Upload failed: {result.get('error')}")
+            update_queue_status(
+                conn, item_id, "failed", f"Upload failed: {result.get('error')}", owner
+            )
+    except TrackerError as e:
+        if not _tracker_unavailable(e):
+            # TL answered and refused; sending it again would get the same answer
+            logger.warning(f"Item {item_id}: Upload refused - {e}")
+            update_queue_status(
+                conn, item_id, "failed", f"Upload rejected by TorrentLeech: {e}", owner
+            )
+            return
+        # Staging files and checkpoints are kept, so the retry is cheap
+        logger.warning(f"Item {item_id}: Upload not completed - {e}")
+        update_queue_status(conn, item_id, "queued", f"Tracker unavailable, will retry: {e}", owner)
     except Exception as e:
         logger.error(f"Item {item_id}: Upload error - {e}\n{traceback.format_exc()}")
-        update_queue_status(conn, item_id, "failed", f"Upload error: {sanitize_error_message(e)}")
+        update_queue_status(
+            conn, item_id, "failed", f"Upload error: {sanitize_error_message(e)}", owner
+        )
+    finally:
+        staging.close()
+
+
+def process_queue_item(conn: sqlite3.Connection, item: sqlite3.Row) -> None:
+    """Process a single queue item through both stages, one after the other."""
+    job = prepare_queue_item(conn, item)
+    if job is not None:
+        upload_queue_item(conn, job)
+        # No batch to wait for when items are processed one at a time
+        seed_batcher().flush()
+
+
+def check_activity_after_item() -> None:
+    """Re-check activity health and notify on a critical transition."""
+    try:
+        from src.utils.activity import calculate_health, check_and_notify_critical
+        with db() as notify_conn:
+            health = calculate_health(notify_conn)
+            check_and_notify_critical(notify_conn, health["critical"])
+    except Exception as e:
+        logger.warning(f"Activity notification check failed: {e}")
 
 
 def queue_worker(shutdown_event: "threading.Event | None" = None) -> None:
     """Main worker loop that processes queued items.
 
+    Runs the staged prepare/upload pipeline sized by the
+    worker_prepare_concurrency, worker_upload_concurrency and
+    worker_handoff_size settings.
+
     Args:
         shutdown_event: Optional event that signals the worker to stop.
     """
     import threading as _threading
 
+    from src.pipeline import UploadPipeline, pipeline_settings
+
     if shutdown_event is None:
         shutdown_event = _threading.Event()
 
     logger.info("Queue worker started")
-    backoff = 2
-    max_backoff = 60
-    while not shutdown_event.is_set():
-        try:
-            processed = False
-            with db() as conn:
-                row = conn.execute(
-                    "SELECT * FROM queue WHERE status = 'queued' AND approval_status = 'approved' ORDER BY id ASC LIMIT 1"
-                ).fetchone()
-                if row:
-                    process_queue_item(conn, row)
-                    processed = True
-            if processed:
-                try:
-                    from src.utils.activity import calculate_health, check_and_notify_critical
-                    with db() as notify_conn:
-                        health = calculate_health(notify_conn)
-                        check_and_notify_critical(notify_conn, health["critical"])
-                except Exception as e:
-                    logger.warning(f"Activity notification check failed: {e}")
-            backoff = 2  # Reset backoff on success
-            shutdown_event.wait(2)
-        except Exception as e:
-            logger.error(f"Worker loop error: {e}", exc_info=True)
-            shutdown_event.wait(backoff)
-            backoff = min(backoff * 2, max_backoff)  # Exponential backoff
+    prepare, upload, handoff = pipeline_settings()
+    UploadPipeline(shutdown_event, prepare, upload, handoff).run()
+    close_client()
     logger.info("Queue worker stopped")
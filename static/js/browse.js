@@ -230,7 +230,9 @@ async function addToQueue() {
     return {
       media_type: mediaType,
       path: item.path,
-      category: defaultCategory
+      category: defaultCategory,
+      // Already measured for the listing; saves the server a tree walk
+      size_bytes: item.size_bytes
     };
   });
 
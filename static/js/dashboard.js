@@ -46,8 +46,10 @@ async function deleteQueueRow(id) {
 }
 
 async function loadQueue() {
-  const res = await fetch('/api/queue');
-  const rows = await res.json();
+  // The dashboard only shows the most recent items; the Queue page pages the rest.
+  const params = new URLSearchParams({ limit: 50, fields: 'id,media_type,release_name,category,tags,status,message' });
+  const res = await fetch(`/api/queue/page?${params}`);
+  const rows = (await res.json()).items;
   const tbody = document.querySelector('#queue-table tbody');
   tbody.innerHTML = '';
   rows.forEach(item => {
@@ -3,8 +3,13 @@
 
 let currentTab = 'uploads';
 let historyData = [];
+let nextCursor = null;
 let selectedItemId = null;
 
+const PAGE_SIZE = 100;
+const HISTORY_STATUSES = 'success,failed,duplicate';
+const HISTORY_FIELDS = 'id,media_type,path,release_name,category,tags,status,message,created_at,updated_at';
+
 function csrfHeaders() {
   return window.csrfToken ? { 'X-CSRFToken': window.csrfToken } : {};
 }
@@ -46,57 +51,57 @@ function statusBadge(status) {
   return `<span class="badge ${map[normalized] || ''}">${normalized || 'unknown'}</span>`;
 }
 
-function filterByDate(items, days) {
-  if (days === 'all') return items;
-  const cutoff = new Date();
-  cutoff.setDate(cutoff.getDate() - parseInt(days, 10));
-  return items.filter(item => {
-    const itemDate = new Date(item.updated_at || item.created_at);
-    return itemDate >= cutoff;
-  });
-}
-
-function filterByStatus(items, status) {
-  if (status === 'all') return items;
-  return items.filter(item => item.status === status);
-}
-
-function filterByType(items, mediaType) {
-  if (mediaType === 'all') return items;
-  return items.filter(item => item.media_type === mediaType);
-}
-
-function applyFilters(items) {
+function historyParams(cursor) {
+  // Status and type only narrow the uploads table; the activity log shows
+  // every finished item within the date window.
   const statusFilter = document.getElementById('filter-status').value;
   const dateFilter = document.getElementById('filter-date').value;
   const typeFilter = document.getElementById('filter-type').value;
+  const uploads = currentTab === 'uploads';
 
-  let filtered = items;
-  filtered = filterByStatus(filtered, statusFilter);
-  filtered = filterByDate(filtered, dateFilter);
-  filtered = filterByType(filtered, typeFilter);
-
-  return filtered;
+  const params = new URLSearchParams({ order: 'updated', limit: PAGE_SIZE, fields: HISTORY_FIELDS });
+  params.set('status', uploads && statusFilter !== 'all' ? statusFilter : HISTORY_STATUSES);
+  if (uploads && typeFilter !== 'all') params.set('media_type', typeFilter);
+  if (dateFilter !== 'all') {
+    const cutoff = new Date();
+    cutoff.setDate(cutoff.getDate() - parseInt(dateFilter, 10));
+    params.set('since', cutoff.toISOString());
+  }
+  if (cursor) params.set('cursor', cursor);
+  return params;
 }
 
 async function loadHistory() {
   try {
-    const res = await fetch('/api/queue');
-    const allItems = await res.json();
-
-    historyData = allItems.filter(item =>
-      ['success', 'failed', 'duplicate'].includes(item.status)
-    );
+    const res = await fetch(`/api/queue/page?${historyParams(null)}`);
+    const page = await res.json();
+    historyData = page.items;
+    nextCursor = page.next_cursor;
+    renderCurrentTab();
+  } catch (err) {
+    console.error('Failed to load history:', err);
+  }
+}
 
-    historyData.sort((a, b) => {
-      const dateA = new Date(a.updated_at || a.created_at || 0);
-      const dateB = new Date(b.updated_at || b.created_at || 0);
-      return dateB - dateA;
-    });
+async function loadMoreHistory() {
+  if (!nextCursor) return;
+  try {
+    const res = await fetch(`/api/queue/page?${historyParams(nextCursor)}`);
+    const page = await res.json();
+    historyData = historyData.concat(page.items);
+    nextCursor = page.next_cursor;
+    renderCurrentTab();
+  } catch (err) {
+    console.error('Failed to load more history:', err);
+  }
+}
 
+function renderCurrentTab() {
+  document.getElementById('load-more').style.display = nextCursor ? '' : 'none';
+  if (currentTab === 'uploads') {
     renderHistory();
-  } catch (err) {
-    console.error('Failed to load history:', err);
+  } else {
+    renderActivity();
   }
 }
 
@@ -104,16 +109,14 @@ function renderHistory() {
   const tbody = document.getElementById('history-tbody');
   const emptyState = document.getElementById('empty-uploads');
 
-  const filtered = applyFilters(historyData);
-
-  if (filtered.length === 0) {
+  if (historyData.length === 0) {
     tbody.innerHTML = '';
     emptyState.style.display = 'block';
     return;
   }
 
   emptyState.style.display = 'none';
-  tbody.innerHTML = filtered.map(item => `
+  tbody.innerHTML = historyData.map(item => `
     <tr data-id="${item.id}" class="${selectedItemId === item.id ? 'selected' : ''}">
       <td>${formatDate(item.updated_at || item.created_at)}</td>
       <td class="release-name" title="${escapeHtml(item.release_name)}">${escapeHtml(item.release_name)}</td>
@@ -170,32 +173,21 @@ function renderActivity() {
   const logContainer = document.getElementById('activity-log');
   const emptyState = document.getElementById('empty-activity');
 
-  const activities = [];
-  historyData.forEach(item => {
-    activities.push({
-      time: item.updated_at || item.created_at,
-      action: item.status,
-      message: item.release_name + (item.message ? ': ' + item.message : '')
-    });
-  });
-
-  activities.sort((a, b) => new Date(b.time) - new Date(a.time));
-
-  const dateFilter = document.getElementById('filter-date').value;
-  const filtered = dateFilter === 'all' ? activities : activities.filter(a => {
-    const cutoff = new Date();
-    cutoff.setDate(cutoff.getDate() - parseInt(dateFilter, 10));
-    return new Date(a.time) >= cutoff;
-  });
+  // Already newest-first: the API orders by updated_at DESC.
+  const activities = historyData.map(item => ({
+    time: item.updated_at || item.created_at,
+    action: item.status,
+    message: item.release_name + (item.message ? ': ' + item.message : '')
+  }));
 
-  if (filtered.length === 0) {
+  if (activities.length === 0) {
     logContainer.innerHTML = '';
     emptyState.style.display = 'block';
     return;
   }
 
   emptyState.style.display = 'none';
-  logContainer.innerHTML = filtered.map(a => `
+  logContainer.innerHTML = activities.map(a => `
     <div class="activity-item">
       <span class="activity-time">${formatDateTime(a.time)}</span>
       <span class="activity-action ${a.action}">${a.action}</span>
@@ -215,12 +207,7 @@ function switchTab(tab) {
   document.getElementById('activity-content').style.display = tab === 'activity' ? 'block' : 'none';
 
   hideDetails();
-
-  if (tab === 'uploads') {
-    renderHistory();
-  } else {
-    renderActivity();
-  }
+  loadHistory();
 }
 
 // Event listeners
@@ -229,22 +216,17 @@ document.querySelectorAll('.tab').forEach(btn => {
 });
 
 document.getElementById('filter-status').addEventListener('change', () => {
-  if (currentTab === 'uploads') renderHistory();
+  if (currentTab === 'uploads') loadHistory();
 });
 
-document.getElementById('filter-date').addEventListener('change', () => {
-  if (currentTab === 'uploads') {
-    renderHistory();
-  } else {
-    renderActivity();
-  }
-});
+document.getElementById('filter-date').addEventListener('change', loadHistory);
 
 document.getElementById('filter-type').addEventListener('change', () => {
-  if (currentTab === 'uploads') renderHistory();
+  if (currentTab === 'uploads') loadHistory();
 });
 
 document.getElementById('refresh').addEventListener('click', loadHistory);
+document.getElementById('load-more').addEventListener('click', loadMoreHistory);
 
 document.addEventListener('click', (e) => {
   const panel = document.getElementById('details-panel');
@@ -4,6 +4,19 @@
 let currentFilter = 'all';
 let autoRefreshInterval = null;
 let queueData = [];
+let queueCounts = {};
+let queueTotal = 0;
+let nextCursor = null;
+
+const PAGE_SIZE = 100;
+const LIST_FIELDS = 'id,media_type,release_name,category,tags,imdb,tvmazeid,status,message,priority,size_bytes';
+const FILTER_STATUSES = {
+  all: '',
+  queued: 'queued',
+  uploading: 'uploading,preparing',
+  failed: 'failed',
+  duplicate: 'duplicate',
+};
 
 function csrfHeaders() {
   return window.csrfToken ? { 'X-CSRFToken': window.csrfToken } : {};
@@ -49,56 +62,81 @@ function getActionsForStatus(status, id) {
   return actions.join('');
 }
 
-function filterQueue(data, filter) {
-  if (filter === 'all') return data;
-  if (filter === 'uploading') {
-    return data.filter(item => item.status === 'uploading' || item.status === 'preparing');
-  }
-  return data.filter(item => item.status === filter);
-}
-
-function renderSummary(data) {
-  const counts = { queued: 0, failed: 0, duplicate: 0, success: 0, preparing: 0, uploading: 0 };
-  data.forEach(item => { if (counts[item.status] !== undefined) counts[item.status]++; });
+function renderSummary(counts) {
+  const c = { queued: 0, failed: 0, duplicate: 0, success: 0, preparing: 0, uploading: 0, ...counts };
+  const total = Object.values(counts).reduce((sum, n) => sum + n, 0);
 
   const parts = [];
-  parts.push(`${data.length} total`);
-  if (counts.queued) parts.push(`${counts.queued} queued`);
-  if (counts.failed) parts.push(`${counts.failed} failed`);
-  if (counts.duplicate) parts.push(`${counts.duplicate} duplicate`);
-  if (counts.success) parts.push(`${counts.success} completed`);
-  if (counts.uploading || counts.preparing) parts.push(`${counts.uploading + counts.preparing} in progress`);
+  parts.push(`${total} total`);
+  if (c.queued) parts.push(`${c.queued} queued`);
+  if (c.failed) parts.push(`${c.failed} failed`);
+  if (c.duplicate) parts.push(`${c.duplicate} duplicate`);
+  if (c.success) parts.push(`${c.success} completed`);
+  if (c.uploading || c.preparing) parts.push(`${c.uploading + c.preparing} in progress`);
 
   document.getElementById('queue-summary').textContent = parts.join(' | ');
 
   // Show/hide bulk buttons based on what exists
-  document.getElementById('retry-all-btn').style.display = counts.failed > 0 ? '' : 'none';
-  document.getElementById('clear-dupes-btn').style.display = counts.duplicate > 0 ? '' : 'none';
-  document.getElementById('clear-completed-btn').style.display = counts.success > 0 ? '' : 'none';
+  document.getElementById('retry-all-btn').style.display = c.failed > 0 ? '' : 'none';
+  document.getElementById('clear-dupes-btn').style.display = c.duplicate > 0 ? '' : 'none';
+  document.getElementById('clear-completed-btn').style.display = c.success > 0 ? '' : 'none';
 }
 
-function renderQueue(data) {
-  renderSummary(data);
-  const tbody = document.getElementById('queue-body');
-  const filtered = filterQueue(data, currentFilter);
+function formatSize(bytes) {
+  if (bytes === null || bytes === undefined) return '';
+  const units = ['B', 'KB', 'MB', 'GB', 'TB'];
+  let size = bytes;
+  let unit = 0;
+  while (size >= 1024 && unit < units.length - 1) {
+    size /= 1024;
+    unit++;
+  }
+  return `${size.toFixed(unit ? 1 : 0)} ${units[unit]}`;
+}
 
-  if (filtered.length === 0) {
-    tbody.innerHTML = `<tr><td colspan="7" class="text-muted" style="text-align: center; padding: var(--space-6);">No items in queue</td></tr>`;
-    return;
+async function loadSchedule() {
+  try {
+    const res = await fetch('/api/queue/schedule');
+    const s = await res.json();
+    const parts = Object.entries(s.policies).map(([type, policy]) => {
+      const boosted = policy === 'deadline' && s.smallest_first.includes(type) ? ' - smallest first, behind monthly minimum' : '';
+      return `${type}: ${s.labels[policy]}${boosted}`;
+    });
+    document.getElementById('queue-schedule').textContent = `Scheduling: ${parts.join(' | ')}`;
+  } catch (err) {
+    console.error('Failed to load schedule:', err);
   }
+}
 
-  tbody.innerHTML = filtered.map(item => `
+function renderRow(item) {
+  return `
     <tr data-id="${item.id}">
       <td>${escapeHtml(String(item.id))}</td>
       <td>${escapeHtml(item.media_type)}</td>
       <td class="release-name" title="${escapeHtml(item.release_name)}">${escapeHtml(item.release_name)}</td>
       <td>${escapeHtml(String(item.category))}</td>
+      <td>${escapeHtml(String(item.priority || 0))}</td>
+      <td class="text-sm">${escapeHtml(formatSize(item.size_bytes))}</td>
       <td>${statusBadge(item.status)}</td>
       <td class="text-sm text-muted" style="max-width:200px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;" title="${escapeHtml(item.message || '')}">${escapeHtml(item.message || '')}</td>
       <td class="table-actions">${getActionsForStatus(item.status, item.id)}</td>
     </tr>
-  `).join('');
+  `;
+}
 
+function renderQueue() {
+  renderSummary(queueCounts);
+  const tbody = document.getElementById('queue-body');
+  const loadMore = document.getElementById('load-more-btn');
+  loadMore.style.display = nextCursor ? '' : 'none';
+  loadMore.textContent = `Load more (${queueData.length} of ${queueTotal})`;
+
+  if (queueData.length === 0) {
+    tbody.innerHTML = `<tr><td colspan="9" class="text-muted" style="text-align: center; padding: var(--space-6);">No items in queue</td></tr>`;
+    return;
+  }
+
+  tbody.innerHTML = queueData.map(renderRow).join('');
   attachActionListeners();
 }
 
@@ -139,6 +177,7 @@ function showEditPanel(item) {
   document.getElementById('edit-media-type').value = item.media_type;
   document.getElementById('edit-release-name').value = item.release_name;
   document.getElementById('edit-tags').value = item.tags || '';
+  document.getElementById('edit-priority').value = item.priority || 0;
 
   const imdbInput = document.getElementById('edit-imdb');
   const tvmazeidInput = document.getElementById('edit-tvmazeid');
@@ -198,11 +237,12 @@ async function saveEdit() {
   const tags = document.getElementById('edit-tags').value;
   const imdb = document.getElementById('edit-imdb').value;
   const tvmazeid = document.getElementById('edit-tvmazeid').value;
+  const priority = parseInt(document.getElementById('edit-priority').value, 10) || 0;
 
   const res = await fetch('/api/queue/update', {
     method: 'POST',
     headers: { 'Content-Type': 'application/json', ...csrfHeaders() },
-    body: JSON.stringify({ id, release_name: releaseName, category, tags, imdb, tvmazeid })
+    body: JSON.stringify({ id, release_name: releaseName, category, tags, imdb, tvmazeid, priority })
   });
 
   const data = await res.json();
@@ -291,16 +331,45 @@ async function clearAll() {
   else alert(data.error || 'Failed');
 }
 
-async function loadQueue() {
+async function fetchPage(cursor, limit = PAGE_SIZE) {
+  const params = new URLSearchParams({ limit, fields: LIST_FIELDS });
+  const statuses = FILTER_STATUSES[currentFilter];
+  if (statuses) params.set('status', statuses);
+  if (cursor) params.set('cursor', cursor);
+  const res = await fetch(`/api/queue/page?${params}`);
+  return res.json();
+}
+
+async function loadQueue(keepExpanded = true) {
   try {
-    const res = await fetch('/api/queue');
-    queueData = await res.json();
-    renderQueue(queueData);
+    // Re-fetch as many rows as are already on screen, so auto-refresh
+    // does not collapse a list the user has expanded with "Load more".
+    const limit = keepExpanded ? Math.max(PAGE_SIZE, queueData.length) : PAGE_SIZE;
+    const page = await fetchPage(null, limit);
+    queueData = page.items;
+    queueCounts = page.counts;
+    queueTotal = page.total;
+    nextCursor = page.next_cursor;
+    renderQueue();
   } catch (err) {
     console.error('Failed to load queue:', err);
   }
 }
 
+async function loadMore() {
+  if (!nextCursor) return;
+  try {
+    const page = await fetchPage(nextCursor);
+    queueData = queueData.concat(page.items);
+    queueCounts = page.counts;
+    queueTotal = page.total;
+    nextCursor = page.next_cursor;
+    renderQueue();
+  } catch (err) {
+    console.error('Failed to load more queue items:', err);
+  }
+}
+
 function setFilter(filter) {
   currentFilter = filter;
 
@@ -309,7 +378,7 @@ function setFilter(filter) {
   });
 
   document.getElementById('status-filter').value = filter;
-  renderQueue(queueData);
+  loadQueue(false);
 }
 
 function setupAutoRefresh() {
@@ -338,7 +407,8 @@ document.getElementById('status-filter').onchange = (e) => {
   setFilter(e.target.value);
 };
 
-document.getElementById('refresh-btn').onclick = loadQueue;
+document.getElementById('refresh-btn').onclick = () => { loadQueue(); loadSchedule(); };
+document.getElementById('load-more-btn').onclick = loadMore;
 document.getElementById('save-edit-btn').onclick = saveEdit;
 document.getElementById('cancel-edit-btn').onclick = hideEditPanel;
 
@@ -349,6 +419,7 @@ document.getElementById('clear-all-btn').onclick = clearAll;
 
 // Initialize
 loadQueue();
+loadSchedule();
 setupAutoRefresh();
 
 // Theme toggle
@@ -28,6 +28,7 @@ async function saveSettings() {
     ntfy_url: document.getElementById('ntfy_url').value,
     ntfy_topic: document.getElementById('ntfy_topic').value,
     media_roots: [],
+    queue_policies: {},
     templates: {},
   };
 
@@ -38,6 +39,7 @@ async function saveSettings() {
     const path = row.querySelector('input[data-field="path"]').value;
     const default_category = row.querySelector('select[data-field="default_category"]').value;
     data.media_roots.push({ media_type, enabled, auto_scan, path, default_category });
+    data.queue_policies[media_type] = row.querySelector('select[data-field="queue_policy"]').value;
   });
 
   document.querySelectorAll('input[data-template]').forEach(input => {
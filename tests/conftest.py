@@ -5,9 +5,8 @@ import importlib
 import pytest
 
 
-@pytest.fixture()
-def client(tmp_path, monkeypatch):
-    """Create a Flask test client with fresh database."""
+def _use_temp_db(tmp_path, monkeypatch):
+    """Point config at a database and output dir in tmp_path; return src.db reloaded."""
     monkeypatch.setenv("SECRET_KEY", "test-secret")
     monkeypatch.setenv("TORRUP_DB_PATH", str(tmp_path / "torrup.db"))
     monkeypatch.setenv("TORRUP_OUTPUT_DIR", str(tmp_path / "output"))
@@ -15,10 +14,36 @@ def client(tmp_path, monkeypatch):
 
     import src.config as config
     import src.db as db
-    import app as app_module
 
     importlib.reload(config)
     importlib.reload(db)
+    return db
+
+
+@pytest.fixture()
+def fresh_db(request, tmp_path, monkeypatch):
+    """Return the src.db module bound to a fresh, initialised database.
+
+    Modules that import src.db names at import time keep the old bindings;
+    reload them after it with a marker, e.g.
+    ``pytestmark = pytest.mark.reload("src.seeding")``.
+    """
+    db = _use_temp_db(tmp_path, monkeypatch)
+    for marker in request.node.iter_markers("reload"):
+        for name in marker.args:
+            importlib.reload(importlib.import_module(name))
+    db.init_db()
+    return db
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    """Create a Flask test client with fresh database."""
+    _use_temp_db(tmp_path, monkeypatch)
+    # Import app only after config is reloaded, so a first import never
+    # starts background workers from a stale TORRUP_RUN_WORKER
+    import app as app_module
+
     importlib.reload(app_module)
 
     app = app_module.app
@@ -80,3 +105,33 @@ def queue_item_data():
             }
         ]
     }
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracker_breaker():
+    """Start every test with the tracker circuit breaker closed."""
+    from src.api import tracker_breaker
+
+    tracker_breaker().reset()
+    yield
+    tracker_breaker().reset()
+
+
+@pytest.fixture(autouse=True)
+def _clear_staging_store():
+    """Start every test with an empty artifact staging store."""
+    from src.artifacts import staging_store
+
+    staging_store().clear()
+    yield
+    staging_store().clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_qbt_session():
+    """Start every test without a cached qBT client."""
+    from src.utils.qbittorrent import qbt_session
+
+    qbt_session().reset()
+    yield
+    qbt_session().reset()
@@ -0,0 +1 @@
+FILE "01 Intro.flac" WAVE
@@ -601,3 +601,80 @@ class TestNtfy:
         with db_module.db() as conn:
             state = db_module.get_setting(conn, "tl_last_critical_state")
         assert state == "0"
+
+
+# --------------------------------------------------------------------------
+# TestActivityCounters
+# --------------------------------------------------------------------------
+
+class TestActivityCounters:
+    def _snapshot(self, conn):
+        rows = conn.execute(
+            "SELECT period, bucket, status, count FROM activity_counters WHERE count != 0"
+        ).fetchall()
+        return sorted(tuple(r) for r in rows)
+
+    def test_triggers_match_rebuild(self, client):
+        """Inserts, status changes, created_at edits and deletes keep counters exact."""
+        import src.db as db_module
+
+        ts = current_month_iso()
+        with db_module.db() as conn:
+            for status in ("queued", "queued", "failed", "success"):
+                insert_queue_item(conn, status, ts)
+            insert_queue_item(conn, "success", last_month_iso())
+            conn.execute("UPDATE queue SET status = 'queued' WHERE status = 'failed'")
+            conn.execute("UPDATE queue SET status = 'success' WHERE id = 1")
+            conn.execute("UPDATE queue SET created_at = ? WHERE id = 2", (last_month_iso(),))
+            conn.execute("DELETE FROM queue WHERE id = 4")
+            conn.commit()
+
+            incremental = self._snapshot(conn)
+            db_module.rebuild_activity_counters(conn)
+            assert self._snapshot(conn) == incremental
+
+        month = ts[:7]
+        assert ("month", month, "success", 1) in incremental
+        assert ("total", "", "queued", 2) in incremental
+
+    def test_health_reads_counters(self, client):
+        """calculate_health answers from activity_counters, not the queue table."""
+        import src.db as db_module
+        from src.utils.activity import calculate_health
+
+        month = datetime.now(timezone.utc).strftime("%Y-%m")
+        with db_module.db() as conn:
+            conn.execute(
+                "INSERT INTO activity_counters (period, bucket, status, count) "
+                "VALUES ('month', ?, 'success', 7), ('total', '', 'queued', 3)",
+                (month,),
+            )
+            conn.commit()
+            health = calculate_health(conn)
+
+        assert health["uploads"] == 7
+        assert health["queued"] == 3
+
+    def test_cli_rebuild(self, client):
+        """`activity --rebuild` recomputes counters from queue rows."""
+        import io
+        import sys
+        import src.db as db_module
+        from src.cli import main
+
+        with db_module.db() as conn:
+            insert_queue_item(conn, "success", current_month_iso())
+            conn.execute("UPDATE activity_counters SET count = 99")
+            conn.commit()
+
+        captured = io.StringIO()
+        old_stdout = sys.stdout
+        sys.stdout = captured
+        try:
+            main(["--json", "activity", "--rebuild"])
+        finally:
+            sys.stdout = old_stdout
+
+        data = json.loads(captured.getvalue())
+        assert data["rebuilt_from_rows"] == 1
+        assert data["uploads"] == 1
@@ -1,9 +1,12 @@
 """Tests for TorrentLeech API client in src/api.py."""
 
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
+import httpx
 import pytest
 
 os.environ.setdefault("TORRUP_OUTPUT_DIR", "/tmp/torrup-test-output")
@@ -13,12 +16,12 @@ class TestCheckExists:
     """Tests for check_exists function."""
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_check_exists_found(self, mock_post):
         """Verify check_exists returns True when release exists."""
         from src.api import check_exists
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "1"
         mock_post.return_value = mock_response
 
@@ -28,12 +31,12 @@ class TestCheckExists:
         mock_post.assert_called_once()
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_check_exists_not_found(self, mock_post):
         """Verify check_exists returns False when release not found."""
         from src.api import check_exists
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "0"
         mock_post.return_value = mock_response
 
@@ -50,35 +53,50 @@ class TestCheckExists:
         assert result is False
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
-    def test_check_exists_handles_exception(self, mock_post):
-        """Verify check_exists returns False on network error."""
-        from src.api import check_exists
+    @patch("src.api.httpx.Client.post")
+    @patch("src.api.time.sleep")
+    def test_check_exists_raises_on_network_error(self, mock_sleep, mock_post):
+        """Verify a network error is raised, never read as "not a duplicate"."""
+        from src.api import RETRY_ATTEMPTS, TrackerError, check_exists
 
-        mock_post.side_effect = Exception("Network error")
+        mock_post.side_effect = httpx.ConnectError("Network error")
 
-        result = check_exists("Test.Release")
-        assert result is False
+        with pytest.raises(TrackerError) as exc_info:
+            check_exists("Test.Release")
+        assert exc_info.value.kind == "network"
+        assert mock_post.call_count == RETRY_ATTEMPTS
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
+    def test_check_exists_raises_on_malformed_answer(self, mock_post):
+        """Verify an unparseable search answer is an error, not False."""
+        from src.api import TrackerError, check_exists
+
+        mock_post.return_value = MagicMock(status_code=200, text="<html>Maintenance</html>")
+
+        with pytest.raises(TrackerError) as exc_info:
+            check_exists("Test.Release")
+        assert exc_info.value.kind == "malformed"
+
+    @patch("src.api.ANNOUNCE_KEY", "test-key-123")
+    @patch("src.api.httpx.Client.post")
     def test_check_exists_handles_quotes(self, mock_post):
         """Verify check_exists handles quoted "1" or "0"."""
         from src.api import check_exists
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = '"1"'
         mock_post.return_value = mock_response
 
         assert check_exists("Quoted.Release") is True
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_check_exists_fuzzy(self, mock_post):
         """Verify check_exists sends exact=0 for fuzzy search."""
         from src.api import check_exists
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "0"
         mock_post.return_value = mock_response
 
@@ -88,12 +106,12 @@ class TestCheckExists:
         assert call_kwargs[1]["data"]["exact"] == "0"
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_check_exists_sends_correct_data(self, mock_post):
         """Verify check_exists sends correct search parameters."""
         from src.api import check_exists
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "0"
         mock_post.return_value = mock_response
 
@@ -108,13 +126,13 @@ class TestUploadTorrent:
     """Tests for upload_torrent function."""
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     @patch("builtins.open", mock_open(read_data=b"torrent data"))
     def test_upload_torrent_success(self, mock_post, tmp_path):
         """Verify upload_torrent returns success on valid response."""
         from src.api import upload_torrent
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "12345"  # Valid torrent ID
         mock_post.return_value = mock_response
 
@@ -129,13 +147,13 @@ class TestUploadTorrent:
         assert result["torrent_id"] == 12345
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     @patch("builtins.open", mock_open(read_data=b"torrent data"))
     def test_upload_torrent_failure(self, mock_post, tmp_path):
         """Verify upload_torrent returns failure on error response."""
         from src.api import upload_torrent
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "Error: Duplicate torrent"  # Not a valid ID
         mock_post.return_value = mock_response
 
@@ -166,13 +184,13 @@ class TestUploadTorrent:
         assert "not configured" in str(exc_info.value)
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     @patch("builtins.open", mock_open(read_data=b"data"))
     def test_upload_torrent_sends_correct_data(self, mock_post, tmp_path):
         """Verify upload_torrent sends correct form data."""
         from src.api import upload_torrent
 
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200)
         mock_response.text = "99999"
         mock_post.return_value = mock_response
 
@@ -190,11 +208,32 @@ class TestUploadTorrent:
         assert "nfo" in call_kwargs[1]["files"]
 
 
+    @patch("src.api.ANNOUNCE_KEY", "test-key-123")
+    @patch("src.api.httpx.Client.post")
+    def test_upload_torrent_streams_staged_artifacts(self, mock_post):
+        """Verify in-memory artifacts are uploaded without touching disk."""
+        from src.artifacts import Artifact
+        from src.api import upload_torrent
+
+        sent = {}
+
+        def post(url, files, **kwargs):
+            sent.update({key: (name, f.read()) for key, (name, f, _) in files.items()})
+            return _response(200, "77")
+
+        mock_post.side_effect = post
+
+        result = upload_torrent(Artifact("r.torrent", b"d4:infoe"), Artifact("r.nfo", b"nfo"), 31, "")
+
+        assert result == {"success": True, "torrent_id": 77}
+        assert sent == {"torrent": ("r.torrent", b"d4:infoe"), "nfo": ("r.nfo", b"nfo")}
+
+
 class TestDownloadTorrent:
     """Tests for download_torrent function."""
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_download_torrent_success(self, mock_post, tmp_path):
         """Verify download_torrent saves file on valid response."""
         from src.api import download_torrent
@@ -217,7 +256,7 @@ class TestDownloadTorrent:
         assert call_data["announcekey"] == "test-key-123"
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_download_torrent_http_error(self, mock_post, tmp_path):
         """Verify download_torrent returns False on HTTP error."""
         from src.api import download_torrent
@@ -233,7 +272,7 @@ class TestDownloadTorrent:
         assert not dest.exists()
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_download_torrent_invalid_content(self, mock_post, tmp_path):
         """Verify download_torrent rejects non-torrent response."""
         from src.api import download_torrent
@@ -259,7 +298,7 @@ class TestDownloadTorrent:
         assert result is False
 
     @patch("src.api.ANNOUNCE_KEY", "test-key-123")
-    @patch("src.api.httpx.post")
+    @patch("src.api.httpx.Client.post")
     def test_download_torrent_network_error(self, mock_post, tmp_path):
         """Verify download_torrent handles network exceptions."""
         from src.api import download_torrent
@@ -270,3 +309,237 @@ class TestDownloadTorrent:
         result = download_torrent(12345, dest)
 
         assert result is False
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    """Stand-in for the TL search endpoint that records client ports."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.peers.append(self.client_address)
+        body = b'"1"'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def tl_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    server.peers = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSharedClient:
+    """Tests for the pooled keep-alive client."""
+
+    def test_requests_reuse_one_connection(self, tl_server):
+        """Verify sequential searches share one keep-alive connection."""
+        from src import api
+
+        url = f"http://127.0.0.1:{tl_server.server_port}/search"
+        api.close_client()
+        with patch("src.api.ANNOUNCE_KEY", "k"), patch("src.api.TL_SEARCH_URL", url):
+            results = [api.check_exists(f"Release {n}") for n in range(5)]
+        api.close_client()
+
+        assert results == [True] * 5
+        assert len(tl_server.peers) == 5
+        assert len(set(tl_server.peers)) == 1
+
+    def test_close_client_drops_connections(self, tl_server):
+        """Verify close_client() closes the pool and the next call reconnects."""
+        from src import api
+
+        url = f"http://127.0.0.1:{tl_server.server_port}/search"
+        api.close_client()
+        with patch("src.api.ANNOUNCE_KEY", "k"), patch("src.api.TL_SEARCH_URL", url):
+            api.check_exists("A")
+            first = api.get_client()
+            api.close_client()
+            api.check_exists("B")
+
+        assert first.is_closed
+        assert api.get_client() is not first
+        assert len(set(tl_server.peers)) == 2
+        api.close_client()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(status, text="", headers=None):
+    return httpx.Response(status, text=text, headers=headers)
+
+
+class TestClassify:
+    """Tests for classify_response() / classify_exception()."""
+
+    def test_status_kinds(self):
+        """Verify HTTP statuses map to error kinds."""
+        from src.api import classify_response
+
+        assert classify_response(_response(200, "1")) is None
+        assert classify_response(_response(429)).kind == "rate_limited"
+        assert classify_response(_response(502)).kind == "server"
+        assert classify_response(_response(403)).kind == "auth"
+        assert classify_response(_response(404)).kind == "rejected"
+
+    def test_retry_after_header(self):
+        """Verify Retry-After is kept and bounds the backoff delay."""
+        from src.api import backoff_delay, classify_response
+
+        error = classify_response(_response(429, headers={"Retry-After": "7"}))
+        assert error.retry_after == 7.0
+        assert backoff_delay(0, error.retry_after) >= 7.0
+
+    def test_connect_errors_were_not_sent(self):
+        """Verify only connect failures are marked as never sent."""
+        from src.api import classify_exception
+
+        assert classify_exception(httpx.ConnectError("refused")).sent is False
+        assert classify_exception(httpx.ConnectTimeout("slow")).sent is False
+        read_timeout = classify_exception(httpx.ReadTimeout("slow"))
+        assert read_timeout.kind == "timeout"
+        assert read_timeout.sent is True
+
+
+@patch("src.api.time.sleep")
+@patch("src.api.ANNOUNCE_KEY", "test-key-123")
+@patch("src.api.httpx.Client.post")
+class TestRetries:
+    """Tests for retrying tracker calls."""
+
+    def test_search_retries_server_errors(self, mock_post, mock_sleep):
+        """Verify a search is retried after a 5xx and then succeeds."""
+        from src.api import check_exists
+
+        mock_post.side_effect = [_response(503), _response(200, '"1"')]
+
+        assert check_exists("Retry.Release") is True
+        assert mock_post.call_count == 2
+        mock_sleep.assert_called_once()
+
+    def test_rejected_search_not_retried(self, mock_post, mock_sleep):
+        """Verify a 4xx other than 429 fails at once."""
+        from src.api import TrackerError, check_exists
+
+        mock_post.return_value = _response(400)
+
+        with pytest.raises(TrackerError):
+            check_exists("Bad.Release")
+        assert mock_post.call_count == 1
+
+    def test_upload_not_resent_after_read_timeout(self, mock_post, mock_sleep, tmp_path):
+        """Verify an upload that may have reached TL is not sent twice."""
+        from src.api import TrackerError, upload_torrent
+
+        mock_post.side_effect = httpx.ReadTimeout("slow")
+        (tmp_path / "a.torrent").write_bytes(b"t")
+        (tmp_path / "a.nfo").write_bytes(b"n")
+
+        with pytest.raises(TrackerError) as exc_info:
+            upload_torrent(tmp_path / "a.torrent", tmp_path / "a.nfo", 31, "")
+        assert exc_info.value.kind == "timeout"
+        assert mock_post.call_count == 1
+
+    def test_upload_retried_when_never_sent(self, mock_post, mock_sleep, tmp_path):
+        """Verify an upload whose connection failed is retried."""
+        from src.api import upload_torrent
+
+        mock_post.side_effect = [httpx.ConnectError("refused"), _response(200, "4242")]
+        (tmp_path / "a.torrent").write_bytes(b"t")
+        (tmp_path / "a.nfo").write_bytes(b"n")
+
+        result = upload_torrent(tmp_path / "a.torrent", tmp_path / "a.nfo", 31, "")
+
+        assert result == {"success": True, "torrent_id": 4242}
+        assert mock_post.call_count == 2
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def _error(self, kind="server"):
+        from src.api import TrackerError
+
+        return TrackerError(kind, "boom")
+
+    def test_opens_after_threshold(self):
+        """Verify consecutive outage errors open the breaker."""
+        from src.api import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=10, clock=_Clock())
+        for _ in range(2):
+            breaker.record_failure(self._error())
+        assert breaker.allow()
+        breaker.record_failure(self._error())
+
+        assert breaker.is_open()
+        assert not breaker.allow()
+        assert breaker.stats()["state"] == "open"
+        assert breaker.stats()["retry_in"] == 10
+
+    def test_rejected_requests_do_not_count(self):
+        """Verify a tracker that answers with a 4xx is treated as up."""
+        from src.api import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1, clock=_Clock())
+        breaker.record_failure(self._error("rejected"))
+
+        assert not breaker.is_open()
+        assert breaker.stats()["consecutive_failures"] == 0
+
+    def test_half_open_probe(self):
+        """Verify one probe is let through after the pause and decides the state."""
+        from src.api import CircuitBreaker
+
+        clock = _Clock()
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=10, clock=clock)
+        breaker.record_failure(self._error())
+        clock.now = 10
+
+        assert breaker.allow()
+        assert not breaker.allow()  # Probe already claimed
+        breaker.record_failure(self._error())
+        assert breaker.stats()["retry_in"] == 20  # Pause doubled
+
+        clock.now = 30
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.stats()["state"] == "closed"
+        assert breaker.allow()
+
+    @patch("src.api.time.sleep")
+    @patch("src.api.ANNOUNCE_KEY", "test-key-123")
+    @patch("src.api.httpx.Client.post")
+    def test_open_breaker_fails_fast(self, mock_post, mock_sleep):
+        """Verify no request is sent while the shared breaker is open."""
+        from src.api import CircuitOpenError, check_exists, tracker_breaker
+
+        mock_post.return_value = _response(503)
+        breaker = tracker_breaker()
+        with patch.object(breaker, "failure_threshold", 2):
+            with pytest.raises(CircuitOpenError):
+                check_exists("Down.Release")
+            calls = mock_post.call_count
+            with pytest.raises(CircuitOpenError):
+                check_exists("Down.Release")
+
+        assert calls == 2
+        assert mock_post.call_count == 2
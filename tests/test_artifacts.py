@@ -0,0 +1,132 @@
+"""Tests for the artifact staging store in src/artifacts.py."""
+
+from src.artifacts import STALE_HOURS, Artifact, ArtifactStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestArtifactStore:
+    """Tests for ArtifactStore."""
+
+    def test_small_artifacts_stay_in_memory(self, tmp_path):
+        """Verify artifacts under the spill threshold never touch disk."""
+        store = ArtifactStore(spill_bytes=100)
+        staging = store.open(1, tmp_path)
+
+        nfo = staging.put("Release.nfo", b"nfo text")
+
+        assert nfo.in_memory
+        assert nfo.open().read() == b"nfo text"
+        assert str(nfo) == "Release.nfo"
+        assert list(tmp_path.iterdir()) == []
+        assert staging.get("Release.nfo") is nfo
+
+    def test_large_artifacts_spill_to_disk(self, tmp_path):
+        """Verify artifacts over the threshold are written to the output dir."""
+        store = ArtifactStore(spill_bytes=4)
+        staging = store.open(1, tmp_path)
+
+        torrent = staging.put("Release.torrent", b"d" * 10)
+
+        assert torrent.path == tmp_path / "Release.torrent"
+        assert torrent.path.read_bytes() == b"d" * 10
+        assert store.stats()["spilled_bytes"] == 10
+
+        staging.discard()
+        assert not torrent.path.exists()
+        assert store.stats()["bytes"] == 0
+
+    def test_adopt_reads_small_files_into_memory(self, tmp_path):
+        """Verify a thumbnail written by ffmpeg is taken into memory and deleted."""
+        store = ArtifactStore(spill_bytes=100)
+        thumb = tmp_path / "Release.jpg"
+        thumb.write_bytes(b"jpeg")
+
+        artifact = store.open(1, tmp_path).adopt(thumb)
+
+        assert artifact.in_memory
+        assert artifact.read_bytes() == b"jpeg"
+        assert not thumb.exists()
+
+    def test_replacing_an_artifact_changes_its_stamp(self, tmp_path):
+        """Verify a rebuilt artifact does not match the old one's checkpoint stamp."""
+        store = ArtifactStore()
+        staging = store.open(1, tmp_path)
+
+        old = staging.put("Release.nfo", b"one")
+        new = staging.put("Release.nfo", b"two")
+
+        assert old.stamp() != new.stamp()
+        assert not old.intact()
+        assert staging.get("Release.nfo") is new
+        assert store.stats()["bytes"] == 3
+
+    def test_budget_evicts_unpinned_items_lru(self, tmp_path):
+        """Verify over-budget stores evict the least recently used failed item."""
+        store = ArtifactStore(budget_bytes=25)
+        first = store.open(1, tmp_path)
+        first.put("a.nfo", b"x" * 10)
+        first.close()
+        second = store.open(2, tmp_path)
+        second.put("b.nfo", b"x" * 10)
+        second.close()
+        store.get(1, "a.nfo")  # Item 1 is now the most recently used
+
+        store.open(3, tmp_path).put("c.nfo", b"x" * 10)
+
+        assert store.get(1, "a.nfo") is not None
+        assert store.get(2, "b.nfo") is None
+        assert store.stats()["evictions"] == 1
+
+    def test_pinned_items_are_never_evicted(self, tmp_path):
+        """Verify in-flight items survive even when the budget is exceeded."""
+        store = ArtifactStore(budget_bytes=5)
+        staging = store.open(1, tmp_path)
+
+        staging.put("a.nfo", b"x" * 10)
+        assert staging.get("a.nfo") is not None
+
+        staging.close()
+        assert staging.get("a.nfo") is None
+        assert store.stats()["bytes"] == 0
+
+    def test_unpinned_put_keeps_the_new_artifact(self, tmp_path):
+        """Verify a put outside open() is not evicted by its own over-budget trim."""
+        store = ArtifactStore(budget_bytes=5)
+
+        artifact = store.put(1, "a.nfo", b"x" * 10, tmp_path)
+
+        assert store.get(1, "a.nfo") is artifact
+        assert artifact.read_bytes() == b"x" * 10
+
+        # The next trim may take it: it was never pinned
+        store.put(2, "b.nfo", b"x", tmp_path)
+        assert store.get(1, "a.nfo") is None
+
+    def test_stale_items_dropped_under_budget(self, tmp_path):
+        """Verify failed items untouched for STALE_HOURS are dropped."""
+        clock = _Clock()
+        store = ArtifactStore(clock=clock)
+        staging = store.open(1, tmp_path)
+        staging.put("a.nfo", b"x")
+        staging.close()
+
+        clock.now += STALE_HOURS * 3600 + 1
+        store.open(2, tmp_path).put("b.nfo", b"y")
+
+        assert store.get(1, "a.nfo") is None
+        assert store.get(2, "b.nfo") is not None
+
+    def test_write_to_exports_copy(self, tmp_path):
+        """Verify an in-memory artifact can be written out for inspection."""
+        artifact = Artifact("Release.nfo", b"nfo")
+
+        dest = artifact.write_to(tmp_path / "Release.nfo")
+
+        assert dest.read_bytes() == b"nfo"
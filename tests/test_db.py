@@ -303,3 +303,374 @@ class TestWalMode:
         ).fetchone()
         assert row["certainty_score"] == 75
         assert row["approval_status"] == "pending_approval"
+
+
+class TestConnectionPool:
+    """Tests for the thread-local connection pool behind db()."""
+
+    def test_same_thread_reuses_connection(self, db_conn):
+        """Verify sequential db() blocks on one thread share a connection."""
+        import src.db as db_module
+
+        with db_module.db() as first:
+            pass
+        with db_module.db() as second:
+            pass
+        assert first is second
+
+    def test_pragmas_applied(self, db_conn):
+        """Verify tuned PRAGMAs are set on pooled connections."""
+        assert db_conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert db_conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert db_conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_threads_get_separate_connections(self, db_conn):
+        """Verify each thread gets its own connection."""
+        import threading
+
+        import src.db as db_module
+
+        seen = []
+
+        def grab():
+            with db_module.db() as conn:
+                seen.append(conn)
+
+        t = threading.Thread(target=grab)
+        t.start()
+        t.join()
+        assert seen and seen[0] is not db_conn
+
+    def test_nested_block_defers_commit_to_outer(self, db_conn):
+        """Verify an error in the outermost block rolls back nested writes."""
+        import threading
+
+        import src.db as db_module
+
+        shared = []
+
+        def run():
+            try:
+                with db_module.db() as outer:
+                    with db_module.db() as inner:
+                        shared.append(inner is outer)
+                        db_module.set_setting(inner, "nested_key", "1")
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+
+        t = threading.Thread(target=run)
+        t.start()
+        t.join()
+
+        assert shared == [True]
+        assert db_module.get_setting(db_conn, "nested_key") == ""
+
+    def test_dead_thread_connections_reaped(self, db_conn):
+        """Verify connections owned by finished threads are closed."""
+        import threading
+
+        import src.db as db_module
+
+        def grab():
+            with db_module.db() as conn:
+                conn.execute("SELECT 1")
+
+        t = threading.Thread(target=grab)
+        t.start()
+        t.join()
+
+        stats = db_module.pool_stats()
+        assert stats["open"] == 1
+        assert stats["closed"] >= 1
+        assert stats["reused"] >= 1
+
+
+class TestSchemaMigrations:
+    """Tests for versioned schema migrations."""
+
+    def test_schema_version_recorded(self, db_conn):
+        """Verify init_db records the latest schema version."""
+        from src.db import SCHEMA_VERSION, get_schema_version
+
+        assert get_schema_version(db_conn) == SCHEMA_VERSION
+
+    def test_queue_indexes_created(self, db_conn):
+        """Verify hot-path queue indexes exist."""
+        names = {
+            r["name"]
+            for r in db_conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='queue'"
+            )
+        }
+        assert "idx_queue_status_approval_id" in names
+        assert "idx_queue_path" in names
+        assert "idx_queue_status_created" in names
+
+    def test_worker_poll_uses_index(self, db_conn):
+        """Verify the worker poll query is answered from an index."""
+        plan = db_conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM queue WHERE status = 'queued' "
+            "AND approval_status = 'approved' ORDER BY id ASC LIMIT 1"
+        ).fetchall()
+        detail = " ".join(r["detail"] for r in plan)
+        assert "idx_queue_status_approval_id" in detail
+        assert "TEMP B-TREE" not in detail
+
+    def test_init_db_skips_when_current(self, db_conn):
+        """Verify re-running init_db does not re-apply migrations."""
+        import src.db as db_module
+
+        db_conn.commit()
+        db_module.init_db()
+        rows = db_conn.execute("SELECT version FROM schema_version").fetchall()
+        assert [r["version"] for r in rows] == [v for v, _ in db_module.MIGRATIONS]
+
+    def test_upgrades_pre_versioned_database(self, tmp_path, monkeypatch):
+        """Verify a legacy DB without newer columns is migrated in place."""
+        legacy = tmp_path / "legacy.db"
+        conn = sqlite3.connect(legacy)
+        conn.execute(
+            """
+            CREATE TABLE queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                media_type TEXT NOT NULL,
+                path TEXT NOT NULL,
+                release_name TEXT NOT NULL,
+                category INTEGER NOT NULL,
+                tags TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'queued',
+                message TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                torrent_path TEXT,
+                nfo_path TEXT,
+                xml_path TEXT
+            )
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setenv("TORRUP_DB_PATH", str(legacy))
+        monkeypatch.setenv("TORRUP_OUTPUT_DIR", str(tmp_path / "output"))
+
+        import src.config as config
+        import src.db as db_module
+
+        importlib.reload(config)
+        importlib.reload(db_module)
+        db_module.init_db()
+
+        with db_module.db() as conn:
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(queue)")}
+            assert {"imdb", "thumb_path", "approval_status"} <= columns
+            assert db_module.get_schema_version(conn) == db_module.SCHEMA_VERSION
+
+
+class TestSettingsCache:
+    """Tests for the in-process settings cache."""
+
+    def test_warm_cache_serves_without_queries(self, db_conn):
+        """Verify repeated reads hit the cache, not the database."""
+        import src.db as db_module
+
+        db_conn.commit()
+        db_module.get_setting(db_conn, "release_group")
+        loads = db_module.settings_cache_stats()["loads"]
+
+        for _ in range(5):
+            assert db_module.get_setting(None, "release_group") == "torrup"
+
+        stats = db_module.settings_cache_stats()
+        assert stats["loads"] == loads
+        assert stats["hits"] >= 5
+
+    def test_set_setting_invalidates(self, db_conn):
+        """Verify set_setting is visible to the next read."""
+        import src.db as db_module
+
+        db_conn.commit()
+        assert db_module.get_setting(db_conn, "release_group") == "torrup"
+        db_module.set_setting(db_conn, "release_group", "grp")
+        db_conn.commit()
+        assert db_module.get_setting(None, "release_group") == "grp"
+
+    def test_external_commit_detected_via_generation(self, db_conn, monkeypatch, tmp_path):
+        """Verify writes from another connection (e.g. the CLI) invalidate the cache."""
+        import src.db as db_module
+
+        monkeypatch.setattr(db_module.SettingsCache, "RECHECK_SECONDS", 0.0)
+        db_conn.commit()
+        assert db_module.get_setting(db_conn, "release_group") == "torrup"
+
+        other = sqlite3.connect(tmp_path / "torrup.db")
+        other.execute("UPDATE settings SET value = 'external' WHERE key = 'release_group'")
+        other.commit()
+        other.close()
+
+        assert db_module.get_setting(db_conn, "release_group") == "external"
+
+    def test_other_table_commits_keep_cache(self, db_conn, monkeypatch, tmp_path):
+        """Verify heartbeats and status writes elsewhere do not reload settings."""
+        import src.db as db_module
+
+        monkeypatch.setattr(db_module.SettingsCache, "RECHECK_SECONDS", 0.0)
+        db_conn.commit()
+        db_module.get_setting(db_conn, "release_group")
+        loads = db_module.settings_cache_stats()["loads"]
+
+        other = sqlite3.connect(tmp_path / "torrup.db")
+        other.execute("UPDATE media_roots SET last_scan = '2026-01-01T00:00:00Z'")
+        other.commit()
+        other.close()
+
+        assert db_module.get_setting(db_conn, "release_group") == "torrup"
+        assert db_module.settings_cache_stats()["loads"] == loads
+
+    def test_typed_helpers(self, db_conn):
+        """Verify bool/int helpers keep the legacy '1'/'0' semantics."""
+        import src.db as db_module
+
+        db_module.set_setting(db_conn, "flag_on", "1")
+        db_module.set_setting(db_conn, "num_bad", "abc")
+        db_conn.commit()
+
+        assert db_module.get_bool_setting(db_conn, "flag_on") is True
+        assert db_module.get_bool_setting(db_conn, "missing_flag") is False
+        assert db_module.get_bool_setting(db_conn, "missing_flag", default=True) is True
+        assert db_module.get_bool_setting(db_conn, "extract_metadata", default=True) is True
+        assert db_module.get_int_setting(db_conn, "tl_min_uploads_per_month", 0) == 10
+        assert db_module.get_int_setting(db_conn, "num_bad", 7) == 7
+
+
+class TestBulkEnqueue:
+    """Tests for enqueue_items() and the unique path_key."""
+
+    def _item(self, path, **extra):
+        return {"media_type": "music", "path": path, "release_name": "Rel", "category": 31, **extra}
+
+    def test_inserts_batch_and_returns_ids(self, db_conn):
+        """Verify all valid rows are inserted in order and their IDs returned."""
+        import src.db as db_module
+
+        ids = db_module.enqueue_items(db_conn, [self._item(f"/m/{i}") for i in range(200)])
+
+        assert len(ids) == 200
+        rows = db_conn.execute("SELECT id, path, path_key, status FROM queue ORDER BY id").fetchall()
+        assert [r["id"] for r in rows] == ids
+        assert all(r["path"] == r["path_key"] and r["status"] == "queued" for r in rows)
+        assert not db_conn.in_transaction
+
+    def test_dedupes_existing_and_in_batch_paths(self, db_conn):
+        """Verify already-queued and repeated paths are ignored, not errors."""
+        import src.db as db_module
+
+        first = db_module.enqueue_items(db_conn, [self._item("/m/a")])
+        ids = db_module.enqueue_items(
+            db_conn, [self._item("/m/a"), self._item("/m/b"), self._item("/m/b")]
+        )
+
+        assert len(first) == 1
+        assert len(ids) == 1
+        assert db_conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0] == 2
+        assert db_module.queued_paths(db_conn, ["/m/a", "/m/b", "/m/c"]) == {"/m/a", "/m/b"}
+
+    def test_finished_paths_can_be_queued_again(self, db_conn):
+        """Verify a path is free again once its item succeeded or failed."""
+        import src.db as db_module
+
+        first = db_module.enqueue_items(db_conn, [self._item("/m/a"), self._item("/m/b")])
+        db_conn.execute("UPDATE queue SET status = 'success' WHERE id = ?", (first[0],))
+        db_conn.execute("UPDATE queue SET status = 'failed' WHERE id = ?", (first[1],))
+        db_conn.commit()
+
+        assert db_module.queued_paths(db_conn, ["/m/a", "/m/b"]) == set()
+        assert db_module.known_paths(db_conn, ["/m/a", "/m/b", "/m/c"]) == {"/m/a", "/m/b"}
+        assert db_module.known_paths(db_conn, ["/m/a", "/m/b"], retry_failed=True) == {"/m/a"}
+        again = db_module.enqueue_items(db_conn, [self._item("/m/a"), self._item("/m/b")])
+        assert len(again) == 2
+        assert db_module.paths_for_ids(db_conn, again) == {"/m/a", "/m/b"}
+
+    def test_retry_reclaims_key_only_when_free(self, db_conn):
+        """Verify a retried item takes its path_key back unless the path was re-added."""
+        import src.db as db_module
+
+        [old] = db_module.enqueue_items(db_conn, [self._item("/m/a")])
+        [other] = db_module.enqueue_items(db_conn, [self._item("/m/b")])
+        db_conn.execute("UPDATE queue SET status = 'failed' WHERE id IN (?, ?)", (old, other))
+        db_conn.commit()
+        [new] = db_module.enqueue_items(db_conn, [self._item("/m/a")])
+
+        db_conn.execute("UPDATE queue SET status = 'queued' WHERE id IN (?, ?)", (old, other))
+        db_conn.commit()
+
+        keys = dict(db_conn.execute("SELECT id, path_key FROM queue").fetchall())
+        assert keys == {old: None, other: "/m/b", new: "/m/a"}
+
+    def test_caller_transaction_is_not_committed(self, db_conn):
+        """Verify enqueue inside an open transaction leaves the commit to the caller."""
+        import src.db as db_module
+
+        db_conn.execute("INSERT INTO settings (key, value) VALUES ('probe', '1')")
+        ids = db_module.enqueue_items(db_conn, [self._item("/m/a")])
+
+        assert len(ids) == 1
+        assert db_conn.in_transaction
+        db_conn.rollback()
+        assert db_conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0] == 0
+
+    def test_skips_invalid_items(self, db_conn):
+        """Verify items with bad media type, category or status are dropped."""
+        import src.db as db_module
+
+        ids = db_module.enqueue_items(db_conn, [
+            self._item("/m/1", media_type="games"),
+            self._item("/m/2", category="abc"),
+            self._item("/m/3", status="success"),
+            self._item("/m/4", release_name=""),
+            self._item("/m/5", status="duplicate", message="TL match"),
+        ])
+
+        assert len(ids) == 1
+        row = db_conn.execute("SELECT path, status, message FROM queue").fetchone()
+        assert tuple(row) == ("/m/5", "duplicate", "TL match")
+
+    def test_migration_keys_newest_duplicate_path(self, tmp_path, monkeypatch):
+        """Verify legacy duplicate paths survive; only the newest gets path_key."""
+        legacy = tmp_path / "legacy.db"
+        conn = sqlite3.connect(legacy)
+        conn.execute(
+            """
+            CREATE TABLE queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                media_type TEXT NOT NULL, path TEXT NOT NULL, release_name TEXT NOT NULL,
+                category INTEGER NOT NULL, tags TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'queued', message TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+            )
+            """
+        )
+        for status in ("failed", "queued"):
+            conn.execute(
+                "INSERT INTO queue (media_type, path, release_name, category, status, created_at, updated_at) "
+                "VALUES ('music', '/m/dup', 'Rel', 31, ?, '2024-01-01', '2024-01-01')",
+                (status,),
+            )
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setenv("TORRUP_DB_PATH", str(legacy))
+        monkeypatch.setenv("TORRUP_OUTPUT_DIR", str(tmp_path / "output"))
+
+        import src.config as config
+        import src.db as db_module
+
+        importlib.reload(config)
+        importlib.reload(db_module)
+        db_module.init_db()
+
+        with db_module.db() as conn:
+            rows = conn.execute("SELECT status, path_key FROM queue ORDER BY id").fetchall()
+            assert [tuple(r) for r in rows] == [("failed", None), ("queued", "/m/dup")]
+            assert db_module.enqueue_items(conn, [self._item("/m/dup")]) == []
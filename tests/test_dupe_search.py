@@ -0,0 +1,234 @@
+"""Tests for concurrent TL duplicate searches in src/dupe_search.py."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from unittest.mock import patch
+
+import pytest
+
+from src.dupe_search import DupeSearch, TokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Tests for the adaptive rate limiter."""
+
+    def test_burst_then_paced(self):
+        """Verify a full bucket allows a burst, then one token per 1/rate."""
+        clock = _Clock()
+        bucket = TokenBucket(2.0, clock=clock)
+
+        assert [bucket.delay() for _ in range(2)] == [0.0, 0.0]
+        assert bucket.delay() == pytest.approx(0.5)
+        clock.now += 0.5
+        assert bucket.delay() == 0.0
+
+    def test_throttle_halves_rate_and_pauses(self):
+        """Verify a 429 halves the rate and honours Retry-After."""
+        clock = _Clock()
+        bucket = TokenBucket(4.0, clock=clock)
+
+        bucket.throttle(retry_after=3)
+
+        assert bucket.rate == 2.0
+        assert bucket.throttled == 1
+        assert bucket.delay() == pytest.approx(3)
+        clock.now += 3
+        assert bucket.delay() == pytest.approx(0.5)
+
+    def test_rate_floor_and_recovery_ceiling(self):
+        """Verify the rate stays between min_rate and the configured rate."""
+        bucket = TokenBucket(1.0, min_rate=0.25, clock=_Clock())
+
+        for _ in range(10):
+            bucket.throttle(retry_after=0)
+        assert bucket.rate == 0.25
+
+        for _ in range(100):
+            bucket.recover()
+        assert bucket.rate == 1.0
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    """TL search stand-in: matches queries in server.hits, throttles on demand."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        query = form["query"][0].strip("'")
+        server = self.server
+        with server.lock:
+            server.queries.append(query)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            throttle = server.throttle_first > 0 or server.always_fail
+            if server.throttle_first > 0:
+                server.throttle_first -= 1
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        if throttle:
+            self.send_response(429 if not server.always_fail else 503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b'"1"' if query in server.hits else b'"0"'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def search_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SearchHandler)
+    server.lock = threading.Lock()
+    server.queries = []
+    server.hits = set()
+    server.active = server.peak = 0
+    server.delay = 0
+    server.throttle_first = 0
+    server.always_fail = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/search"
+    with patch("src.api.ANNOUNCE_KEY", "k"), patch("src.api.TL_SEARCH_URL", url):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSearchMany:
+    """Tests for DupeSearch.search_many()."""
+
+    def test_results_for_every_item(self, search_server):
+        """Verify each key gets a result and fallback queries are tried."""
+        search_server.hits = {"A", "C fallback"}
+        items = [("a", ["A"]), ("b", ["B"]), ("c", ["C", "C fallback"])]
+
+        results = dict(DupeSearch(concurrency=2, rate=100).search_many(items))
+
+        assert results == {"a": True, "b": False, "c": True}
+        assert "A fallback" not in search_server.queries
+
+    def test_runs_searches_concurrently(self, search_server):
+        """Verify up to `concurrency` searches are in flight at once."""
+        search_server.delay = 0.2
+        items = [(n, [f"Q{n}"]) for n in range(8)]
+
+        start = time.monotonic()
+        results = list(DupeSearch(concurrency=4, rate=100).search_many(items))
+        elapsed = time.monotonic() - start
+
+        assert len(results) == 8
+        assert search_server.peak == 4
+        assert elapsed < 1.2  # 8 x 0.2s serially
+
+    def test_throttled_searches_retry_and_slow_down(self, search_server):
+        """Verify 429s are retried and lower the rate."""
+        search_server.throttle_first = 2
+        search_server.hits = {"Q1"}
+        engine = DupeSearch(concurrency=1, rate=100)
+
+        results = dict(engine.search_many([(1, ["Q1"]), (2, ["Q2"])]))
+
+        assert results == {1: True, 2: False}
+        assert engine.bucket.throttled == 2
+        assert engine.bucket.rate < 100
+
+    def test_gives_up_with_none(self, search_server):
+        """Verify a search that keeps failing is reported as None."""
+        search_server.always_fail = True
+        engine = DupeSearch(concurrency=1, rate=100)
+
+        with patch("src.dupe_search.MAX_ATTEMPTS", 2):
+            results = list(engine.search_many([("x", ["X"])]))
+
+        assert results == [("x", None)]
+        assert engine.failed == 1
+        assert len(search_server.queries) == 2
+
+    def test_open_circuit_pauses_scan(self, search_server):
+        """Verify failures trip the tracker breaker and the rest wait for the next scan."""
+        from src.api import tracker_breaker
+
+        search_server.always_fail = True
+        engine = DupeSearch(concurrency=1, rate=100)
+        items = [(n, [f"Q{n}"]) for n in range(5)]
+
+        with patch("src.dupe_search.MAX_ATTEMPTS", 1), patch.object(tracker_breaker(), "failure_threshold", 2):
+            results = dict(engine.search_many(items))
+
+        assert tracker_breaker().stats()["state"] == "open"
+        assert len(search_server.queries) == 2
+        assert all(results.get(n) is None for n in range(5))
+
+    def test_no_announce_key_skips_network(self):
+        """Verify nothing is searched without a passkey."""
+        with patch("src.api.ANNOUNCE_KEY", ""):
+            results = list(DupeSearch().search_many([("a", ["A"])]))
+        assert results == [("a", False)]
+
+    def test_cancel_stops_feeding(self, search_server):
+        """Verify a set cancel event stops new items being searched."""
+        cancel = threading.Event()
+
+        def items():
+            yield 1, ["Q1"]
+            cancel.set()
+            yield 2, ["Q2"]
+
+        results = list(DupeSearch(rate=100).search_many(items(), cancel=cancel))
+
+        assert [key for key, _ in results] == [1]
+
+    def test_input_errors_propagate(self, search_server):
+        """Verify an exception from the item iterable reaches the caller."""
+        def items():
+            yield 1, ["Q1"]
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(DupeSearch(rate=100).search_many(items()))
+
+
+class TestSearchManyCache:
+    """Tests for DupeSearch with the search cache."""
+
+    def test_rescan_makes_no_requests(self, search_server, tmp_path, monkeypatch):
+        """Verify a second batch of the same queries is answered from the cache."""
+        import importlib
+
+        monkeypatch.setenv("TORRUP_DB_PATH", str(tmp_path / "torrup.db"))
+        import src.config as config
+        import src.db as db_module
+
+        importlib.reload(config)
+        importlib.reload(db_module)
+        db_module.init_db()
+
+        search_server.hits = {"A"}
+        items = [("a", ["A"]), ("b", ["B"])]
+        engine = DupeSearch(rate=100, use_cache=True)
+
+        first = dict(engine.search_many(items))
+        requests = len(search_server.queries)
+        second = dict(engine.search_many(items))
+
+        assert first == second == {"a": True, "b": False}
+        assert len(search_server.queries) == requests == 2
+        assert engine.cached == 2
@@ -0,0 +1,138 @@
+"""Tests for the persistent exiftool pool in src/utils/exiftool.py."""
+
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.utils.exiftool import ExifToolError, ExifToolPool, ExifToolProcess
+
+# Speaks the -stay_open protocol: echoes its arguments and pid as JSON.
+# "crash" makes it exit mid-command, "hang" makes it never answer.
+FAKE_EXIFTOOL = """#!{python}
+import json, os, sys, time
+args = []
+for line in sys.stdin:
+    line = line.rstrip("\\n")
+    if line == "-stay_open" or (args and args[-1] == "-stay_open" and line == "False"):
+        if line == "False":
+            sys.exit(0)
+        args.append(line)
+        continue
+    if line.startswith("-execute"):
+        if "crash" in args:
+            sys.exit(1)
+        if "hang" in args:
+            time.sleep(30)
+        sys.stdout.write(json.dumps([{{"args": args, "pid": os.getpid()}}]) + "\\n")
+        sys.stdout.write("{{ready" + line[len("-execute"):] + "}}\\n")
+        sys.stdout.flush()
+        args = []
+        continue
+    args.append(line)
+"""
+
+
+@pytest.fixture()
+def fake_exiftool(tmp_path):
+    """Path to an executable that emulates exiftool -stay_open."""
+    script = tmp_path / "exiftool"
+    script.write_text(FAKE_EXIFTOOL.format(python=sys.executable))
+    script.chmod(0o755)
+    return str(script)
+
+
+class TestExifToolProcess:
+    """Tests for ExifToolProcess."""
+
+    def test_execute_reuses_one_process(self, fake_exiftool):
+        """Verify consecutive commands run on the same process."""
+        proc = ExifToolProcess(fake_exiftool)
+        try:
+            first = json.loads(proc.execute("-json", "/music/a.flac"))
+            second = json.loads(proc.execute("-json", "/music/b.flac"))
+        finally:
+            proc.close()
+
+        assert first[0]["args"] == ["-json", "/music/a.flac"]
+        assert second[0]["args"] == ["-json", "/music/b.flac"]
+        assert first[0]["pid"] == second[0]["pid"]
+        assert not proc.alive
+
+    def test_timeout_kills_process(self, fake_exiftool):
+        """Verify a hung command raises TimeoutExpired and kills the process."""
+        proc = ExifToolProcess(fake_exiftool)
+        with pytest.raises(subprocess.TimeoutExpired):
+            proc.execute("hang", timeout=0.5)
+        assert not proc.alive
+
+    def test_crash_raises_exiftool_error(self, fake_exiftool):
+        """Verify a process that exits mid-command raises ExifToolError."""
+        proc = ExifToolProcess(fake_exiftool)
+        with pytest.raises(ExifToolError):
+            proc.execute("crash")
+
+    def test_missing_binary_raises_exiftool_error(self, tmp_path):
+        """Verify a missing executable surfaces as ExifToolError (an OSError)."""
+        with pytest.raises(OSError):
+            ExifToolProcess(str(tmp_path / "missing"))
+
+
+class TestExifToolPool:
+    """Tests for ExifToolPool."""
+
+    def test_pool_restarts_after_crash(self, fake_exiftool):
+        """Verify a dead process is replaced on the next request."""
+        pool = ExifToolPool(size=1, executable=fake_exiftool)
+        try:
+            before = json.loads(pool.execute("x"))[0]["pid"]
+            with pytest.raises(ExifToolError):
+                pool.execute("crash")
+            after = json.loads(pool.execute("y"))[0]["pid"]
+        finally:
+            pool.close()
+
+        assert before != after
+        stats = pool.stats()
+        assert stats["requests"] == 3
+        assert stats["restarts"] == 2  # crash, then the retry also crashed
+
+    def test_pool_retries_when_idle_process_died(self, fake_exiftool):
+        """Verify a process that died while idle is retried transparently."""
+        pool = ExifToolPool(size=1, executable=fake_exiftool)
+        try:
+            pool.execute("x")
+            idle = pool._idle.queue[0]
+            # Make the next write succeed but the read hit EOF
+            idle.proc.stdin.write(b"crash\n")
+            out = json.loads(pool.execute("y"))
+        finally:
+            pool.close()
+
+        assert out[0]["args"] == ["y"]
+
+    def test_pool_runs_in_parallel_up_to_size(self, fake_exiftool):
+        """Verify concurrent requests get separate processes, then reuse them."""
+        pool = ExifToolPool(size=3, executable=fake_exiftool)
+        pids = []
+        lock = threading.Lock()
+
+        def work(n):
+            pid = json.loads(pool.execute(f"file{n}"))[0]["pid"]
+            with lock:
+                pids.append(pid)
+
+        try:
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(12)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            pool.close()
+
+        assert len(pids) == 12
+        assert 1 <= len(set(pids)) <= 3
+        assert pool.stats()["started"] == len(set(pids))
@@ -0,0 +1,119 @@
+"""Tests for SQLite maintenance in src/maintenance.py."""
+
+import io
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+pytestmark = pytest.mark.reload("src.maintenance")
+
+
+def _fill_and_clear(db_module, rows=2000):
+    """Insert then delete enough rows to leave free pages and a large WAL."""
+    with db_module.db() as conn:
+        conn.executemany(
+            "INSERT INTO queue (media_type, path, release_name, category, tags, message, created_at, updated_at) "
+            "VALUES ('music', ?, 'Rel', 31, '', ?, '2024-01-01', '2024-01-01')",
+            [(f"/m/{i}", "x" * 500) for i in range(rows)],
+        )
+        conn.commit()
+        conn.execute("DELETE FROM queue")
+        conn.commit()
+
+
+class TestRunMaintenance:
+    """Tests for run_maintenance()."""
+
+    def test_reclaims_space_and_truncates_wal(self, fresh_db, tmp_path):
+        """Verify vacuum frees pages and checkpoint empties the -wal file."""
+        from src.maintenance import run_maintenance
+
+        _fill_and_clear(fresh_db)
+        with fresh_db.db() as conn:
+            results = run_maintenance(conn)
+            by_task = {r["task"]: r for r in results}
+
+            assert [r["task"] for r in results] == ["optimize", "vacuum", "checkpoint"]
+            assert by_task["vacuum"]["bytes_reclaimed"] > 0
+            assert by_task["checkpoint"]["bytes_reclaimed"] > 0
+            assert all(r["seconds"] >= 0 and "error" not in r for r in results)
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+
+            logged = conn.execute("SELECT task FROM maintenance_log ORDER BY id").fetchall()
+            assert [r[0] for r in logged] == ["optimize", "vacuum", "checkpoint"]
+
+    def test_incremental_vacuum_after_conversion(self, fresh_db):
+        """Verify later runs use incremental_vacuum on the converted database."""
+        from src.maintenance import run_maintenance
+
+        with fresh_db.db() as conn:
+            run_maintenance(conn, ["vacuum"])
+        _fill_and_clear(fresh_db)
+        with fresh_db.db() as conn:
+            (result,) = run_maintenance(conn, ["vacuum"])
+
+        assert result["detail"].startswith("freed ")
+        assert result["bytes_reclaimed"] > 0
+
+    def test_log_is_trimmed(self, fresh_db, monkeypatch):
+        """Verify maintenance_log keeps only the newest LOG_KEEP rows."""
+        import src.maintenance as maintenance
+
+        monkeypatch.setattr(maintenance, "LOG_KEEP", 4)
+        with fresh_db.db() as conn:
+            for _ in range(3):
+                maintenance.run_maintenance(conn, ["optimize", "checkpoint"])
+            assert conn.execute("SELECT COUNT(*) FROM maintenance_log").fetchone()[0] == 4
+
+
+class TestMaintenanceSchedule:
+    """Tests for the due check and cross-process claim."""
+
+    def test_due_when_never_run_and_not_after(self, fresh_db):
+        """Verify a run is due initially and not again within the interval."""
+        from src.maintenance import maintenance_due
+
+        with fresh_db.db() as conn:
+            assert maintenance_due(conn) == ""
+            recent = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+            fresh_db.set_setting(conn, "db_last_maintenance", recent)
+            conn.commit()
+            assert maintenance_due(conn) is None
+
+            fresh_db.set_setting(conn, "db_maintenance_interval", "0")
+            fresh_db.set_setting(conn, "db_last_maintenance", "")
+            conn.commit()
+            assert maintenance_due(conn) is None
+
+    def test_only_one_claimant_wins(self, fresh_db):
+        """Verify compare_and_set_setting lets exactly one caller take the run."""
+        with fresh_db.db() as conn:
+            assert fresh_db.compare_and_set_setting(conn, "db_last_maintenance", "", "t1")
+            assert not fresh_db.compare_and_set_setting(conn, "db_last_maintenance", "", "t2")
+            assert fresh_db.get_setting(conn, "db_last_maintenance") == "t1"
+
+
+class TestDbMaintainCLI:
+    """Tests for `torrup db maintain`."""
+
+    def test_json_output(self, fresh_db):
+        """Verify the CLI runs the selected tasks and reports them as JSON."""
+        from src.cli import main
+
+        captured = io.StringIO()
+        old_stdout = sys.stdout
+        sys.stdout = captured
+        try:
+            code = main(["--json", "db", "maintain", "--task", "checkpoint", "--analyze"])
+        finally:
+            sys.stdout = old_stdout
+
+        assert code == 0
+        data = json.loads(captured.getvalue())
+        assert [r["task"] for r in data] == ["checkpoint"]
+        with fresh_db.db() as conn:
+            assert fresh_db.get_setting(conn, "db_last_maintenance")
@@ -0,0 +1,113 @@
+"""Tests for the release manifest in src/utils/manifest.py."""
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+os.environ.setdefault("TORRUP_OUTPUT_DIR", "/tmp/torrup-test-output")
+
+from src.utils import ReleaseManifest, create_torrent, generate_nfo
+from src.utils.media import _find_local_lyrics
+
+
+def _make_release(root: Path) -> Path:
+    album = root / "Artist - Album"
+    (album / "CD1").mkdir(parents=True)
+    (album / "CD2").mkdir()
+    (album / "cover.jpg").write_bytes(b"x" * 10)
+    (album / "info.nfo").write_text("https://www.imdb.com/title/tt1234567/")
+    (album / "CD1" / "01 Song.mp3").write_bytes(b"x" * 100)
+    (album / "CD1" / "01 Song.lrc").write_text("[00:01]la")
+    (album / "CD2" / "01 Other.flac").write_bytes(b"x" * 1000)
+    (album / "CD2" / "notes.txt").write_text("not lyrics")
+    return album
+
+
+class TestReleaseManifest:
+    """Tests for ReleaseManifest."""
+
+    def test_files_follow_rglob_order(self, tmp_path):
+        """Verify files are listed in the order Path.rglob yields them."""
+        album = _make_release(tmp_path)
+        manifest = ReleaseManifest(album)
+
+        expected = [f for f in album.rglob("*") if f.is_file()]
+        assert manifest.files == expected
+        assert manifest.file_count == 6
+
+    def test_total_size_and_suffix_buckets(self, tmp_path):
+        """Verify sizes are summed and files bucketed by lowercased suffix."""
+        album = _make_release(tmp_path)
+        (album / "CD2" / "02 Loud.FLAC").write_bytes(b"x" * 5)
+        manifest = ReleaseManifest(album)
+
+        assert manifest.total_size == sum(
+            f.stat().st_size for f in album.rglob("*") if f.is_file()
+        )
+        assert len(manifest.by_suffix[".flac"]) == 2
+
+    def test_single_file_release(self, tmp_path):
+        """Verify a single-file release lists just that file."""
+        movie = tmp_path / "Movie.2024.mkv"
+        movie.write_bytes(b"x" * 42)
+        manifest = ReleaseManifest(movie)
+
+        assert manifest.files == [movie]
+        assert manifest.total_size == 42
+        assert manifest.primary_file("movies") == movie
+
+    def test_max_files_raises(self, tmp_path):
+        """Verify releases over the file limit are refused."""
+        for i in range(4):
+            (tmp_path / f"f{i}.txt").touch()
+        with pytest.raises(ValueError, match="more than 3 files"):
+            ReleaseManifest(tmp_path, max_files=3)
+
+    def test_symlinked_directory_not_descended(self, tmp_path):
+        """Verify symlinked directories are skipped like rglob does."""
+        album = _make_release(tmp_path / "lib")
+        (album / "link").symlink_to(album / "CD1", target_is_directory=True)
+        manifest = ReleaseManifest(album)
+
+        assert not any("link" in p.parts for p in manifest.files)
+
+    def test_primary_file_prefers_best_audio(self, tmp_path):
+        """Verify music picks FLAC over an earlier MP3."""
+        album = _make_release(tmp_path)
+        manifest = ReleaseManifest(album)
+
+        assert manifest.primary_file("music").name == "01 Other.flac"
+
+    def test_lyrics_candidates_match_tracks(self, tmp_path):
+        """Verify sidecar lyrics are kept only when they match a track."""
+        album = _make_release(tmp_path)
+        manifest = ReleaseManifest(album)
+
+        assert [p.name for p in manifest.lyrics_candidates()] == ["01 Song.lrc"]
+        assert _find_local_lyrics(album, manifest) == [{"track": "01 Song", "lang": None}]
+
+    def test_top_level_only_release_dir(self, tmp_path):
+        """Verify top_level ignores files in subdirectories."""
+        album = _make_release(tmp_path)
+        (album / "CD1" / "deep.nfo").touch()
+        manifest = ReleaseManifest(album)
+
+        assert manifest.top_level(".nfo") == [album / "info.nfo"]
+
+    @patch("src.utils.nfo.subprocess.run")
+    def test_prepare_steps_reuse_manifest(self, mock_mediainfo, tmp_path):
+        """Verify NFO and torrent steps do not walk the tree again."""
+        album = _make_release(tmp_path)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        mock_mediainfo.return_value = MagicMock(stdout="General\n")
+        manifest = ReleaseManifest(album)
+
+        with patch("src.utils.manifest.os.scandir", side_effect=AssertionError("walked")), \
+                patch.object(Path, "rglob", side_effect=AssertionError("walked")):
+            nfo_path = generate_nfo(album, "Artist-Album", out_dir, "books", manifest=manifest)
+            create_torrent(album, "Artist-Album", out_dir, manifest)
+
+        assert "Files          : 6" in nfo_path.read_text()
@@ -134,17 +134,14 @@ class TestNormalizeMetadata:
 class TestExtractMetadata:
     """Tests for extract_metadata function."""
 
-    @patch("src.utils.metadata.subprocess.run")
+    @patch("src.utils.metadata.run_exiftool")
     def test_extract_metadata_success(self, mock_run, tmp_path):
         """Verify metadata extraction succeeds."""
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout=json.dumps([{
-                "Title": "Test Movie",
-                "ContentCreateDate": "2024-01-15",
-                "Description": "A test movie"
-            }])
-        )
+        mock_run.return_value = json.dumps([{
+            "Title": "Test Movie",
+            "ContentCreateDate": "2024-01-15",
+            "Description": "A test movie"
+        }])
 
         test_file = tmp_path / "movie.mkv"
         test_file.touch()
@@ -155,10 +152,10 @@ class TestExtractMetadata:
         assert result.get("year") == "2024"
         assert result.get("description") == "A test movie"
 
-    @patch("src.utils.metadata.subprocess.run")
+    @patch("src.utils.metadata.run_exiftool")
     def test_extract_metadata_exiftool_failure(self, mock_run, tmp_path):
         """Verify metadata extraction handles exiftool failure."""
-        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        mock_run.return_value = ""
 
         test_file = tmp_path / "movie.mkv"
         test_file.touch()
@@ -167,10 +164,10 @@ class TestExtractMetadata:
 
         assert result == {}
 
-    @patch("src.utils.metadata.subprocess.run")
+    @patch("src.utils.metadata.run_exiftool")
     def test_extract_metadata_empty_result(self, mock_run, tmp_path):
         """Verify metadata extraction handles empty result."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="[]")
+        mock_run.return_value = "[]"
 
         test_file = tmp_path / "movie.mkv"
         test_file.touch()
@@ -179,7 +176,7 @@ class TestExtractMetadata:
 
         assert result == {}
 
-    @patch("src.utils.metadata.subprocess.run")
+    @patch("src.utils.metadata.run_exiftool")
     def test_extract_metadata_timeout(self, mock_run, tmp_path):
         """Verify metadata extraction handles timeout."""
         mock_run.side_effect = subprocess.TimeoutExpired("exiftool", 30)
@@ -191,10 +188,10 @@ class TestExtractMetadata:
 
         assert result == {}
 
-    @patch("src.utils.metadata.subprocess.run")
+    @patch("src.utils.metadata.run_exiftool")
     def test_extract_metadata_json_error(self, mock_run, tmp_path):
         """Verify metadata extraction handles JSON parse error."""
-        mock_run.return_value = MagicMock(returncode=0, stdout="not valid json")
+        mock_run.return_value = "not valid json"
 
         test_file = tmp_path / "movie.mkv"
         test_file.touch()
@@ -542,3 +542,103 @@ class TestScanSourcePrefix:
         # Verify it has a default value
         param = sig.parameters["source"]
         assert param.default != inspect.Parameter.empty, "source should have a default value"
+
+
+# ---------------------------------------------------------------------------
+# /api/queue/page keyset pagination
+# ---------------------------------------------------------------------------
+
+class TestQueuePage:
+    """Tests for GET /api/queue/page."""
+
+    def _insert_items(self, rows):
+        """Insert (media_type, status, updated_at) rows, return list of ids."""
+        import src.db as db_module
+
+        ids = []
+        with db_module.db() as conn:
+            for i, (media_type, status, updated_at) in enumerate(rows):
+                cur = conn.execute(
+                    """
+                    INSERT INTO queue (
+                        media_type, path, release_name, category, tags,
+                        status, message, created_at, updated_at
+                    )
+                    VALUES (?, ?, ?, 31, '', ?, '', '2024-01-01T00:00:00Z', ?)
+                    """,
+                    (media_type, f"/fake/page/{i}", f"Release-{i}", status, updated_at),
+                )
+                ids.append(cur.lastrowid)
+            conn.commit()
+        return ids
+
+    def _walk(self, client, query):
+        """Follow next_cursor until exhausted, return (ids, pages)."""
+        ids, pages, cursor = [], 0, None
+        while True:
+            url = f"/api/queue/page?{query}" + (f"&cursor={cursor}" if cursor else "")
+            data = client.get(url).get_json()
+            ids.extend(i["id"] for i in data["items"])
+            pages += 1
+            cursor = data["next_cursor"]
+            if not cursor:
+                return ids, pages
+
+    def test_pages_by_id_desc_without_gaps(self, client):
+        """Walking cursors yields every row once, newest id first."""
+        ids = self._insert_items([("music", "queued", "2024-01-01T00:00:00Z")] * 7)
+
+        seen, pages = self._walk(client, "limit=3")
+        assert seen == sorted(ids, reverse=True)
+        assert pages == 3
+
+    def test_order_updated_with_ties(self, client):
+        """order=updated sorts by updated_at then id, stable across equal timestamps."""
+        ids = self._insert_items([
+            ("music", "success", "2024-01-02T00:00:00Z"),
+            ("music", "failed", "2024-01-03T00:00:00Z"),
+            ("music", "success", "2024-01-02T00:00:00Z"),
+            ("music", "success", "2024-01-01T00:00:00Z"),
+        ])
+
+        seen, _ = self._walk(client, "order=updated&limit=1")
+        assert seen == [ids[1], ids[2], ids[0], ids[3]]
+
+    def test_filters_and_counts(self, client):
+        """Status/media_type/since narrow items; counts ignore only the status filter."""
+        self._insert_items([
+            ("music", "success", "2024-03-01T00:00:00Z"),
+            ("music", "failed", "2024-03-02T00:00:00Z"),
+            ("movies", "success", "2024-03-03T00:00:00Z"),
+            ("music", "success", "2023-12-01T00:00:00Z"),
+        ])
+
+        res = client.get(
+            "/api/queue/page?status=success&media_type=music&since=2024-01-01"
+        )
+        data = res.get_json()
+        assert res.status_code == 200
+        assert [i["status"] for i in data["items"]] == ["success"]
+        assert data["total"] == 1
+        assert data["counts"] == {"success": 1, "failed": 1}
+        assert data["next_cursor"] is None
+
+    def test_fields_projection(self, client):
+        """Only requested columns are returned."""
+        self._insert_items([("music", "queued", "2024-01-01T00:00:00Z")])
+
+        data = client.get("/api/queue/page?fields=id,status").get_json()
+        assert set(data["items"][0]) == {"id", "status"}
+
+    def test_rejects_invalid_params(self, client):
+        """Unknown fields, statuses, orders and malformed cursors return 400."""
+        for query in (
+            "fields=id,password",
+            "status=bogus",
+            "media_type=games",
+            "order=path",
+            "limit=abc",
+            "cursor=not-a-cursor",
+        ):
+            res = client.get(f"/api/queue/page?{query}")
+            assert res.status_code == 400, query
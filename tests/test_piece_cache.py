@@ -0,0 +1,110 @@
+"""Tests for the piece-hash cache in src/piece_cache.py."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture()
+def album(tmp_path):
+    """A small multi-file release."""
+    root = tmp_path / "album"
+    root.mkdir()
+    (root / "01.flac").write_bytes(os.urandom(70_000))
+    (root / "02.flac").write_bytes(os.urandom(30_000))
+    return root
+
+
+def _pieces(torrent_path):
+    from src.utils.bencode import bdecode
+
+    return bdecode(torrent_path.read_bytes())[b"info"][b"pieces"]
+
+
+class TestPieceHashCache:
+    """Tests for PieceHashCache with create_torrent."""
+
+    def test_unchanged_files_are_not_read(self, fresh_db, album, tmp_path):
+        """Verify a second build of unchanged files hashes nothing."""
+        from src.piece_cache import PieceHashCache, piece_cache_stats
+        from src.utils import create_torrent
+
+        with fresh_db.db() as conn:
+            cache = PieceHashCache(conn)
+            first = _pieces(create_torrent(album, "A", tmp_path, cache=cache))
+            before = piece_cache_stats(conn)
+
+            with patch("src.utils.torrent.hash_pieces", side_effect=AssertionError("hashed")):
+                second = _pieces(create_torrent(album, "B", tmp_path, cache=cache))
+            after = piece_cache_stats(conn)
+
+        assert first == second
+        assert before["entries"] == 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_modified_file_misses(self, fresh_db, album, tmp_path):
+        """Verify a changed mtime gives a new key and fresh hashes."""
+        from src.piece_cache import PieceHashCache, piece_cache_stats
+        from src.utils import create_torrent
+
+        with fresh_db.db() as conn:
+            cache = PieceHashCache(conn)
+            create_torrent(album, "A", tmp_path, cache=cache)
+            misses = piece_cache_stats(conn)["misses"]
+
+            track = album / "01.flac"
+            track.write_bytes(os.urandom(70_000))
+            st = track.stat()
+            os.utime(track, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            pieces = _pieces(create_torrent(album, "B", tmp_path, cache=cache))
+            stats = piece_cache_stats(conn)
+
+        data = (album / "01.flac").read_bytes() + (album / "02.flac").read_bytes()
+        assert stats["misses"] == misses + 1
+        assert stats["entries"] == 2
+        assert len(pieces) == 20 * -(-len(data) // (1 << 15))
+
+    def test_evicts_least_recently_used(self, fresh_db):
+        """Verify the table is trimmed to the byte budget, oldest first."""
+        from src.piece_cache import PieceHashCache
+
+        with fresh_db.db() as conn:
+            cache = PieceHashCache(conn, max_bytes=100)
+            cache.put("a", b"x" * 40, 1024, 1)
+            cache.put("b", b"x" * 40, 1024, 1)
+            conn.execute("UPDATE piece_cache SET last_used_at = '2000-01-01' WHERE key = 'b'")
+            cache.put("c", b"x" * 40, 1024, 1)
+            keys = {r[0] for r in conn.execute("SELECT key FROM piece_cache")}
+
+        assert keys == {"a", "c"}
+
+    def test_zero_budget_disables_cache(self, fresh_db):
+        """Verify piece_cache_max_mb = 0 stores and returns nothing."""
+        from src.piece_cache import PieceHashCache
+
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "piece_cache_max_mb", "0")
+            cache = PieceHashCache(conn)
+            cache.put("a", b"x" * 20, 1024, 1)
+
+            assert cache.get("a") is None
+            assert conn.execute("SELECT COUNT(*) FROM piece_cache").fetchone()[0] == 0
+
+    def test_health_reports_counters(self, client):
+        """Verify /health exposes piece cache counters without scanning the table."""
+        response = client.get("/health")
+        data = response.get_json()
+
+        assert {"hits", "misses", "evictions"} <= set(data["piece_cache"])
+        assert "entries" not in data["piece_cache"]
+        assert "entries" not in data["search_cache"]
+
+    def test_cache_stats_reports_table_sizes(self, client):
+        """Verify /api/stats/caches adds the table counts to the counters."""
+        response = client.get("/api/stats/caches")
+        data = response.get_json()
+
+        assert response.status_code == 200
+        assert {"hits", "misses", "entries", "bytes"} <= set(data["piece_cache"])
+        assert {"hit_rate", "entries", "positive", "lifetime_hits"} <= set(data["search_cache"])
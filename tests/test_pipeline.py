@@ -0,0 +1,195 @@
+"""Tests for the staged prepare/upload pipeline in src/pipeline.py."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+
+def _insert_items(db_module, count):
+    from src.utils import now_iso
+
+    now = now_iso()
+    with db_module.db() as conn:
+        for n in range(count):
+            conn.execute(
+                "INSERT INTO queue (media_type, path, release_name, category, tags, "
+                "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ("music", f"/tmp/item{n}", f"Release-{n}", 31, "", "queued", now, now),
+            )
+
+
+def _job(item):
+    return {"item_id": item["id"], "release_name": item["release_name"], "staging": MagicMock()}
+
+
+def _status(db_module, item_id):
+    with db_module.db() as conn:
+        return conn.execute("SELECT status FROM queue WHERE id = ?", (item_id,)).fetchone()[0]
+
+
+class TestUploadPipeline:
+    """Tests for UploadPipeline."""
+
+    @patch("src.worker.check_activity_after_item")
+    @patch("src.worker.upload_queue_item")
+    @patch("src.worker.prepare_queue_item")
+    def test_prepare_overlaps_upload(self, mock_prepare, mock_upload, mock_check, fresh_db):
+        """Verify the next item is prepared while the previous one uploads."""
+        from src.pipeline import UploadPipeline
+
+        _insert_items(fresh_db, 2)
+        second_prepared = threading.Event()
+        overlapped = []
+        uploaded = []
+
+        def prepare(conn, item, steps):
+            if item["release_name"] == "Release-1":
+                second_prepared.set()
+            return _job(item)
+
+        def upload(conn, job):
+            if job["release_name"] == "Release-0":
+                # Only completes if preparing item 1 does not wait for this upload
+                overlapped.append(second_prepared.wait(5))
+            uploaded.append(job["item_id"])
+            if len(uploaded) == 2:
+                shutdown.set()
+
+        mock_prepare.side_effect = prepare
+        mock_upload.side_effect = upload
+
+        shutdown = threading.Event()
+        pipeline = UploadPipeline(shutdown, poll_seconds=0.05).start()
+        assert shutdown.wait(10)
+        pipeline.join()
+
+        assert overlapped == [True]
+        assert sorted(uploaded) == [1, 2]
+
+    @patch("src.worker.check_activity_after_item")
+    @patch("src.worker.upload_queue_item")
+    @patch("src.worker.prepare_queue_item")
+    def test_handoff_bounds_items_in_flight(
+        self, mock_prepare, mock_upload, mock_check, fresh_db
+    ):
+        """Verify a stalled upload stage stops the prepare stage claiming more."""
+        from src.pipeline import UploadPipeline
+
+        _insert_items(fresh_db, 5)
+        release = threading.Event()
+        prepared = []
+
+        def prepare(conn, item, steps):
+            prepared.append(item["id"])
+            return _job(item)
+
+        mock_prepare.side_effect = prepare
+        mock_upload.side_effect = lambda conn, job: release.wait(5)
+
+        shutdown = threading.Event()
+        pipeline = UploadPipeline(shutdown, handoff_size=1, poll_seconds=0.05).start()
+        # One uploading, one in the hand-off queue, one blocked in put()
+        threading.Event().wait(1.5)
+        assert len(prepared) == 3
+
+        shutdown.set()
+        release.set()
+        pipeline.join()
+
+        # The item that never reached an upload thread is back in the queue
+        assert _status(fresh_db, prepared[-1]) == "queued"
+        assert _status(fresh_db, 5) == "queued"
+
+    @patch("src.worker.check_activity_after_item")
+    @patch("src.worker.upload_queue_item")
+    @patch("src.worker.prepare_queue_item")
+    def test_each_prepare_thread_has_its_own_step_pool(
+        self, mock_prepare, mock_upload, mock_check, fresh_db
+    ):
+        """Verify step threads scale with prepare workers instead of being shared."""
+        from src import worker
+        from src.pipeline import UploadPipeline
+
+        _insert_items(fresh_db, 2)
+        both = threading.Barrier(2, timeout=5)
+        pools = set()
+
+        def prepare(conn, item, steps):
+            pools.add(steps)
+            # Both items are prepared at the same time, one per thread
+            both.wait()
+            return None
+
+        mock_prepare.side_effect = prepare
+
+        shutdown = threading.Event()
+        pipeline = UploadPipeline(shutdown, prepare_workers=2, poll_seconds=0.05).start()
+        threading.Event().wait(0.5)
+        shutdown.set()
+        pipeline.join()
+
+        assert len(pools) == 2
+        assert all(p._max_workers == worker.PREPARE_STEP_WORKERS for p in pools)
+
+    @patch("src.worker.check_activity_after_item")
+    @patch("src.worker.upload_queue_item")
+    @patch("src.worker.prepare_queue_item")
+    def test_skipped_item_is_not_uploaded(
+        self, mock_prepare, mock_upload, mock_check, fresh_db
+    ):
+        """Verify items the prepare stage resolves (e.g. duplicates) skip upload."""
+        from src.pipeline import UploadPipeline
+
+        _insert_items(fresh_db, 1)
+        shutdown = threading.Event()
+
+        def prepare(conn, item, steps):
+            shutdown.set()
+            return None
+
+        mock_prepare.side_effect = prepare
+
+        pipeline = UploadPipeline(shutdown, poll_seconds=0.05).start()
+        pipeline.join()
+
+        assert mock_prepare.called
+        assert not mock_upload.called
+        assert mock_check.called
+
+    @patch("src.worker.check_activity_after_item")
+    @patch("src.worker.upload_queue_item")
+    @patch("src.worker.prepare_queue_item")
+    def test_enqueue_wakes_idle_worker(
+        self, mock_prepare, mock_upload, mock_check, fresh_db
+    ):
+        """Verify an idle pipeline claims a new item without waiting to poll."""
+        import time
+
+        from src.pipeline import UploadPipeline
+
+        prepared = threading.Event()
+        mock_prepare.side_effect = lambda conn, item, steps: prepared.set()
+
+        shutdown = threading.Event()
+        pipeline = UploadPipeline(shutdown).start()
+        threading.Event().wait(0.3)
+        assert not mock_prepare.called
+
+        start = time.monotonic()
+        with fresh_db.db() as conn:
+            fresh_db.enqueue_items(
+                conn,
+                [{"media_type": "music", "path": "/tmp/new", "release_name": "New", "category": 31}],
+            )
+        assert prepared.wait(5)
+        elapsed = time.monotonic() - start
+
+        shutdown.set()
+        pipeline.join()
+
+        assert elapsed < 1
+
+    def test_pipeline_settings_defaults(self, fresh_db):
+        """Verify pipeline sizing defaults to one thread per stage."""
+        from src.pipeline import pipeline_settings
+
+        assert pipeline_settings() == (1, 1, 1)
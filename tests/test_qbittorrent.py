@@ -1,14 +1,32 @@
 """Tests for qBitTorrent integration."""
 
+import threading
 import unittest
 from unittest.mock import MagicMock, patch, mock_open
 from pathlib import Path
 
+import qbittorrentapi
+
+from src.utils.bencode import bencode, info_hash
 from src.utils.qbittorrent import (
+    SeedBatcher,
     add_to_qbt,
+    add_torrents,
     get_qbt_client,
+    qbt_session,
 )
 
+SETTINGS = {
+    "qbt_enabled": "1",
+    "qbt_url": "localhost:8080",
+    "qbt_user": "admin",
+    "qbt_pass": "adminadmin",
+}
+
+
+def _torrent(name: str) -> bytes:
+    return bencode({b"info": {b"name": name.encode(), b"piece length": 16384}})
+
 class TestQBitTorrentUtils(unittest.TestCase):
 
     @patch("src.utils.qbittorrent.get_setting")
@@ -108,3 +126,174 @@ class TestQBitTorrentUtils(unittest.TestCase):
 
         result = add_to_qbt("missing.torrent", "savepath")
         self.assertFalse(result)
+
+
+@patch("src.utils.qbittorrent.get_setting")
+@patch("src.utils.qbittorrent.qbittorrentapi.Client")
+class TestQbtSession(unittest.TestCase):
+    """Tests for the cached qBT session."""
+
+    def setUp(self):
+        self.settings = dict(SETTINGS)
+
+    def _configure(self, mock_client_cls, mock_get_setting):
+        mock_get_setting.side_effect = lambda conn, key: self.settings.get(key)
+        mock_client_cls.side_effect = lambda **kwargs: MagicMock()
+
+    def test_client_logs_in_once_and_is_reused(self, mock_client_cls, mock_get_setting):
+        """Verify repeated calls share one logged-in client."""
+        self._configure(mock_client_cls, mock_get_setting)
+        before = qbt_session().stats()["reused"]
+
+        first = get_qbt_client()
+        second = get_qbt_client()
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_client_cls.call_count, 1)
+        first.auth_log_in.assert_called_once()
+        self.assertEqual(qbt_session().stats()["reused"], before + 1)
+
+    def test_settings_change_builds_new_client(self, mock_client_cls, mock_get_setting):
+        """Verify a changed password logs in again with the new credentials."""
+        self._configure(mock_client_cls, mock_get_setting)
+
+        first = get_qbt_client()
+        self.settings["qbt_pass"] = "changed"
+        second = get_qbt_client()
+
+        self.assertIsNot(first, second)
+        self.assertEqual(mock_client_cls.call_args.kwargs["password"], "changed")
+
+    def test_failed_login_is_not_cached(self, mock_client_cls, mock_get_setting):
+        """Verify a rejected login is retried on the next call."""
+        mock_get_setting.side_effect = lambda conn, key: self.settings.get(key)
+        refused = MagicMock()
+        refused.auth_log_in.side_effect = qbittorrentapi.LoginFailed()
+        good = MagicMock()
+        mock_client_cls.side_effect = [refused, good]
+
+        self.assertIsNone(get_qbt_client())
+        self.assertIs(get_qbt_client(), good)
+
+    def test_call_reconnects_once_after_lost_session(self, mock_client_cls, mock_get_setting):
+        """Verify a dropped connection rebuilds the client and retries the call."""
+        self._configure(mock_client_cls, mock_get_setting)
+        calls = []
+
+        def version(client):
+            calls.append(client)
+            if len(calls) == 1:
+                raise qbittorrentapi.APIConnectionError("connection reset")
+            return "v5.0.0"
+
+        before = qbt_session().stats()["reconnects"]
+        self.assertEqual(qbt_session().call(version), "v5.0.0")
+        self.assertIsNot(calls[0], calls[1])
+        self.assertEqual(qbt_session().stats()["reconnects"], before + 1)
+
+    def test_call_gives_up_after_second_failure(self, mock_client_cls, mock_get_setting):
+        """Verify the retry happens only once."""
+        self._configure(mock_client_cls, mock_get_setting)
+
+        def down(client):
+            raise qbittorrentapi.APIConnectionError("refused")
+
+        with self.assertRaises(qbittorrentapi.APIConnectionError):
+            qbt_session().call(down)
+        self.assertEqual(mock_client_cls.call_count, 2)
+
+
+class TestAddTorrents(unittest.TestCase):
+    """Tests for batched torrent adds."""
+
+    @patch("src.utils.qbittorrent.get_qbt_client")
+    def test_one_request_per_save_path_with_per_torrent_results(self, mock_get_client):
+        """Verify torrents sharing a save path go in one request and are checked by hash."""
+        mock_client = MagicMock()
+        mock_client.torrents_add.return_value = "Ok."
+        a, b, c = _torrent("a"), _torrent("b"), _torrent("c")
+        # qBT took a and c, but rejected b
+        mock_client.torrents_info.return_value = [
+            MagicMock(hash=info_hash(a).upper()),
+            MagicMock(hash=info_hash(c)),
+        ]
+        mock_get_client.return_value = mock_client
+
+        results = add_torrents([
+            (1, a, "/music/A/album"),
+            (2, b, "/music/A/other"),
+            (3, c, "/music/A/third"),
+        ])
+
+        self.assertEqual(results, {1: True, 2: False, 3: True})
+        mock_client.torrents_add.assert_called_once()
+        kwargs = mock_client.torrents_add.call_args.kwargs
+        self.assertEqual(kwargs["save_path"], "/music/A")
+        self.assertEqual(len(kwargs["torrent_files"]), 3)
+
+    @patch("src.utils.qbittorrent.get_qbt_client")
+    def test_groups_by_save_path(self, mock_get_client):
+        """Verify different save paths are sent as separate requests."""
+        mock_client = MagicMock()
+        mock_client.torrents_add.return_value = "Ok."
+        mock_get_client.return_value = mock_client
+
+        results = add_torrents([(1, _torrent("a"), "/music/x"), (2, _torrent("b"), "/movies/y")])
+
+        self.assertEqual(results, {1: True, 2: True})
+        self.assertEqual(mock_client.torrents_add.call_count, 2)
+        mock_client.torrents_info.assert_not_called()
+
+    @patch("src.utils.qbittorrent.get_qbt_client")
+    def test_missing_file_fails_only_that_torrent(self, mock_get_client):
+        """Verify one unreadable torrent does not sink the batch."""
+        mock_client = MagicMock()
+        mock_client.torrents_add.return_value = "Ok."
+        mock_get_client.return_value = mock_client
+
+        results = add_torrents([(1, "/nonexistent.torrent", "/x/a"), (2, _torrent("b"), "/x/b")])
+
+        self.assertEqual(results, {1: False, 2: True})
+
+    @patch("src.utils.qbittorrent.get_qbt_client")
+    def test_no_client_fails_every_torrent(self, mock_get_client):
+        """Verify every key is reported when qBT is unreachable."""
+        mock_get_client.return_value = None
+
+        self.assertEqual(add_torrents([(1, b"x", "/a/b"), (2, b"y", "/a/c")]), {1: False, 2: False})
+
+
+class TestSeedBatcher(unittest.TestCase):
+    """Tests for SeedBatcher."""
+
+    def test_full_batch_is_sent_immediately(self):
+        """Verify reaching max_size sends the batch without waiting."""
+        add = MagicMock(return_value={1: True, 2: True})
+        batcher = SeedBatcher(delay=60, max_size=2, add=add)
+
+        batcher.submit(1, b"one", "/a/one")
+        add.assert_not_called()
+        batcher.submit(2, b"two", "/a/two")
+
+        add.assert_called_once_with([(1, b"one", "/a/one"), (2, b"two", "/a/two")])
+
+    def test_flush_sends_pending(self):
+        """Verify flush() sends a partial batch and leaves nothing behind."""
+        add = MagicMock(return_value={})
+        batcher = SeedBatcher(delay=60, max_size=10, add=add)
+        batcher.submit(7, b"seven", "/a/seven")
+
+        batcher.flush()
+        batcher.flush()
+
+        add.assert_called_once_with([(7, b"seven", "/a/seven")])
+
+    def test_timer_sends_after_delay(self):
+        """Verify a batch goes out on its own after the delay."""
+        sent = threading.Event()
+        batcher = SeedBatcher(delay=0.01, max_size=10, add=lambda batch: sent.set() or {})
+
+        batcher.submit(1, b"one", "/a/one")
+
+        self.assertTrue(sent.wait(2))
+
@@ -43,6 +43,7 @@ class TestHealthRoute:
         data = res.get_json()
         assert data["status"] == "healthy"
         assert "version" in data
+        assert data["tracker"]["state"] == "closed"
 
     def test_health_returns_unhealthy_on_db_error(self, client, monkeypatch):
         """Verify health endpoint returns unhealthy when DB fails."""
@@ -282,6 +283,38 @@ class TestQueueAddRoute:
         assert data["success"] is True
         assert len(data["ids"]) == 1
 
+    def test_queue_add_batch_dedupes_paths(self, client, music_root):
+        """Verify a batch is queued once per path, including on re-submit."""
+        paths = [_ensure_dir(music_root / f"batch-{i}") for i in range(3)]
+        items = [
+            {"media_type": "music", "path": str(p), "category": 31, "tags": ""}
+            for p in paths + paths[:1]
+        ]
+
+        first = client.post("/api/queue/add", json={"items": items}).get_json()
+        again = client.post("/api/queue/add", json={"items": items}).get_json()
+
+        assert len(first["ids"]) == 3
+        assert first["skipped"] == []
+        assert again["ids"] == []
+        assert again["skipped"] == sorted(str(p) for p in paths)
+
+    def test_queue_add_accepts_finished_path_again(self, client, music_root):
+        """Verify a path whose item already uploaded can be queued again."""
+        import src.db as db_module
+
+        path = _ensure_dir(music_root / "redo")
+        item = {"media_type": "music", "path": str(path), "category": 31, "tags": ""}
+        [item_id] = client.post("/api/queue/add", json={"items": [item]}).get_json()["ids"]
+        with db_module.db() as conn:
+            conn.execute("UPDATE queue SET status = 'success' WHERE id = ?", (item_id,))
+            conn.commit()
+
+        data = client.post("/api/queue/add", json={"items": [item]}).get_json()
+
+        assert len(data["ids"]) == 1
+        assert data["skipped"] == []
+
     def test_queue_add_skips_empty_path(self, client):
         """Verify queue add skips items with empty path."""
         payload = {
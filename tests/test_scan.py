@@ -207,3 +207,82 @@ class TestGenerateReleaseNameMovies:
         name = generate_release_name(meta, "movies", "torrup")
         assert "Inception" in name
         assert "torrup" in name
+
+
+# ---------------------------------------------------------------------------
+# _scan_root -- batched TL searches
+# ---------------------------------------------------------------------------
+
+class _FakeSearch:
+    """DupeSearch stand-in: 'Found' matches, 'Broken' fails, anything else misses."""
+
+    searched = failed = 0
+    batches = []
+
+    def search_many(self, items, exact=False, cancel=None):
+        items = list(items)
+        self.batches.append(items)
+        for key, queries in items:
+            if any("Broken" in q for q in queries):
+                yield key, None
+            else:
+                yield key, any("Found" in q for q in queries)
+
+
+class TestScanRootBatch:
+    """Tests for _scan_root feeding DupeSearch instead of sleeping per entry."""
+
+    def test_records_duplicates_and_queues_missing(self, music_root):
+        """Verify matches become duplicates, misses are queued and failures are left out."""
+        import src.db as db_module
+        from src.auto_worker import _scan_root
+
+        for album in ("Found Album", "New Album", "Broken Album"):
+            (music_root / "Artist" / album).mkdir(parents=True)
+
+        def metadata(path, media_type, manifest=None):
+            return {"artist": "Artist", "album": path.name}
+
+        _FakeSearch.batches = []
+        with patch("src.auto_worker.extract_metadata", side_effect=metadata), \
+                patch("src.auto_worker.DupeSearch.from_settings", return_value=_FakeSearch()), \
+                patch("time.sleep") as sleep:
+            with db_module.db() as conn:
+                root = {"path": str(music_root), "media_type": "music", "default_category": 31}
+                _scan_root(conn, root, [])
+                rows = conn.execute("SELECT path, status FROM queue ORDER BY path").fetchall()
+
+        statuses = {row["path"].rsplit("/", 1)[1]: row["status"] for row in rows}
+        assert statuses == {"Found Album": "duplicate", "New Album": "queued"}
+        assert len(_FakeSearch.batches) == 1
+        assert len(_FakeSearch.batches[0]) == 3
+        sleep.assert_not_called()
+
+    def test_scanned_items_are_claimed_smallest_first(self, music_root):
+        """Verify scans record each release's size so sjf can order them."""
+        import src.db as db_module
+        from src.auto_worker import _scan_root
+        from src.worker import claim_next_item
+
+        for album, size in (("A Boxset", 30_000), ("B Single", 100), ("C Album", 2_000)):
+            (music_root / "Artist" / album).mkdir(parents=True)
+            (music_root / "Artist" / album / "01.flac").write_bytes(b"x" * size)
+
+        def metadata(path, media_type, manifest=None):
+            return {"artist": "Artist", "album": path.name}
+
+        with patch("src.auto_worker.extract_metadata", side_effect=metadata), \
+                patch("src.auto_worker.DupeSearch.from_settings", return_value=_FakeSearch()):
+            with db_module.db() as conn:
+                root = {"path": str(music_root), "media_type": "music", "default_category": 31}
+                _scan_root(conn, root, [])
+                db_module.set_setting(conn, "queue_policy_music", "sjf")
+                conn.execute("UPDATE queue SET approval_status = 'approved'")
+                conn.commit()
+                sizes = dict(conn.execute("SELECT release_name, size_bytes FROM queue").fetchall())
+                order = []
+                while (row := claim_next_item(conn, "test-worker")) is not None:
+                    order.append(row["path"].rsplit("/", 1)[1])
+
+        assert sorted(sizes.values()) == [100, 2_000, 30_000]
+        assert order == ["B Single", "C Album", "A Boxset"]
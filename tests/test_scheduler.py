@@ -0,0 +1,130 @@
+"""Tests for queue scheduling in src/scheduler.py."""
+
+from unittest.mock import patch
+
+import pytest
+
+
+def _add(conn, name, size, media_type="music", priority=0):
+    from src.utils import now_iso
+
+    now = now_iso()
+    return conn.execute(
+        "INSERT INTO queue (media_type, path, release_name, category, tags, status, "
+        "priority, size_bytes, created_at, updated_at) "
+        "VALUES (?, ?, ?, 31, '', 'queued', ?, ?, ?, ?)",
+        (media_type, f"/tmp/{name}", name, priority, size, now, now),
+    ).lastrowid
+
+
+def _claim_order(conn):
+    from src.worker import claim_next_item
+
+    names = []
+    while (row := claim_next_item(conn, "test-worker")) is not None:
+        names.append(row["release_name"])
+    return names
+
+
+class TestScheduler:
+    """Tests for claim order under each policy."""
+
+    def test_fifo_is_default(self, fresh_db):
+        """Verify the default policy claims oldest first."""
+        with fresh_db.db() as conn:
+            _add(conn, "boxset", 80 << 30)
+            _add(conn, "album", 300 << 20)
+            conn.commit()
+            assert _claim_order(conn) == ["boxset", "album"]
+
+    def test_sjf_claims_smallest_first(self, fresh_db):
+        """Verify shortest-job-first skips past a large item at the head."""
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "queue_policy_music", "sjf")
+            _add(conn, "boxset", 80 << 30)
+            _add(conn, "unknown", None)
+            _add(conn, "album", 300 << 20)
+            _add(conn, "single", 20 << 20)
+            conn.commit()
+            assert _claim_order(conn) == ["single", "album", "boxset", "unknown"]
+
+    def test_priority_beats_policy(self, fresh_db):
+        """Verify a higher priority is claimed before smaller items."""
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "queue_policy_music", "sjf")
+            _add(conn, "album", 300 << 20)
+            _add(conn, "boxset", 80 << 30, priority=5)
+            conn.commit()
+            assert _claim_order(conn) == ["boxset", "album"]
+
+    def test_policy_is_per_media_type(self, fresh_db):
+        """Verify each media type's head competes by age across types."""
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "queue_policy_movies", "sjf")
+            _add(conn, "movie-big", 40 << 30, media_type="movies")
+            _add(conn, "album-big", 2 << 30)
+            _add(conn, "movie-small", 4 << 30, media_type="movies")
+            _add(conn, "album-small", 100 << 20)
+            conn.commit()
+            assert _claim_order(conn) == ["album-big", "movie-small", "movie-big", "album-small"]
+
+    @pytest.mark.parametrize("behind, expected", [(False, ["boxset", "album"]), (True, ["album", "boxset"])])
+    def test_deadline_favours_small_items_when_behind(self, fresh_db, behind, expected):
+        """Verify deadline mode is FIFO on track and smallest first when behind."""
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "queue_policy_music", "deadline")
+            _add(conn, "boxset", 80 << 30)
+            _add(conn, "album", 300 << 20)
+            conn.commit()
+            with patch("src.scheduler.activity_behind", return_value=behind):
+                assert _claim_order(conn) == expected
+
+    def test_activity_behind_uses_pace(self, fresh_db):
+        """Verify uploads plus pace over the remaining days is compared to the minimum."""
+        from src.scheduler import activity_behind
+
+        health = {"uploads": 4, "pace": 0.5, "days_remaining": 10}
+        with fresh_db.db() as conn:
+            with patch("src.scheduler.calculate_health", return_value=health):
+                assert activity_behind(conn)  # 4 + 5 < 10
+                fresh_db.set_setting(conn, "tl_min_uploads_per_month", "9")
+                assert not activity_behind(conn)
+
+    def test_enqueue_keeps_given_size_without_walking(self, fresh_db, tmp_path):
+        """Verify enqueue_items stores a passed size and never measures the tree."""
+        album = tmp_path / "album"
+        album.mkdir()
+        (album / "01.flac").write_bytes(b"x" * 1234)
+        item = {"media_type": "music", "path": str(album), "release_name": "A", "category": 31}
+
+        with fresh_db.db() as conn, patch("src.utils.core.get_folder_size") as walk:
+            given, unknown = (
+                fresh_db.enqueue_items(conn, [{**item, "size_bytes": 99}])[0],
+                fresh_db.enqueue_items(conn, [{**item, "path": str(tmp_path)}])[0],
+            )
+            sizes = dict(conn.execute("SELECT id, size_bytes FROM queue").fetchall())
+            priority = conn.execute("SELECT priority FROM queue WHERE id = ?", (given,)).fetchone()[0]
+
+        walk.assert_not_called()
+        assert sizes == {given: 99, unknown: None}
+        assert priority == 0
+
+    def test_schedule_endpoint_and_priority_update(self, client):
+        """Verify /api/queue/schedule reports policies and priority can be edited."""
+        import src.db as db_module
+
+        with db_module.db() as conn:
+            item_id = _add(conn, "album", 1)
+            conn.commit()
+
+        res = client.post("/api/queue/update", json={"id": item_id, "priority": "3"})
+        assert res.status_code == 200
+        assert client.post("/api/queue/update", json={"id": item_id, "priority": "high"}).status_code == 400
+
+        data = client.get("/api/queue/schedule").get_json()
+        with db_module.db() as conn:
+            priority = conn.execute("SELECT priority FROM queue WHERE id = ?", (item_id,)).fetchone()[0]
+
+        assert priority == 3
+        assert data["policies"]["music"] == "fifo"
+        assert set(data["labels"]) == {"fifo", "sjf", "deadline"}
@@ -0,0 +1,116 @@
+"""Tests for the TL search result cache in src/search_cache.py."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _age(db_module, hours):
+    """Backdate every cache entry by `hours`."""
+    stamp = (datetime.utcnow() - timedelta(hours=hours)).isoformat() + "Z"
+    with db_module.db() as conn:
+        conn.execute("UPDATE search_cache SET checked_at = ?", (stamp,))
+        conn.commit()
+
+
+class TestSearchCache:
+    """Tests for cache_lookup() / cache_store()."""
+
+    def test_hit_after_store(self, fresh_db):
+        """Verify a stored result is returned for the normalised query."""
+        from src.search_cache import cache_lookup, cache_store
+
+        assert cache_lookup("Artist Album", False) is None
+        cache_store("Artist Album", False, True)
+
+        assert cache_lookup("  artist   ALBUM ", False) is True
+        assert cache_lookup("Artist Album", True) is None
+
+    def test_negative_ttl_shorter_than_positive(self, fresh_db):
+        """Verify misses expire after search_cache_negative_hours, matches do not."""
+        from src.search_cache import cache_lookup, cache_store
+
+        cache_store("Found", False, True)
+        cache_store("Missing", False, False)
+        _age(fresh_db, 25)
+
+        assert cache_lookup("Found", False) is True
+        assert cache_lookup("Missing", False) is None
+
+    def test_zero_ttl_disables_kind(self, fresh_db):
+        """Verify a TTL of 0 stops that kind of result being cached."""
+        from src.search_cache import cache_lookup, cache_store
+
+        with fresh_db.db() as conn:
+            fresh_db.set_setting(conn, "search_cache_negative_hours", "0")
+        cache_store("Missing", False, False)
+        cache_store("Found", False, True)
+
+        assert cache_lookup("Missing", False) is None
+        assert cache_lookup("Found", False) is True
+
+    def test_invalidate(self, fresh_db):
+        """Verify clearing by query, negatives only and expired only."""
+        from src.search_cache import cache_lookup, cache_store, invalidate_search_cache
+
+        for name, found in (("A", True), ("B", False), ("C", False)):
+            cache_store(name, False, found)
+
+        with fresh_db.db() as conn:
+            assert invalidate_search_cache(conn, query="a") == 1
+            assert invalidate_search_cache(conn, expired_only=True) == 0
+            assert invalidate_search_cache(conn, negative_only=True) == 2
+        assert cache_lookup("B", False) is None
+
+    def test_stats_count_hits(self, fresh_db):
+        """Verify per-entry and process hit counters."""
+        from src.search_cache import cache_lookup, cache_store, search_cache_stats
+
+        with fresh_db.db() as conn:
+            before = search_cache_stats(conn)
+        cache_store("A", False, True)
+        cache_lookup("A", False)
+        cache_lookup("A", False)
+        cache_lookup("Z", False)
+
+        with fresh_db.db() as conn:
+            stats = search_cache_stats(conn)
+        assert stats["entries"] == 1
+        assert stats["positive"] == 1
+        assert stats["lifetime_hits"] == 2
+        assert stats["hits"] - before["hits"] == 2
+        assert stats["misses"] - before["misses"] == 1
+
+
+class TestCheckExistsCache:
+    """Tests for check_exists(use_cache=True)."""
+
+    @patch("src.api.ANNOUNCE_KEY", "k")
+    @patch("src.api.httpx.Client.post")
+    def test_second_check_uses_cache(self, mock_post, fresh_db):
+        """Verify a repeated check makes no API call."""
+        from src.api import check_exists
+
+        mock_post.return_value = MagicMock(status_code=200, text='"0"')
+
+        assert check_exists("Some.Release", use_cache=True) is False
+        assert check_exists("Some.Release", use_cache=True) is False
+        assert mock_post.call_count == 1
+
+        assert check_exists("Some.Release") is False
+        assert mock_post.call_count == 2
+
+    @patch("src.api.ANNOUNCE_KEY", "k")
+    @patch("src.api.httpx.Client.post")
+    @patch("src.api.RETRY_ATTEMPTS", 1)
+    def test_throttled_response_not_cached(self, mock_post, fresh_db):
+        """Verify a non-200 answer is not stored."""
+        from src.api import TrackerError, check_exists
+
+        mock_post.return_value = MagicMock(status_code=429, text="Too Many Requests", headers={})
+
+        for _ in range(2):
+            with pytest.raises(TrackerError):
+                check_exists("Some.Release", use_cache=True)
+        assert mock_post.call_count == 2
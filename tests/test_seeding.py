@@ -0,0 +1,200 @@
+"""Tests for seeding-compliance tracking in src/seeding.py."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+pytestmark = pytest.mark.reload("src.seeding")
+
+
+def _torrent(name, tags="torrup", state="uploading", seeding_time=0, seeds=1, ratio=0.5):
+    return {
+        "name": name,
+        "tags": tags,
+        "state": state,
+        "ratio": ratio,
+        "seeding_time": seeding_time,
+        "num_complete": seeds,
+        "added_on": 1700000000,
+    }
+
+
+def _rows(fresh_db):
+    with fresh_db.db() as conn:
+        return {r["hash"]: dict(r) for r in conn.execute("SELECT * FROM seeding")}
+
+
+def _apply(fresh_db, monitor, data):
+    with fresh_db.db() as conn:
+        rid = monitor._apply(conn, data)
+        conn.commit()
+    return rid
+
+
+class TestSeedingMonitor:
+    """Tests for applying /sync/maindata answers."""
+
+    def test_full_update_tracks_only_torrup_torrents(self, fresh_db):
+        """Verify untagged torrents are ignored."""
+        from src.seeding import SeedingMonitor
+
+        rid = _apply(fresh_db, SeedingMonitor(), {
+            "rid": 1,
+            "full_update": True,
+            "torrents": {
+                "aa": _torrent("Ours"),
+                "bb": _torrent("Theirs", tags="movies"),
+                "cc": _torrent("Also ours", tags="keep, torrup"),
+            },
+        })
+
+        assert rid == 1
+        assert set(_rows(fresh_db)) == {"aa", "cc"}
+        assert _rows(fresh_db)["aa"]["seeds"] == 1
+
+    def test_diff_updates_only_changed_fields(self, fresh_db):
+        """Verify a partial diff leaves the other columns alone."""
+        from src.seeding import SeedingMonitor
+
+        monitor = SeedingMonitor()
+        _apply(fresh_db, monitor, {"rid": 1, "full_update": True, "torrents": {"aa": _torrent("Ours")}})
+
+        rid = _apply(fresh_db, monitor, {"rid": 2, "torrents": {"aa": {"seeding_time": 3600, "ratio": 1.25}}})
+
+        row = _rows(fresh_db)["aa"]
+        assert rid == 2
+        assert row["seeding_time"] == 3600
+        assert row["ratio"] == 1.25
+        assert row["state"] == "uploading"
+        assert row["name"] == "Ours"
+
+    def test_removed_torrents_are_marked(self, fresh_db):
+        """Verify torrents_removed and torrents missing from a full update become removed."""
+        from src.seeding import SeedingMonitor
+
+        monitor = SeedingMonitor()
+        _apply(fresh_db, monitor, {
+            "rid": 1,
+            "full_update": True,
+            "torrents": {"aa": _torrent("A"), "bb": _torrent("B")},
+        })
+
+        _apply(fresh_db, monitor, {"rid": 2, "torrents_removed": ["aa"]})
+        assert _rows(fresh_db)["aa"]["state"] == "removed"
+
+        _apply(fresh_db, monitor, {"rid": 3, "full_update": True, "torrents": {}})
+        assert _rows(fresh_db)["bb"]["state"] == "removed"
+
+    def test_untagged_torrent_is_dropped(self, fresh_db):
+        """Verify removing the torrup tag stops tracking the torrent."""
+        from src.seeding import SeedingMonitor
+
+        monitor = SeedingMonitor()
+        _apply(fresh_db, monitor, {"rid": 1, "full_update": True, "torrents": {"aa": _torrent("A")}})
+
+        _apply(fresh_db, monitor, {"rid": 2, "torrents": {"aa": {"tags": "other"}}})
+
+        assert _rows(fresh_db) == {}
+
+    def test_tag_added_later_forces_full_sync(self, fresh_db):
+        """Verify a diff carrying only a new tag asks for a full answer next time."""
+        from src.seeding import SeedingMonitor
+
+        rid = _apply(fresh_db, SeedingMonitor(), {"rid": 5, "torrents": {"aa": {"tags": "torrup"}}})
+
+        assert rid == 0
+        assert _rows(fresh_db) == {}
+
+    def test_sync_passes_rid_and_resets_on_failure(self, fresh_db):
+        """Verify each sync asks for changes since the last rid."""
+        from src.seeding import SeedingMonitor
+
+        monitor = SeedingMonitor()
+        client = MagicMock()
+        client.sync_maindata.return_value = {"rid": 7, "full_update": True, "torrents": {}}
+        session = MagicMock()
+        session.call.side_effect = lambda fn: fn(client)
+
+        with patch("src.seeding.qbt_session", return_value=session):
+            assert monitor.sync()
+            assert monitor.sync()
+            client.sync_maindata.assert_called_with(rid=7)
+
+            session.call.side_effect = None
+            session.call.return_value = None
+            assert not monitor.sync()
+
+        assert monitor.rid == 0
+        assert monitor.stats()["errors"] == 1
+
+
+class TestSeedingSummary:
+    """Tests for compliance evaluation."""
+
+    def test_flags_torrents_below_minimum_that_stopped_seeding(self, fresh_db):
+        """Verify only torrents below both minimums and not seeding are flagged."""
+        from src.seeding import SeedingMonitor, seeding_summary
+
+        day = 86400
+        _apply(fresh_db, SeedingMonitor(), {
+            "rid": 1,
+            "full_update": True,
+            "torrents": {
+                "aa": _torrent("Long enough", state="stoppedUP", seeding_time=8 * day),
+                "bb": _torrent("Enough copies", state="stoppedUP", seeds=12),
+                "cc": _torrent("On its way", state="stalledUP", seeding_time=day),
+                "dd": _torrent("Stopped early", state="stoppedUP", seeding_time=day),
+                "ee": _torrent("Files gone", state="missingFiles"),
+            },
+        })
+
+        with fresh_db.db() as conn:
+            summary = seeding_summary(conn)
+
+        assert (summary["tracked"], summary["met"], summary["seeding"], summary["flagged"]) == (5, 2, 1, 2)
+        assert {t["name"] for t in summary["torrents"]} == {"Stopped early", "Files gone"}
+        assert summary["min_days"] == 7
+        assert summary["min_copies"] == 10
+
+    def test_prune_drops_removed_torrents_that_met_minimum(self, fresh_db):
+        """Verify compliant removed torrents leave the table, early removals stay."""
+        from src.seeding import SeedingMonitor, prune_seeding
+
+        monitor = SeedingMonitor()
+        _apply(fresh_db, monitor, {
+            "rid": 1,
+            "full_update": True,
+            "torrents": {"aa": _torrent("Done", seeding_time=8 * 86400), "bb": _torrent("Early")},
+        })
+        _apply(fresh_db, monitor, {"rid": 2, "torrents_removed": ["aa", "bb"]})
+
+        with fresh_db.db() as conn:
+            assert prune_seeding(conn) == 1
+            conn.commit()
+
+        assert set(_rows(fresh_db)) == {"bb"}
+
+
+class TestSeedingRoute:
+    """Tests for GET /api/activity/seeding."""
+
+    def test_reads_table_without_qbt(self, client):
+        """Verify the endpoint answers from the table alone."""
+        import src.db as db_module
+
+        with db_module.db() as conn:
+            conn.execute(
+                "INSERT INTO seeding (hash, name, state, seeding_time, seeds, updated_at) "
+                "VALUES ('aa', 'Early', 'stoppedUP', 60, 1, '2026-01-01')"
+            )
+            conn.commit()
+
+        with patch("src.utils.qbittorrent.qbittorrentapi.Client") as mock_client_cls:
+            response = client.get("/api/activity/seeding")
+
+        mock_client_cls.assert_not_called()
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["flagged"] == 1
+        assert data["torrents"][0]["name"] == "Early"
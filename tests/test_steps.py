@@ -0,0 +1,96 @@
+"""Tests for the prepare step graph in src/utils/steps.py."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.steps import run_steps
+
+
+@pytest.fixture()
+def pool():
+    executor = ThreadPoolExecutor(max_workers=3)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+class TestRunSteps:
+    """Tests for run_steps()."""
+
+    def test_results_passed_to_dependents(self, pool):
+        """Verify each step gets its dependencies' results as kwargs."""
+        results = run_steps(
+            {
+                "a": ((), lambda: 2),
+                "b": ((), lambda: 3),
+                "sum": (("a", "b"), lambda a, b: a + b),
+                "double": (("sum",), lambda sum: sum * 2),
+            },
+            pool,
+        )
+
+        assert results == {"a": 2, "b": 3, "sum": 5, "double": 10}
+
+    def test_independent_steps_overlap(self, pool):
+        """Verify steps without dependencies run at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other():
+            barrier.wait()
+            return True
+
+        results = run_steps(
+            {"hash": ((), wait_for_other), "thumb": ((), wait_for_other)}, pool
+        )
+
+        assert results == {"hash": True, "thumb": True}
+
+    def test_error_skips_dependents(self, pool):
+        """Verify a failing step raises and its dependents never run."""
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            run_steps(
+                {
+                    "fail": ((), fail),
+                    "after": (("fail",), lambda fail: ran.append("after")),
+                },
+                pool,
+            )
+
+        assert ran == []
+
+    def test_running_steps_finish_before_error(self, pool):
+        """Verify steps already running complete before the error is raised."""
+        started = threading.Event()
+        finished = []
+
+        def slow():
+            started.set()
+            threading.Event().wait(0.1)
+            finished.append("slow")
+
+        def fail():
+            started.wait(5)
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            run_steps({"slow": ((), slow), "fail": ((), fail)}, pool)
+
+        assert finished == ["slow"]
+
+    def test_unknown_dependency_rejected(self, pool):
+        """Verify a missing dependency is a ValueError before anything runs."""
+        with pytest.raises(ValueError, match="unknown"):
+            run_steps({"a": (("nope",), lambda nope: None)}, pool)
+
+    def test_cycle_rejected(self, pool):
+        """Verify a dependency cycle is a ValueError."""
+        with pytest.raises(ValueError, match="cycle"):
+            run_steps(
+                {"a": (("b",), lambda b: None), "b": (("a",), lambda a: None)}, pool
+            )
@@ -1,24 +1,27 @@
 """Tests for torrent creation in src/utils/torrent.py."""
 
+import hashlib
 import os
+import shutil
 import subprocess
-from unittest.mock import MagicMock, patch
+from pathlib import Path
 
 import pytest
 
 os.environ.setdefault("TORRUP_OUTPUT_DIR", "/tmp/torrup-test-output")
 
-from src.utils import create_torrent
+from src.utils import ReleaseManifest, create_torrent, pick_piece_size
+from src.utils.bencode import bdecode, bencode, info_hash
+from src.utils.torrent import hash_pieces
+
+GOLDEN_TORRENTS = Path(__file__).parent / "fixtures" / "golden_torrents"
 
 
 class TestCreateTorrent:
     """Tests for create_torrent function."""
 
-    @patch("src.utils.torrent.subprocess.run")
-    def test_create_torrent_success(self, mock_run, tmp_path):
-        """Verify torrent creation succeeds with valid input."""
-        mock_run.return_value = MagicMock(returncode=0, stderr="")
-
+    def test_create_torrent_success(self, tmp_path):
+        """Verify a private, source-tagged torrent is written."""
         test_dir = tmp_path / "album"
         test_dir.mkdir()
         (test_dir / "track.flac").write_bytes(b"\x00" * 1024)
@@ -28,56 +31,72 @@ class TestCreateTorrent:
 
         result = create_torrent(test_dir, "Test-Release", out_dir)
 
-        assert mock_run.called
         assert result == out_dir / "Test-Release.torrent"
-
-    @patch("src.utils.torrent.subprocess.run")
-    def test_create_torrent_mktorrent_failure(self, mock_run, tmp_path):
-        """Verify torrent creation handles mktorrent failure."""
-        mock_run.return_value = MagicMock(returncode=1, stderr="mktorrent error")
-
+        torrent = bdecode(result.read_bytes())
+        info = torrent[b"info"]
+        assert info[b"name"] == b"album"
+        assert info[b"private"] == 1
+        assert info[b"source"] == b"TorrentLeech.org"
+        assert info[b"piece length"] == 1 << 15
+        assert info[b"files"] == [{b"length": 1024, b"path": [b"track.flac"]}]
+        assert torrent[b"announce"].startswith(b"https://tracker.torrentleech.org")
+        assert not (out_dir / "Test-Release.torrent.tmp").exists()
+
+    def test_create_torrent_pieces_span_files(self, tmp_path):
+        """Verify pieces hash the files concatenated in sorted path order."""
         test_dir = tmp_path / "album"
-        test_dir.mkdir()
-        (test_dir / "track.flac").write_bytes(b"\x00" * 1024)
-
-        out_dir = tmp_path / "output"
-        out_dir.mkdir()
-
-        with pytest.raises(Exception) as exc_info:
-            create_torrent(test_dir, "Test-Release", out_dir)
-        assert "mktorrent failed" in str(exc_info.value)
-
-    @patch("src.utils.torrent.subprocess.run")
-    def test_create_torrent_timeout(self, mock_run, tmp_path):
-        """Verify torrent creation handles timeout."""
-        mock_run.side_effect = subprocess.TimeoutExpired("mktorrent", 120)
-
+        (test_dir / "CD2").mkdir(parents=True)
+        (test_dir / "CD1").mkdir()
+        (test_dir / "CD2" / "01.flac").write_bytes(os.urandom(50_000))
+        (test_dir / "CD1" / "01.flac").write_bytes(os.urandom(70_001))
+        (test_dir / "CD1.cue").write_bytes(b"cue")
+        (test_dir / "empty.txt").touch()
+
+        result = create_torrent(test_dir, "Test-Release", tmp_path)
+        info = bdecode(result.read_bytes())[b"info"]
+
+        # strcmp order: "CD1.cue" < "CD1/01.flac" because '.' < '/'
+        order = ["CD1.cue", "CD1/01.flac", "CD2/01.flac", "empty.txt"]
+        assert [b"/".join(f[b"path"]).decode() for f in info[b"files"]] == order
+        data = b"".join((test_dir / name).read_bytes() for name in order)
+        piece = info[b"piece length"]
+        expected = b"".join(
+            hashlib.sha1(data[i:i + piece]).digest() for i in range(0, len(data), piece)
+        )
+        assert info[b"pieces"] == expected
+
+    def test_create_torrent_single_file(self, tmp_path):
+        """Verify a single-file release uses length instead of files."""
+        movie = tmp_path / "Movie.2024.mkv"
+        movie.write_bytes(os.urandom(40_000))
+
+        result = create_torrent(movie, "Movie.2024", tmp_path)
+        info = bdecode(result.read_bytes())[b"info"]
+
+        assert info[b"name"] == b"Movie.2024.mkv"
+        assert info[b"length"] == 40_000
+        assert b"files" not in info
+        assert len(info[b"pieces"]) == 20 * 2
+
+    def test_create_torrent_empty_dir(self, tmp_path):
+        """Verify an empty release is refused."""
         test_dir = tmp_path / "album"
         test_dir.mkdir()
-        (test_dir / "track.flac").write_bytes(b"\x00" * 1024)
-
-        out_dir = tmp_path / "output"
-        out_dir.mkdir()
-
-        with pytest.raises(Exception) as exc_info:
-            create_torrent(test_dir, "Test-Release", out_dir)
-        assert "timed out" in str(exc_info.value)
 
-    @patch("src.utils.torrent.subprocess.run")
-    def test_create_torrent_subprocess_error(self, mock_run, tmp_path):
-        """Verify torrent creation handles subprocess error."""
-        mock_run.side_effect = subprocess.SubprocessError("Subprocess failed")
+        with pytest.raises(ValueError, match="no files"):
+            create_torrent(test_dir, "Test-Release", tmp_path)
 
+    def test_create_torrent_file_shrank(self, tmp_path):
+        """Verify a file truncated after the walk fails instead of mis-hashing."""
         test_dir = tmp_path / "album"
         test_dir.mkdir()
-        (test_dir / "track.flac").write_bytes(b"\x00" * 1024)
+        track = test_dir / "track.flac"
+        track.write_bytes(b"\x01" * 4096)
+        manifest = ReleaseManifest(test_dir)
+        track.write_bytes(b"\x01" * 100)
 
-        out_dir = tmp_path / "output"
-        out_dir.mkdir()
-
-        with pytest.raises(Exception) as exc_info:
-            create_torrent(test_dir, "Test-Release", out_dir)
-        assert "subprocess error" in str(exc_info.value)
+        with pytest.raises(ValueError, match="changed while hashing"):
+            create_torrent(test_dir, "Test-Release", tmp_path, manifest)
 
     def test_create_torrent_invalid_path(self, tmp_path, monkeypatch):
         """Verify torrent creation rejects invalid input path."""
@@ -123,19 +142,96 @@ class TestCreateTorrent:
             create_torrent(test_dir, "Test-Release", out_dir)
         assert "Invalid output path" in str(exc_info.value)
 
-    @patch("src.utils.torrent.subprocess.run")
-    def test_create_torrent_mktorrent_not_found(self, mock_run, tmp_path):
-        """Verify error message mentions install instructions when mktorrent is missing."""
-        mock_run.side_effect = FileNotFoundError("No such file or directory: 'mktorrent'")
 
-        test_dir = tmp_path / "album"
-        test_dir.mkdir()
-        (test_dir / "track.flac").write_bytes(b"\x00" * 1024)
-
-        out_dir = tmp_path / "output"
+class TestHashPieces:
+    """Tests for hash_pieces function."""
+
+    def test_parallel_matches_single_thread(self, tmp_path, monkeypatch):
+        """Verify spans hashed on several threads give the same pieces."""
+        monkeypatch.setattr("src.utils.torrent.HASH_SPAN_BYTES", 3 * 1024)
+        files = []
+        for n, size in enumerate((5000, 1, 0, 12_345)):
+            p = tmp_path / f"f{n}"
+            p.write_bytes(os.urandom(size))
+            files.append((p, size, [p.name]))
+
+        seen = []
+        single = hash_pieces(files, 1024, workers=1)
+        parallel = hash_pieces(files, 1024, workers=4, progress=lambda d, t: seen.append((d, t)))
+
+        assert single == parallel
+        assert len(single) == 20 * 17  # ceil(17346 / 1024)
+        assert seen[-1] == (17_346, 17_346)
+        assert [d for d, _ in seen] == sorted(d for d, _ in seen)
+
+
+class TestBencode:
+    """Tests for src/utils/bencode.py."""
+
+    def test_roundtrip_sorts_keys(self):
+        """Verify dict keys are emitted sorted and decode back to bytes."""
+        encoded = bencode({"b": 1, "a": [b"x", "y", -3], "c": {}})
+        assert encoded == b"d1:al1:x1:yi-3ee1:bi1e1:cdee"
+        assert bdecode(encoded) == {b"a": [b"x", b"y", -3], b"b": 1, b"c": {}}
+
+    def test_rejects_invalid(self):
+        """Verify malformed and trailing data raise ValueError."""
+        for bad in (b"i1", b"5:abc", b"d1:a", b"i1ei2e", b"x"):
+            with pytest.raises(ValueError):
+                bdecode(bad)
+
+    def test_info_hash_uses_raw_info_bytes(self):
+        """Verify info_hash hashes the info value exactly as stored."""
+        info = b"d4:name3:abc6:lengthi1ee"  # keys not sorted
+        torrent = b"d8:announce3:url4:info" + info + b"e"
+        assert info_hash(torrent) == hashlib.sha1(info).hexdigest()
+
+
+class TestGoldenTorrents:
+    """Output pinned to hand-assembled torrents (tests/fixtures/golden_torrents)."""
+
+    @pytest.mark.parametrize("name", ["Artist-Album-2024", "Single-Track-2024.flac"])
+    def test_info_hash_matches_golden(self, name, tmp_path):
+        """Verify the native builder still produces the golden info dict."""
+        golden = (GOLDEN_TORRENTS / f"{Path(name).stem}.torrent").read_bytes()
+
+        ours = create_torrent(GOLDEN_TORRENTS / name, "ours", tmp_path)
+
+        assert info_hash(ours.read_bytes()) == info_hash(golden)
+        assert bdecode(ours.read_bytes())[b"info"] == bdecode(golden)[b"info"]
+
+
+@pytest.mark.skipif(shutil.which("mktorrent") is None, reason="mktorrent not installed")
+class TestMktorrentParity:
+    """Byte-for-byte info-hash parity with mktorrent -p -s."""
+
+    @pytest.mark.parametrize("layout", ["multi", "single"])
+    def test_info_hash_matches_mktorrent(self, layout, tmp_path):
+        """Verify the native builder's info-hash equals mktorrent's."""
+        src = tmp_path / "Artist-Album-2024"
+        if layout == "multi":
+            (src / "CD1").mkdir(parents=True)
+            (src / "CD1" / "01 Intro.flac").write_bytes(os.urandom(200_000))
+            (src / "CD1.cue").write_bytes(b"FILE")
+            (src / "cover.jpg").write_bytes(os.urandom(33_333))
+        else:
+            src.write_bytes(os.urandom(150_000))
+        out_dir = tmp_path / "out"
         out_dir.mkdir()
 
-        with pytest.raises(Exception) as exc_info:
-            create_torrent(test_dir, "Test-Release", out_dir)
-        assert "mktorrent not found" in str(exc_info.value)
-        assert "container may need rebuild" in str(exc_info.value)
+        ours = create_torrent(src, "ours", out_dir)
+        manifest = ReleaseManifest(src)
+        theirs = out_dir / "theirs.torrent"
+        subprocess.run(
+            [
+                "mktorrent", "-p",
+                "-l", str(pick_piece_size(manifest.total_size)),
+                "-a", bdecode(ours.read_bytes())[b"announce"].decode(),
+                "-s", "TorrentLeech.org",
+                "-o", str(theirs), str(src),
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+        assert info_hash(ours.read_bytes()) == info_hash(theirs.read_bytes())
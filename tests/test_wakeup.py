@@ -0,0 +1,75 @@
+"""Tests for queue worker wakeups in src/wakeup.py."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from src.wakeup import QueueWakeup
+
+
+@pytest.fixture()
+def wake_dir(tmp_path):
+    return tmp_path / "torrup.db-wake"
+
+
+class TestQueueWakeup:
+    """Tests for QueueWakeup."""
+
+    def test_notify_before_wait_is_not_lost(self, wake_dir):
+        """Verify a notify between generation() and wait() returns at once."""
+        wakeup = QueueWakeup(wake_dir)
+        since = wakeup.generation()
+        wakeup.wake_local()
+
+        start = time.monotonic()
+        assert wakeup.wait(since, timeout=5)
+        assert time.monotonic() - start < 1
+        wakeup.close()
+
+    def test_wait_times_out(self, wake_dir):
+        """Verify wait() returns False when nothing is notified."""
+        wakeup = QueueWakeup(wake_dir)
+        assert not wakeup.wait(wakeup.generation(), timeout=0.05)
+        wakeup.close()
+
+    def test_notify_reaches_other_listener(self, wake_dir):
+        """Verify notify() wakes a waiter bound to another socket (another process)."""
+        waiter = QueueWakeup(wake_dir)
+        sender = QueueWakeup(wake_dir)
+        assert waiter.listen()
+        since = waiter.generation()
+        woken = []
+
+        thread = threading.Thread(target=lambda: woken.append(waiter.wait(since, timeout=5)))
+        thread.start()
+        sender.notify()
+        thread.join()
+
+        assert woken == [True]
+        assert waiter.stats()["received"] == 1
+        waiter.close()
+        sender.close()
+
+    def test_stale_socket_removed(self, wake_dir):
+        """Verify a socket file nobody listens on is cleaned up by the sender."""
+        wake_dir.mkdir()
+        stale = wake_dir / "99999-dead.sock"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(stale))
+        sock.close()
+
+        QueueWakeup(wake_dir).notify()
+
+        assert not stale.exists()
+
+    def test_close_removes_socket(self, wake_dir):
+        """Verify close() unlinks this process's socket."""
+        wakeup = QueueWakeup(wake_dir)
+        assert wakeup.listen()
+        assert list(wake_dir.glob("*.sock"))
+
+        wakeup.close()
+
+        assert not list(wake_dir.glob("*.sock"))
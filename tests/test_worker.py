@@ -4,6 +4,7 @@ import importlib
 import os
 import sqlite3
 import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -427,11 +428,106 @@ class TestProcessQueueItem:
             assert row["status"] == "failed"
             assert "Upload error" in row["message"]
 
+    @patch("src.worker.check_exists")
+    @patch("src.worker.extract_metadata")
+    def test_tracker_outage_requeues_item(self, mock_meta, mock_exists, worker_db, tmp_path):
+        """Verify a failed dupe check puts the item back instead of uploading it."""
+        from src.api import TrackerError
+        from src.worker import process_queue_item
+        from src.utils import now_iso
+
+        test_dir = tmp_path / "test-album"
+        test_dir.mkdir()
+        (test_dir / "track.flac").touch()
+        mock_exists.side_effect = TrackerError("timeout", "Timed out")
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            conn.execute(
+                """
+                INSERT INTO queue (media_type, path, release_name, category, tags, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                ("music", str(test_dir), "Test-Release", 31, "", "queued", now, now),
+            )
+            conn.commit()
+            item_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+            row = conn.execute("SELECT * FROM queue WHERE id = ?", (item_id,)).fetchone()
+            process_queue_item(conn, row)
+
+            row = conn.execute("SELECT status, message FROM queue WHERE id = ?", (item_id,)).fetchone()
+            assert row["status"] == "queued"
+            assert "Tracker unavailable" in row["message"]
+            mock_meta.assert_not_called()
+
+    @patch("src.api.ANNOUNCE_KEY", "test-key-123")
+    @patch("src.api.httpx.Client.post")
+    @patch("src.worker.check_exists")
+    @patch("src.worker.create_torrent")
+    @patch("src.worker.generate_nfo")
+    @patch("src.worker.extract_metadata")
+    @patch("src.worker.extract_thumbnail")
+    @patch("src.worker.write_xml_metadata")
+    def test_rejected_upload_fails_item(
+        self,
+        mock_xml,
+        mock_thumb,
+        mock_meta,
+        mock_nfo,
+        mock_torrent,
+        mock_exists,
+        mock_post,
+        worker_db,
+        tmp_path,
+    ):
+        """Verify an HTTP 400 from TL fails the item instead of requeueing it."""
+        from src.api import tracker_breaker
+        from src.worker import process_queue_item
+        from src.utils import now_iso
+
+        test_dir = tmp_path / "test-album"
+        test_dir.mkdir()
+        (test_dir / "track.flac").touch()
+
+        mock_exists.return_value = False
+        mock_meta.return_value = {}
+        mock_thumb.return_value = None
+        mock_nfo.return_value = tmp_path / "test.nfo"
+        mock_torrent.return_value = tmp_path / "test.torrent"
+        mock_xml.return_value = tmp_path / "test.xml"
+        mock_post.return_value = MagicMock(status_code=400, text="Invalid category")
+
+        (tmp_path / "test.nfo").touch()
+        (tmp_path / "test.torrent").touch()
+        (tmp_path / "test.xml").touch()
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            conn.execute(
+                """
+                INSERT INTO queue (media_type, path, release_name, category, tags, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                ("music", str(test_dir), "Test-Release", 31, "", "queued", now, now),
+            )
+            conn.commit()
+            item_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+            row = conn.execute("SELECT * FROM queue WHERE id = ?", (item_id,)).fetchone()
+            process_queue_item(conn, row)
+
+            row = conn.execute("SELECT status, message FROM queue WHERE id = ?", (item_id,)).fetchone()
+            assert row["status"] == "failed"
+            assert "HTTP 400: Invalid category" in row["message"]
+            assert mock_post.call_count == 1
+            assert tracker_breaker().stats()["consecutive_failures"] == 0
+
 
 class TestQueueWorker:
     """Tests for queue_worker function."""
 
-    @patch("src.worker.process_queue_item")
+    @patch("src.worker.prepare_queue_item")
     def test_queue_worker_processes_queued_item(
         self,
         mock_process,
@@ -447,6 +543,7 @@ class TestQueueWorker:
         # Stop after one iteration by setting shutdown after process runs
         def stop_after_process(*args, **kwargs):
             shutdown.set()
+            return None
         mock_process.side_effect = stop_after_process
 
         with worker_db.db() as conn:
@@ -462,10 +559,10 @@ class TestQueueWorker:
 
         queue_worker(shutdown)
 
-        # Verify process_queue_item was called
+        # Verify the prepare stage was called
         assert mock_process.called
 
-    @patch("src.worker.process_queue_item")
+    @patch("src.worker.prepare_queue_item")
     def test_queue_worker_stops_on_shutdown_event(
         self,
         mock_process,
@@ -482,7 +579,7 @@ class TestQueueWorker:
         # Worker should not have processed anything
         assert not mock_process.called
 
-    @patch("src.worker.process_queue_item")
+    @patch("src.worker.prepare_queue_item")
     def test_worker_skips_unapproved(
         self,
         mock_process,
@@ -721,3 +818,449 @@ class TestTestMode:
             # Should still succeed
             row = conn.execute("SELECT status FROM queue WHERE id = ?", (item_id,)).fetchone()
             assert row["status"] == "success"
+
+
+class TestShortTransactions:
+    """Tests that the pipeline never holds the write lock across a stage."""
+
+    @patch("src.worker.check_exists")
+    @patch("src.worker.upload_torrent")
+    @patch("src.worker.create_torrent")
+    @patch("src.worker.generate_nfo")
+    @patch("src.worker.extract_metadata")
+    @patch("src.worker.extract_thumbnail")
+    @patch("src.worker.write_xml_metadata")
+    def test_concurrent_writer_succeeds_during_prepare(
+        self,
+        mock_xml,
+        mock_thumb,
+        mock_meta,
+        mock_nfo,
+        mock_torrent,
+        mock_upload,
+        mock_exists,
+        worker_db,
+        tmp_path,
+    ):
+        """Verify another connection can write while an item is being prepared."""
+        from src.worker import process_queue_item
+        from src.utils import now_iso
+
+        test_dir = tmp_path / "test-album"
+        test_dir.mkdir()
+        (test_dir / "track.flac").touch()
+
+        results = []
+
+        def write_from_other_connection(*args, **kwargs):
+            # timeout=0: fail immediately with "database is locked" if the
+            # worker's connection still holds a write transaction.
+            def writer():
+                other = sqlite3.connect(tmp_path / "torrup.db", timeout=0)
+                try:
+                    other.execute(
+                        "UPDATE queue SET tags = 'edited' WHERE release_name = 'Other-Item'"
+                    )
+                    other.commit()
+                    row = other.execute(
+                        "SELECT status FROM queue WHERE release_name = 'Test-Release'"
+                    ).fetchone()
+                    results.append(("ok", row[0]))
+                except sqlite3.OperationalError as e:
+                    results.append(("locked", str(e)))
+                finally:
+                    other.close()
+
+            t = threading.Thread(target=writer)
+            t.start()
+            t.join()
+            return tmp_path / "test.torrent"
+
+        mock_exists.return_value = False
+        mock_meta.return_value = {}
+        mock_thumb.return_value = None
+        mock_nfo.return_value = tmp_path / "test.nfo"
+        mock_torrent.side_effect = write_from_other_connection
+        mock_xml.return_value = tmp_path / "test.xml"
+        mock_upload.return_value = {"success": False, "error": "rejected"}
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            for name in ("Test-Release", "Other-Item"):
+                conn.execute(
+                    """
+                    INSERT INTO queue (media_type, path, release_name, category, tags, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    ("music", str(test_dir), name, 31, "", "queued", now, now),
+                )
+            conn.commit()
+
+            row = conn.execute(
+                "SELECT * FROM queue WHERE release_name = 'Test-Release'"
+            ).fetchone()
+            process_queue_item(conn, row)
+
+        # The writer ran mid-prepare, succeeded, and saw the committed status
+        assert results == [("ok", "preparing")]
+
+
+class TestClaimAndLease:
+    """Tests for atomic claiming, heartbeats and lease reclaim."""
+
+    def _insert(self, worker_db, name, status="queued", lease=None):
+        from src.utils import now_iso
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            cur = conn.execute(
+                """
+                INSERT INTO queue (media_type, path, release_name, category, tags, status,
+                                   lease_expires_at, created_at, updated_at)
+                VALUES ('music', '/tmp/test', ?, 31, '', ?, ?, ?, ?)
+                """,
+                (name, status, lease, now, now),
+            )
+            conn.commit()
+            return cur.lastrowid
+
+    def test_concurrent_claims_never_share_an_item(self, worker_db):
+        """Many threads claiming at once each get a distinct item."""
+        from src.worker import claim_next_item
+
+        ids = {self._insert(worker_db, f"Item-{i}") for i in range(5)}
+        claimed = []
+        barrier = threading.Barrier(8)
+
+        def claimer(n):
+            barrier.wait()
+            with worker_db.db() as conn:
+                row = claim_next_item(conn, f"worker-{n}")
+                if row:
+                    claimed.append((row["id"], row["worker_id"]))
+
+        threads = [threading.Thread(target=claimer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(i for i, _ in claimed) == sorted(ids)
+        with worker_db.db() as conn:
+            rows = conn.execute("SELECT status, worker_id, lease_expires_at FROM queue").fetchall()
+        assert all(r["status"] == "preparing" and r["lease_expires_at"] for r in rows)
+        assert {r["worker_id"] for r in rows} == {w for _, w in claimed}
+
+    def test_expired_lease_is_reclaimed(self, worker_db):
+        """A crashed worker's item goes back to queued and is claimed again."""
+        from src.worker import claim_next_item
+
+        item_id = self._insert(
+            worker_db, "Stuck", status="uploading", lease="2000-01-01T00:00:00.000000Z"
+        )
+        self._insert(worker_db, "Live", status="preparing", lease="2999-01-01T00:00:00.000000Z")
+
+        with worker_db.db() as conn:
+            row = claim_next_item(conn, "worker-b")
+
+        assert row["id"] == item_id
+        assert row["worker_id"] == "worker-b"
+
+    def test_heartbeat_renews_and_terminal_status_releases(self, worker_db):
+        """Heartbeats push the lease forward; finishing clears worker and lease."""
+        from src.worker import LeaseHeartbeat, claim_next_item, update_queue_status
+
+        self._insert(worker_db, "Item")
+        with worker_db.db() as conn:
+            row = claim_next_item(conn, "worker-a", lease_seconds=1)
+            first = row["lease_expires_at"]
+
+            with LeaseHeartbeat(row["id"], "worker-a", interval=0.05):
+                time.sleep(0.2)
+            renewed = conn.execute(
+                "SELECT lease_expires_at FROM queue WHERE id = ?", (row["id"],)
+            ).fetchone()[0]
+            assert renewed > first
+
+            assert not LeaseHeartbeat(row["id"], "worker-other").renew()
+
+            update_queue_status(conn, row["id"], "success", "done")
+            final = conn.execute(
+                "SELECT worker_id, lease_expires_at FROM queue WHERE id = ?", (row["id"],)
+            ).fetchone()
+        assert tuple(final) == (None, None)
+
+
+    def test_stale_worker_cannot_overwrite_reclaimed_item(self, worker_db):
+        """A worker whose lease expired neither changes status nor uploads."""
+        from src.worker import LeaseHeartbeat, claim_next_item, update_queue_status, upload_queue_item
+
+        self._insert(worker_db, "Item")
+        with worker_db.db() as conn:
+            row = claim_next_item(conn, "worker-a")
+            # worker-a stalls; its lease expires and worker-b reclaims the item
+            conn.execute(
+                "UPDATE queue SET lease_expires_at = '2000-01-01T00:00:00.000000Z' WHERE id = ?",
+                (row["id"],),
+            )
+            conn.commit()
+            assert claim_next_item(conn, "worker-b")["id"] == row["id"]
+
+            heartbeat = LeaseHeartbeat(row["id"], "worker-a", interval=0.05).start()
+            assert heartbeat.lost.wait(2)
+            heartbeat.stop()
+
+            assert not update_queue_status(conn, row["id"], "failed", "stale", "worker-a")
+            staging = MagicMock()
+            job = {
+                "item_id": row["id"], "worker_id": "worker-a", "media_type": "music",
+                "path": Path("/tmp/test"), "metadata": {}, "torrent_path": None,
+                "nfo_path": None, "staging": staging, "test_mode": False,
+            }
+            with patch("src.worker.upload_torrent") as mock_upload:
+                upload_queue_item(conn, job)
+            final = conn.execute(
+                "SELECT status, worker_id FROM queue WHERE id = ?", (row["id"],)
+            ).fetchone()
+
+        mock_upload.assert_not_called()
+        staging.close.assert_called_once()
+        assert tuple(final) == ("preparing", "worker-b")
+
+
+class TestResumeFromCheckpoints:
+    """Tests for resuming prepare from per-stage checkpoints."""
+
+    def _insert(self, worker_db, path):
+        from src.utils import now_iso
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            conn.execute(
+                "INSERT INTO queue (media_type, path, release_name, category, tags, status, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ("music", str(path), "Test-Release", 31, "rock", "queued", now, now),
+            )
+            conn.commit()
+            return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def _row(self, conn, item_id):
+        return conn.execute("SELECT * FROM queue WHERE id = ?", (item_id,)).fetchone()
+
+    @patch("src.worker.check_exists", return_value=False)
+    @patch("src.worker.upload_torrent")
+    @patch("src.worker.create_torrent")
+    @patch("src.worker.generate_nfo")
+    @patch("src.worker.extract_metadata")
+    @patch("src.worker.extract_thumbnail", return_value=None)
+    @patch("src.worker.write_xml_metadata")
+    def test_failed_upload_retry_skips_prepare_stages(
+        self, mock_xml, mock_thumb, mock_meta, mock_nfo, mock_torrent, mock_upload,
+        mock_exists, worker_db, tmp_path,
+    ):
+        """Verify a retried upload reuses metadata, NFO, torrent and XML."""
+        from src.worker import process_queue_item
+
+        release = tmp_path / "album"
+        release.mkdir()
+        (release / "track.flac").write_bytes(b"x" * 100)
+        for name in ("test.nfo", "test.torrent", "test.xml"):
+            (tmp_path / name).write_text(name)
+        mock_meta.return_value = {"artist": "Test Artist"}
+        mock_nfo.return_value = tmp_path / "test.nfo"
+        mock_torrent.return_value = tmp_path / "test.torrent"
+        mock_xml.return_value = tmp_path / "test.xml"
+        mock_upload.side_effect = [
+            {"success": False, "error": "timeout"},
+            {"success": True, "torrent_id": 1},
+        ]
+        item_id = self._insert(worker_db, release)
+
+        with worker_db.db() as conn:
+            process_queue_item(conn, self._row(conn, item_id))
+            assert self._row(conn, item_id)["status"] == "failed"
+            process_queue_item(conn, self._row(conn, item_id))
+            row = self._row(conn, item_id)
+
+        assert row["status"] == "success"
+        assert mock_meta.call_count == 1
+        assert mock_nfo.call_count == 1
+        assert mock_torrent.call_count == 1
+        assert mock_xml.call_count == 1
+        assert mock_upload.call_count == 2
+        # Staging files are gone after success, so the checkpoints are too
+        assert row["checkpoints"] is None
+
+    @patch("src.worker.check_exists", return_value=False)
+    @patch("src.worker.upload_torrent", return_value={"success": False, "error": "x"})
+    @patch("src.worker.create_torrent")
+    @patch("src.worker.generate_nfo")
+    @patch("src.worker.extract_metadata", return_value={})
+    @patch("src.worker.extract_thumbnail", return_value=None)
+    @patch("src.worker.write_xml_metadata")
+    def test_changed_files_invalidate_stages(
+        self, mock_xml, mock_thumb, mock_meta, mock_nfo, mock_torrent, mock_upload,
+        mock_exists, worker_db, tmp_path,
+    ):
+        """Verify a modified release file re-runs every stage that reads it."""
+        from src.worker import process_queue_item
+
+        release = tmp_path / "album"
+        release.mkdir()
+        track = release / "track.flac"
+        track.write_bytes(b"x" * 100)
+        for name in ("test.nfo", "test.torrent", "test.xml"):
+            (tmp_path / name).write_text(name)
+        mock_nfo.return_value = tmp_path / "test.nfo"
+        mock_torrent.return_value = tmp_path / "test.torrent"
+        mock_xml.return_value = tmp_path / "test.xml"
+        item_id = self._insert(worker_db, release)
+
+        with worker_db.db() as conn:
+            process_queue_item(conn, self._row(conn, item_id))
+            track.write_bytes(b"y" * 200)
+            process_queue_item(conn, self._row(conn, item_id))
+
+        assert mock_meta.call_count == 2
+        assert mock_torrent.call_count == 2
+        assert mock_xml.call_count == 2
+
+    @patch("src.worker.check_exists", return_value=False)
+    @patch("src.worker.upload_torrent", return_value={"success": False, "error": "x"})
+    @patch("src.worker.create_torrent")
+    @patch("src.worker.generate_nfo")
+    @patch("src.worker.extract_metadata", return_value={})
+    @patch("src.worker.extract_thumbnail", return_value=None)
+    @patch("src.worker.write_xml_metadata")
+    def test_missing_artifact_reruns_stage(
+        self, mock_xml, mock_thumb, mock_meta, mock_nfo, mock_torrent, mock_upload,
+        mock_exists, worker_db, tmp_path,
+    ):
+        """Verify a deleted .torrent is rebuilt while intact stages are reused."""
+        from src.worker import process_queue_item
+
+        release = tmp_path / "album"
+        release.mkdir()
+        (release / "track.flac").write_bytes(b"x" * 100)
+        torrent = tmp_path / "test.torrent"
+        for name in ("test.nfo", "test.torrent", "test.xml"):
+            (tmp_path / name).write_text(name)
+        mock_nfo.return_value = tmp_path / "test.nfo"
+        mock_xml.return_value = tmp_path / "test.xml"
+
+        def build(*args, **kwargs):
+            torrent.write_text("torrent")
+            return torrent
+
+        mock_torrent.side_effect = build
+        item_id = self._insert(worker_db, release)
+
+        with worker_db.db() as conn:
+            process_queue_item(conn, self._row(conn, item_id))
+            torrent.unlink()
+            process_queue_item(conn, self._row(conn, item_id))
+
+        assert mock_meta.call_count == 1
+        assert mock_nfo.call_count == 1
+        assert mock_torrent.call_count == 2
+        # Same inputs, so the XML sidecar written for the old torrent still holds
+        assert mock_xml.call_count == 1
+
+
+def _stage(name):
+    """Mock side effect for a generator called with staging=: stage `name` in memory."""
+    def stage(*args, staging, **kwargs):
+        return staging.put(name, name.encode())
+    return stage
+
+
+class TestStagedArtifacts:
+    """Tests for preparing items into the in-memory artifact store."""
+
+    def _insert(self, worker_db, path):
+        from src.utils import now_iso
+
+        with worker_db.db() as conn:
+            now = now_iso()
+            conn.execute(
+                "INSERT INTO queue (media_type, path, release_name, category, tags, status, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ("music", str(path), "Test-Release", 31, "rock", "queued", now, now),
+            )
+            conn.commit()
+            return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def _row(self, conn, item_id):
+        return conn.execute("SELECT * FROM queue WHERE id = ?", (item_id,)).fetchone()
+
+    @patch("src.worker.check_exists", return_value=False)
+    @patch("src.worker.upload_torrent")
+    @patch("src.worker.create_torrent", side_effect=_stage("Test-Release.torrent"))
+    @patch("src.worker.generate_nfo", side_effect=_stage("Test-Release.nfo"))
+    @patch("src.worker.extract_metadata", return_value={})
+    @patch("src.worker.extract_thumbnail", return_value=None)
+    @patch("src.worker.write_xml_metadata", side_effect=_stage("Test-Release.xml"))
+    def test_retry_reuses_staged_artifacts(
+        self, mock_xml, mock_thumb, mock_meta, mock_nfo, mock_torrent, mock_upload,
+        mock_exists, worker_db, tmp_path,
+    ):
+        """Verify uploads stream staged artifacts, retries reuse them and success drops them."""
+        from src.artifacts import staging_store
+        from src.worker import process_queue_item
+
+        release = tmp_path / "album"
+        release.mkdir()
+        (release / "track.flac").write_bytes(b"x" * 100)
+        uploaded = []
+
+        def upload(torrent, nfo, *args, **kwargs):
+            uploaded.append((torrent.open().read(), nfo.open().read()))
+            return {"success": len(uploaded) > 1, "torrent_id": 7, "error": "try again"}
+
+        mock_upload.side_effect = upload
+        item_id = self._insert(worker_db, release)
+
+        with worker_db.db() as conn:
+            process_queue_item(conn, self._row(conn, item_id))
+            row = self._row(conn, item_id)
+            assert row["status"] == "failed"
+            assert row["torrent_path"] is None  # Held in memory only
+            process_queue_item(conn, self._row(conn, item_id))
+            assert self._row(conn, item_id)["status"] == "success"
+
+        assert uploaded == [(b"Test-Release.torrent", b"Test-Release.nfo")] * 2
+        assert mock_torrent.call_count == 1
+        assert mock_nfo.call_count == 1
+        assert staging_store().get(item_id, "Test-Release.torrent") is None
+        assert not list(worker_db.get_output_dir().iterdir())
+
+    @patch("src.worker.check_exists", return_value=False)
+    @patch("src.worker.upload_torrent", return_value={"success": False, "error": "x"})
+    @patch("src.worker.create_torrent", side_effect=_stage("Test-Release.torrent"))
+    @patch("src.worker.generate_nfo", side_effect=_stage("Test-Release.nfo"))
+    @patch("src.worker.extract_metadata", return_value={})
+    @patch("src.worker.extract_thumbnail", return_value=None)
+    @patch("src.worker.write_xml_metadata", side_effect=_stage("Test-Release.xml"))
+    def test_evicted_artifacts_are_rebuilt(
+        self, mock_xml, mock_thumb, mock_meta, mock_nfo, mock_torrent, mock_upload,
+        mock_exists, worker_db, tmp_path,
+    ):
+        """Verify a failed item's evicted artifacts are regenerated on retry."""
+        from src.artifacts import staging_store
+        from src.worker import process_queue_item
+
+        release = tmp_path / "album"
+        release.mkdir()
+        (release / "track.flac").write_bytes(b"x" * 100)
+        item_id = self._insert(worker_db, release)
+
+        with worker_db.db() as conn:
+            process_queue_item(conn, self._row(conn, item_id))
+            # Budget pressure evicts the failed item
+            staging_store().discard(item_id)
+            process_queue_item(conn, self._row(conn, item_id))
+
+        assert mock_meta.call_count == 1
+        assert mock_torrent.call_count == 2
+        assert mock_nfo.call_count == 2
+        assert mock_xml.call_count == 2